@@ -6,12 +6,15 @@ from typing import TYPE_CHECKING
 
 from rich.console import Console
 
+from ..core.tokens import count_prompt_tokens, provider_family
+from ..core.tracing import record_output, span, time_first_chunk, trace, traced_call
 from ..core.types import ChatConfig, ChatMessage, MessageRole
 from ..providers.base import CompletionOptions, Provider
 from .commands import CommandHandler
+from .persistence import SESSIONS_DIR
 from .prompts import get_system_prompt, make_expand_prompt
 from .session import ChatSession
-from .ui import ChatDisplay
+from .ui import ChatDisplay, StreamingResponses
 
 
 class ChatRoom:
@@ -68,7 +71,24 @@ class ChatRoom:
         target_models: list[str] | None = None,
         expand: bool = False,
     ) -> None:
-        """Send user message and collect model responses."""
+        """Send user message and collect model responses.
+
+        Each message is traced to ``<session_id>.trace.jsonl`` next to saved sessions.
+        """
+        with trace(
+            "chat.message",
+            SESSIONS_DIR / f"{self.session.session_id}.trace.jsonl",
+            session_id=self.session.session_id,
+            expand=expand,
+        ):
+            await self._send_message(content, target_models, expand)
+
+    async def _send_message(
+        self,
+        content: str,
+        target_models: list[str] | None,
+        expand: bool,
+    ) -> None:
         # Parse @mentions from content
         mentioned_models, clean_content = self._parse_mentions(content)
 
@@ -93,78 +113,86 @@ class ChatRoom:
             self.display.show_error("No matching models found.")
             return
 
-        # Show thinking indicator
-        self.display.show_thinking([p.name for p in responding_providers])
-
-        # Get responses
-        if self.config.parallel_responses:
-            tasks = [
-                self._get_response(p, clean_content, expand)
-                for p in responding_providers
-            ]
-            responses = await asyncio.gather(*tasks)
-        else:
-            responses = []
-            for p in responding_providers:
-                resp = await self._get_response(p, clean_content, expand)
-                responses.append(resp)
-
-        # Clear thinking indicator
-        self.display.clear_thinking()
+        # Stream all responses into live panels, one per model
+        with self.display.stream_responses([p.name for p in responding_providers]) as live:
+            if self.config.parallel_responses:
+                tasks = [
+                    self._get_response(p, clean_content, live, expand)
+                    for p in responding_providers
+                ]
+                responses = await asyncio.gather(*tasks)
+            else:
+                responses = []
+                for p in responding_providers:
+                    resp = await self._get_response(p, clean_content, live, expand)
+                    responses.append(resp)
 
-        # Display and store responses
+        # Store responses (already rendered by the live panels)
         for response in responses:
             if response:
                 self.session.add_message(response)
-                self.display.show_model_response(response.model, response.content)
 
     async def _get_response(
         self,
         provider: Provider,
         content: str,
+        live: StreamingResponses,
         expand: bool = False,
     ) -> ChatMessage | None:
-        """Get a single model's response."""
+        """Stream a single model's response into its live panel."""
         try:
-            # Build context from conversation history
-            context = self.session.format_context()
-
-            # Build the prompt
-            if context:
-                prompt = f"{context}\n\nUser: {content}"
-            else:
-                prompt = content
-
-            # Add expand directive if requested
-            if expand:
-                prompt = make_expand_prompt(prompt)
-
             # Get system prompt
             all_models = [p.name for p in self.providers]
             system_prompt = get_system_prompt(provider.name, all_models)
 
+            with span("prompt.build", provider=provider.name):
+                # Build context from as much recent history as the context budget allows
+                family = provider_family(provider)
+                budget = self.config.max_context_tokens - count_prompt_tokens(
+                    content, CompletionOptions(system_prompt=system_prompt), family
+                )
+                context = self.session.format_context(
+                    max_tokens=max(0, budget),
+                    family=family,
+                    max_messages=self.config.max_history_messages,
+                )
+
+                # Build the prompt
+                if context:
+                    prompt = f"{context}\n\nUser: {content}"
+                else:
+                    prompt = content
+
+                # Add expand directive if requested
+                if expand:
+                    prompt = make_expand_prompt(prompt)
+
             # Call the provider
             options = CompletionOptions(
                 system_prompt=system_prompt,
                 max_tokens=self.config.expand_max_tokens if expand else self.config.max_response_tokens,
             )
 
-            response_text = await provider.generate(prompt, options)
-
-            # Check for error
-            if response_text.startswith("[Error]"):
-                self.display.show_error(f"{provider.name}: {response_text}")
-                return None
-
+            with traced_call(provider, prompt, options, expand=expand) as call:
+                async for chunk in time_first_chunk(provider.stream(prompt, options), call):
+                    # Check for error
+                    if chunk.startswith("[Error]"):
+                        live.fail(provider.name, chunk)
+                        call.fail(chunk)
+                        return None
+                    live.append(provider.name, chunk)
+                record_output(call, provider, live.get_text(provider.name))
+
+            live.finish(provider.name)
             return ChatMessage(
                 role=MessageRole.ASSISTANT,
-                content=response_text,
+                content=live.get_text(provider.name),
                 model=provider.name,
                 is_expanded=expand,
             )
 
         except Exception as e:
-            self.display.show_error(f"{provider.name}: {e}")
+            live.fail(provider.name, f"{provider.name}: {e}")
             return None
 
     def _parse_mentions(self, content: str) -> tuple[list[str], str]:
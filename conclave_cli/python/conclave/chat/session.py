@@ -3,6 +3,7 @@
 import uuid
 from datetime import datetime
 
+from ..core.tokens import DEFAULT_FAMILY, count_tokens
 from ..core.types import ChatMessage, MessageRole
 
 
@@ -56,15 +57,34 @@ class ChatSession:
         """Clear all messages."""
         self.messages = []
 
-    def format_context(self) -> str:
-        """Format messages as context string for LLM."""
+    def format_context(
+        self,
+        max_tokens: int | None = None,
+        family: str = DEFAULT_FAMILY,
+        max_messages: int | None = None,
+    ) -> str:
+        """Format messages as context string for LLM.
+
+        With limits, keeps the most recent messages that fit within
+        ``max_tokens`` (estimated for ``family``) and ``max_messages``.
+        """
         lines = []
-        for msg in self.messages:
+        used = 0
+        for msg in reversed(self.messages):
+            if max_messages is not None and len(lines) >= max_messages:
+                break
             if msg.role == MessageRole.USER:
-                lines.append(f"User: {msg.content}")
+                line = f"User: {msg.content}"
             elif msg.role == MessageRole.ASSISTANT:
-                lines.append(f"{msg.model}: {msg.content}")
-        return "\n\n".join(lines)
+                line = f"{msg.model}: {msg.content}"
+            else:
+                continue
+            if max_tokens is not None:
+                used += count_tokens(line, family)
+                if used > max_tokens:
+                    break
+            lines.append(line)
+        return "\n\n".join(reversed(lines))
 
     def to_dict(self) -> dict:
         """Serialize session for persistence."""
@@ -1,5 +1,5 @@
 """Chat UI components."""
 
-from .display import ChatDisplay
+from .display import ChatDisplay, StreamingResponses
 
-__all__ = ["ChatDisplay"]
+__all__ = ["ChatDisplay", "StreamingResponses"]
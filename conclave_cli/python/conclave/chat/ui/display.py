@@ -1,11 +1,12 @@
 """Rich-based terminal UI for chat display."""
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.spinner import Spinner
 from rich.table import Table
+from rich.text import Text
 
 from ...utils.banner import print_banner
 
@@ -17,6 +18,99 @@ MODEL_COLORS = {
     "grok": "red",
 }
 
+# Live panels redraw at a fixed rate, however fast tokens arrive
+STREAM_REFRESH_PER_SECOND = 8
+
+
+class StreamingResponses:
+    """Live-updating panels, one per responding model, filled in as tokens arrive.
+
+    Chunks only mutate buffered text; rich's auto-refresh redraws at a fixed
+    rate, so concurrent streams cost a bounded number of re-renders. While
+    streaming, each panel shows the latest lines that fit its share of the
+    terminal as plain text; the finished responses are printed once, as
+    Markdown, when the live display closes.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        models: list[str],
+        refresh_per_second: float = STREAM_REFRESH_PER_SECOND,
+    ):
+        self.console = console
+        self.models = models
+        self._buffers: dict[str, list[str]] = {model: [] for model in models}
+        self._status: dict[str, str] = {model: "thinking" for model in models}
+        self._live = Live(
+            get_renderable=self._render,
+            console=console,
+            refresh_per_second=refresh_per_second,
+            vertical_overflow="crop",
+            transient=True,
+        )
+
+    def __enter__(self) -> "StreamingResponses":
+        self._live.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._live.stop()
+        self.console.print(Group(*(self._render_panel(model, final=True) for model in self.models)))
+
+    def append(self, model: str, chunk: str) -> None:
+        """Append a chunk of text to a model's panel."""
+        self._buffers[model].append(chunk)
+        self._status[model] = "streaming"
+
+    def finish(self, model: str) -> None:
+        """Mark a model's response as complete."""
+        self._status[model] = "done"
+
+    def fail(self, model: str, error: str) -> None:
+        """Replace a model's panel content with an error."""
+        self._buffers[model] = [error]
+        self._status[model] = "error"
+
+    def get_text(self, model: str) -> str:
+        """Get the text streamed so far for a model."""
+        return "".join(self._buffers[model])
+
+    def _render(self) -> Group:
+        """Build the current panel stack."""
+        return Group(*(self._render_panel(model) for model in self.models))
+
+    def _tail(self, model: str) -> Text:
+        """The last lines of a model's text that fit its share of the terminal."""
+        # Each panel spends two lines on its border
+        lines = max(1, self.console.height // len(self.models) - 2)
+        width = max(1, self.console.width - 4)
+        wrapped = Text(self.get_text(model)).wrap(self.console, width)
+        return Text("\n").join(wrapped[-lines:])
+
+    def _render_panel(self, model: str, final: bool = False) -> Panel:
+        """Build the panel for a single model, as Markdown once it is final."""
+        status = self._status[model]
+        color = "red" if status == "error" else MODEL_COLORS.get(model.lower(), "white")
+
+        if status == "thinking" and final:
+            body = Text("no response", style="dim")
+        elif status == "thinking":
+            body = Spinner("dots", text="[dim]thinking...[/dim]")
+        elif status == "error":
+            body = Text(self.get_text(model), style="red")
+        elif final:
+            body = Markdown(self.get_text(model))
+        else:
+            body = self._tail(model)
+
+        return Panel(
+            body,
+            title=f"[{color} bold]{model}[/{color} bold]",
+            border_style=color,
+            padding=(0, 1),
+        )
+
 
 class ChatDisplay:
     """Handles all terminal rendering for chat."""
@@ -60,6 +154,10 @@ class ChatDisplay:
             )
         )
 
+    def stream_responses(self, models: list[str]) -> StreamingResponses:
+        """Create a live renderer with one panel per responding model."""
+        return StreamingResponses(self.console, models)
+
     def show_thinking(self, models: list[str]) -> None:
         """Show thinking indicator for models."""
         names = ", ".join(models)
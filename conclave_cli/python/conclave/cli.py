@@ -1,22 +1,41 @@
 """Conclave CLI entry point."""
 
 import asyncio
+import contextlib
+import glob
+import json
 import os
-import shutil
 import subprocess
+import sys
 from pathlib import Path
 
 import click
 from dotenv import load_dotenv
 from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
 
 from .core.config import ConfigManager
+from .core.deltas import DeltaSavings
+from .core.manifest import RunManifest
+from .core.tracing import shutdown as shutdown_tracing
 from .core.types import FlowConfig, FlowPrompts, FlowType
+from .core.usage import UsageLedger
 from .flows import create_flow_engine, get_flow_metadata
-from .providers.factory import create_providers
+from .providers.cache import ResponseCache
+from .providers.claude_cli import close_worker_pools, find_claude
+from .providers.factory import create_provider, create_providers
+from .providers.transport import close_http_clients
 from .utils.banner import print_banner
+from .utils.output import create_run_context
 
 # Load .env file
 load_dotenv()
@@ -51,6 +70,134 @@ KNOWN_MODELS = {
 }
 
 
+def run_async(coro):
+    """Run a coroutine, closing pooled connections and CLI workers before the loop shuts down.
+
+    Spans still queued for an OTLP collector are flushed last.
+    """
+
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await close_worker_pools()
+            await close_http_clients()
+            await asyncio.to_thread(shutdown_tracing)
+
+    return asyncio.run(runner())
+
+
+def open_cache(config, use_cache: bool | None) -> ResponseCache | None:
+    """Open the response cache if enabled by flag or config."""
+    enabled = config.cache.enabled if use_cache is None else use_cache
+    return ResponseCache(max_size_mb=config.cache.max_size_mb) if enabled else None
+
+
+def print_cache_stats(cache: ResponseCache | None) -> None:
+    """Print response cache hit/miss statistics."""
+    if not cache:
+        return
+    stats = cache.stats()
+    console.print(
+        f"[dim]Response cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate)[/dim]"
+    )
+
+
+def print_usage_summary(usage: UsageLedger) -> None:
+    """Print tokens and cost per provider for a finished run."""
+    rows = usage.by_provider()
+    if not rows:
+        return
+    table = Table(title="Usage", title_justify="left")
+    table.add_column("Provider")
+    table.add_column("Model", style="dim", overflow="fold")
+    table.add_column("Calls", justify="right")
+    table.add_column("Input", justify="right")
+    table.add_column("Cache r/w", justify="right")
+    table.add_column("Output", justify="right")
+    table.add_column("Cost", justify="right")
+
+    def cells(totals: dict) -> list[str]:
+        cost = f"${totals['cost_usd']:.4f}"
+        if totals.get("unpriced_models"):
+            cost += "*"
+        return [
+            str(totals["calls"]),
+            f"{totals['input_tokens']:,}",
+            f"{totals['cache_read_tokens']:,}/{totals['cache_write_tokens']:,}",
+            f"{totals['output_tokens']:,}",
+            cost,
+        ]
+
+    for (provider, model), totals in rows.items():
+        table.add_row(provider, model, *cells(totals))
+    total = usage.total()
+    table.add_section()
+    table.add_row("[bold]Total[/bold]", "", *cells(total))
+    console.print()
+    console.print(table)
+    if total["estimated_calls"]:
+        console.print(
+            f"[dim]{total['estimated_calls']} call(s) without reported usage "
+            "were estimated locally.[/dim]"
+        )
+    if total.get("unpriced_models"):
+        console.print(
+            f"[dim]* No price known for {', '.join(total['unpriced_models'])}; "
+            f"add it under 'pricing' in the config.[/dim]"
+        )
+
+
+def print_delta_summary(deltas: DeltaSavings) -> None:
+    """Print what sending peers' changes as diffs saved, per round."""
+    if not deltas.rounds:
+        return
+    table = Table(title="Delta prompts", title_justify="left")
+    table.add_column("Round", justify="right")
+    table.add_column("Diffed", justify="right")
+    table.add_column("Full tokens", justify="right")
+    table.add_column("Sent tokens", justify="right")
+    table.add_column("Saved tokens", justify="right")
+    table.add_column("Saved KB", justify="right")
+
+    def cells(entry: dict) -> list[str]:
+        return [
+            f"{entry['full_tokens']:,}",
+            f"{entry['sent_tokens']:,}",
+            f"{entry['saved_tokens']:,}",
+            f"{entry['saved_bytes'] / 1024:,.1f}",
+        ]
+
+    for entry in deltas.rounds:
+        table.add_row(str(entry["round"]), str(entry["diffed_outputs"]), *cells(entry))
+    table.add_section()
+    table.add_row("[bold]Total[/bold]", "", *cells(deltas.total()))
+    console.print(table)
+
+
+def execute(
+    engine, file_path: str, prompt_override: str | None, cache: ResponseCache | None
+) -> None:
+    """Run a flow engine and print its summaries; Ctrl-C exits once the run manifest is flushed."""
+    try:
+        run_async(engine.run(file_path, prompt_override))
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+    print_usage_summary(engine.usage)
+    print_delta_summary(engine.deltas)
+    print_cache_stats(cache)
+
+
+def apply_limits(flow: FlowConfig, max_cost: float | None, max_tokens: int | None) -> FlowConfig:
+    """The flow with its budget limits overridden by the given options."""
+    limits = {"max_cost": max_cost, "max_tokens": max_tokens}
+    limits = {key: value for key, value in limits.items() if value is not None}
+    if not limits:
+        return flow
+    return flow.model_copy(update={"budget": flow.budget.model_copy(update=limits)})
+
+
 @click.group(invoke_without_command=True)
 @click.version_option(version="0.1.0")
 @click.pass_context
@@ -68,7 +215,38 @@ def main(ctx):
 @click.argument("file_path", type=click.Path(exists=True))
 @click.option("-p", "--prompt", "prompt_override", help="Override the initial prompt")
 @click.option("-l", "--leader", help="Specify the leader provider (for leading flows)")
-def run(flow_name: str, file_path: str, prompt_override: str | None, leader: str | None):
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=None,
+    help="Serve repeated calls from the response cache",
+)
+@click.option(
+    "--batch/--no-batch",
+    "use_batch",
+    default=None,
+    help="Run rounds through provider batch APIs (basic flows)",
+)
+@click.option(
+    "--max-cost",
+    type=float,
+    help="Stop (or shrink replies) before the run would exceed this many USD",
+)
+@click.option(
+    "--max-tokens",
+    type=int,
+    help="Stop (or shrink replies) before the run would exceed this many tokens",
+)
+def run(
+    flow_name: str,
+    file_path: str,
+    prompt_override: str | None,
+    leader: str | None,
+    use_cache: bool | None,
+    use_batch: bool | None,
+    max_cost: float | None,
+    max_tokens: int | None,
+):
     """Run a specific flow on a markdown file."""
     config_manager = ConfigManager()
     config = config_manager.get_config()
@@ -79,7 +257,11 @@ def run(flow_name: str, file_path: str, prompt_override: str | None, leader: str
         console.print(f"Available flows: {', '.join(config.flows.keys())}")
         raise SystemExit(1)
 
-    providers = create_providers(config)
+    # Budget options override the flow's own limits
+    flow = apply_limits(flow, max_cost, max_tokens)
+
+    cache = open_cache(config, use_cache)
+    providers = create_providers(config, cache)
     flow_type = flow.flow_type.value if isinstance(flow.flow_type, FlowType) else flow.flow_type
 
     # Show flow explanation from metadata
@@ -100,9 +282,247 @@ def run(flow_name: str, file_path: str, prompt_override: str | None, leader: str
         choice = Prompt.ask("Enter number", default="1")
         leader_name = provider_names[int(choice) - 1]
 
+    # Batch mode trades latency for cost
+    batch_enabled = config.batch.enabled if use_batch is None else use_batch
+    batch = config.batch if batch_enabled else None
+    if batch and flow_type == "leading":
+        if use_batch:
+            console.print("[red]Error: Batch mode is only supported for basic flows.[/red]")
+            raise SystemExit(1)
+        console.print(
+            "[dim]Batch mode is only supported for basic flows; running interactively.[/dim]"
+        )
+        batch = None
+
+    # Peer-output summaries use their own (usually cheaper) provider
+    summarizer = None
+    if flow.compaction.enabled and flow.compaction.summary_provider:
+        summarizer = create_provider(config, flow.compaction.summary_provider, cache)
+
     # Create and run the appropriate engine
-    engine = create_flow_engine(flow_type, providers, flow, leader=leader_name)
-    asyncio.run(engine.run(file_path, prompt_override))
+    engine = create_flow_engine(
+        flow_type,
+        providers,
+        flow,
+        leader=leader_name,
+        batch=batch,
+        summarizer=summarizer,
+    )
+    execute(engine, file_path, prompt_override, cache)
+
+
+@main.command()
+@click.argument("run_id")
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=None,
+    help="Serve repeated calls from the response cache",
+)
+@click.option(
+    "--max-cost",
+    type=float,
+    help="Stop (or shrink replies) before the run would exceed this many USD",
+)
+@click.option(
+    "--max-tokens",
+    type=int,
+    help="Stop (or shrink replies) before the run would exceed this many tokens",
+)
+def resume(run_id: str, use_cache: bool | None, max_cost: float | None, max_tokens: int | None):
+    """Resume an interrupted run, making only the calls it is missing.
+
+    A batch run goes on in batch mode, polling the batches it had already
+    submitted rather than submitting them again.
+    """
+    manifest = RunManifest(create_run_context(run_id).run_dir)
+    if not manifest.started:
+        console.print(f"[red]Error: No run manifest found for run '{run_id}'.[/red]")
+        raise SystemExit(1)
+    if manifest.status == "complete":
+        console.print(f"[green]Run '{run_id}' is already complete.[/green]")
+        return
+
+    input_file = manifest.data["input_file"]
+    if not Path(input_file).exists():
+        console.print(f"[red]Error: The run's input file {input_file} no longer exists.[/red]")
+        raise SystemExit(1)
+
+    config = ConfigManager().get_config()
+    # The run goes on with the flow config it started with
+    flow = apply_limits(FlowConfig.model_validate(manifest.data["flow"]), max_cost, max_tokens)
+    cache = open_cache(config, use_cache)
+    providers = create_providers(config, cache)
+    gone = set(manifest.data["providers"]) - {p.name for p in providers}
+    if gone:
+        console.print(
+            f"[yellow]Warning: {', '.join(sorted(gone))} no longer configured; "
+            f"their missing calls are skipped.[/yellow]"
+        )
+
+    summarizer = None
+    if flow.compaction.enabled and flow.compaction.summary_provider:
+        summarizer = create_provider(config, flow.compaction.summary_provider, cache)
+
+    engine = create_flow_engine(
+        manifest.data["flow_type"],
+        providers,
+        flow,
+        leader=manifest.data.get("leader"),
+        # Batch IDs in flight are read back from the run's batch checkpoint
+        batch=config.batch if manifest.data.get("batch") else None,
+        run_id=run_id,
+        summarizer=summarizer,
+    )
+    execute(engine, input_file, manifest.data.get("prompt_override"), cache)
+
+
+@main.command("run-batch")
+@click.argument("flow_name", required=False)
+@click.argument("patterns", nargs=-1)
+@click.option("-p", "--prompt", "prompt_override", help="Override the initial prompt")
+@click.option("-l", "--leader", help="Specify the leader provider (for leading flows)")
+@click.option("-j", "--jobs", default=8, show_default=True, help="Input files in flight at once")
+@click.option(
+    "--concurrency",
+    default=4,
+    show_default=True,
+    help="Calls in flight per provider without its own max_concurrency",
+)
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=None,
+    help="Serve repeated calls from the response cache",
+)
+@click.option("--resume", "resume_id", help="Resume an interrupted batch by its batch ID")
+def run_batch(
+    flow_name: str | None,
+    patterns: tuple[str, ...],
+    prompt_override: str | None,
+    leader: str | None,
+    jobs: int,
+    concurrency: int,
+    use_cache: bool | None,
+    resume_id: str | None,
+):
+    """Run a flow over every file matching the glob patterns, in one process."""
+    from .commands.run_batch import INDEX_FILE, BatchRun
+    from .providers.ratelimit import rate_limiters
+
+    config_manager = ConfigManager()
+    config = config_manager.get_config()
+
+    if resume_id:
+        batch = BatchRun.load(resume_id)
+        if batch is None:
+            console.print(f"[red]Error: No batch index found for batch '{resume_id}'.[/red]")
+            raise SystemExit(1)
+    else:
+        flow = config_manager.get_flow(flow_name) if flow_name else None
+        if not flow:
+            console.print(f"[red]Error: Flow '{flow_name}' not found.[/red]")
+            console.print(f"Available flows: {', '.join(config.flows.keys())}")
+            raise SystemExit(1)
+        # Shells expand globs themselves; a pattern they didn't expand is matched here
+        inputs = dict.fromkeys(
+            path
+            for pattern in patterns
+            for path in sorted(glob.glob(pattern, recursive=True))
+            if Path(path).is_file()
+        )
+        if not inputs:
+            console.print("[red]Error: No input files match the given patterns.[/red]")
+            raise SystemExit(1)
+        flow_type = flow.flow_type.value if isinstance(flow.flow_type, FlowType) else flow.flow_type
+        leader = leader or flow.default_leader
+        if flow_type == "leading" and not leader:
+            console.print(
+                "[red]Error: Leading flows need a leader. "
+                "Specify --leader or set default_leader.[/red]"
+            )
+            raise SystemExit(1)
+        batch = BatchRun(
+            None, flow, flow_type, list(inputs), leader=leader, prompt_override=prompt_override
+        )
+
+    # Every file shares these providers, so their caps hold across the whole batch
+    capped = {"max_concurrency": concurrency}
+    config = config.model_copy(update={"providers": {
+        name: provider if provider.max_concurrency else provider.model_copy(update=capped)
+        for name, provider in config.providers.items()
+    }})
+    cache = open_cache(config, use_cache)
+    providers = create_providers(config, cache)
+    summarizer = None
+    if batch.flow.compaction.enabled and batch.flow.compaction.summary_provider:
+        summarizer = create_provider(config, batch.flow.compaction.summary_provider, cache)
+
+    console.print(
+        f"\n[green]Batch {batch.batch_id}: {batch.flow.name} over {len(batch.items)} file(s), "
+        f"{jobs} at a time[/green]"
+    )
+
+    async def run_with_progress():
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=console,
+        ) as progress:
+            task = progress.add_task("", total=len(batch.items))
+
+            def update():
+                state = batch.progress()
+                slots = ", ".join(
+                    f"{name} {limiter.in_flight}/{limiter.max_concurrency}"
+                    for name, limiter in rate_limiters().items()
+                    if limiter.max_concurrency
+                )
+                progress.update(
+                    task,
+                    completed=state["done"],
+                    description=(
+                        f"{state['running']} running, {state['failed']} failed, "
+                        f"{state['calls']} calls, ${state['cost_usd']:.4f} [dim]{slots}[/dim]"
+                    ),
+                )
+
+            async def tick():
+                while True:
+                    update()
+                    await asyncio.sleep(0.5)
+
+            ticker = asyncio.create_task(tick())
+            try:
+                await batch.run(providers, jobs, summarizer)
+            finally:
+                ticker.cancel()
+                update()
+
+    try:
+        run_async(run_with_progress())
+    except KeyboardInterrupt:
+        console.print(
+            "[yellow]Batch interrupted; resume it with: "
+            f"conclave run-batch --resume {batch.batch_id}[/yellow]"
+        )
+        raise SystemExit(130)
+
+    total = batch.to_dict()["total"]
+    console.print(
+        f"\n[bold]{total['complete']}/{total['files']} complete[/bold], {total['failed']} failed; "
+        f"{total['calls']} calls, {total['tokens']:,} tokens, ${total['cost_usd']:.4f}"
+    )
+    for item in batch.items:
+        if item.status == "failed":
+            console.print(f"  [red]{item.input_file}: {item.error}[/red]")
+    console.print(f"Results index: {batch.dir / INDEX_FILE}")
+    print_cache_stats(cache)
+    if total["failed"]:
+        raise SystemExit(1)
 
 
 @main.command("list")
@@ -164,7 +584,7 @@ def doctor():
             else:
                 console.print(f"[red]FAILED[/red] - {message}")
 
-    asyncio.run(check_all())
+    run_async(check_all())
     console.print()
 
 
@@ -325,7 +745,7 @@ def auth_claude():
 
     # Check Claude CLI status
     console.print("Checking Claude Code status...")
-    claude_path = shutil.which("claude")
+    claude_path = find_claude()
 
     if not claude_path:
         console.print("[red]Claude CLI not found.[/red]")
@@ -363,6 +783,149 @@ def auth_claude():
         console.print("4. Run [bold]conclave auth-claude[/bold] again")
 
 
+@main.command()
+@click.argument("flow_name", default="basic-ideator")
+@click.option(
+    "--sizes", default="1,16,128", help="Input sizes to benchmark, in KB (comma-separated)"
+)
+@click.option(
+    "--providers",
+    "provider_counts",
+    default="2,4,8",
+    help="Provider counts to benchmark (comma-separated)",
+)
+@click.option("-n", "--repeats", default=3, show_default=True, help="Timed runs per case")
+@click.option(
+    "--latency",
+    type=click.Choice(["fixed", "lognormal", "pareto"]),
+    default="lognormal",
+    show_default=True,
+)
+@click.option("--latency-ms", default=200.0, show_default=True, help="Median time to first token")
+@click.option(
+    "--tokens-per-second", default=400.0, show_default=True, help="Simulated streaming rate"
+)
+@click.option(
+    "--response-tokens", default=400, show_default=True, help="Length of each simulated reply"
+)
+@click.option("--seed", default=0, show_default=True, help="Seed for reproducible latencies")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(),
+    help="Results JSON path ('-' for stdout; default: .conclave/bench/)",
+)
+@click.option(
+    "--baseline", type=click.Path(), help="Baseline results JSON to check for regressions"
+)
+@click.option(
+    "--tolerance",
+    default=0.2,
+    show_default=True,
+    help="Allowed growth over the baseline (0.2 = 20%)",
+)
+@click.option("--save-baseline", is_flag=True, help="Store these results as the new baseline")
+@click.option("--keep-runs", is_flag=True, help="Keep the run directories the benchmark writes")
+def bench(
+    flow_name: str,
+    sizes: str,
+    provider_counts: str,
+    repeats: int,
+    latency: str,
+    latency_ms: float,
+    tokens_per_second: float,
+    response_tokens: int,
+    seed: int,
+    output: str | None,
+    baseline: str | None,
+    tolerance: float,
+    save_baseline: bool,
+    keep_runs: bool,
+):
+    """Benchmark a flow end to end over simulated providers."""
+    from .commands import bench as benchmark
+    from .core.types import MockConfig
+    from .flows.basic import engine as basic_engine
+    from .flows.leading import engine as leading_engine
+
+    # With results on stdout, anything else printed goes to stderr so the JSON stays parseable
+    to_stderr = contextlib.nullcontext()
+    if output == "-":
+        to_stderr = contextlib.redirect_stdout(sys.stderr)
+
+    with to_stderr:
+        config = ConfigManager().get_config()
+    if flow_name not in config.flows:
+        console.print(f"[red]Error: Flow '{flow_name}' not found.[/red]")
+        console.print(f"Available flows: {', '.join(config.flows.keys())}")
+        raise SystemExit(1)
+    if save_baseline and not baseline:
+        console.print("[red]Error: --save-baseline needs --baseline PATH.[/red]")
+        raise SystemExit(1)
+
+    settings = MockConfig(
+        latency=latency,
+        latency_ms=latency_ms,
+        tokens_per_second=tokens_per_second,
+        response_tokens=response_tokens,
+        seed=seed,
+    )
+
+    progress = Console(stderr=True) if output == "-" else console
+
+    def report(case):
+        summary = case.to_dict()
+        progress.print(
+            f"[dim]{summary['input_kb']:>5} KB x {summary['providers']:>2} providers: "
+            f"wall {summary['wall_s']:.3f}s, overhead {summary['overhead_s']:.3f}s "
+            f"({summary['overhead_pct']:.1f}%), peak {summary['peak_memory_mb']:.1f} MB, "
+            f"{summary['bytes_written']:,} bytes written[/dim]"
+        )
+
+    progress.print(f"[bold]Benchmarking {flow_name}[/bold] ({repeats} runs per case)")
+    with to_stderr, benchmark.quiet_consoles(basic_engine.console, leading_engine.console):
+        results = run_async(benchmark.run_bench(
+            config,
+            flow_name,
+            [int(s) for s in sizes.split(",")],
+            [int(n) for n in provider_counts.split(",")],
+            settings,
+            repeats=repeats,
+            keep_runs=keep_runs,
+            on_case=report,
+        ))
+
+    regressions = []
+    baseline_path = Path(baseline) if baseline else None
+    if baseline_path and baseline_path.exists() and not save_baseline:
+        regressions = benchmark.compare_to_baseline(
+            results, benchmark.load_results(baseline_path), tolerance
+        )
+        results["regressions"] = regressions
+
+    if output == "-":
+        click.echo(json.dumps(results, indent=2))
+    else:
+        output_path = Path(output) if output else benchmark.default_results_path()
+        benchmark.save_results(output_path, results)
+        progress.print(f"Results written to {output_path}")
+
+    if save_baseline:
+        benchmark.save_results(baseline_path, results)
+        progress.print(f"Baseline saved to {baseline_path}")
+    elif baseline_path and not baseline_path.exists():
+        progress.print(f"[yellow]Baseline {baseline_path} not found; nothing to compare.[/yellow]")
+
+    if regressions:
+        progress.print(f"[red]{len(regressions)} regression(s) against {baseline_path}:[/red]")
+        for r in regressions:
+            progress.print(
+                f"  [red]{r['input_kb']} KB x {r['providers']} providers: {r['metric']} "
+                f"{r['baseline']:.3f} -> {r['current']:.3f}[/red]"
+            )
+        raise SystemExit(1)
+
+
 @main.command()
 def init():
     """Run the setup wizard to configure providers."""
@@ -375,7 +938,13 @@ def init():
 @main.command()
 @click.option("-m", "--model", "models", multiple=True, help="Models to include (default: all active)")
 @click.option("-s", "--session", "session_file", help="Load existing session file")
-def chat(models: tuple[str], session_file: str | None):
+@click.option(
+    "--cache/--no-cache",
+    "use_cache",
+    default=None,
+    help="Serve repeated calls from the response cache",
+)
+def chat(models: tuple[str], session_file: str | None, use_cache: bool | None):
     """Start an interactive multi-LLM chat room."""
     from .chat import ChatRoom, ChatSession
     from .chat.persistence import load_session
@@ -389,7 +958,8 @@ def chat(models: tuple[str], session_file: str | None):
         active = [m.lower() for m in models]
         config.active_providers = [p for p in config.active_providers if p.lower() in active]
 
-    providers = create_providers(config)
+    cache = open_cache(config, use_cache)
+    providers = create_providers(config, cache)
 
     if not providers:
         console.print("[red]No providers available. Run `conclave doctor` to check.[/red]")
@@ -410,7 +980,8 @@ def chat(models: tuple[str], session_file: str | None):
     room = ChatRoom(providers, chat_config, session, console)
 
     # Run the chat
-    asyncio.run(room.start())
+    run_async(room.start())
+    print_cache_stats(cache)
 
 
 if __name__ == "__main__":
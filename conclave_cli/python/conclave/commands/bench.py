@@ -0,0 +1,323 @@
+"""End-to-end flow benchmark over simulated providers.
+
+Runs a flow against mock providers (see providers.mock) for every combination
+of input size and provider count, and measures where the time goes:
+
+- wall: total time of a run
+- critical path: per round, the slowest provider call, i.e. how long the
+  round would take with zero orchestration cost
+- overhead: wall time not spent waiting on providers (prompt building,
+  token counting, file I/O, scheduling)
+- peak memory: Python allocations during a run (tracemalloc, measured on a
+  separate run so tracing doesn't skew the timings)
+- bytes written to the run directory
+
+Results are JSON so releases can be compared; a stored baseline flags cases
+that got slower or heavier.
+"""
+
+import contextlib
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from .. import __version__
+from ..core.types import (
+    ConclaveConfig,
+    FlowConfig,
+    FlowType,
+    MockConfig,
+    ProviderConfig,
+    ProviderType,
+)
+from ..flows import create_flow_engine
+from ..providers.base import CompletionOptions, Prompt, Provider, ProviderWrapper
+from ..providers.factory import create_providers
+
+# Metrics compared against a baseline; a case regresses when any grows past tolerance
+BASELINE_METRICS = ("wall_s", "overhead_s", "peak_memory_mb", "bytes_written")
+
+# Changes smaller than these are noise, whatever the relative change
+MIN_REGRESSION_DELTA = {
+    "wall_s": 0.05,
+    "overhead_s": 0.05,
+    "peak_memory_mb": 1.0,
+    "bytes_written": 1024,
+}
+
+# Paragraph repeated to build synthetic inputs
+SYNTHETIC_PARAGRAPH = (
+    "The service accepts uploads, validates them against the schema, stores the "
+    "payload in object storage and records metadata in the database. A worker "
+    "picks up new records, enriches them and publishes events for downstream "
+    "consumers. Failures are retried with backoff and surfaced on the dashboard.\n\n"
+)
+
+
+class TimedProvider(ProviderWrapper):
+    """Records the start and end of every call to the wrapped provider."""
+
+    def __init__(self, inner: Provider, calls: list[tuple[float, float]]):
+        super().__init__(inner)
+        self.calls = calls
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
+        start = time.perf_counter()
+        try:
+            return await self.inner.generate(prompt, options)
+        finally:
+            self.calls.append((start, time.perf_counter()))
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        try:
+            async for chunk in self.inner.stream(prompt, options):
+                yield chunk
+        finally:
+            self.calls.append((start, time.perf_counter()))
+
+
+@dataclass
+class RunMeasurement:
+    """Measurements of a single run."""
+
+    wall_s: float
+    rounds_s: list[float]
+    bytes_written: int
+
+    @property
+    def provider_wait_s(self) -> float:
+        return sum(self.rounds_s)
+
+    @property
+    def overhead_s(self) -> float:
+        return max(0.0, self.wall_s - self.provider_wait_s)
+
+
+@dataclass
+class BenchCase:
+    """One flow / input size / provider count combination."""
+
+    flow: str
+    input_kb: int
+    providers: int
+    runs: list[RunMeasurement] = field(default_factory=list)
+    peak_memory_mb: float = 0.0
+
+    def to_dict(self) -> dict:
+        walls = [r.wall_s for r in self.runs]
+        overheads = [r.overhead_s for r in self.runs]
+        round_count = max(len(r.rounds_s) for r in self.runs)
+        rounds = [
+            statistics.median(r.rounds_s[i] for r in self.runs if i < len(r.rounds_s))
+            for i in range(round_count)
+        ]
+        wall = statistics.median(walls)
+        overhead = statistics.median(overheads)
+        return {
+            "flow": self.flow,
+            "input_kb": self.input_kb,
+            "providers": self.providers,
+            "repeats": len(self.runs),
+            "wall_s": wall,
+            "wall_min_s": min(walls),
+            "wall_max_s": max(walls),
+            "critical_path_s": rounds,
+            "provider_wait_s": sum(rounds),
+            "overhead_s": overhead,
+            "overhead_pct": 100 * overhead / wall if wall else 0.0,
+            "peak_memory_mb": self.peak_memory_mb,
+            "bytes_written": max(r.bytes_written for r in self.runs),
+        }
+
+
+def critical_path(calls: list[tuple[float, float]]) -> list[float]:
+    """Slowest call of each round, where a round is a group of overlapping calls.
+
+    Flows wait for every call of a round before starting the next, so a new
+    round begins with the first call that starts after all earlier calls ended.
+    """
+    rounds: list[float] = []
+    round_end = None
+    for start, end in sorted(calls):
+        if round_end is None or start >= round_end:
+            rounds.append(0.0)
+            round_end = end
+        round_end = max(round_end, end)
+        rounds[-1] = max(rounds[-1], end - start)
+    return rounds
+
+
+def synthetic_input(directory: Path, size_kb: int) -> Path:
+    """Write a markdown input of roughly ``size_kb`` kilobytes."""
+    target = size_kb * 1024
+    repeats = max(1, target // len(SYNTHETIC_PARAGRAPH))
+    path = directory / f"input-{size_kb}kb.md"
+    path.write_text("# Service design\n\n" + SYNTHETIC_PARAGRAPH * repeats)
+    return path
+
+
+def directory_size(path: Path) -> int:
+    """Total bytes of the files under a directory."""
+    if not path.exists():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def mock_config(base: ConclaveConfig, count: int, settings: MockConfig) -> ConclaveConfig:
+    """A copy of the config whose active providers are ``count`` mock providers."""
+    names = [f"mock-{i + 1}" for i in range(count)]
+    providers = {
+        name: ProviderConfig(
+            type=ProviderType.MOCK,
+            # Each provider draws its own latencies; a fixed seed keeps runs comparable
+            mock=settings.model_copy(
+                update={"seed": None if settings.seed is None else settings.seed + i}
+            ),
+        )
+        for i, name in enumerate(names)
+    }
+    return base.model_copy(update={"active_providers": names, "providers": providers})
+
+
+async def run_once(
+    config: ConclaveConfig,
+    flow: FlowConfig,
+    input_file: Path,
+    keep_runs: bool = False,
+) -> RunMeasurement:
+    """Run the flow once and measure it."""
+    calls: list[tuple[float, float]] = []
+    providers = [TimedProvider(p, calls) for p in create_providers(config)]
+    flow_type = flow.flow_type.value if isinstance(flow.flow_type, FlowType) else flow.flow_type
+    # Every provider takes part, whatever the flow normally filters to
+    flow = flow.model_copy(update={"active_providers": None})
+    engine = create_flow_engine(flow_type, providers, flow, leader=providers[0].name)
+
+    start = time.perf_counter()
+    await engine.run(str(input_file))
+    wall = time.perf_counter() - start
+
+    measurement = RunMeasurement(
+        wall_s=wall,
+        rounds_s=critical_path(calls),
+        bytes_written=directory_size(engine.run_dir),
+    )
+    if not keep_runs:
+        shutil.rmtree(engine.run_dir, ignore_errors=True)
+    return measurement
+
+
+async def run_bench(
+    config: ConclaveConfig,
+    flow_name: str,
+    sizes_kb: list[int],
+    provider_counts: list[int],
+    settings: MockConfig,
+    repeats: int = 3,
+    keep_runs: bool = False,
+    on_case: Callable[[BenchCase], None] | None = None,
+) -> dict:
+    """Benchmark a flow over every input size and provider count."""
+    flow = config.flows[flow_name]
+    cases: list[BenchCase] = []
+
+    with tempfile.TemporaryDirectory(prefix="conclave-bench-") as tmp:
+        for size_kb in sizes_kb:
+            input_file = synthetic_input(Path(tmp), size_kb)
+            for count in provider_counts:
+                bench_config = mock_config(config, count, settings)
+                case = BenchCase(flow=flow_name, input_kb=size_kb, providers=count)
+                for _ in range(repeats):
+                    case.runs.append(await run_once(bench_config, flow, input_file, keep_runs))
+
+                # Tracing slows allocation-heavy code, so memory gets its own run
+                tracemalloc.start()
+                try:
+                    await run_once(bench_config, flow, input_file, keep_runs)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                case.peak_memory_mb = peak / (1024 * 1024)
+
+                cases.append(case)
+                if on_case:
+                    on_case(case)
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "flow": flow_name,
+        "repeats": repeats,
+        "mock": settings.model_dump(),
+        "cases": [case.to_dict() for case in cases],
+    }
+
+
+def _case_key(case: dict) -> tuple:
+    return (case["flow"], case["input_kb"], case["providers"])
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Cases whose metrics grew more than ``tolerance`` (a fraction) past the baseline."""
+    previous = {_case_key(case): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        old = previous.get(_case_key(case))
+        if not old:
+            continue
+        for metric in BASELINE_METRICS:
+            before, after = old.get(metric), case.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + tolerance) and after - before > MIN_REGRESSION_DELTA[metric]:
+                regressions.append({
+                    "flow": case["flow"],
+                    "input_kb": case["input_kb"],
+                    "providers": case["providers"],
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change_pct": 100 * (after - before) / before if before else None,
+                })
+    return regressions
+
+
+def default_results_path() -> Path:
+    """Where results go unless another path is given."""
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return Path.cwd() / ".conclave" / "bench" / f"bench-{timestamp}.json"
+
+
+def load_results(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def save_results(path: Path, results: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+
+
+@contextlib.contextmanager
+def quiet_consoles(*consoles):
+    """Silence the given rich consoles (engine progress output) for the duration."""
+    previous = [c.quiet for c in consoles]
+    for c in consoles:
+        c.quiet = True
+    try:
+        yield
+    finally:
+        for c, quiet in zip(consoles, previous):
+            c.quiet = quiet
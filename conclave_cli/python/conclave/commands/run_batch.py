@@ -0,0 +1,216 @@
+"""One flow over many input files, in one process.
+
+A BatchRun starts an engine per input file, up to ``jobs`` at once, all on
+the same provider instances: HTTP clients, rate limiters and the response
+cache are shared, and each provider's ``max_concurrency`` caps its calls in
+flight across every file. Throughput is then bounded by the providers'
+limits rather than by how many files there are.
+
+Each file's run keeps its usual run directory, with the engine's progress
+written to console.log there instead of the terminal. The batch's
+index.json lists every input with its run ID, status, usage and final
+output files, and is rewritten atomically whenever a file starts or ends.
+An interrupted batch resumes from its index: finished files are skipped
+and interrupted ones continue from their run manifests.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from rich.console import Console
+
+from ..core.types import FlowConfig
+from ..flows import create_flow_engine
+from ..providers.base import Provider
+from ..utils.output import create_run_context
+
+INDEX_FILE = "index.json"
+LOG_FILE = "console.log"
+
+# Statuses a file doesn't run again from
+FINAL_STATUSES = ("complete", "stopped")
+
+
+@dataclass
+class BatchItem:
+    """One input file of a batch and the outcome of its run."""
+
+    input_file: str
+    status: str = "pending"  # pending, running, complete, stopped, interrupted or failed
+    run_id: str | None = None
+    error: str | None = None
+    elapsed_s: float | None = None
+    calls: int = 0
+    tokens: int = 0
+    cost_usd: float = 0.0
+    outputs: list[str] = field(default_factory=list)
+
+
+def batch_dir(batch_id: str) -> Path:
+    return Path.cwd() / ".conclave" / "batches" / batch_id
+
+
+class BatchRun:
+    """A flow over many inputs, with one results index."""
+
+    def __init__(
+        self,
+        batch_id: str | None,
+        flow: FlowConfig,
+        flow_type: str,
+        inputs: list[str],
+        leader: str | None = None,
+        prompt_override: str | None = None,
+    ):
+        self.batch_id = batch_id or str(uuid.uuid4()).split("-")[0]
+        self.dir = batch_dir(self.batch_id)
+        self.flow = flow
+        self.flow_type = flow_type
+        self.leader = leader
+        self.prompt_override = prompt_override
+        self.items = [BatchItem(str(Path(path).resolve())) for path in inputs]
+        # Engines of the files in flight, for progress
+        self.engines: dict[str, object] = {}
+
+    @classmethod
+    def load(cls, batch_id: str) -> "BatchRun | None":
+        """The batch with this ID as its index left it, or None if there is none."""
+        path = batch_dir(batch_id) / INDEX_FILE
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        batch = cls(
+            batch_id,
+            FlowConfig.model_validate(data["flow"]),
+            data["flow_type"],
+            [],
+            leader=data.get("leader"),
+            prompt_override=data.get("prompt_override"),
+        )
+        batch.items = [BatchItem(**item) for item in data["items"]]
+        return batch
+
+    async def run(
+        self, providers: list[Provider], jobs: int, summarizer: Provider | None = None
+    ) -> None:
+        """Run every file not yet finished, ``jobs`` at a time."""
+        slots = asyncio.Semaphore(jobs)
+        todo = [item for item in self.items if item.status not in FINAL_STATUSES]
+        self.save()
+        await asyncio.gather(*(self._run_item(item, providers, slots, summarizer) for item in todo))
+
+    async def _run_item(
+        self,
+        item: BatchItem,
+        providers: list[Provider],
+        slots: asyncio.Semaphore,
+        summarizer: Provider | None,
+    ) -> None:
+        async with slots:
+            ctx = create_run_context(item.run_id)
+            ctx.run_dir.mkdir(parents=True, exist_ok=True)
+            with open(ctx.run_dir / LOG_FILE, "a") as log:
+                try:
+                    engine = create_flow_engine(
+                        self.flow_type,
+                        providers,
+                        self.flow,
+                        leader=self.leader,
+                        run_id=ctx.run_id,
+                        summarizer=summarizer,
+                        progress=Console(file=log, width=120, no_color=True),
+                    )
+                except Exception as e:
+                    # Like a failed run, this shouldn't stop the other files
+                    item.status = "failed"
+                    item.error = f"{type(e).__name__}: {e}"
+                    self.save()
+                    return
+                item.run_id = engine.run_id
+                item.status = "running"
+                item.error = None
+                self.engines[item.input_file] = engine
+                self.save()
+
+                start = time.perf_counter()
+                try:
+                    await engine.run(item.input_file, self.prompt_override)
+                    # A run that returns early (changed input, no providers) is left unfinished
+                    status = engine.manifest.status
+                    item.status = status if status in FINAL_STATUSES else "failed"
+                    if item.status == "failed":
+                        item.error = f"run ended early; see {engine.run_dir / LOG_FILE}"
+                except asyncio.CancelledError:
+                    item.status = "interrupted"
+                    raise
+                except Exception as e:
+                    # One bad file shouldn't take the rest of the batch down
+                    item.status = "failed"
+                    item.error = f"{type(e).__name__}: {e}"
+                finally:
+                    item.elapsed_s = round(time.perf_counter() - start, 3)
+                    self._record(item, engine)
+                    del self.engines[item.input_file]
+                    self.save()
+
+    def _record(self, item: BatchItem, engine) -> None:
+        total = engine.usage.total()
+        item.calls = total["calls"]
+        item.tokens = (
+            total["input_tokens"]
+            + total["output_tokens"]
+            + total["cache_read_tokens"]
+            + total["cache_write_tokens"]
+        )
+        item.cost_usd = total["cost_usd"]
+        item.outputs = [str(engine.run_dir / name) for name in engine.manifest.final_outputs()]
+
+    def progress(self) -> dict:
+        """Counts and spend across the batch so far, files in flight included."""
+        statuses = ("pending", "running", "complete", "stopped", "interrupted", "failed")
+        counts = {status: 0 for status in statuses}
+        calls, cost = 0, 0.0
+        for item in self.items:
+            counts[item.status] += 1
+            engine = self.engines.get(item.input_file)
+            if engine is not None:
+                total = engine.usage.total()
+                calls, cost = calls + total["calls"], cost + total["cost_usd"]
+            else:
+                calls, cost = calls + item.calls, cost + item.cost_usd
+        return {
+            **counts,
+            "done": counts["complete"] + counts["stopped"],
+            "calls": calls,
+            "cost_usd": cost,
+        }
+
+    def to_dict(self) -> dict:
+        items = [asdict(item) for item in self.items]
+        return {
+            "batch_id": self.batch_id,
+            "flow": self.flow.model_dump(mode="json"),
+            "flow_type": self.flow_type,
+            "leader": self.leader,
+            "prompt_override": self.prompt_override,
+            "total": {
+                "files": len(items),
+                "complete": sum(item["status"] == "complete" for item in items),
+                "failed": sum(item["status"] == "failed" for item in items),
+                "calls": sum(item["calls"] for item in items),
+                "tokens": sum(item["tokens"] for item in items),
+                "cost_usd": sum(item["cost_usd"] for item in items),
+            },
+            "items": items,
+        }
+
+    def save(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.dir / INDEX_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2))
+        tmp.replace(path)
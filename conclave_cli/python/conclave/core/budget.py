@@ -0,0 +1,198 @@
+"""Run-level token and cost budgets.
+
+Before each round, an engine asks its BudgetGuard whether the round fits in
+what is left of the flow's budget. Input tokens are counted from the round's
+prompts; each reply is expected to be as long as that provider's longest reply
+so far, or max_tokens when it has none yet. Spending so far comes from the
+run's UsageLedger, so actual reply lengths and cache hits are accounted for.
+
+A round that doesn't fit either stops the run before it starts or, with
+``on_exceed: shrink``, runs with a smaller max_tokens that also applies to
+every later round. Each decision is recorded in budget.json in the run
+directory.
+"""
+
+import dataclasses
+from dataclasses import dataclass
+
+from ..providers.base import CompletionOptions, Prompt, Provider
+from .tokens import count_prompt_tokens, provider_family, provider_model
+from .types import BudgetConfig
+from .usage import UsageLedger, price_for
+
+BUDGET_FILE = "budget.json"
+
+# A round's calls: (provider, prompt, options)
+Call = tuple[Provider, Prompt, CompletionOptions | None]
+
+
+@dataclass
+class RoundEstimate:
+    """Expected tokens and cost of a round (unpriced models count as free)."""
+
+    input_tokens: int
+    output_tokens: int
+    cost: float
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@dataclass
+class BudgetDecision:
+    """Whether a round may run, and the reply limit it runs with."""
+
+    proceed: bool
+    max_tokens: int | None = None
+    reason: str | None = None
+
+
+class BudgetGuard:
+    """Checks each round of a run against the flow's budget."""
+
+    def __init__(self, config: BudgetConfig, usage: UsageLedger):
+        self.config = config
+        self.usage = usage
+        # Reply limit once shrunk; it only ever goes down
+        self.max_tokens: int | None = None
+        self.events: list[dict] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.max_cost is not None or self.config.max_tokens is not None
+
+    def spent(self) -> tuple[int, float]:
+        """Tokens and USD used so far."""
+        total = self.usage.total()
+        tokens = (
+            total["input_tokens"]
+            + total["output_tokens"]
+            + total["cache_read_tokens"]
+            + total["cache_write_tokens"]
+        )
+        return tokens, total["cost_usd"]
+
+    def _reply_tokens(self, provider: Provider, limit: int) -> int:
+        replies = [c.output_tokens for c in self.usage.completions if c.provider == provider.name]
+        return min(limit, max(replies)) if replies else limit
+
+    def estimate(self, calls: list[Call], reply_limit: int | None = None) -> RoundEstimate:
+        """Expected usage of a round, with replies capped at ``reply_limit``."""
+        estimate = RoundEstimate(0, 0, 0.0)
+        for provider, prompt, options in calls:
+            options = options or CompletionOptions()
+            limit = min(options.max_tokens, reply_limit or options.max_tokens)
+            input_tokens = count_prompt_tokens(prompt, options, provider_family(provider))
+            output_tokens = self._reply_tokens(provider, limit)
+            estimate.input_tokens += input_tokens
+            estimate.output_tokens += output_tokens
+            price = price_for(provider_model(provider))
+            if price:
+                # Cached input is cheaper, so pricing all input in full errs on the safe side
+                cost = input_tokens * price.input + output_tokens * price.output
+                estimate.cost += cost / 1_000_000
+        return estimate
+
+    def _overrun(self, estimate: RoundEstimate, spent_tokens: int, spent_cost: float) -> str | None:
+        """Why the round would exceed the budget, or None if it fits."""
+        max_tokens, max_cost = self.config.max_tokens, self.config.max_cost
+        if max_tokens is not None and spent_tokens + estimate.tokens > max_tokens:
+            return (
+                f"needs ~{estimate.tokens:,} tokens but {max(0, max_tokens - spent_tokens):,} "
+                f"of the {max_tokens:,}-token budget are left"
+            )
+        if max_cost is not None and spent_cost + estimate.cost > max_cost:
+            return (
+                f"needs ~${estimate.cost:.4f} but ${max(0.0, max_cost - spent_cost):.4f} "
+                f"of the ${max_cost:g} budget is left"
+            )
+        return None
+
+    def _shrunk_limit(self, calls: list[Call], spent_tokens: int, spent_cost: float) -> int:
+        """Largest reply limit, shared by every call, that keeps the round in budget."""
+        limits = [min((options or CompletionOptions()).max_tokens for _, _, options in calls)]
+        if self.max_tokens is not None:
+            limits.append(self.max_tokens)
+
+        input_tokens = 0
+        input_cost = 0.0
+        output_price = 0.0  # USD per reply token, summed over the calls
+        for provider, prompt, options in calls:
+            tokens = count_prompt_tokens(prompt, options, provider_family(provider))
+            input_tokens += tokens
+            price = price_for(provider_model(provider))
+            if price:
+                input_cost += tokens * price.input / 1_000_000
+                output_price += price.output / 1_000_000
+
+        if self.config.max_tokens is not None:
+            limits.append((self.config.max_tokens - spent_tokens - input_tokens) // len(calls))
+        if self.config.max_cost is not None and output_price:
+            limits.append(int((self.config.max_cost - spent_cost - input_cost) / output_price))
+        return max(0, min(limits))
+
+    def check(self, round_num: int, calls: list[Call]) -> BudgetDecision:
+        """Decide whether a round runs, shrinking its reply limit if configured to."""
+        if not self.enabled or not calls:
+            return BudgetDecision(True, self.max_tokens)
+
+        spent_tokens, spent_cost = self.spent()
+        estimate = self.estimate(calls, self.max_tokens)
+        overrun = self._overrun(estimate, spent_tokens, spent_cost)
+        if overrun is None:
+            return BudgetDecision(True, self.max_tokens)
+
+        if self.config.on_exceed == "shrink":
+            limit = self._shrunk_limit(calls, spent_tokens, spent_cost)
+            if limit >= self.config.min_response_tokens:
+                self.max_tokens = limit
+                reason = f"round {round_num} {overrun}; replies limited to {limit:,} tokens"
+                self._record(round_num, "shrink", reason, estimate, spent_tokens, spent_cost)
+                return BudgetDecision(True, limit, reason)
+
+        reason = f"round {round_num} {overrun}; stopping before it"
+        self._record(round_num, "stop", reason, estimate, spent_tokens, spent_cost)
+        return BudgetDecision(False, reason=reason)
+
+    def limit(self, calls: list[Call], decision: BudgetDecision) -> list[Call]:
+        """The calls with their max_tokens capped at the decision's reply limit."""
+        if decision.max_tokens is None:
+            return calls
+        limited = []
+        for provider, prompt, options in calls:
+            options = options or CompletionOptions()
+            if options.max_tokens > decision.max_tokens:
+                options = dataclasses.replace(options, max_tokens=decision.max_tokens)
+            limited.append((provider, prompt, options))
+        return limited
+
+    def _record(
+        self,
+        round_num: int,
+        action: str,
+        reason: str,
+        estimate: RoundEstimate,
+        spent_tokens: int,
+        spent_cost: float,
+    ) -> None:
+        self.events.append({
+            "round": round_num,
+            "action": action,
+            "reason": reason,
+            "spent_tokens": spent_tokens,
+            "spent_cost_usd": spent_cost,
+            "estimated_tokens": estimate.tokens,
+            "estimated_cost_usd": estimate.cost,
+            "max_tokens": self.max_tokens,
+        })
+
+    def to_dict(self) -> dict:
+        spent_tokens, spent_cost = self.spent()
+        return {
+            "budget": self.config.model_dump(),
+            "spent_tokens": spent_tokens,
+            "spent_cost_usd": spent_cost,
+            "reply_limit": self.max_tokens,
+            "events": self.events,
+        }
@@ -0,0 +1,240 @@
+"""Compaction of peer outputs before they go into refinement prompts.
+
+Every refinement prompt of a basic flow embeds every peer's previous output,
+so a round's input grows with the square of the provider count and with the
+length of the outputs. A PeerCompactor shrinks the outputs once per round,
+before the shared peer block is built, by running configured stages in order:
+
+- ``dedupe``: drops sections that are near-duplicates (MinHash similarity,
+  see core.convergence) of a section an earlier peer already made, leaving a
+  one-line note in their place.
+- ``truncate``: cuts each peer to ``max_tokens_per_peer`` on Markdown
+  structure, keeping whole headings, list items, paragraphs and code blocks.
+- ``summarize``: has a cheap model condense each peer that is still longer
+  than ``summary_tokens``.
+
+Stages are looked up in STAGES, so new ones can be registered there. Results
+are memoized by content, so the same outputs are never compacted twice, and
+summaries go through the provider wrappers (including the response cache).
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from abc import ABC, abstractmethod
+
+from ..providers.base import CompletionOptions, Provider
+from .convergence import minhash_similarity, sketch
+from .tokens import count_tokens, provider_family, truncate_to_tokens
+from .types import CompactionConfig
+
+COMPACTION_FILE = "compaction.json"
+
+# Sections shorter than this are always kept; MinHash is unreliable on them
+MIN_DEDUPE_WORDS = 30
+
+_HEADING = re.compile(r"#{1,6}\s")
+_LIST_ITEM = re.compile(r"\s*(?:[-*+]|\d+[.)])\s")
+_FENCE = re.compile(r"\s*(?:```|~~~)")
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You condense proposals for expert reviewers. Keep concrete recommendations, "
+    "decisions, numbers, risks and open questions. Drop preamble, restatements of "
+    "the task and examples. Keep the Markdown headings."
+)
+
+
+def split_blocks(text: str) -> list[str]:
+    """Split Markdown into headings, list items, paragraphs and fenced code blocks.
+
+    Each block keeps its trailing blank lines, so joining the blocks gives back the text.
+    """
+    blocks: list[str] = []
+    current: list[str] = []
+    fenced = False
+    after_blank = False
+    for line in text.splitlines(keepends=True):
+        if fenced:
+            current.append(line)
+            fenced = not _FENCE.match(line)
+            continue
+        if not line.strip():
+            current.append(line)
+            after_blank = True
+            continue
+        starts_block = (
+            after_blank or _HEADING.match(line) or _LIST_ITEM.match(line) or _FENCE.match(line)
+        )
+        if starts_block and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+        fenced = bool(_FENCE.match(line))
+        after_blank = False
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def split_sections(text: str) -> list[str]:
+    """Split Markdown at its headings, or at blank lines if it has none."""
+    blocks = split_blocks(text)
+    if not any(_HEADING.match(block) for block in blocks):
+        return blocks
+    sections: list[str] = []
+    for block in blocks:
+        if _HEADING.match(block) or not sections:
+            sections.append(block)
+        else:
+            sections[-1] += block
+    return sections
+
+
+def truncate_blocks(text: str, max_tokens: int, family: str) -> str:
+    """Cut text to ``max_tokens`` at a block boundary, noting how much was left out."""
+    if count_tokens(text, family) <= max_tokens:
+        return text
+    blocks = split_blocks(text)
+    kept: list[str] = []
+    used = 0
+    for block in blocks:
+        size = count_tokens(block, family)
+        if used + size > max_tokens:
+            break
+        kept.append(block)
+        used += size
+    if not kept:
+        # A single block larger than the budget; fall back to a plain cut
+        return truncate_to_tokens(text, max_tokens, family)
+    omitted = len(blocks) - len(kept)
+    return "".join(kept).rstrip() + f"\n\n[... {omitted} more block(s) omitted for length ...]"
+
+
+class CompactionStage(ABC):
+    """One step of peer-output compaction."""
+
+    def __init__(self, config: CompactionConfig, summarizer: Provider | None = None):
+        self.config = config
+        self.summarizer = summarizer
+
+    @abstractmethod
+    async def compact(self, outputs: dict[str, str]) -> dict[str, str]:
+        """Return the outputs, keyed by peer name, made smaller."""
+
+
+class DedupeStage(CompactionStage):
+    """Replace sections an earlier peer already made with a short note."""
+
+    async def compact(self, outputs: dict[str, str]) -> dict[str, str]:
+        seen: list[tuple[str, set[int]]] = []  # (peer, sketch) of every section kept so far
+        threshold = self.config.duplicate_threshold
+        compacted = {}
+        for name, text in outputs.items():
+            parts = []
+            for section in split_sections(text):
+                if len(section.split()) >= MIN_DEDUPE_WORDS:
+                    signature = sketch(section)
+                    duplicate_of = next(
+                        (
+                            peer for peer, other in seen
+                            if peer != name
+                            and minhash_similarity(signature, other) >= threshold
+                        ),
+                        None,
+                    )
+                    if duplicate_of:
+                        title = "A section"
+                        if _HEADING.match(section):
+                            title = section.splitlines()[0].lstrip("# ").strip()
+                        parts.append(f"[{title}: omitted, near-duplicate of {duplicate_of}'s]\n\n")
+                        continue
+                    seen.append((name, signature))
+                parts.append(section)
+            compacted[name] = "".join(parts)
+        return compacted
+
+
+class TruncateStage(CompactionStage):
+    """Cut each peer to its token budget on Markdown boundaries."""
+
+    async def compact(self, outputs: dict[str, str]) -> dict[str, str]:
+        return {
+            name: truncate_blocks(text, self.config.max_tokens_per_peer, "default")
+            for name, text in outputs.items()
+        }
+
+
+class SummarizeStage(CompactionStage):
+    """Have a cheap model condense peers that are still long."""
+
+    async def compact(self, outputs: dict[str, str]) -> dict[str, str]:
+        if self.summarizer is None:
+            return outputs
+        summaries = await asyncio.gather(*(
+            self._summarize(name, text) for name, text in outputs.items()
+        ))
+        return dict(zip(outputs, summaries))
+
+    async def _summarize(self, name: str, text: str) -> str:
+        limit = self.config.summary_tokens
+        if count_tokens(text, provider_family(self.summarizer)) <= limit:
+            return text
+        prompt = (
+            f"Condense this proposal from {name} to at most {limit} tokens.\n\n"
+            f"[PROPOSAL]\n{text}"
+        )
+        # Headroom so a summary that runs a little long isn't cut mid-sentence
+        options = CompletionOptions(max_tokens=limit * 2, system_prompt=SUMMARY_SYSTEM_PROMPT)
+        summary = await self.summarizer.generate(prompt, options)
+        # A failed summary is no reason to fail the round; keep the text as it was
+        return text if summary.startswith("[Error]") else summary
+
+
+# Registry of compaction stages, by the name used in CompactionConfig.stages
+STAGES: dict[str, type[CompactionStage]] = {
+    "dedupe": DedupeStage,
+    "truncate": TruncateStage,
+    "summarize": SummarizeStage,
+}
+
+
+class PeerCompactor:
+    """Runs the configured compaction stages over a round's peer outputs."""
+
+    def __init__(self, config: CompactionConfig, summarizer: Provider | None = None):
+        unknown = [name for name in config.stages if name not in STAGES]
+        if unknown:
+            available = ", ".join(STAGES)
+            raise ValueError(
+                f"Unknown compaction stage(s): {', '.join(unknown)}. "
+                f"Available stages: {available}"
+            )
+        self.config = config
+        self.stages = [(name, STAGES[name](config, summarizer)) for name in config.stages]
+        self.rounds: list[dict] = []
+        # Compacted outputs and their rounds entry, by a hash of the outputs
+        self._memo: dict[str, tuple[dict[str, str], dict]] = {}
+
+    async def compact(self, round_num: int, outputs: dict[str, str]) -> dict[str, str]:
+        """Compacted copies of a round's outputs, keyed like ``outputs``."""
+        key = hashlib.sha256(json.dumps(outputs, sort_keys=True).encode()).hexdigest()
+        if key in self._memo:
+            outputs, entry = self._memo[key]
+            # Same outputs, same savings; each round still gets its own entry
+            self.rounds.append({**entry, "round": round_num, "reused_from": entry["round"]})
+            return outputs
+
+        tokens = {name: count_tokens(text) for name, text in outputs.items()}
+        entry = {"round": round_num, "input_tokens": tokens, "stages": []}
+        for name, stage in self.stages:
+            outputs = await stage.compact(outputs)
+            tokens = {peer: count_tokens(text) for peer, text in outputs.items()}
+            entry["stages"].append({"stage": name, "tokens": tokens, "total": sum(tokens.values())})
+        entry["saved_tokens"] = sum(entry["input_tokens"].values()) - sum(tokens.values())
+        self.rounds.append(entry)
+        self._memo[key] = (outputs, entry)
+        return outputs
+
+    def to_dict(self) -> dict:
+        return {"config": self.config.model_dump(), "rounds": self.rounds}
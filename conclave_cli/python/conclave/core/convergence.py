@@ -0,0 +1,116 @@
+"""Similarity of flow outputs between rounds, to end a flow once it converges.
+
+After each refinement round, every provider's output is compared with its
+own previous version (stability) and with the other providers' outputs of
+the same round (agreement). The flow has converged when every provider is
+at least ``threshold`` similar to its previous version, or, with
+``peer_threshold``, when every pair of providers is at least that similar.
+
+Two local measures are available:
+
+- ``minhash``: Jaccard similarity of the texts' 5-word shingles, estimated
+  from bottom-k MinHash sketches. One hash per shingle, so it stays cheap on
+  long outputs.
+- ``diff``: difflib's ratio over the texts' words. Exact, but quadratic in
+  the worst case.
+
+Scores are written to convergence.json in the run directory whether or not
+early stopping is enabled, so thresholds can be tuned from past runs.
+"""
+
+import difflib
+import hashlib
+import heapq
+import itertools
+import re
+
+from .types import ConvergenceConfig
+
+CONVERGENCE_FILE = "convergence.json"
+
+SHINGLE_WORDS = 5
+SKETCH_SIZE = 256
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def sketch(text: str, size: int = SKETCH_SIZE) -> set[int]:
+    """Bottom-k MinHash sketch: the ``size`` smallest hashes of the text's shingles."""
+    words = _words(text)
+    shingles = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    hashes = (
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles
+    )
+    return set(heapq.nsmallest(size, hashes))
+
+
+def minhash_similarity(a: set[int], b: set[int], size: int = SKETCH_SIZE) -> float:
+    """Estimated Jaccard similarity of two texts from their sketches."""
+    union = heapq.nsmallest(size, a | b)
+    if not union:
+        return 1.0
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+def diff_similarity(a: str, b: str) -> float:
+    """difflib's similarity ratio of two texts, compared word by word."""
+    return difflib.SequenceMatcher(None, _words(a), _words(b)).ratio()
+
+
+class ConvergenceDetector:
+    """Scores each round of a flow and decides whether it has converged."""
+
+    def __init__(self, config: ConvergenceConfig):
+        self.config = config
+        self.rounds: list[dict] = []
+
+    def _similarity(self, texts: dict[str, str]):
+        """Pairwise similarity function over the given texts, keyed by name."""
+        if self.config.method == "diff":
+            return lambda a, b: diff_similarity(texts[a], texts[b])
+        sketches = {key: sketch(text) for key, text in texts.items()}
+        return lambda a, b: minhash_similarity(sketches[a], sketches[b])
+
+    def check(self, round_num: int, previous: dict[str, str], current: dict[str, str]) -> bool:
+        """Score a round's outputs against the previous round's; True if it converged.
+
+        Providers with an error reply or no reply in either round are left out.
+        """
+        previous = {name: text for name, text in previous.items() if not text.startswith("[Error]")}
+        current = {name: text for name, text in current.items() if not text.startswith("[Error]")}
+        texts = {("prev", name): text for name, text in previous.items()}
+        texts.update({("curr", name): text for name, text in current.items()})
+        similarity = self._similarity(texts)
+
+        stability = {
+            name: round(similarity(("prev", name), ("curr", name)), 4)
+            for name in current
+            if name in previous
+        }
+        agreement = {
+            f"{a}~{b}": round(similarity(("curr", a), ("curr", b)), 4)
+            for a, b in itertools.combinations(current, 2)
+        }
+
+        converged = bool(stability) and min(stability.values()) >= self.config.threshold
+        if self.config.peer_threshold is not None and agreement:
+            converged = converged or min(agreement.values()) >= self.config.peer_threshold
+
+        self.rounds.append({
+            "round": round_num,
+            "stability": stability,
+            "agreement": agreement,
+            "min_stability": min(stability.values(), default=None),
+            "min_agreement": min(agreement.values(), default=None),
+            "converged": converged,
+        })
+        return converged
+
+    def to_dict(self) -> dict:
+        return {"config": self.config.model_dump(), "rounds": self.rounds}
@@ -0,0 +1,95 @@
+"""Refinement prompts that send peers' outputs as changes instead of full text.
+
+Late in a flow, the versions in a refinement prompt tend to differ in only a
+few places. With ``refinement_deltas`` enabled, engines send such outputs as
+unified diffs against another version, and fall back to the full text
+whenever the diff would not be shorter. Provider calls are stateless, so the
+base of a diff is always a text the same prompt carries in full: the
+recipient's own previous version, or the first version in a block every
+recipient shares.
+
+DeltaSavings compares every prompt sent with the prompt full texts would
+have made, per round, and is written to deltas.json in the run directory.
+"""
+
+import difflib
+
+from ..providers.base import Prompt, render_prompt
+from .tokens import count_tokens
+
+DELTAS_FILE = "deltas.json"
+
+# Unchanged lines shown around each change
+CONTEXT_LINES = 2
+
+
+def text_delta(old: str, new: str) -> str | None:
+    """Unified diff from ``old`` to ``new``, or None if it isn't shorter than ``new``.
+
+    Identical texts give an empty diff.
+    """
+    if old == new:
+        return ""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    # A missing final newline would glue the last line to the next hunk header
+    if old_lines and not old_lines[-1].endswith("\n"):
+        old_lines[-1] += "\n"
+    if new_lines and not new_lines[-1].endswith("\n"):
+        new_lines[-1] += "\n"
+    # Skip the ---/+++ file header; the prompt labels each diff itself
+    diff = "".join(list(difflib.unified_diff(old_lines, new_lines, n=CONTEXT_LINES))[2:])
+    return diff if len(diff) < len(new) else None
+
+
+def render_delta(delta: str) -> str:
+    """A diff as it appears in a prompt."""
+    if not delta:
+        return "(unchanged)"
+    return f"```diff\n{delta}```"
+
+
+class DeltaSavings:
+    """Size of the prompts sent against the full-text prompts they replaced."""
+
+    def __init__(self):
+        self.rounds: list[dict] = []
+
+    def record(
+        self,
+        round_num: int,
+        full: list[Prompt],
+        sent: list[Prompt],
+        diffed: int,
+        step: str | None = None,
+    ) -> None:
+        """Record one round's prompts, with how many peer outputs went as diffs."""
+        full_texts = [render_prompt(prompt) for prompt in full]
+        sent_texts = [render_prompt(prompt) for prompt in sent]
+        entry = {
+            "round": round_num,
+            "diffed_outputs": diffed,
+            "full_bytes": sum(len(text.encode()) for text in full_texts),
+            "sent_bytes": sum(len(text.encode()) for text in sent_texts),
+            "full_tokens": sum(count_tokens(text) for text in full_texts),
+            "sent_tokens": sum(count_tokens(text) for text in sent_texts),
+        }
+        if step:
+            entry["step"] = step
+        entry["saved_bytes"] = entry["full_bytes"] - entry["sent_bytes"]
+        entry["saved_tokens"] = entry["full_tokens"] - entry["sent_tokens"]
+        self.rounds.append(entry)
+
+    def total(self) -> dict:
+        keys = (
+            "full_bytes",
+            "sent_bytes",
+            "saved_bytes",
+            "full_tokens",
+            "sent_tokens",
+            "saved_tokens",
+        )
+        return {key: sum(entry[key] for entry in self.rounds) for key in keys}
+
+    def to_dict(self) -> dict:
+        return {"total": self.total(), "rounds": self.rounds}
@@ -0,0 +1,139 @@
+"""Run manifests, so an interrupted run can be resumed.
+
+Engines record in manifest.json how a run was started (flow config, input
+file and its hash, prompt override, providers, leader) and, after every
+provider call that finishes, which output file holds its reply. When a round
+closes, the names of the outputs that went into the run's history are
+recorded with it. The file is rewritten atomically each time, so a run killed
+at any point leaves a consistent manifest behind.
+
+Resuming (``conclave resume <run_id>``) replays the run: closed rounds are
+rebuilt from their recorded outputs without calling anyone, and in the round
+that was interrupted only the calls that hadn't finished are made. Outputs
+are read back from their ``<provider>.v<N>.md`` files and checked against the
+recorded hash; one that no longer matches is called again.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from .types import FlowConfig
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class RunManifest:
+    """How a run was started and which of its calls have finished."""
+
+    def __init__(self, run_dir: Path):
+        self.run_dir = run_dir
+        self.path = run_dir / MANIFEST_FILE
+        self.data: dict = {"rounds": {}}
+        if self.path.exists():
+            self.data = json.loads(self.path.read_text())
+
+    @property
+    def started(self) -> bool:
+        return "input_sha256" in self.data
+
+    @property
+    def status(self) -> str | None:
+        """running, interrupted, stopped or complete; None before the run starts."""
+        return self.data.get("status")
+
+    def start(
+        self,
+        run_id: str,
+        flow: FlowConfig,
+        flow_type: str,
+        input_file: str,
+        input_content: str,
+        prompt_override: str | None,
+        providers: list[str],
+        leader: str | None = None,
+        batch: bool = False,
+    ) -> str | None:
+        """Record how the run starts; returns an error if a resumed run's input changed."""
+        digest = _digest(input_content)
+        if self.started and self.data["input_sha256"] != digest:
+            return f"{input_file} has changed since run {run_id} started"
+        self.data.update(
+            run_id=run_id,
+            flow=flow.model_dump(mode="json"),
+            flow_type=flow_type,
+            leader=leader,
+            batch=batch,
+            input_file=str(Path(input_file).resolve()),
+            input_sha256=digest,
+            prompt_override=prompt_override,
+            providers=providers,
+            status="running",
+        )
+        self.save()
+        return None
+
+    def _round(self, round_num: int) -> dict:
+        return self.data["rounds"].setdefault(str(round_num), {"calls": {}, "closed": False})
+
+    def record_call(self, round_num: int, provider: str, output: str, path: Path) -> None:
+        """Record a finished call whose reply is in ``path``.
+
+        Error replies are left out, so they are retried.
+        """
+        if output.startswith("[Error]"):
+            return
+        self._round(round_num)["calls"][provider] = {"file": path.name, "sha256": _digest(output)}
+        self.save()
+
+    def close_round(self, round_num: int, outputs: dict[str, str]) -> None:
+        """Record which outputs a round passed on to the run's history."""
+        entry = self._round(round_num)
+        entry["closed"] = True
+        entry["history"] = list(outputs)
+        self.save()
+
+    def completed_outputs(self, round_num: int) -> dict[str, str]:
+        """Outputs of a round's finished calls whose files are still intact."""
+        calls = self.data["rounds"].get(str(round_num), {}).get("calls", {})
+        outputs = {}
+        for provider, call in calls.items():
+            path = self.run_dir / call["file"]
+            if not path.exists():
+                continue
+            text = path.read_text()
+            if _digest(text) == call["sha256"]:
+                outputs[provider] = text
+        return outputs
+
+    def closed_outputs(self, round_num: int) -> dict[str, str] | None:
+        """History outputs of a closed round, or None if it has to be run (again)."""
+        entry = self.data["rounds"].get(str(round_num), {})
+        if not entry.get("closed"):
+            return None
+        outputs = self.completed_outputs(round_num)
+        if not all(provider in outputs for provider in entry["history"]):
+            return None
+        return {provider: outputs[provider] for provider in entry["history"]}
+
+    def final_outputs(self) -> list[str]:
+        """Output files of the last closed round, the run's results."""
+        closed = [int(n) for n, entry in self.data["rounds"].items() if entry.get("closed")]
+        if not closed:
+            return []
+        entry = self.data["rounds"][str(max(closed))]
+        return [entry["calls"][provider]["file"] for provider in entry["history"]]
+
+    def finish(self, status: str) -> None:
+        self.data["status"] = status
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2))
+        tmp.replace(self.path)
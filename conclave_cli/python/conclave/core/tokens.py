@@ -0,0 +1,259 @@
+"""Fast local token estimation.
+
+Counts are estimated from character counts with a ratio per provider family,
+then scaled by a calibration factor learned from the ``usage`` each provider
+reports back. When ``tiktoken`` is installed, exact mode counts OpenAI-family
+prompts with the real tokenizer instead.
+
+Tokenizer counts are memoized by a digest of the text, so the input file and
+peer outputs that recur in every prompt of a run are only encoded once; the
+character estimate is cheaper than a lookup and isn't memoized.
+"""
+
+import functools
+import hashlib
+import importlib
+import importlib.util
+import math
+from collections import OrderedDict
+
+from ..providers.base import CompletionOptions, Prompt, PromptSegment
+from .types import TokenConfig
+
+DEFAULT_FAMILY = "default"
+
+# Average characters per token for ASCII text
+CHARS_PER_TOKEN = {
+    "anthropic": 3.5,
+    "openai": 4.0,
+    "gemini": 4.0,
+    "grok": 4.0,
+    DEFAULT_FAMILY: 4.0,
+}
+
+# Non-ASCII characters (accents, CJK, emoji) tokenize far less densely
+NON_ASCII_TOKENS_PER_CHAR = 1.0
+
+# Context windows (tokens) of known models, by longest matching name prefix.
+# TokenConfig.context_windows overrides them by model prefix or provider family;
+# prompts to a model with no known window are sent as they are.
+CONTEXT_WINDOWS = {
+    "claude-opus-4": 200_000,
+    "claude-sonnet-4": 200_000,
+    "claude-haiku-4": 200_000,
+    "claude-3": 200_000,
+    "gpt-5": 400_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "o3": 200_000,
+    "o1": 200_000,
+    "gemini-2.5": 1_048_576,
+    "gemini-2.0": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-1.5-flash": 1_048_576,
+    "grok-4-fast": 2_000_000,
+    "grok-4": 256_000,
+    "grok-3": 131_072,
+}
+
+# Families with a local tokenizer for exact mode
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+TIKTOKEN_ENCODING = "o200k_base"
+EXACT_FAMILIES = {"openai", "grok"}
+
+# Calibration: moving-average weight of each new sample, and the smallest
+# request worth learning from (tiny prompts are dominated by fixed overhead)
+CALIBRATION_WEIGHT = 0.2
+MIN_CALIBRATION_TOKENS = 200
+CALIBRATION_BOUNDS = (0.25, 4.0)
+
+# Distinct strings whose tokenizer counts are memoized
+MEMO_SIZE = 4096
+
+TRUNCATION_MARKER = "\n\n[... truncated to fit the context window ...]"
+
+_settings = TokenConfig()
+_calibration: dict[str, float] = {}
+_samples: dict[str, int] = {}
+_exact_counts: OrderedDict[bytes, int] = OrderedDict()
+
+
+def configure(config: TokenConfig) -> None:
+    """Apply token settings from the loaded configuration."""
+    global _settings
+    _settings = config
+
+
+def provider_family(provider) -> str:
+    """Tokenizer family of a provider (wrappers delegate to the wrapped provider)."""
+    return getattr(provider, "token_family", DEFAULT_FAMILY)
+
+
+def provider_model(provider) -> str:
+    """Model a provider calls (Gemini names it model_name)."""
+    return getattr(provider, "model", None) or getattr(provider, "model_name", None) or "unknown"
+
+
+def _longest_prefix(windows: dict[str, int], model: str) -> int | None:
+    matches = [prefix for prefix in windows if model.startswith(prefix)]
+    return windows[max(matches, key=len)] if matches else None
+
+
+def context_window(model: str, family: str) -> int | None:
+    """Context window size (tokens) of a model, or None if it isn't known.
+
+    Configured windows come first, by model name prefix and then by family.
+    """
+    configured = _settings.context_windows
+    window = _longest_prefix(configured, model)
+    if window is None:
+        window = configured.get(family)
+    if window is None:
+        window = _longest_prefix(CONTEXT_WINDOWS, model)
+    return window
+
+
+@functools.cache
+def _encoder():
+    return importlib.import_module("tiktoken").get_encoding(TIKTOKEN_ENCODING)
+
+
+def _uses_exact(family: str) -> bool:
+    return _settings.exact and TIKTOKEN_AVAILABLE and family in EXACT_FAMILIES
+
+
+def _exact_count(text: str) -> int:
+    """Tokenizer count of a string, memoized without keeping the string."""
+    key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    count = _exact_counts.get(key)
+    if count is not None:
+        _exact_counts.move_to_end(key)
+        return count
+    count = _exact_counts[key] = len(_encoder().encode_ordinary(text))
+    if len(_exact_counts) > MEMO_SIZE:
+        _exact_counts.popitem(last=False)
+    return count
+
+
+def _raw_count(text: str, family: str, exact: bool) -> float:
+    """Uncalibrated token count of a string."""
+    if exact:
+        return _exact_count(text)
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    ratio = CHARS_PER_TOKEN.get(family, CHARS_PER_TOKEN[DEFAULT_FAMILY])
+    return ascii_chars / ratio + (len(text) - ascii_chars) * NON_ASCII_TOKENS_PER_CHAR
+
+
+def _raw_prompt_count(prompt: Prompt, options: CompletionOptions | None, family: str) -> float:
+    exact = _uses_exact(family)
+    # Count segments separately so shared blocks hit the tokenizer memo across recipients
+    texts = [prompt] if isinstance(prompt, str) else [s.text for s in prompt]
+    if options and options.system_prompt:
+        texts.append(options.system_prompt)
+    return sum(_raw_count(text, family, exact) for text in texts if text)
+
+
+def _calibrated(raw: float, family: str) -> int:
+    if raw <= 0:
+        return 0
+    if not _uses_exact(family):
+        raw *= _calibration.get(family, 1.0)
+    return max(1, math.ceil(raw))
+
+
+def count_tokens(text: str, family: str = DEFAULT_FAMILY) -> int:
+    """Estimate the tokens in a string for a provider family."""
+    if not text:
+        return 0
+    return _calibrated(_raw_count(text, family, _uses_exact(family)), family)
+
+
+def count_prompt_tokens(
+    prompt: Prompt,
+    options: CompletionOptions | None = None,
+    family: str = DEFAULT_FAMILY,
+) -> int:
+    """Estimate the input tokens of a request, including its system prompt."""
+    return _calibrated(_raw_prompt_count(prompt, options, family), family)
+
+
+def record_usage(
+    family: str,
+    prompt: Prompt,
+    options: CompletionOptions | None,
+    input_tokens: int | None,
+) -> None:
+    """Learn a family's calibration factor from the input tokens a provider reported."""
+    if not input_tokens or _uses_exact(family):
+        return
+    raw = _raw_prompt_count(prompt, options, family)
+    if raw < MIN_CALIBRATION_TOKENS:
+        return
+
+    low, high = CALIBRATION_BOUNDS
+    sample = min(high, max(low, input_tokens / raw))
+    current = _calibration.get(family)
+    if current is None:
+        _calibration[family] = sample
+    else:
+        _calibration[family] = current + CALIBRATION_WEIGHT * (sample - current)
+    _samples[family] = _samples.get(family, 0) + 1
+
+
+def calibration_factors() -> dict[str, dict]:
+    """Current calibration factor and sample count per family."""
+    return {
+        family: {"factor": factor, "samples": _samples.get(family, 0)}
+        for family, factor in _calibration.items()
+    }
+
+
+def truncate_to_tokens(text: str, max_tokens: int, family: str = DEFAULT_FAMILY) -> str:
+    """Cut text to roughly ``max_tokens``, preferring a line break near the cut."""
+    tokens = count_tokens(text, family)
+    if tokens <= max_tokens:
+        return text
+    keep = max(0, int(len(text) * max_tokens / tokens) - len(TRUNCATION_MARKER))
+    cut = text.rfind("\n", 0, keep)
+    if cut < keep // 2:
+        cut = keep
+    return text[:cut] + TRUNCATION_MARKER
+
+
+def fit_prompt(
+    prompt: Prompt,
+    budget: int,
+    options: CompletionOptions | None = None,
+    family: str = DEFAULT_FAMILY,
+) -> Prompt:
+    """Shrink a prompt to ``budget`` input tokens by truncating its largest parts.
+
+    Returns the prompt unchanged if it already fits.
+    """
+    excess = count_prompt_tokens(prompt, options, family) - budget
+    if excess <= 0:
+        return prompt
+
+    if isinstance(prompt, str):
+        return truncate_to_tokens(prompt, max(0, count_tokens(prompt, family) - excess), family)
+
+    segments = list(prompt)
+    # Trim the largest segments first; they are the input file and peer outputs
+    for i in sorted(range(len(segments)), key=lambda i: -len(segments[i].text)):
+        if excess <= 0:
+            break
+        segment = segments[i]
+        size = count_tokens(segment.text, family)
+        target = max(0, size - excess)
+        segments[i] = PromptSegment(
+            truncate_to_tokens(segment.text, target, family), segment.cacheable
+        )
+        excess -= size - count_tokens(segments[i].text, family)
+    return segments
+
+
+def prompt_budget(options: CompletionOptions | None, window: int) -> int:
+    """Input tokens available in a context window once the output allowance is reserved."""
+    max_output = options.max_tokens if options else CompletionOptions().max_tokens
+    return max(0, window - max_output)
+
@@ -0,0 +1,338 @@
+"""Span-based tracing of runs, rounds and provider calls.
+
+A trace starts with ``trace()``, which opens the root span and a JSONL file
+that every finished span of the trace is appended to. Nested ``span()``
+blocks become children of the innermost open span; the current span lives in
+a context variable, so tasks started with asyncio.gather inherit it and
+concurrent runs in one process keep separate traces.
+
+Outside a trace, ``span()`` is a no-op, so instrumented code costs nothing
+when nobody is tracing it.
+
+Spans can also be exported to an OpenTelemetry collector over OTLP/HTTP
+(JSON encoding), configured with TracingConfig.otlp_endpoint or the standard
+OTEL_EXPORTER_OTLP_ENDPOINT variable. Export happens on a background thread
+and never fails a run.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+import httpx
+
+from ..providers.base import CompletionOptions, Prompt, Provider
+from .tokens import count_prompt_tokens, count_tokens, provider_family
+from .types import TracingConfig
+
+TRACE_FILE = "trace.jsonl"
+
+# Spans sent to the collector per request, and seconds to wait for it
+OTLP_BATCH_SIZE = 256
+OTLP_TIMEOUT = 5.0
+
+
+class Span:
+    """A timed operation with attributes."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        sink: "TraceSink",
+        attributes: dict,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sink = sink
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.status = "ok"
+        self.error: str | None = None
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self.end_ns: int | None = None
+
+    def set(self, **attributes) -> None:
+        """Add or update attributes (None values are skipped)."""
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def fail(self, error: str) -> None:
+        """Mark the span as failed without raising."""
+        self.status = "error"
+        self.error = error
+
+    def finish(self) -> None:
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start)
+        self.sink.export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded by span() outside a trace."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def fail(self, error: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "conclave_span", default=None
+)
+
+
+class OtlpExporter:
+    """Sends finished spans to an OTLP/HTTP collector from a background thread."""
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.endpoint = endpoint
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.queue: queue.Queue[Span | None] = queue.Queue()
+        self.thread = threading.Thread(target=self._worker, name="otlp-exporter", daemon=True)
+        self.thread.start()
+
+    def export(self, span: Span) -> None:
+        self.queue.put(span)
+
+    def close(self) -> None:
+        """Flush queued spans and stop the worker."""
+        self.queue.put(None)
+        self.thread.join(OTLP_TIMEOUT * 2)
+
+    def _worker(self) -> None:
+        with httpx.Client(timeout=OTLP_TIMEOUT) as client:
+            stopping = False
+            while not stopping:
+                batch = [self.queue.get()]
+                while len(batch) < OTLP_BATCH_SIZE and not self.queue.empty():
+                    batch.append(self.queue.get())
+                if None in batch:
+                    stopping = True
+                    batch = [s for s in batch if s is not None]
+                if batch:
+                    try:
+                        client.post(self.url, json=self._payload(batch))
+                    except httpx.HTTPError:
+                        # Tracing is diagnostic; a missing collector never fails a run
+                        pass
+
+    def _payload(self, spans: list[Span]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "conclave"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_span(span: Span) -> dict:
+    # STATUS_CODE_OK / STATUS_CODE_ERROR
+    status = {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1}
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": status,
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+class TraceSink:
+    """Destination of one trace's spans: a JSONL file plus the optional exporter."""
+
+    def __init__(self, path: Path | None, exporter: OtlpExporter | None):
+        self.path = path
+        self.exporter = exporter
+        self.lock = threading.Lock()
+        self.file = None
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        if self.file:
+            line = json.dumps(span.to_dict(), default=str)
+            with self.lock:
+                self.file.write(line + "\n")
+                self.file.flush()
+        if self.exporter:
+            self.exporter.export(span)
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+
+
+_settings = TracingConfig()
+_exporter: OtlpExporter | None = None
+
+
+def configure(config: TracingConfig) -> None:
+    """Apply tracing settings from the loaded configuration."""
+    global _settings, _exporter
+    _settings = config
+    endpoint = config.otlp_endpoint or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+    if _exporter and _exporter.endpoint != endpoint:
+        shutdown()
+    if endpoint and _exporter is None:
+        _exporter = OtlpExporter(endpoint, config.service_name)
+
+
+def shutdown() -> None:
+    """Flush spans still waiting for the collector."""
+    global _exporter
+    if _exporter:
+        _exporter.close()
+        _exporter = None
+
+
+@contextlib.contextmanager
+def trace(name: str, path: Path | None, **attributes) -> Iterator[Span | _NoopSpan]:
+    """Open a root span whose trace is appended to ``path`` (JSONL)."""
+    if not _settings.enabled:
+        yield NOOP_SPAN
+        return
+    sink = TraceSink(path, _exporter)
+    root = Span(name, secrets.token_hex(16), None, sink, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.fail(repr(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        root.finish()
+        sink.close()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Span | _NoopSpan]:
+    """Time a block as a child of the current span (no-op outside a trace)."""
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    current = Span(name, parent.trace_id, parent.span_id, parent.sink, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(repr(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+
+
+def annotate(**attributes) -> None:
+    """Set attributes on the innermost open span (no-op outside a trace)."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def _prompt_bytes(prompt: Prompt) -> int:
+    if isinstance(prompt, str):
+        return len(prompt.encode())
+    return sum(len(segment.text.encode()) for segment in prompt)
+
+
+def traced_call(
+    provider: Provider,
+    prompt: Prompt,
+    options: CompletionOptions | None = None,
+    **attributes,
+) -> contextlib.AbstractContextManager[Span | _NoopSpan]:
+    """Span for one provider call, carrying the request's size.
+
+    Report the reply with ``record_output()`` before the block ends.
+    """
+    if _current_span.get() is None:
+        return contextlib.nullcontext(NOOP_SPAN)
+    family = provider_family(provider)
+    return span(
+        "provider.call",
+        provider=provider.name,
+        model=getattr(provider, "model", None),
+        prompt_bytes=_prompt_bytes(prompt),
+        input_tokens=count_prompt_tokens(prompt, options, family),
+        **attributes,
+    )
+
+
+def record_output(current: Span | _NoopSpan, provider: Provider, text: str) -> None:
+    """Attach a provider's reply size to its call span, failing it on an error reply."""
+    if current is NOOP_SPAN:
+        return
+    current.set(
+        output_bytes=len(text.encode()),
+        output_tokens=count_tokens(text, provider_family(provider)),
+    )
+    if text.startswith("[Error]"):
+        current.fail(text)
+
+
+async def time_first_chunk(
+    chunks: AsyncIterator[str], current: Span | _NoopSpan
+) -> AsyncIterator[str]:
+    """Pass a stream through, recording time to first chunk on the span."""
+    start = time.perf_counter()
+    first = True
+    async for chunk in chunks:
+        if first:
+            current.set(first_chunk_ms=(time.perf_counter() - start) * 1000)
+            first = False
+        yield chunk
@@ -20,6 +20,7 @@ class ProviderType(str, Enum):
     GEMINI = "gemini"
     OPENAI_COMPATIBLE = "openai_compatible"
     GROK = "grok"
+    MOCK = "mock"
 
 
 class FlowType(str, Enum):
@@ -72,6 +73,81 @@ class ChatConfig(BaseModel):
     show_timestamps: bool = False
 
 
+class RetryConfig(BaseModel):
+    """Retry policy for transient provider errors."""
+
+    max_attempts: int = 4  # Including the first call
+    base_delay: float = 1.0  # Seconds; doubles each attempt before jitter
+    max_delay: float = 60.0
+    budget_seconds: float = 300.0  # Total backoff allowed per run, across all providers
+
+
+class CacheConfig(BaseModel):
+    """On-disk response cache (see providers.cache)."""
+
+    enabled: bool = False  # Overridden by --cache/--no-cache
+    max_size_mb: int = 500
+
+
+class BatchConfig(BaseModel):
+    """Provider batch-API execution for non-interactive runs (see providers.batch)."""
+
+    enabled: bool = False  # Overridden by --batch/--no-batch
+    poll_interval: float = 30.0  # Seconds between batch status checks
+    max_wait_hours: float = 24.0  # Give up on a round's batches after this long
+
+
+class TokenConfig(BaseModel):
+    """Token estimation settings (see core.tokens)."""
+
+    exact: bool = False  # Count with a local tokenizer (tiktoken) where one applies
+    # Context windows by model name prefix or provider family, over the built-in ones
+    context_windows: dict[str, int] = Field(default_factory=dict)
+
+
+class TracingConfig(BaseModel):
+    """Span tracing of runs and provider calls (see core.tracing)."""
+
+    enabled: bool = True  # Write trace.jsonl into each run directory
+    otlp_endpoint: str | None = None  # OTLP/HTTP collector, e.g. http://localhost:4318
+    service_name: str = "conclave"
+
+
+class ModelPricing(BaseModel):
+    """List prices of a model in USD per million tokens (see core.usage)."""
+
+    input: float
+    output: float
+    cache_read: float | None = None  # Defaults to the input price
+    cache_write: float | None = None  # Defaults to the input price
+
+
+class HedgeConfig(BaseModel):
+    """Opt-in hedged requests for a provider."""
+
+    enabled: bool = False
+    percentile: float = 95.0  # Hedge calls slower than this percentile of recent latency
+    min_samples: int = 5  # Below this many samples, hedge after initial_delay
+    initial_delay: float = 60.0  # Seconds
+    backup_model: str | None = None  # Model for the duplicate request (default: same model)
+
+
+class MockConfig(BaseModel):
+    """Simulated provider behaviour for offline benchmarking (see providers.mock)."""
+
+    response_tokens: int = 400  # Length of the synthetic reply (capped by max_tokens)
+    # Time-to-first-token distribution
+    latency: Literal["fixed", "lognormal", "pareto"] = "lognormal"
+    latency_ms: float = 800.0  # Fixed value, or median for lognormal/pareto
+    latency_sigma: float = 0.5  # Spread of the lognormal distribution
+    pareto_alpha: float = 1.5  # Tail index of the pareto distribution (lower = heavier tail)
+    max_latency_ms: float = 60_000.0  # Cap on any single draw
+    tokens_per_second: float = 80.0  # Streaming rate after the first token (0 = instant)
+    error_rate: float = 0.0  # Probability a call fails with error_status
+    error_status: int = 503  # HTTP status of injected failures (decides whether they're retried)
+    seed: int | None = None  # Fix for reproducible latencies, errors and text
+
+
 class ProviderConfig(BaseModel):
     """Configuration for a single provider."""
 
@@ -82,6 +158,25 @@ class ProviderConfig(BaseModel):
     endpoint: str | None = None
     base_url: str | None = None
 
+    # Shared HTTP connection pool (see providers.transport)
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+
+    # Local rate limits shared by every engine and chat in the process
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    max_concurrency: int | None = None  # Calls in flight at once
+
+    hedge: HedgeConfig = Field(default_factory=HedgeConfig)
+
+    # Warm Claude CLI worker processes kept ready (CLI auth only, see providers.claude_cli)
+    cli_workers: int = 2
+
+    # Simulated behaviour (mock providers only)
+    mock: MockConfig = Field(default_factory=MockConfig)
+
 
 class FlowPrompts(BaseModel):
     """Prompts used in a flow."""
@@ -91,6 +186,47 @@ class FlowPrompts(BaseModel):
     leader_synthesis: str | None = None
 
 
+class BudgetConfig(BaseModel):
+    """Spending limits for a whole run of a flow (see core.budget)."""
+
+    max_cost: float | None = None  # USD
+    max_tokens: int | None = None  # Input, cached and output tokens across all calls
+    on_exceed: Literal["stop", "shrink"] = "stop"  # Stop before the round, or cut max_tokens to fit
+    min_response_tokens: int = 512  # Shrinking replies below this stops the run instead
+
+
+class QuorumConfig(BaseModel):
+    """When a round of a basic flow may close before every reply is in (see flows.basic.engine)."""
+
+    min_outputs: int | None = None  # Close once this many replies arrive (default: all of them)
+    deadline: float | None = None  # Seconds; close with the replies in so far once it passes
+    stragglers: Literal["cancel", "background"] = "cancel"  # What happens to calls still running
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_outputs is not None or self.deadline is not None
+
+
+class ConvergenceConfig(BaseModel):
+    """Ending a basic flow early once its outputs stop changing (see core.convergence)."""
+
+    enabled: bool = False  # Similarity scores are recorded either way
+    method: Literal["minhash", "diff"] = "minhash"
+    threshold: float = 0.9  # Converged when every provider is this similar to its previous version
+    peer_threshold: float | None = None  # ...or every pair of providers this similar to each other
+
+
+class CompactionConfig(BaseModel):
+    """Shrinking peer outputs before they go into refinement prompts (see core.compaction)."""
+
+    enabled: bool = False
+    stages: list[str] = Field(default_factory=lambda: ["dedupe", "truncate"])  # Run in this order
+    duplicate_threshold: float = 0.8  # Sections this similar to an earlier peer's are dropped
+    max_tokens_per_peer: int = 2000  # Budget of each peer's output in the "truncate" stage
+    summary_provider: str | None = None  # Configured provider (active or not) for "summarize"
+    summary_tokens: int = 600  # Peers longer than this are summarized
+
+
 class FlowConfig(BaseModel):
     """Configuration for a single flow."""
 
@@ -101,6 +237,12 @@ class FlowConfig(BaseModel):
     default_leader: str | None = None
     active_providers: list[str] | None = None
     prompts: FlowPrompts
+    budget: BudgetConfig = Field(default_factory=BudgetConfig)
+    quorum: QuorumConfig = Field(default_factory=QuorumConfig)
+    convergence: ConvergenceConfig = Field(default_factory=ConvergenceConfig)
+    compaction: CompactionConfig = Field(default_factory=CompactionConfig)
+    # Send peers' outputs as diffs against a version the prompt carries in full (see core.deltas)
+    refinement_deltas: bool = False
 
 
 class ConclaveConfig(BaseModel):
@@ -109,6 +251,13 @@ class ConclaveConfig(BaseModel):
     active_providers: list[str]
     providers: dict[str, ProviderConfig]
     flows: dict[str, FlowConfig]
+    retry: RetryConfig = Field(default_factory=RetryConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    tokens: TokenConfig = Field(default_factory=TokenConfig)
+    batch: BatchConfig = Field(default_factory=BatchConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+    # Prices by model name prefix, added to or replacing the built-in table
+    pricing: dict[str, ModelPricing] = Field(default_factory=dict)
 
 
 # Default configuration
@@ -0,0 +1,174 @@
+"""Token usage and cost of provider calls.
+
+Providers report a Completion for every call they make (see providers.base).
+Flow engines collect them per round into a UsageLedger, which prices them and
+is written to usage.json in the run directory.
+
+Prices are list prices in USD per million tokens, matched by the longest
+model-name prefix. They change over time; ``pricing`` in the config adds to
+or replaces entries. Batch API calls are billed at a discount.
+"""
+
+import json
+from pathlib import Path
+
+from ..providers.base import Completion
+from .types import ModelPricing
+
+USAGE_FILE = "usage.json"
+
+# Batch APIs (Anthropic Message Batches, OpenAI Batch) bill at half price
+BATCH_DISCOUNT = 0.5
+
+PRICES: dict[str, ModelPricing] = {
+    # Anthropic
+    "claude-opus-4-5": ModelPricing(input=5.0, output=25.0, cache_read=0.50, cache_write=6.25),
+    "claude-opus-4": ModelPricing(input=15.0, output=75.0, cache_read=1.50, cache_write=18.75),
+    "claude-sonnet-4": ModelPricing(input=3.0, output=15.0, cache_read=0.30, cache_write=3.75),
+    "claude-3-7-sonnet": ModelPricing(input=3.0, output=15.0, cache_read=0.30, cache_write=3.75),
+    "claude-haiku-4-5": ModelPricing(input=1.0, output=5.0, cache_read=0.10, cache_write=1.25),
+    "claude-3-5-haiku": ModelPricing(input=0.80, output=4.0, cache_read=0.08, cache_write=1.0),
+    # OpenAI (cached input is discounted; cache writes aren't billed separately)
+    "gpt-5.2-pro": ModelPricing(input=21.0, output=168.0),
+    "gpt-5.2": ModelPricing(input=1.75, output=14.0, cache_read=0.175),
+    "gpt-5-mini": ModelPricing(input=0.25, output=2.0, cache_read=0.025),
+    "gpt-5-nano": ModelPricing(input=0.05, output=0.40, cache_read=0.005),
+    "gpt-5": ModelPricing(input=1.25, output=10.0, cache_read=0.125),
+    "gpt-4.1-mini": ModelPricing(input=0.40, output=1.60, cache_read=0.10),
+    "gpt-4.1": ModelPricing(input=2.0, output=8.0, cache_read=0.50),
+    "gpt-4o-mini": ModelPricing(input=0.15, output=0.60, cache_read=0.075),
+    "gpt-4o": ModelPricing(input=2.50, output=10.0, cache_read=1.25),
+    "o3": ModelPricing(input=2.0, output=8.0, cache_read=0.50),
+    "o1": ModelPricing(input=15.0, output=60.0, cache_read=7.50),
+    # Google
+    "gemini-2.5-pro": ModelPricing(input=1.25, output=10.0, cache_read=0.31),
+    "gemini-2.5-flash": ModelPricing(input=0.30, output=2.50, cache_read=0.075),
+    "gemini-2.0-flash": ModelPricing(input=0.10, output=0.40, cache_read=0.025),
+    "gemini-1.5-pro": ModelPricing(input=1.25, output=5.0, cache_read=0.3125),
+    "gemini-1.5-flash": ModelPricing(input=0.075, output=0.30, cache_read=0.01875),
+    # xAI
+    "grok-4-fast": ModelPricing(input=0.20, output=0.50, cache_read=0.05),
+    "grok-4": ModelPricing(input=3.0, output=15.0, cache_read=0.75),
+    "grok-3-mini": ModelPricing(input=0.30, output=0.50, cache_read=0.075),
+    "grok-3": ModelPricing(input=3.0, output=15.0, cache_read=0.75),
+    # Simulated providers are free
+    "mock": ModelPricing(input=0.0, output=0.0),
+}
+
+_prices = dict(PRICES)
+
+
+def configure(pricing: dict[str, ModelPricing]) -> None:
+    """Apply price overrides from the loaded configuration."""
+    global _prices
+    _prices = {**PRICES, **pricing}
+
+
+def price_for(model: str) -> ModelPricing | None:
+    """Prices of a model, by longest matching name prefix."""
+    matches = [prefix for prefix in _prices if model.startswith(prefix)]
+    return _prices[max(matches, key=len)] if matches else None
+
+
+def completion_cost(completion: Completion) -> float | None:
+    """Cost of a completion in USD, or None if the model has no known price."""
+    price = price_for(completion.model)
+    if price is None:
+        return None
+    cache_read = price.input if price.cache_read is None else price.cache_read
+    cache_write = price.input if price.cache_write is None else price.cache_write
+    cost = (
+        completion.input_tokens * price.input
+        + completion.output_tokens * price.output
+        + completion.cache_read_tokens * cache_read
+        + completion.cache_write_tokens * cache_write
+    ) / 1_000_000
+    return cost * BATCH_DISCOUNT if completion.batch else cost
+
+
+def _call(completion: Completion) -> dict:
+    return {
+        "provider": completion.provider,
+        "model": completion.model,
+        "input_tokens": completion.input_tokens,
+        "output_tokens": completion.output_tokens,
+        "cache_read_tokens": completion.cache_read_tokens,
+        "cache_write_tokens": completion.cache_write_tokens,
+        "finish_reason": completion.finish_reason,
+        "latency_s": round(completion.latency_s, 3),
+        "estimated": completion.estimated,
+        "batch": completion.batch,
+        "cost_usd": completion_cost(completion),
+    }
+
+
+def summarize(completions: list[Completion]) -> dict:
+    """Token and cost totals of a group of completions."""
+    costs = [completion_cost(c) for c in completions]
+    unpriced = sorted({c.model for c, cost in zip(completions, costs) if cost is None})
+    totals = {
+        "calls": len(completions),
+        "input_tokens": sum(c.input_tokens for c in completions),
+        "output_tokens": sum(c.output_tokens for c in completions),
+        "cache_read_tokens": sum(c.cache_read_tokens for c in completions),
+        "cache_write_tokens": sum(c.cache_write_tokens for c in completions),
+        "estimated_calls": sum(c.estimated for c in completions),
+        "cost_usd": sum(cost for cost in costs if cost is not None),
+    }
+    if unpriced:
+        totals["unpriced_models"] = unpriced
+    return totals
+
+
+class UsageLedger:
+    """Completions of a run, grouped by round."""
+
+    def __init__(self):
+        self.rounds: dict[int, list[Completion]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "UsageLedger":
+        """Ledger saved by an earlier run in the same directory, so a resumed run adds to it."""
+        ledger = cls()
+        if path.exists():
+            for entry in json.loads(path.read_text()).get("rounds", []):
+                ledger.record(entry["round"], [
+                    Completion(text="", **{k: v for k, v in call.items() if k != "cost_usd"})
+                    for call in entry["completions"]
+                ])
+        return ledger
+
+    def record(self, round_num: int, completions: list[Completion]) -> None:
+        self.rounds.setdefault(round_num, []).extend(completions)
+
+    @property
+    def completions(self) -> list[Completion]:
+        return [c for round_completions in self.rounds.values() for c in round_completions]
+
+    def by_provider(self) -> dict[tuple[str, str], dict]:
+        """Totals per (provider, model)."""
+        groups: dict[tuple[str, str], list[Completion]] = {}
+        for completion in self.completions:
+            groups.setdefault((completion.provider, completion.model), []).append(completion)
+        return {key: summarize(group) for key, group in groups.items()}
+
+    def total(self) -> dict:
+        return summarize(self.completions)
+
+    def to_dict(self, run_id: str) -> dict:
+        return {
+            "run_id": run_id,
+            "total": self.total(),
+            "by_provider": [
+                {"provider": provider, "model": model, **totals}
+                for (provider, model), totals in self.by_provider().items()
+            ],
+            "rounds": [
+                {
+                    "round": round_num,
+                    **summarize(completions),
+                    "completions": [_call(c) for c in completions],
+                }
+                for round_num, completions in sorted(self.rounds.items())
+            ],
+        }
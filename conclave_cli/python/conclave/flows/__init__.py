@@ -2,7 +2,9 @@
 
 from typing import Any
 
-from ..core.types import FlowConfig
+from rich.console import Console
+
+from ..core.types import BatchConfig, FlowConfig
 from ..providers.base import Provider
 from . import basic, leading
 
@@ -32,19 +34,33 @@ def create_flow_engine(
     providers: list[Provider],
     flow_config: FlowConfig,
     leader: str | None = None,
+    batch: BatchConfig | None = None,
+    run_id: str | None = None,
+    summarizer: Provider | None = None,
+    progress: Console | None = None,
 ):
-    """Create a flow engine instance for the given flow type."""
+    """Create a flow engine instance for the given flow type.
+
+    ``batch`` runs the flow through provider batch APIs (basic flows only);
+    ``run_id`` resumes an earlier run from its manifest; ``summarizer``
+    condenses peer outputs when the flow's compaction has a summarize stage;
+    ``progress`` is the console the run reports to instead of the terminal.
+    """
     if flow_type not in FLOWS:
         available = ", ".join(FLOWS.keys())
         raise ValueError(f"Unknown flow type: '{flow_type}'. Available types: {available}")
 
     if flow_type == "leading":
+        if batch:
+            raise ValueError("Batch mode is only supported for basic flows.")
         leader_name = leader or flow_config.default_leader
         if not leader_name:
             raise ValueError("Leading flow requires a leader. Specify --leader or set default_leader in config.")
-        return leading.Engine(providers, flow_config, leader_name)
+        return leading.Engine(providers, flow_config, leader_name, run_id=run_id, progress=progress)
 
-    return basic.Engine(providers, flow_config)
+    return basic.Engine(
+        providers, flow_config, batch=batch, run_id=run_id, summarizer=summarizer, progress=progress
+    )
 
 
 def is_valid_flow_type(flow_type: str) -> bool:
@@ -1,20 +1,58 @@
 """Basic flow engine - round-robin democratic pattern."""
 
 import asyncio
+import functools
 from pathlib import Path
 from dataclasses import dataclass, field
 
 from rich.console import Console
 from rich.status import Status
 
-from ...core.types import FlowConfig
-from ...providers.base import CompletionOptions, Provider
-from ...utils.output import create_run_context, read_input_file, save_output
+from ...core.budget import BUDGET_FILE, BudgetDecision, BudgetGuard, Call
+from ...core.compaction import COMPACTION_FILE, PeerCompactor
+from ...core.convergence import CONVERGENCE_FILE, ConvergenceDetector
+from ...core.deltas import DELTAS_FILE, DeltaSavings, render_delta, text_delta
+from ...core.manifest import RunManifest
+from ...core.tokens import (
+    context_window,
+    fit_prompt,
+    prompt_budget,
+    provider_family,
+    provider_model,
+)
+from ...core.tracing import TRACE_FILE, record_output, span, time_first_chunk, trace, traced_call
+from ...core.types import BatchConfig, FlowConfig
+from ...core.usage import USAGE_FILE, UsageLedger
+from ...providers.base import (
+    Completion,
+    CompletionOptions,
+    Prompt,
+    PromptSegment,
+    Provider,
+    capture_completions,
+    render_prompt,
+    report_completion,
+    shares_prompt_cache,
+)
+from ...providers.batch import BatchCheckpoint, BatchRequest, run_batch_round
+from ...providers.hedging import collect_hedge_stats
+from ...providers.transport import start_warming, stop_warming
+from ...utils.console import report_to
+from ...utils.output import (
+    create_run_context,
+    get_output_path,
+    read_input_file,
+    save_json,
+    save_output,
+    stream_output,
+)
 from ...utils.prompts import resolve_prompt
 from .prompts import get_refinement_system_prompt
 
 console = Console()
 
+QUORUM_FILE = "quorum.json"
+
 
 @dataclass
 class RunState:
@@ -32,22 +70,103 @@ class BasicFlowEngine:
     Round 2+ (Convergence): Everyone sees ALL peer outputs and refines
 
     This is a democratic flow - all providers are equal participants.
+
+    With a batch config, each round goes through the providers' batch APIs
+    instead of streaming, and submitted batches are checkpointed so a resumed
+    run polls them instead of submitting them again.
+
+    With a quorum config, a streaming round closes once enough replies are in
+    or its deadline passes. Missing replies are left out of the next round's
+    peer block; the calls still running are cancelled or left to finish in
+    the background, and either way recorded in quorum.json.
+
+    With compaction enabled, peer outputs are deduplicated, truncated or
+    summarized once per round before the shared peer block is built. With
+    refinement_deltas, peers' outputs go as diffs against a version the same
+    prompt carries in full.
+
+    Every finished call is recorded in the run's manifest, so a run that was
+    interrupted can be resumed by passing its run_id: closed rounds are
+    restored from their outputs and only the missing calls are made.
     """
 
-    def __init__(self, providers: list[Provider], flow: FlowConfig):
+    def __init__(
+        self,
+        providers: list[Provider],
+        flow: FlowConfig,
+        batch: BatchConfig | None = None,
+        run_id: str | None = None,
+        summarizer: Provider | None = None,
+        progress: Console | None = None,
+    ):
         self.providers = providers
         self.flow = flow
-        ctx = create_run_context()
+        self.batch = batch
+        # Progress goes to the terminal unless the caller gives the run its own console
+        self.console = progress or console
+        ctx = create_run_context(run_id)
         self.run_id = ctx.run_id
         self.run_dir = ctx.run_dir
+        self.warming: asyncio.Task | None = None
+        self.checkpoint = BatchCheckpoint(self.run_dir) if batch else None
+        self.manifest = RunManifest(self.run_dir)
+        # Token usage and cost of every call, written to usage.json after each round
+        self.usage = UsageLedger.load(self.run_dir / USAGE_FILE)
+        self.budget = BudgetGuard(flow.budget, self.usage)
+        # Rounds closed by quorum or deadline, and calls still running after them
+        self.quorum_log: list[dict] = []
+        self.stragglers: set[asyncio.Task] = set()
+        self.convergence = ConvergenceDetector(flow.convergence)
+        self.compactor = None
+        if flow.compaction.enabled:
+            self.compactor = PeerCompactor(flow.compaction, summarizer)
+        if self.compactor and "summarize" in flow.compaction.stages and summarizer is None:
+            self.console.print(
+                "[yellow]Compaction: no summary_provider available; skipping summaries[/yellow]"
+            )
+        self.deltas = DeltaSavings()
 
     async def run(self, input_file: str, initial_prompt_override: str | None = None) -> None:
-        """Run the basic flow."""
-        console.print(f"\n[green]Starting Flow: {self.flow.name} (Run ID: {self.run_id})[/green]")
-        console.print(f"[dim]Output Directory: {self.run_dir}[/dim]\n")
+        """Run the basic flow, tracing it to trace.jsonl in the run directory."""
+        # Provider notes (retries, batch progress) go to this run's console
+        with report_to(self.console), trace(
+            "flow.run",
+            self.run_dir / TRACE_FILE,
+            flow=self.flow.name,
+            flow_type="basic",
+            run_id=self.run_id,
+            providers=[p.name for p in self.providers],
+            batch=bool(self.batch),
+            resumed=self.manifest.started,
+        ):
+            try:
+                await self._run(input_file, initial_prompt_override)
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                if self.manifest.started:
+                    self.manifest.finish("interrupted")
+                    self.console.print(
+                        "\n[yellow]Run interrupted; resume it with: "
+                        f"conclave resume {self.run_id}[/yellow]"
+                    )
+                raise
+            finally:
+                await self._stop_stragglers()
+                await stop_warming(self.warming)
+
+    async def _run(self, input_file: str, initial_prompt_override: str | None) -> None:
+        action = "Resuming" if self.manifest.started else "Starting"
+        self.console.print(
+            f"\n[green]{action} Flow: {self.flow.name} (Run ID: {self.run_id})[/green]"
+        )
+        self.console.print(f"[dim]Output Directory: {self.run_dir}[/dim]\n")
 
         history: list[RunState] = []
-        input_content = read_input_file(input_file)
+
+        # Warm pooled connections while the input is read and prompts are assembled
+        self.warming = start_warming()
+        with span("input.read", path=str(input_file)) as read:
+            input_content = await asyncio.to_thread(read_input_file, input_file)
+            read.set(bytes=len(input_content.encode()))
 
         # Filter providers if flow defines specific ones
         active_providers = self.providers
@@ -58,85 +177,552 @@ class BasicFlowEngine:
             ]
 
         if not active_providers:
-            console.print("[red]No active providers found for this flow configuration.[/red]")
+            self.console.print("[red]No active providers found for this flow configuration.[/red]")
+            return
+
+        error = self.manifest.start(
+            self.run_id,
+            self.flow,
+            "basic",
+            input_file,
+            input_content,
+            initial_prompt_override,
+            [p.name for p in active_providers],
+            batch=bool(self.batch),
+        )
+        if error:
+            self.console.print(f"[red]Error: {error}; not resuming.[/red]")
             return
 
         # --- Round 1: Divergence ---
-        with Status("Round 1: Divergence (Brainstorming)", console=console) as status:
+        with Status("Round 1: Divergence (Brainstorming)", console=self.console) as status:
             round1_outputs: dict[str, str] = {}
 
-            round1_prompt = initial_prompt_override or resolve_prompt(self.flow.prompts.round_1)
-            full_round1_prompt = f"{round1_prompt}\n\n[INPUT FILE START]\n{input_content}\n[INPUT FILE END]"
+            with span("prompt.build", round=1):
+                round1_prompt = initial_prompt_override or resolve_prompt(self.flow.prompts.round_1)
+                # Input file first: it is the large prefix shared by every call, and is
+                # worth caching only if some model is called with it more than once
+                full_round1_prompt = [
+                    PromptSegment(
+                        f"[INPUT FILE START]\n{input_content}\n[INPUT FILE END]",
+                        cacheable=shares_prompt_cache(active_providers),
+                    ),
+                    PromptSegment(round1_prompt),
+                ]
 
             # Run all providers in parallel
-            tasks = [
-                self._generate_and_save(provider, full_round1_prompt, 1)
-                for provider in active_providers
-            ]
-            results = await asyncio.gather(*tasks)
+            calls = [(provider, full_round1_prompt, None) for provider in active_providers]
+            results = await self._run_round(1, calls)
+            status.stop()
+            if results is None:
+                self.console.print(
+                    "[yellow]Flow stopped: the budget doesn't cover round 1.[/yellow]"
+                )
+                self.manifest.finish("stopped")
+                return
 
             for provider, output in zip(active_providers, results):
-                round1_outputs[provider.name] = output
+                # Failed calls are left out like missed ones, so errors never reach a peer block
+                if output is not None and not output.startswith("[Error]"):
+                    round1_outputs[provider.name] = output
+            if not round1_outputs:
+                self.console.print("[red]Flow stopped: no replies arrived in round 1.[/red]")
+                self.manifest.finish("stopped")
+                return
 
             history.append(RunState(round=1, outputs=round1_outputs))
-            status.stop()
-            console.print("[green]✓[/green] Round 1 Complete")
+            self.console.print("[green]✓[/green] Round 1 Complete")
 
         # --- Convergence Rounds (2..N) ---
+        stop_reason: str | None = None
         for round_num in range(2, self.flow.max_rounds + 1):
-            with Status(f"Round {round_num}: Convergence (Refinement)", console=console) as status:
+            label = f"Round {round_num}: Convergence (Refinement)"
+            with Status(label, console=self.console) as status:
                 prev_outputs = history[-1].outputs
                 round_outputs: dict[str, str] = {}
 
-                tasks = []
-                for provider in active_providers:
-                    previous_output = prev_outputs.get(provider.name, "")
-
-                    # Get other providers' outputs
-                    other_outputs = "\n\n".join(
-                        f"[PEER REVIEW FROM {p.name.upper()}]\n{prev_outputs.get(p.name, 'No output')}"
-                        for p in active_providers
-                        if p.name != provider.name
-                    )
-
-                    refinement_prompt = resolve_prompt(self.flow.prompts.refinement)
-                    full_prompt = f"""{refinement_prompt}
-
-[YOUR PREVIOUS VERSION (v{round_num - 1})]
-{previous_output}
-
-[PEER REVIEWS]
-{other_outputs}
-
-[TASK]
-Based on the critiques and ideas from your peers, output the v{round_num} version of the plan."""
-
-                    options = CompletionOptions(
-                        system_prompt=get_refinement_system_prompt(round_num, self.flow.max_rounds)
-                    )
-                    tasks.append(
-                        self._generate_and_save(provider, full_prompt, round_num, options)
-                    )
-
-                results = await asyncio.gather(*tasks)
+                if self.manifest.closed_outputs(round_num) is not None:
+                    # A restored round's prompts were sent before; its outputs are all that's needed
+                    calls = [(provider, [], None) for provider in active_providers]
+                else:
+                    peer_outputs = await self._compact(round_num, prev_outputs)
+
+                    with span("prompt.build", round=round_num) as build:
+                        calls, _ = self._refinement_calls(
+                            active_providers, peer_outputs, prev_outputs, round_num
+                        )
+                        if self.flow.refinement_deltas:
+                            delta_calls, diffed = self._refinement_calls(
+                                active_providers, peer_outputs, prev_outputs, round_num, deltas=True
+                            )
+                            calls = self._pick_delta_calls(round_num, calls, delta_calls, diffed)
+                            build.set(
+                                diffed_outputs=diffed,
+                                saved_tokens=self.deltas.rounds[-1]["saved_tokens"],
+                            )
+
+                results = await self._run_round(round_num, calls)
+                status.stop()
+                if results is None:
+                    stop_reason = "the budget doesn't cover the next round"
+                    break
                 for provider, output in zip(active_providers, results):
-                    round_outputs[provider.name] = output
+                    if output is not None and not output.startswith("[Error]"):
+                        round_outputs[provider.name] = output
+                if not round_outputs:
+                    stop_reason = f"no replies arrived in round {round_num}"
+                    break
 
                 history.append(RunState(round=round_num, outputs=round_outputs))
-                status.stop()
-                console.print(f"[green]✓[/green] Round {round_num} Complete")
+                self.console.print(f"[green]✓[/green] Round {round_num} Complete")
+
+            if self._converged(round_num, prev_outputs, round_outputs):
+                break
+
+        hedge_stats = collect_hedge_stats(self.providers)
+        if hedge_stats:
+            save_json(self.run_dir, "hedging.json", hedge_stats)
+
+        self.manifest.finish("stopped" if stop_reason else "complete")
+        if stop_reason:
+            self.console.print(
+                f"\n[bold yellow]Flow stopped after round {history[-1].round}: "
+                f"{stop_reason}.[/bold yellow]"
+            )
+        else:
+            self.console.print(f"\n[bold green]Flow Complete![/bold green]")
+        self.console.print(f"Explore the results in: {self.run_dir}")
+
+    def _refinement_calls(
+        self,
+        providers: list[Provider],
+        peer_outputs: dict[str, str],
+        own_outputs: dict[str, str],
+        round_num: int,
+        deltas: bool = False,
+    ) -> tuple[list[Call], int]:
+        """A refinement round's calls, and how many peer outputs went as diffs.
+
+        Each provider's own previous version is sent in full once: as its entry
+        in the block of versions, or after it when that entry is compacted or a
+        diff. With ``deltas``, peers go as diffs where that is shorter (see
+        ``_build_shared_block``).
+        """
+        # Where a model is called more than once, every version from the last round,
+        # in a fixed order, is the same block for every recipient and goes first as a
+        # cached prefix; otherwise each recipient is sent only its peers' versions
+        shared = None
+        if shares_prompt_cache(providers):
+            shared = self._build_shared_block(providers, peer_outputs, round_num, deltas)
+        options = CompletionOptions(
+            system_prompt=get_refinement_system_prompt(round_num, self.flow.max_rounds)
+        )
+        calls = []
+        diffed = len(shared[1]) if shared else 0
+        for provider in providers:
+            if shared:
+                block, diffed_names = shared
+            else:
+                block, diffed_names = self._build_shared_block(
+                    providers,
+                    peer_outputs,
+                    round_num,
+                    deltas,
+                    exclude=provider.name,
+                    base=own_outputs.get(provider.name),
+                )
+                diffed += len(diffed_names)
+            own = own_outputs.get(provider.name)
+            if own is None:
+                own_version = (
+                    "Your previous version didn't arrive for this round. "
+                    "Work from your peers' versions above."
+                )
+            elif (
+                shared is not None
+                and peer_outputs.get(provider.name) == own
+                and provider.name not in diffed_names
+            ):
+                own_version = (
+                    f"Your previous version is the one from {provider.name.upper()} above. "
+                    "The others are your peers' reviews."
+                )
+            elif shared is not None:
+                # In full: the copy above was compacted or a diff
+                own_version = (
+                    "Here is yours in full; the others above are your peers' reviews."
+                    f"\n\n{own}"
+                )
+            else:
+                own_version = own
+            prompt = [
+                block,
+                PromptSegment(
+                    f"[YOUR PREVIOUS VERSION (v{round_num - 1})]\n"
+                    f"{own_version}\n\n"
+                    "[TASK]\n"
+                    "Based on the critiques and ideas from your peers, "
+                    f"output the v{round_num} version of the plan."
+                ),
+            ]
+            calls.append((provider, prompt, options))
+        return calls, diffed
 
-        console.print(f"\n[bold green]Flow Complete![/bold green]")
-        console.print(f"Explore the results in: {self.run_dir}")
+    def _pick_delta_calls(
+        self,
+        round_num: int,
+        full_calls: list[Call],
+        delta_calls: list[Call],
+        diffed: int,
+    ) -> list[Call]:
+        """Use the diff prompts if they are smaller, recording the savings either way."""
+        full_size = sum(len(render_prompt(prompt)) for _, prompt, _ in full_calls)
+        delta_size = sum(len(render_prompt(prompt)) for _, prompt, _ in delta_calls)
+        calls = delta_calls if diffed and delta_size < full_size else full_calls
+        self.deltas.record(
+            round_num,
+            [prompt for _, prompt, _ in full_calls],
+            [prompt for _, prompt, _ in calls],
+            diffed if calls is delta_calls else 0,
+        )
+        save_json(self.run_dir, DELTAS_FILE, self.deltas.to_dict())
+        return calls
+
+    def _build_shared_block(
+        self,
+        providers: list[Provider],
+        prev_outputs: dict[str, str],
+        round_num: int,
+        deltas: bool = False,
+        exclude: str | None = None,
+        base: str | None = None,
+    ) -> tuple[PromptSegment, set[str]]:
+        """Build the block of last round's versions that leads a refinement prompt.
+
+        Providers whose reply missed the last round's quorum or deadline are left
+        out, as is ``exclude``, the recipient of a block that isn't shared.
+
+        Calls are stateless, so with ``deltas`` versions go as diffs only against
+        a text the same prompt carries in full, and only where that is shorter:
+        ``base``, the recipient's own previous version that follows its block, or
+        else the first version in the block. The names of the versions that went
+        as diffs are returned with the block.
+        """
+        refinement_prompt = resolve_prompt(self.flow.prompts.refinement)
+        base_label = "YOUR PREVIOUS VERSION" if base is not None else None
+        entries = []
+        diffed = set()
+        for p in providers:
+            if p.name not in prev_outputs or p.name == exclude:
+                continue
+            text = prev_outputs[p.name]
+            delta = text_delta(base, text) if deltas and base is not None else None
+            if delta is None:
+                entries.append(f"[VERSION v{round_num - 1} FROM {p.name.upper()}]\n{text}")
+                if base is None:
+                    base, base_label = text, f"{p.name.upper()}'S VERSION ABOVE"
+            else:
+                diffed.add(p.name)
+                entries.append(
+                    f"[VERSION v{round_num - 1} FROM {p.name.upper()}, AS CHANGES AGAINST "
+                    f"{base_label}]\n{render_delta(delta)}"
+                )
+        if exclude is None:
+            header = f"[ALL VERSIONS (v{round_num - 1})]"
+        else:
+            header = f"[PEER VERSIONS (v{round_num - 1})]"
+        all_outputs = "\n\n".join(entries)
+        block = PromptSegment(
+            f"{refinement_prompt}\n\n{header}\n{all_outputs}", cacheable=exclude is None
+        )
+        return block, diffed
+
+    async def _run_round(self, round_num: int, calls: list[Call]) -> list[str | None] | None:
+        """Run one round's calls and return the outputs in call order.
+
+        Outputs that missed the round's quorum or deadline are None. Returns
+        None without calling anyone if the round doesn't fit the budget.
+        Calls that finished before the run was interrupted are not made again.
+        """
+        restored = self.manifest.closed_outputs(round_num)
+        if restored is not None:
+            self.console.print(f"[dim]Round {round_num} restored from the run manifest[/dim]")
+            return [restored.get(provider.name) for provider, _, _ in calls]
+
+        done = self.manifest.completed_outputs(round_num)
+        missing = [call for call in calls if call[0].name not in done]
+        if done:
+            self.console.print(
+                f"[dim]Round {round_num}: {len(calls) - len(missing)} call(s) restored, "
+                f"{len(missing)} to make[/dim]"
+            )
+        decision = self.budget.check(round_num, missing)
+        self._report_budget(decision)
+        if not decision.proceed:
+            return None
+        missing = self.budget.limit(missing, decision)
+
+        with span(
+            "round",
+            round=round_num,
+            calls=len(missing),
+            restored=len(done),
+            batch=bool(self.batch),
+        ):
+            with capture_completions() as completions:
+                try:
+                    outputs = []
+                    if missing:
+                        outputs = await self._call_round(round_num, missing, len(done))
+                finally:
+                    # Calls that finished before an interruption are paid for too
+                    self._record_usage(round_num, completions)
+
+        fresh = {provider.name: output for (provider, _, _), output in zip(missing, outputs)}
+        results = [
+            done[provider.name] if provider.name in done else fresh[provider.name]
+            for provider, _, _ in calls
+        ]
+        # Error replies aren't recorded as finished calls, so a restored round leaves them out
+        self.manifest.close_round(round_num, {
+            provider.name: output
+            for (provider, _, _), output in zip(calls, results)
+            if output is not None and not output.startswith("[Error]")
+        })
+        return results
+
+    async def _call_round(
+        self, round_num: int, calls: list[Call], restored: int = 0
+    ) -> list[str | None]:
+        if not self.batch and self.flow.quorum.enabled:
+            return await self._call_quorum_round(round_num, calls, restored)
+        if not self.batch:
+            return await asyncio.gather(*(
+                self._generate_and_save(provider, prompt, round_num, options)
+                for provider, prompt, options in calls
+            ))
+
+        requests = [
+            BatchRequest(
+                provider, self._fit(provider, prompt, options), options or CompletionOptions()
+            )
+            for provider, prompt, options in calls
+        ]
+        outputs = await run_batch_round(round_num, requests, self.checkpoint, self.batch)
+        for provider, _, _ in calls:
+            # Failed requests go to an error file, like failed streams
+            failed = outputs[provider.name].startswith("[Error]")
+            save_output(
+                self.run_dir, provider.name, round_num, outputs[provider.name],
+                suffix="error" if failed else None,
+            )
+            self.manifest.record_call(
+                round_num, provider.name, outputs[provider.name],
+                get_output_path(self.run_dir, provider.name, round_num),
+            )
+        return [outputs[provider.name] for provider, _, _ in calls]
+
+    async def _call_quorum_round(
+        self, round_num: int, calls: list[Call], restored: int = 0
+    ) -> list[str | None]:
+        """Run a round until its quorum or deadline, with None for replies not in by then.
+
+        A round resumed with ``restored`` replies from before the run was
+        interrupted waits for all of its missing calls (up to the deadline)
+        rather than closing on the quorum the restored replies may already
+        meet, which would drop calls just made for it.
+        """
+        quorum = self.flow.quorum
+        total = len(calls) + restored
+        needed = len(calls) if restored else min(quorum.min_outputs or total, total)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = None if quorum.deadline is None else start + quorum.deadline
+
+        tasks = {
+            asyncio.create_task(self._capture_call(provider, prompt, round_num, options)): provider
+            for provider, prompt, options in calls
+        }
+        pending = set(tasks)
+        replies: dict[asyncio.Task, str] = {}
+        closed = "complete"
+        try:
+            while pending:
+                # Error replies count as arrived but not towards the quorum
+                if sum(not text.startswith("[Error]") for text in replies.values()) >= needed:
+                    closed = "quorum"
+                    break
+                timeout = None if deadline is None else deadline - loop.time()
+                if timeout is not None and timeout <= 0:
+                    closed = "deadline"
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    replies[task], completions = task.result()
+                    for completion in completions:
+                        report_completion(completion)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+        if not pending:
+            return [replies[task] for task in tasks]
+
+        entry = {
+            "round": round_num,
+            "closed": closed,
+            "closed_after_s": round(loop.time() - start, 3),
+            "included": [tasks[task].name for task in replies],
+            "stragglers": [],
+        }
+        self.quorum_log.append(entry)
+        for task in pending:
+            straggler = {"provider": tasks[task].name, "status": "running"}
+            entry["stragglers"].append(straggler)
+            self.stragglers.add(task)
+            task.add_done_callback(
+                functools.partial(self._straggler_done, round_num, straggler, start)
+            )
+        late = ", ".join(tasks[task].name for task in pending)
+        if quorum.stragglers == "cancel":
+            self.console.print(
+                f"[yellow]Round {round_num} closed on {closed}; cancelled {late}[/yellow]"
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+        else:
+            self.console.print(
+                f"[yellow]Round {round_num} closed on {closed}; {late} still running[/yellow]"
+            )
+        save_json(self.run_dir, QUORUM_FILE, {"rounds": self.quorum_log})
+        return [replies.get(task) for task in tasks]
+
+    async def _capture_call(
+        self,
+        provider: Provider,
+        prompt: Prompt,
+        round_num: int,
+        options: CompletionOptions | None,
+    ) -> tuple[str, list[Completion]]:
+        """Make one call, keeping its completions so a late reply can still be accounted for."""
+        with capture_completions() as completions:
+            output = await self._generate_and_save(provider, prompt, round_num, options)
+        return output, completions
+
+    def _straggler_done(
+        self, round_num: int, straggler: dict, start: float, task: asyncio.Task
+    ) -> None:
+        """Record how a call left behind by its round ended."""
+        self.stragglers.discard(task)
+        straggler["finished_after_s"] = round(asyncio.get_running_loop().time() - start, 3)
+        if task.cancelled():
+            straggler["status"] = "cancelled"
+        elif task.exception() is not None:
+            straggler.update(status="failed", error=repr(task.exception()))
+        else:
+            text, completions = task.result()
+            straggler["status"] = "failed" if text.startswith("[Error]") else "late"
+            self._record_usage(round_num, completions)
+        save_json(self.run_dir, QUORUM_FILE, {"rounds": self.quorum_log})
+
+    async def _stop_stragglers(self) -> None:
+        """Cancel calls from earlier rounds still running when the flow ends."""
+        if not self.stragglers:
+            return
+        self.console.print(
+            f"[dim]Cancelling {len(self.stragglers)} call(s) still running "
+            "from earlier rounds[/dim]"
+        )
+        stragglers = list(self.stragglers)
+        for task in stragglers:
+            task.cancel()
+        await asyncio.wait(stragglers)
+
+    async def _compact(self, round_num: int, outputs: dict[str, str]) -> dict[str, str]:
+        """The last round's outputs as they go into this round's peer block."""
+        if not self.compactor:
+            return outputs
+        with span("compaction", round=round_num, peers=len(outputs)) as compaction:
+            with capture_completions() as completions:
+                compacted = await self.compactor.compact(round_num, outputs)
+            if completions:
+                self._record_usage(round_num, completions)
+            for name, text in compacted.items():
+                if text != outputs[name]:
+                    save_output(self.run_dir, name, round_num - 1, text, suffix="compacted")
+            saved = self.compactor.rounds[-1]["saved_tokens"] if self.compactor.rounds else 0
+            compaction.set(saved_tokens=saved)
+        save_json(self.run_dir, COMPACTION_FILE, self.compactor.to_dict())
+        return compacted
+
+    def _converged(self, round_num: int, previous: dict[str, str], current: dict[str, str]) -> bool:
+        """Score a round's similarity to the last one; True if the flow should end here."""
+        method = self.flow.convergence.method
+        with span("convergence.check", round=round_num, method=method) as check:
+            converged = self.convergence.check(round_num, previous, current)
+            scores = self.convergence.rounds[-1]
+            check.set(
+                min_stability=scores["min_stability"],
+                min_agreement=scores["min_agreement"],
+                converged=converged,
+            )
+        save_json(self.run_dir, CONVERGENCE_FILE, self.convergence.to_dict())
+
+        remaining = self.flow.max_rounds - round_num
+        if not (converged and self.flow.convergence.enabled and remaining):
+            return False
+        self.console.print(
+            f"[cyan]Outputs converged in round {round_num}; "
+            f"skipping the remaining {remaining} round(s)[/cyan]"
+        )
+        return True
+
+    def _record_usage(self, round_num: int, completions: list[Completion]) -> None:
+        self.usage.record(round_num, completions)
+        save_json(self.run_dir, USAGE_FILE, self.usage.to_dict(self.run_id))
+        if self.budget.enabled:
+            save_json(self.run_dir, BUDGET_FILE, self.budget.to_dict())
+
+    def _report_budget(self, decision: BudgetDecision) -> None:
+        """Print and record a budget decision that changed the run."""
+        if not decision.reason:
+            return
+        color = "yellow" if decision.proceed else "red"
+        self.console.print(f"[{color}]Budget: {decision.reason}[/{color}]")
+        save_json(self.run_dir, BUDGET_FILE, self.budget.to_dict())
+
+    def _fit(self, provider: Provider, prompt: Prompt, options: CompletionOptions | None) -> Prompt:
+        """Keep the prompt inside the model's context window, leaving room for the reply."""
+        family = provider_family(provider)
+        window = context_window(provider_model(provider), family)
+        if window is None:
+            # An unknown window is left to the API rather than guessed at
+            return prompt
+        fitted = fit_prompt(prompt, prompt_budget(options, window), options, family)
+        if fitted is not prompt:
+            self.console.print(
+                f"[yellow]{provider.name}: prompt exceeds the {window:,}-token "
+                f"context window; truncated to fit[/yellow]"
+            )
+        return fitted
 
     async def _generate_and_save(
         self,
         provider: Provider,
-        prompt: str,
+        prompt: Prompt,
         round_num: int,
         options: CompletionOptions | None = None,
     ) -> str:
-        """Generate output and save to file."""
-        result = await provider.generate(prompt, options)
-        save_output(self.run_dir, provider.name, round_num, result)
-        return result
+        """Stream output straight into the round file and return the full text."""
+        fitted = self._fit(provider, prompt, options)
+        with traced_call(provider, fitted, options, round=round_num) as call:
+            chunks = time_first_chunk(provider.stream(fitted, options), call)
+            output = await stream_output(self.run_dir, provider.name, round_num, chunks)
+            record_output(call, provider, output)
+        path = get_output_path(self.run_dir, provider.name, round_num)
+        self.manifest.record_call(round_num, provider.name, output, path)
+        return output
@@ -6,9 +6,39 @@ from dataclasses import dataclass, field
 from rich.console import Console
 from rich.status import Status
 
+from ...core.budget import BUDGET_FILE, BudgetGuard, Call
+from ...core.deltas import DELTAS_FILE, DeltaSavings, render_delta, text_delta
+from ...core.manifest import RunManifest
+from ...core.tokens import (
+    context_window,
+    fit_prompt,
+    prompt_budget,
+    provider_family,
+    provider_model,
+)
+from ...core.tracing import TRACE_FILE, record_output, span, time_first_chunk, trace, traced_call
 from ...core.types import FlowConfig
-from ...providers.base import CompletionOptions, Provider
-from ...utils.output import create_run_context, read_input_file, save_output
+from ...core.usage import USAGE_FILE, UsageLedger
+from ...providers.base import (
+    Completion,
+    CompletionOptions,
+    Prompt,
+    PromptSegment,
+    Provider,
+    capture_completions,
+    render_prompt,
+    shares_prompt_cache,
+)
+from ...providers.hedging import collect_hedge_stats
+from ...providers.transport import start_warming, stop_warming
+from ...utils.console import report_to
+from ...utils.output import (
+    create_run_context,
+    get_output_path,
+    read_input_file,
+    save_json,
+    stream_output,
+)
 from ...utils.prompts import resolve_prompt
 from .prompts import get_contributor_system_prompt, get_leader_system_prompt
 
@@ -32,15 +62,141 @@ class LeadingFlowEngine:
     Step 3: NON-LEADERS respond to leader's synthesis
     Step 4: LEADER synthesizes again from responses
     ... alternating until max_rounds
+
+    With refinement_deltas, the contributors' outputs go to the leader as diffs
+    against its own, which its synthesis prompt carries in full.
+
+    Every finished call is recorded in the run's manifest; passing the run_id
+    of an interrupted run resumes it, restoring finished steps from their
+    outputs and making only the missing calls.
     """
 
-    def __init__(self, providers: list[Provider], flow: FlowConfig, leader_name: str):
+    def __init__(
+        self,
+        providers: list[Provider],
+        flow: FlowConfig,
+        leader_name: str,
+        run_id: str | None = None,
+        progress: Console | None = None,
+    ):
         self.providers = providers
         self.flow = flow
         self.leader_name = leader_name
-        ctx = create_run_context()
+        # Progress goes to the terminal unless the caller gives the run its own console
+        self.console = progress or console
+        ctx = create_run_context(run_id)
         self.run_id = ctx.run_id
         self.run_dir = ctx.run_dir
+        self.warming: asyncio.Task | None = None
+        self.manifest = RunManifest(self.run_dir)
+        # Token usage and cost of every call, written to usage.json after each step
+        self.usage = UsageLedger.load(self.run_dir / USAGE_FILE)
+        self.budget = BudgetGuard(flow.budget, self.usage)
+        self.deltas = DeltaSavings()
+
+    def _record_usage(self, round_num: int, completions: list[Completion]) -> None:
+        self.usage.record(round_num, completions)
+        save_json(self.run_dir, USAGE_FILE, self.usage.to_dict(self.run_id))
+        if self.budget.enabled:
+            save_json(self.run_dir, BUDGET_FILE, self.budget.to_dict())
+
+    async def _run_step(
+        self,
+        round_num: int,
+        step: str,
+        calls: list[Call],
+        suffix: str | None = None,
+    ) -> list[str] | None:
+        """Run one step's calls in parallel and return the outputs in call order.
+
+        Returns None without calling anyone if the step doesn't fit the budget.
+        Calls that finished before the run was interrupted are not made again.
+        """
+        restored = self.manifest.closed_outputs(round_num)
+        if restored is not None and all(provider.name in restored for provider, _, _ in calls):
+            self.console.print(f"[dim]Step {round_num} restored from the run manifest[/dim]")
+            return [restored[provider.name] for provider, _, _ in calls]
+
+        done = self.manifest.completed_outputs(round_num)
+        missing = [call for call in calls if call[0].name not in done]
+        if done:
+            self.console.print(
+                f"[dim]Step {round_num}: {len(calls) - len(missing)} call(s) restored, "
+                f"{len(missing)} to make[/dim]"
+            )
+        decision = self.budget.check(round_num, missing)
+        if decision.reason:
+            color = "yellow" if decision.proceed else "red"
+            self.console.print(f"[{color}]Budget: {decision.reason}[/{color}]")
+            save_json(self.run_dir, BUDGET_FILE, self.budget.to_dict())
+        if not decision.proceed:
+            return None
+        missing = self.budget.limit(missing, decision)
+
+        with span("round", round=round_num, step=step, calls=len(missing), restored=len(done)):
+            with capture_completions() as completions:
+                try:
+                    outputs = await asyncio.gather(*(
+                        self._generate_and_save(provider, prompt, round_num, options, suffix)
+                        for provider, prompt, options in missing
+                    ))
+                finally:
+                    # Calls that finished before an interruption are paid for too
+                    self._record_usage(round_num, completions)
+
+        fresh = {provider.name: output for (provider, _, _), output in zip(missing, outputs)}
+        results = [done.get(provider.name, fresh.get(provider.name)) for provider, _, _ in calls]
+        # Error replies aren't recorded as finished calls, so a resumed run makes them again
+        self.manifest.close_round(round_num, {
+            provider.name: output
+            for (provider, _, _), output in zip(calls, results)
+            if not output.startswith("[Error]")
+        })
+        return results
+
+    def _leader_prompt(
+        self,
+        contributors: list[Provider],
+        outputs: dict[str, str],
+        round_num: int,
+        leader_name: str | None = None,
+    ) -> tuple[Prompt, int]:
+        """The leader's synthesis prompt, and how many contributions went as diffs.
+
+        With ``leader_name``, the other contributions go as diffs against the
+        leader's own, which comes first and in full, where that is shorter.
+        """
+        base = outputs.get(leader_name) if leader_name else None
+        entries = []
+        diffed = 0
+        for p in contributors:
+            text = outputs.get(p.name, "No output")
+            delta = None
+            if base is not None and p.name != leader_name and p.name in outputs:
+                delta = text_delta(base, text)
+            if delta is None:
+                entries.append(f"[CONTRIBUTION FROM {p.name.upper()}]\n{text}")
+            else:
+                diffed += 1
+                entries.append(
+                    f"[CONTRIBUTION FROM {p.name.upper()}, AS CHANGES AGAINST "
+                    f"{leader_name.upper()}'S ABOVE]\n{render_delta(delta)}"
+                )
+        # Gather all outputs for leader to review
+        all_contributions = "\n\n---\n\n".join(entries)
+
+        leader_prompt_text = self.flow.prompts.leader_synthesis or self.flow.prompts.refinement
+        prompt = [
+            # Only the leader is sent this, once, so there is nothing to cache
+            PromptSegment(f"[ALL CONTRIBUTIONS]\n{all_contributions}"),
+            PromptSegment(
+                f"{resolve_prompt(leader_prompt_text)}\n\n"
+                "[TASK]\n"
+                f"Synthesize a unified v{round_num} plan that incorporates "
+                "the best ideas from all contributors."
+            ),
+        ]
+        return prompt, diffed
 
     def _get_leader_provider(self) -> Provider | None:
         """Find the leader provider by name."""
@@ -58,76 +214,161 @@ class LeadingFlowEngine:
         return [p for p in self.providers if p != leader]
 
     async def run(self, input_file: str, initial_prompt_override: str | None = None) -> None:
-        """Run the leading flow."""
+        """Run the leading flow, tracing it to trace.jsonl in the run directory."""
+        # Provider notes (retries, batch progress) go to this run's console
+        with report_to(self.console), trace(
+            "flow.run",
+            self.run_dir / TRACE_FILE,
+            flow=self.flow.name,
+            flow_type="leading",
+            run_id=self.run_id,
+            leader=self.leader_name,
+            providers=[p.name for p in self.providers],
+            resumed=self.manifest.started,
+        ):
+            try:
+                await self._run(input_file, initial_prompt_override)
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                if self.manifest.started:
+                    self.manifest.finish("interrupted")
+                    self.console.print(
+                        "\n[yellow]Run interrupted; resume it with: "
+                        f"conclave resume {self.run_id}[/yellow]"
+                    )
+                raise
+            finally:
+                await stop_warming(self.warming)
+
+    async def _run(self, input_file: str, initial_prompt_override: str | None) -> None:
         leader = self._get_leader_provider()
         if not leader:
-            console.print(f"[red]Error: Leader provider '{self.leader_name}' not found.[/red]")
-            console.print(f"Available providers: {', '.join(p.name for p in self.providers)}")
+            self.console.print(f"[red]Error: Leader provider '{self.leader_name}' not found.[/red]")
+            self.console.print(f"Available providers: {', '.join(p.name for p in self.providers)}")
             return
 
         non_leaders = self._get_non_leader_providers()
 
-        console.print(f"\n[green]Starting Flow: {self.flow.name} (Run ID: {self.run_id})[/green]")
-        console.print(f"[cyan]Leader: {leader.name}[/cyan]")
-        console.print(f"[dim]Contributors: {', '.join(p.name for p in non_leaders)}[/dim]")
-        console.print(f"[dim]Output Directory: {self.run_dir}[/dim]\n")
+        action = "Resuming" if self.manifest.started else "Starting"
+        self.console.print(
+            f"\n[green]{action} Flow: {self.flow.name} (Run ID: {self.run_id})[/green]"
+        )
+        self.console.print(f"[cyan]Leader: {leader.name}[/cyan]")
+        self.console.print(f"[dim]Contributors: {', '.join(p.name for p in non_leaders)}[/dim]")
+        self.console.print(f"[dim]Output Directory: {self.run_dir}[/dim]\n")
+
+        # Warm pooled connections while the input is read and prompts are assembled
+        self.warming = start_warming()
+        with span("input.read", path=str(input_file)) as read:
+            input_content = await asyncio.to_thread(read_input_file, input_file)
+            read.set(bytes=len(input_content.encode()))
+        error = self.manifest.start(
+            self.run_id,
+            self.flow,
+            "leading",
+            input_file,
+            input_content,
+            initial_prompt_override,
+            [p.name for p in self.providers],
+            leader=self.leader_name,
+        )
+        if error:
+            self.console.print(f"[red]Error: {error}; not resuming.[/red]")
+            return
 
-        input_content = read_input_file(input_file)
         history: list[RunState] = []
         current_round = 1
 
         # --- STEP 1: Everyone ideates independently ---
-        with Status("Step 1: Everyone ideates independently", console=console) as status:
+        with Status("Step 1: Everyone ideates independently", console=self.console) as status:
             round1_outputs: dict[str, str] = {}
 
-            round1_prompt = initial_prompt_override or resolve_prompt(self.flow.prompts.round_1)
-            full_round1_prompt = f"{round1_prompt}\n\n[INPUT FILE START]\n{input_content}\n[INPUT FILE END]"
-
             all_providers = [leader] + non_leaders
-            tasks = [
-                self._generate_and_save(provider, full_round1_prompt, 1)
-                for provider in all_providers
-            ]
-            results = await asyncio.gather(*tasks)
+            with span("prompt.build", round=1):
+                round1_prompt = initial_prompt_override or resolve_prompt(self.flow.prompts.round_1)
+                # Input file first: it is the large prefix shared by every call, and is
+                # worth caching only if some model is called with it more than once
+                full_round1_prompt = [
+                    PromptSegment(
+                        f"[INPUT FILE START]\n{input_content}\n[INPUT FILE END]",
+                        cacheable=shares_prompt_cache(all_providers),
+                    ),
+                    PromptSegment(round1_prompt),
+                ]
+
+            calls = [(provider, full_round1_prompt, None) for provider in all_providers]
+            results = await self._run_step(1, "ideate", calls)
+            status.stop()
+            if results is None:
+                self.console.print(
+                    "[yellow]Flow stopped: the budget doesn't cover step 1.[/yellow]"
+                )
+                self.manifest.finish("stopped")
+                return
 
             for provider, output in zip(all_providers, results):
-                round1_outputs[provider.name] = output
+                # Failed calls are left out, so errors never reach the leader as contributions
+                if not output.startswith("[Error]"):
+                    round1_outputs[provider.name] = output
 
             history.append(RunState(round=1, outputs=round1_outputs))
-            status.stop()
-            console.print("[green]✓[/green] Step 1 Complete: Everyone has ideated")
+            self.console.print("[green]✓[/green] Step 1 Complete: Everyone has ideated")
             current_round += 1
 
         # --- ALTERNATING LOOP ---
+        stop_reason: str | None = None
         while current_round <= self.flow.max_rounds:
             prev_outputs = history[-1].outputs
 
             # LEADER SYNTHESIS STEP
-            with Status(f"Step {current_round}: Leader synthesizes", console=console) as status:
-                # Gather all outputs for leader to review
-                all_contributions = "\n\n---\n\n".join(
-                    f"[CONTRIBUTION FROM {p.name.upper()}]\n{prev_outputs.get(p.name, 'No output')}"
-                    for p in [leader] + non_leaders
-                )
-
-                leader_prompt_text = self.flow.prompts.leader_synthesis or self.flow.prompts.refinement
-                full_leader_prompt = f"""{resolve_prompt(leader_prompt_text)}
-
-[ALL CONTRIBUTIONS]
-{all_contributions}
-
-[TASK]
-Synthesize a unified v{current_round} plan that incorporates the best ideas from all contributors."""
+            label = f"Step {current_round}: Leader synthesizes"
+            with Status(label, console=self.console) as status:
+                with span("prompt.build", round=current_round) as build:
+                    contributors = [leader] + non_leaders
+                    full_leader_prompt, _ = self._leader_prompt(
+                        contributors, prev_outputs, current_round
+                    )
+                    if self.flow.refinement_deltas:
+                        delta_prompt, diffed = self._leader_prompt(
+                            contributors, prev_outputs, current_round, leader.name
+                        )
+                        delta_size = len(render_prompt(delta_prompt))
+                        use_delta = diffed and delta_size < len(render_prompt(full_leader_prompt))
+                        self.deltas.record(
+                            current_round,
+                            [full_leader_prompt],
+                            [delta_prompt if use_delta else full_leader_prompt],
+                            diffed if use_delta else 0,
+                            step="synthesize",
+                        )
+                        save_json(self.run_dir, DELTAS_FILE, self.deltas.to_dict())
+                        build.set(diffed_outputs=diffed if use_delta else 0)
+                        if use_delta:
+                            full_leader_prompt = delta_prompt
 
                 options = CompletionOptions(
                     system_prompt=get_leader_system_prompt(current_round, self.flow.max_rounds)
                 )
-                leader_result = await leader.generate(full_leader_prompt, options)
-                save_output(self.run_dir, leader.name, current_round, leader_result, "synthesis")
-
-                leader_outputs = {leader.name: leader_result}
+                results = await self._run_step(
+                    current_round,
+                    "synthesize",
+                    [(leader, full_leader_prompt, options)],
+                    "synthesis",
+                )
                 status.stop()
-                console.print(f"[green]✓[/green] Step {current_round} Complete: Leader synthesized")
+                if results is None:
+                    stop_reason = f"the budget doesn't cover step {current_round}"
+                    break
+
+                leader_result = results[0]
+                if leader_result.startswith("[Error]"):
+                    # Contributors would respond to the error, so the run ends on the
+                    # last good round instead
+                    stop_reason = f"the leader's synthesis in step {current_round} failed"
+                    break
+                leader_outputs = {leader.name: leader_result}
+                self.console.print(
+                    f"[green]✓[/green] Step {current_round} Complete: Leader synthesized"
+                )
                 current_round += 1
 
             if current_round > self.flow.max_rounds:
@@ -135,55 +376,100 @@ Synthesize a unified v{current_round} plan that incorporates the best ideas from
                 break
 
             # NON-LEADERS RESPOND STEP
-            with Status(f"Step {current_round}: Contributors respond to leader", console=console) as status:
-                refinement_prompt = resolve_prompt(self.flow.prompts.refinement)
-                respond_outputs: dict[str, str] = {}
-
-                tasks = []
-                for provider in non_leaders:
-                    my_prev_output = prev_outputs.get(provider.name, "")
-
-                    full_respond_prompt = f"""{refinement_prompt}
-
-[YOUR PREVIOUS VERSION (v{current_round - 2})]
-{my_prev_output}
-
-[LEADER'S SYNTHESIS (v{current_round - 1})]
-{leader_result}
-
-[TASK]
-Based on the leader's synthesis, provide your v{current_round} response. Identify improvements, gaps, or alternative approaches."""
-
-                    options = CompletionOptions(
-                        system_prompt=get_contributor_system_prompt(current_round, self.flow.max_rounds)
+            label = f"Step {current_round}: Contributors respond to leader"
+            with Status(label, console=self.console) as status:
+                with span("prompt.build", round=current_round):
+                    refinement_prompt = resolve_prompt(self.flow.prompts.refinement)
+                    respond_outputs: dict[str, str] = {}
+
+                    # Every contributor gets the same synthesis, so it leads as a shared prefix
+                    shared_block = PromptSegment(
+                        f"{refinement_prompt}\n\n"
+                        f"[LEADER'S SYNTHESIS (v{current_round - 1})]\n{leader_result}",
+                        cacheable=shares_prompt_cache(non_leaders),
                     )
-                    tasks.append(self._generate_and_save(provider, full_respond_prompt, current_round, options))
 
-                results = await asyncio.gather(*tasks)
+                    calls = []
+                    for provider in non_leaders:
+                        my_prev_output = prev_outputs.get(provider.name, "")
+
+                        full_respond_prompt = [
+                            shared_block,
+                            PromptSegment(
+                                f"[YOUR PREVIOUS VERSION (v{current_round - 2})]\n"
+                                f"{my_prev_output}\n\n"
+                                "[TASK]\n"
+                                f"Based on the leader's synthesis, provide your v{current_round} "
+                                "response. Identify improvements, gaps, or alternative approaches."
+                            ),
+                        ]
+
+                        system_prompt = get_contributor_system_prompt(
+                            current_round, self.flow.max_rounds
+                        )
+                        options = CompletionOptions(system_prompt=system_prompt)
+                        calls.append((provider, full_respond_prompt, options))
+
+                results = await self._run_step(current_round, "respond", calls)
+                status.stop()
+                if results is None:
+                    stop_reason = f"the budget doesn't cover step {current_round}"
+                    break
                 for provider, output in zip(non_leaders, results):
-                    respond_outputs[provider.name] = output
+                    if not output.startswith("[Error]"):
+                        respond_outputs[provider.name] = output
 
                 # Merge leader's synthesis with responses for next round
                 merged_outputs = {**respond_outputs, leader.name: leader_result}
                 history.append(RunState(round=current_round, outputs=merged_outputs))
 
-                status.stop()
-                console.print(f"[green]✓[/green] Step {current_round} Complete: Contributors responded")
+                self.console.print(
+                    f"[green]✓[/green] Step {current_round} Complete: Contributors responded"
+                )
                 current_round += 1
 
-        console.print(f"\n[bold green]Flow Complete![/bold green]")
-        console.print(f"Explore the results in: {self.run_dir}")
-        console.print(f"[cyan]Final synthesis from {leader.name} is the recommended output.[/cyan]")
+        hedge_stats = collect_hedge_stats(self.providers)
+        if hedge_stats:
+            save_json(self.run_dir, "hedging.json", hedge_stats)
+
+        self.manifest.finish("stopped" if stop_reason else "complete")
+        if stop_reason:
+            self.console.print(
+                f"\n[bold yellow]Flow stopped after step {history[-1].round}: "
+                f"{stop_reason}.[/bold yellow]"
+            )
+        else:
+            self.console.print(f"\n[bold green]Flow Complete![/bold green]")
+        self.console.print(f"Explore the results in: {self.run_dir}")
+        self.console.print(
+            f"[cyan]Final synthesis from {leader.name} is the recommended output.[/cyan]"
+        )
 
     async def _generate_and_save(
         self,
         provider: Provider,
-        prompt: str,
+        prompt: Prompt,
         round_num: int,
         options: CompletionOptions | None = None,
         suffix: str | None = None,
     ) -> str:
-        """Generate output and save to file."""
-        result = await provider.generate(prompt, options)
-        save_output(self.run_dir, provider.name, round_num, result, suffix)
-        return result
+        """Stream output straight into the round file and return the full text."""
+        # Keep the prompt inside the model's context window, leaving room for the reply
+        # (an unknown window is left to the API rather than guessed at)
+        family = provider_family(provider)
+        window = context_window(provider_model(provider), family)
+        fitted = prompt
+        if window is not None:
+            fitted = fit_prompt(prompt, prompt_budget(options, window), options, family)
+        if fitted is not prompt:
+            self.console.print(
+                f"[yellow]{provider.name}: prompt exceeds the {window:,}-token "
+                f"context window; truncated to fit[/yellow]"
+            )
+        with traced_call(provider, fitted, options, round=round_num, role=suffix) as call:
+            chunks = time_first_chunk(provider.stream(fitted, options), call)
+            output = await stream_output(self.run_dir, provider.name, round_num, chunks, suffix)
+            record_output(call, provider, output)
+        path = get_output_path(self.run_dir, provider.name, round_num, suffix)
+        self.manifest.record_call(round_num, provider.name, output, path)
+        return output
@@ -1,45 +1,199 @@
 """Anthropic provider implementation."""
 
 import os
+import time
+from collections.abc import AsyncIterator
 
-from anthropic import AsyncAnthropic
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 
+from ..core.tokens import record_usage
+from ..core.tracing import annotate
 from ..core.types import ProviderConfig
-from .base import CompletionOptions, Provider
+from .base import BatchItem, Completion, CompletionOptions, Prompt, Provider, report_completion
+from .transport import ANTHROPIC_BASE_URL, get_http_client
+
+# The Messages API accepts at most four cache_control breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
 
 
 class AnthropicProvider(Provider):
     """Provider for Anthropic's Claude API."""
 
+    token_family = "anthropic"
+
     def __init__(self, config: ProviderConfig):
         super().__init__("Anthropic")
         self.model = config.model or "claude-opus-4-5-20251101"
+        base_url = config.base_url or ANTHROPIC_BASE_URL
         self.client = AsyncAnthropic(
-            api_key=config.api_key or os.environ.get("ANTHROPIC_API_KEY")
+            api_key=config.api_key or os.environ.get("ANTHROPIC_API_KEY"),
+            base_url=base_url,
+            http_client=get_http_client(base_url, config, DefaultAsyncHttpxClient),
+            # Retries are handled by self.retrier
+            max_retries=0,
+        )
+
+    def _build_content(self, prompt: Prompt) -> str | list[dict]:
+        """Build message content, marking cacheable segments as cache breakpoints."""
+        if isinstance(prompt, str):
+            return prompt
+
+        segments = [segment for segment in prompt if segment.text]
+        # A breakpoint caches everything before it, so the last ones cover the most
+        breakpoints = [i for i, s in enumerate(segments) if s.cacheable][-MAX_CACHE_BREAKPOINTS:]
+
+        blocks = []
+        for i, segment in enumerate(segments):
+            block = {"type": "text", "text": segment.text}
+            if i in breakpoints:
+                block["cache_control"] = {"type": "ephemeral"}
+            blocks.append(block)
+        return blocks
+
+    def _record_usage(self, prompt: Prompt, options: CompletionOptions, usage) -> None:
+        """Calibrate token estimates against the whole prompt, cached parts included.
+
+        Prompt-cache reads and writes go on the call's trace span; the usage
+        ledger gets them with the call's Completion.
+        """
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        record_usage(self.token_family, prompt, options, usage.input_tokens + read + written)
+        if read or written:
+            annotate(cache_read_tokens=read, cache_write_tokens=written)
+
+    def _completion(
+        self,
+        text: str,
+        usage,
+        output_tokens: int,
+        stop_reason: str | None,
+        start: float,
+        batch: bool = False,
+    ) -> Completion:
+        return Completion(
+            text=text,
+            provider=self.name,
+            model=self.model,
+            input_tokens=usage.input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+            finish_reason=stop_reason,
+            latency_s=time.perf_counter() - start,
+            batch=batch,
         )
 
-    async def generate(self, prompt: str, options: CompletionOptions | None = None) -> str:
+    def _build_kwargs(self, prompt: Prompt, options: CompletionOptions) -> dict:
+        """Build request parameters for the Messages API."""
+        kwargs = {
+            "model": self.model,
+            "max_tokens": options.max_tokens,
+            "messages": [{"role": "user", "content": self._build_content(prompt)}],
+        }
+
+        if options.system_prompt:
+            kwargs["system"] = options.system_prompt
+
+        if options.temperature is not None:
+            kwargs["temperature"] = options.temperature
+
+        return kwargs
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
         """Generate a completion using Anthropic's API."""
         options = options or CompletionOptions()
+        start = time.perf_counter()
 
         try:
-            kwargs = {
-                "model": self.model,
-                "max_tokens": options.max_tokens,
-                "messages": [{"role": "user", "content": prompt}],
-            }
-
-            if options.system_prompt:
-                kwargs["system"] = options.system_prompt
-
-            if options.temperature is not None:
-                kwargs["temperature"] = options.temperature
+            kwargs = self._build_kwargs(prompt, options)
+            response = await self.retrier.call(
+                lambda: self.client.messages.create(**kwargs), self.name
+            )
 
-            response = await self.client.messages.create(**kwargs)
+            self._record_usage(prompt, options, response.usage)
 
             # Extract text from response
-            return "".join(
+            text = "".join(
                 block.text for block in response.content if hasattr(block, "text")
             )
+            report_completion(self._completion(
+                text, response.usage, response.usage.output_tokens, response.stop_reason, start
+            ))
+            return text
         except Exception as e:
             return f"[Error] Anthropic failed to generate response: {e}"
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion using Anthropic's API."""
+        options = options or CompletionOptions()
+        start = time.perf_counter()
+
+        try:
+            kwargs = self._build_kwargs(prompt, options)
+            events = await self.retrier.call(
+                lambda: self.client.messages.create(**kwargs, stream=True), self.name
+            )
+            usage = None
+            output_tokens = 0
+            stop_reason = None
+            parts: list[str] = []
+            async for event in events:
+                if event.type == "message_start":
+                    usage = event.message.usage
+                    self._record_usage(prompt, options, usage)
+                elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    parts.append(event.delta.text)
+                    yield event.delta.text
+                elif event.type == "message_delta":
+                    # Output tokens and the stop reason arrive at the end of the stream
+                    output_tokens = event.usage.output_tokens
+                    stop_reason = event.delta.stop_reason
+            if usage is not None:
+                report_completion(self._completion(
+                    "".join(parts), usage, output_tokens, stop_reason, start
+                ))
+        except Exception as e:
+            yield f"[Error] Anthropic failed to generate response: {e}"
+
+    async def submit_batch(self, requests: list[BatchItem]) -> str:
+        """Submit requests to the Message Batches API and return the batch ID."""
+        batch = await self.retrier.call(
+            lambda: self.client.messages.batches.create(
+                requests=[
+                    {"custom_id": custom_id, "params": self._build_kwargs(prompt, options)}
+                    for custom_id, prompt, options in requests
+                ]
+            ),
+            self.name,
+        )
+        return batch.id
+
+    async def poll_batch(self, batch_id: str) -> dict[str, str] | None:
+        """Return results by custom ID once the batch has ended, else None."""
+        batch = await self.retrier.call(
+            lambda: self.client.messages.batches.retrieve(batch_id), self.name
+        )
+        if batch.processing_status != "ended":
+            return None
+
+        results: dict[str, str] = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                message = result.message
+                text = "".join(block.text for block in message.content if hasattr(block, "text"))
+                results[entry.custom_id] = text
+                # Batch requests have no meaningful latency of their own
+                report_completion(self._completion(
+                    text, message.usage, message.usage.output_tokens, message.stop_reason,
+                    time.perf_counter(), batch=True,
+                ))
+            else:
+                detail = getattr(result, "error", None) or result.type
+                results[entry.custom_id] = (
+                    f"[Error] Anthropic batch request {result.type}: {detail}"
+                )
+        return results
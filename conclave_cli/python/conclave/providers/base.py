@@ -1,8 +1,13 @@
 """Base provider interface."""
 
+import contextlib
+import contextvars
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator
 from dataclasses import dataclass
 
+from .retry import Retrier
+
 
 @dataclass
 class CompletionOptions:
@@ -13,13 +18,159 @@ class CompletionOptions:
     temperature: float | None = None
 
 
+@dataclass
+class PromptSegment:
+    """A block of a structured prompt.
+
+    Cacheable segments are stable prefixes the same model is sent more than
+    once (the input file, a round's peer outputs, when two providers share a
+    model); providers with prompt caching mark them as cache breakpoints.
+    Segments are joined by blank lines when rendered as text.
+    """
+
+    text: str
+    cacheable: bool = False
+
+
+@dataclass
+class Completion:
+    """A finished completion with the usage the provider reported for it.
+
+    Input tokens exclude prompt-cache reads and writes, which are counted
+    separately because they are billed at different rates. Estimated
+    completions had no usage from the API and were counted locally.
+    """
+
+    text: str
+    provider: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    finish_reason: str | None = None
+    latency_s: float = 0.0
+    estimated: bool = False
+    batch: bool = False
+
+
+# Completions reported while a capture_completions() block is open
+_captured: contextvars.ContextVar[list[Completion] | None] = contextvars.ContextVar(
+    "conclave_completions", default=None
+)
+
+
+@contextlib.contextmanager
+def capture_completions() -> Iterator[list[Completion]]:
+    """Collect the completions of every provider call made inside the block.
+
+    Tasks started inside the block (asyncio.gather, hedged attempts) report
+    to the same list.
+    """
+    completions: list[Completion] = []
+    token = _captured.set(completions)
+    try:
+        yield completions
+    finally:
+        _captured.reset(token)
+
+
+def report_completion(completion: Completion) -> None:
+    """Called by providers once a call has finished."""
+    completions = _captured.get()
+    if completions is not None:
+        completions.append(completion)
+
+
+# A prompt is plain text or an ordered list of segments, shared content first
+Prompt = str | list[PromptSegment]
+
+# One request in a provider batch: (custom ID, prompt, options).
+# Providers with a batch API implement submit_batch() and poll_batch().
+BatchItem = tuple[str, Prompt, CompletionOptions]
+
+
+def render_prompt(prompt: Prompt) -> str:
+    """Flatten a prompt to plain text."""
+    if isinstance(prompt, str):
+        return prompt
+    return "\n\n".join(segment.text for segment in prompt if segment.text)
+
+
 class Provider(ABC):
     """Abstract base class for LLM providers."""
 
     def __init__(self, name: str):
         self.name = name
+        # Replaced by the factory with one sharing the run's retry budget
+        self.retrier = Retrier()
 
     @abstractmethod
-    async def generate(self, prompt: str, options: CompletionOptions | None = None) -> str:
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
         """Generate a completion for the given prompt."""
         pass
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion as text chunks.
+
+        Providers without native streaming fall back to a single chunk from generate().
+        """
+        yield await self.generate(prompt, options)
+
+    async def complete(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> Completion:
+        """Generate a completion along with its token usage, finish reason and latency.
+
+        Calls answered without reaching the API (cache hits, errors before the
+        request) come back with zero usage.
+        """
+        with capture_completions() as completions:
+            text = await self.generate(prompt, options)
+        if completions:
+            completion = completions[-1]
+            completion.text = text
+            return completion
+        return Completion(text=text, provider=self.name, model=getattr(self, "model", "unknown"))
+
+
+class ProviderWrapper(Provider):
+    """Provider that decorates another provider, delegating to it by default.
+
+    Attributes not defined on the wrapper (model, client, ...) resolve on the
+    wrapped provider, so wrappers can be stacked transparently.
+    """
+
+    def __init__(self, inner: Provider):
+        super().__init__(inner.name)
+        self.inner = inner
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
+        return await self.inner.generate(prompt, options)
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        async for chunk in self.inner.stream(prompt, options):
+            yield chunk
+
+
+def shares_prompt_cache(providers: list[Provider]) -> bool:
+    """Whether two of the providers call the same model.
+
+    Prompt caches are kept per model, so a prefix sent once to each provider
+    is only read back from the cache when some model gets it more than once.
+    """
+    models = [
+        (
+            getattr(p, "token_family", None),
+            getattr(p, "model", None) or getattr(p, "model_name", None),
+        )
+        for p in providers
+    ]
+    return len(set(models)) < len(models)
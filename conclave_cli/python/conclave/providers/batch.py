@@ -0,0 +1,167 @@
+"""Batch-API execution for non-interactive runs.
+
+In batch mode each round's prompts go through the providers' batch endpoints
+(Anthropic Message Batches, OpenAI Batch), which trade latency for lower cost
+and separate rate limits. Providers without a batch API are called directly
+while the batches are processed.
+
+Submitted batch IDs and finished outputs are checkpointed in the run
+directory as they happen, so an interrupted run can be resumed without
+resubmitting or paying for work twice.
+"""
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..core.types import BatchConfig
+from ..utils.console import provider_console
+from .base import CompletionOptions, Prompt, Provider
+
+CHECKPOINT_FILE = "batch.json"
+
+
+@dataclass
+class BatchRequest:
+    """A single prompt for one provider in a round."""
+
+    provider: Provider
+    prompt: Prompt
+    options: CompletionOptions
+
+
+def supports_batch(provider: Provider) -> bool:
+    """Whether a provider (or the provider it wraps) has a batch API."""
+    return callable(getattr(provider, "submit_batch", None))
+
+
+def custom_id(round_num: int, provider: Provider) -> str:
+    """Stable ID of a provider's request within a round."""
+    # Batch APIs only accept [a-zA-Z0-9_-] in custom IDs
+    slug = re.sub(r"[^a-z0-9_-]+", "-", provider.name.lower()).strip("-")
+    return f"round-{round_num}-{slug}"[:64]
+
+
+class BatchCheckpoint:
+    """Per-round batch IDs and outputs, persisted in the run directory."""
+
+    def __init__(self, run_dir: Path):
+        self.path = run_dir / CHECKPOINT_FILE
+        self.data: dict = {"rounds": {}}
+        if self.path.exists():
+            self.data = json.loads(self.path.read_text())
+
+    def round(self, round_num: int) -> dict:
+        return self.data["rounds"].setdefault(str(round_num), {"batches": {}, "outputs": {}})
+
+    def completed_outputs(self, round_num: int, providers: list[Provider]) -> dict[str, str] | None:
+        """Outputs of a round if every provider finished it, else None."""
+        outputs = self.data["rounds"].get(str(round_num), {}).get("outputs", {})
+        if all(p.name in outputs for p in providers):
+            return {p.name: outputs[p.name] for p in providers}
+        return None
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2))
+        tmp.replace(self.path)
+
+
+async def _submit(
+    request: BatchRequest, round_num: int, state: dict, checkpoint: BatchCheckpoint
+) -> bool:
+    """Submit a request as a batch unless one is already in flight. False on failure."""
+    name = request.provider.name
+    if name in state["batches"]:
+        provider_console().print(f"[dim]{name}: resuming batch {state['batches'][name]}[/dim]")
+        return True
+    try:
+        batch_id = await request.provider.submit_batch(
+            [(custom_id(round_num, request.provider), request.prompt, request.options)]
+        )
+    except Exception as e:
+        provider_console().print(
+            f"[yellow]{name}: batch submission failed ({e}); calling directly[/yellow]"
+        )
+        return False
+    state["batches"][name] = batch_id
+    checkpoint.save()
+    provider_console().print(f"[dim]{name}: submitted batch {batch_id}[/dim]")
+    return True
+
+
+async def run_batch_round(
+    round_num: int,
+    requests: list[BatchRequest],
+    checkpoint: BatchCheckpoint,
+    config: BatchConfig,
+) -> dict[str, str]:
+    """Run one round through batch endpoints and return outputs by provider name."""
+    state = checkpoint.round(round_num)
+    outputs: dict[str, str] = dict(state["outputs"])
+    pending = [r for r in requests if r.provider.name not in outputs]
+
+    batched: list[BatchRequest] = []
+    direct: list[BatchRequest] = []
+    for request in pending:
+        submitted = supports_batch(request.provider) and await _submit(
+            request, round_num, state, checkpoint
+        )
+        if submitted:
+            batched.append(request)
+        else:
+            direct.append(request)
+
+    def finish(request: BatchRequest, text: str) -> None:
+        outputs[request.provider.name] = text
+        # Failures aren't checkpointed, so a resumed run retries them
+        if not text.startswith("[Error]"):
+            state["outputs"][request.provider.name] = text
+            checkpoint.save()
+
+    async def call_direct(request: BatchRequest) -> None:
+        finish(request, await request.provider.generate(request.prompt, request.options))
+
+    async def poll_batches() -> None:
+        waiting = list(batched)
+        deadline = time.monotonic() + config.max_wait_hours * 3600
+        while waiting:
+            for request in list(waiting):
+                name = request.provider.name
+                try:
+                    results = await request.provider.poll_batch(state["batches"][name])
+                except Exception as e:
+                    # Transient polling failures are retried on the next pass
+                    provider_console().print(
+                        f"[yellow]{name}: batch status check failed ({e})[/yellow]"
+                    )
+                    continue
+                if results is None:
+                    continue
+                text = results.get(custom_id(round_num, request.provider))
+                # The batch is done either way; a failed request gets a fresh batch on resume
+                state["batches"].pop(name)
+                if text is None:
+                    text = f"[Error] {name} batch ended without a result"
+                finish(request, text)
+                checkpoint.save()
+                waiting.remove(request)
+
+            if not waiting:
+                break
+            if time.monotonic() > deadline:
+                for request in waiting:
+                    # A resumed run keeps waiting on the same batch
+                    outputs[request.provider.name] = (
+                        f"[Error] {request.provider.name} batch did not finish within "
+                        f"{config.max_wait_hours:g}h"
+                    )
+                break
+            await asyncio.sleep(config.poll_interval)
+
+    await asyncio.gather(poll_batches(), *(call_direct(r) for r in direct))
+    return {r.provider.name: outputs[r.provider.name] for r in requests}
@@ -0,0 +1,153 @@
+"""Content-addressed on-disk cache for provider responses.
+
+Responses are stored under ``.conclave/cache`` keyed by a hash of everything
+that determines them: provider type, model, system prompt, prompt,
+max_tokens and temperature. The cache is bounded in size and evicts the
+least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from .base import CompletionOptions, Prompt, Provider, ProviderWrapper, render_prompt
+
+
+def default_cache_dir() -> Path:
+    """The cache directory of the project in the current working directory."""
+    return Path.cwd() / ".conclave" / "cache"
+
+
+def cache_key(
+    provider_type: str,
+    model: str | None,
+    prompt: str,
+    options: CompletionOptions | None = None,
+) -> str:
+    """Hash the inputs that determine a response."""
+    options = options or CompletionOptions()
+    payload = json.dumps(
+        {
+            "provider_type": provider_type,
+            "model": model,
+            "system_prompt": options.system_prompt,
+            "prompt": prompt,
+            "max_tokens": options.max_tokens,
+            "temperature": options.temperature,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of response texts, one file per entry."""
+
+    def __init__(self, cache_dir: Path | None = None, max_size_mb: int = 500):
+        # Resolved on open, so a process that changes directory caches in the right project
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._sizes = {p.name: p.stat().st_size for p in self.cache_dir.glob("*.md")}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.md"
+
+    def get(self, key: str) -> str | None:
+        """Look up a response, marking it as recently used."""
+        path = self._path(key)
+        try:
+            text = path.read_text()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # mtime doubles as the LRU timestamp
+        os.utime(path)
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store a response atomically, then evict down to the size bound."""
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(text)
+        tmp.replace(path)
+        self._sizes[path.name] = path.stat().st_size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its bound."""
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        entries = []
+        for name in self._sizes:
+            try:
+                entries.append(((self.cache_dir / name).stat().st_mtime, name))
+            except FileNotFoundError:
+                entries.append((0.0, name))
+
+        for _, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            (self.cache_dir / name).unlink(missing_ok=True)
+            total -= self._sizes.pop(name)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._sizes),
+            "size_bytes": sum(self._sizes.values()),
+        }
+
+
+class CachedProvider(ProviderWrapper):
+    """Wraps a provider so identical requests are served from the response cache."""
+
+    def __init__(self, inner: Provider, cache: ResponseCache, provider_type: str):
+        super().__init__(inner)
+        self.cache = cache
+        self.provider_type = provider_type
+
+    def _key(self, prompt: Prompt, options: CompletionOptions | None) -> str:
+        model = getattr(self.inner, "model", None) or getattr(self.inner, "model_name", None)
+        return cache_key(self.provider_type, model, render_prompt(prompt), options)
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
+        key = self._key(prompt, options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await self.inner.generate(prompt, options)
+        if not result.startswith("[Error]"):
+            self.cache.put(key, result)
+        return result
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        key = self._key(prompt, options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts: list[str] = []
+        failed = False
+        async for chunk in self.inner.stream(prompt, options):
+            failed = failed or chunk.startswith("[Error]")
+            parts.append(chunk)
+            yield chunk
+
+        if not failed:
+            self.cache.put(key, "".join(parts))
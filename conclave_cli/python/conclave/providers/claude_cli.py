@@ -1,55 +1,294 @@
-"""Claude CLI provider for subscription users."""
+"""Claude CLI provider for subscription users.
+
+Each call is served by a Claude CLI worker process driven over the CLI's
+stream-json protocol: the prompt is written to the worker's stdin as a JSON
+message (so prompt size is not bounded by ARG_MAX) and the reply is read back
+as JSON events from stdout.
+
+A CLI process keeps its conversation history for as long as it lives, so a
+worker serves exactly one prompt. Startup cost is kept off the critical path
+instead: a small pool of workers is spawned ahead of time, checked for health
+on checkout, and replaced as soon as one is used or found dead.
+"""
 
 import asyncio
+import contextlib
+import functools
+import json
 import shutil
+import time
+from collections import deque
+from collections.abc import AsyncIterator
 
 from ..core.types import ProviderConfig
-from .base import CompletionOptions, Provider
+from .base import Completion, CompletionOptions, Prompt, Provider, render_prompt, report_completion
+
+# Largest single JSON line accepted from the CLI (a full reply arrives as one line)
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# Seconds to wait for a worker to exit before killing it
+WORKER_EXIT_TIMEOUT = 5.0
+
+CLI_NOT_FOUND = "[Error] Claude CLI not found. Install it or use API key auth."
+
+
+@functools.cache
+def find_claude() -> str | None:
+    """Locate the claude binary once per process."""
+    return shutil.which("claude")
+
+
+class ClaudeWorker:
+    """A Claude CLI process waiting for a single prompt on stdin."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        # Drain stderr from the start so a chatty CLI can't block on a full pipe
+        self.stderr_task = asyncio.create_task(process.stderr.read())
+
+    @classmethod
+    async def spawn(cls, claude_path: str) -> "ClaudeWorker":
+        process = await asyncio.create_subprocess_exec(
+            claude_path,
+            "-p",
+            "--input-format", "stream-json",
+            "--output-format", "stream-json",
+            "--include-partial-messages",
+            "--verbose",
+            "--dangerously-skip-permissions",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+        )
+        return cls(process)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def send(self, text: str) -> None:
+        """Write the prompt as a user message and close stdin to end the session."""
+        message = {
+            "type": "user",
+            "message": {"role": "user", "content": [{"type": "text", "text": text}]},
+        }
+        self.process.stdin.write(json.dumps(message).encode() + b"\n")
+        await self.process.stdin.drain()
+        self.process.stdin.close()
+
+    async def events(self) -> AsyncIterator[dict]:
+        """Yield JSON events from stdout until the worker exits."""
+        while line := await self.process.stdout.readline():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Non-JSON diagnostics are ignored; only protocol events matter
+                continue
+
+    async def stderr_text(self) -> str:
+        """What the worker wrote to stderr; empty if closing it cut the read short."""
+        if self.stderr_task.cancelled():
+            return ""
+        return (await self.stderr_task).decode(errors="replace").strip()
+
+    async def close(self) -> None:
+        """Stop the process and reap it."""
+        if self.alive:
+            with contextlib.suppress(ProcessLookupError):
+                self.process.kill()
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self.process.wait(), WORKER_EXIT_TIMEOUT)
+            # Its stderr ends with it, so what it wrote is still there to report
+            await asyncio.wait_for(asyncio.shield(self.stderr_task), WORKER_EXIT_TIMEOUT)
+        self.stderr_task.cancel()
+        # Let the cancellation land, so stderr_text() sees it instead of raising it
+        await asyncio.wait([self.stderr_task])
+
+
+class ClaudeWorkerPool:
+    """Keeps up to ``size`` warm workers ready for the next call."""
+
+    def __init__(self, claude_path: str, size: int):
+        self.claude_path = claude_path
+        self.size = size
+        self.idle: deque[ClaudeWorker] = deque()
+        self.restarts = 0
+        self._spawning = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    async def acquire(self) -> ClaudeWorker:
+        """Check out a healthy worker, spawning one if none is warm."""
+        worker = None
+        while self.idle:
+            candidate = self.idle.popleft()
+            if candidate.alive:
+                worker = candidate
+                break
+            # Died while idle - reap it and let the refill replace it
+            self.restarts += 1
+            await candidate.close()
+        if worker is None:
+            worker = await ClaudeWorker.spawn(self.claude_path)
+        self._refill()
+        return worker
+
+    def _refill(self) -> None:
+        """Spawn workers in the background until the pool is full again."""
+        missing = self.size - len(self.idle) - self._spawning
+        for _ in range(max(0, missing)):
+            self._spawning += 1
+            task = asyncio.create_task(self._spawn_idle())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _spawn_idle(self) -> None:
+        try:
+            self.idle.append(await ClaudeWorker.spawn(self.claude_path))
+        except Exception:
+            # Warming is best effort - acquire() spawns on demand if the pool is empty
+            pass
+        finally:
+            self._spawning -= 1
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        workers = list(self.idle)
+        self.idle.clear()
+        await asyncio.gather(*(w.close() for w in workers))
+
+
+_pools: dict[str, ClaudeWorkerPool] = {}
+
+
+def get_worker_pool(claude_path: str, size: int) -> ClaudeWorkerPool:
+    """Get the process-wide worker pool for a claude binary."""
+    pool = _pools.get(claude_path)
+    if pool is None:
+        pool = _pools[claude_path] = ClaudeWorkerPool(claude_path, size)
+    pool.size = max(pool.size, size)
+    return pool
+
+
+async def close_worker_pools() -> None:
+    """Stop all warm workers (e.g. before the event loop shuts down)."""
+    pools = list(_pools.values())
+    _pools.clear()
+    await asyncio.gather(*(p.close() for p in pools))
 
 
 class ClaudeCliProvider(Provider):
     """Provider that uses the Claude CLI binary (for subscription auth)."""
 
+    token_family = "anthropic"
+
     def __init__(self, config: ProviderConfig):
         super().__init__("Anthropic (CLI)")
         self.model = config.model or "claude-opus-4-5-20251101"
+        self.pool_size = config.cli_workers
 
-    async def generate(self, prompt: str, options: CompletionOptions | None = None) -> str:
+    def _build_message(self, prompt: Prompt, options: CompletionOptions) -> str:
+        """Build the text sent to the CLI for a prompt."""
+        # Prepend system prompt to user prompt (workers are spawned before the
+        # system prompt is known, so --system-prompt can't be used)
+        full_prompt = render_prompt(prompt)
+        if options.system_prompt:
+            full_prompt = f"{options.system_prompt}\n\n---\n\n{full_prompt}"
+        return full_prompt
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
         """Generate a completion using the Claude CLI."""
+        parts: list[str] = []
+        async for chunk in self.stream(prompt, options):
+            if chunk.startswith("[Error]"):
+                return chunk
+            parts.append(chunk)
+        return "".join(parts)
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion from a Claude CLI worker as it is written."""
         options = options or CompletionOptions()
 
-        # Check if claude is available
-        claude_path = shutil.which("claude")
+        claude_path = find_claude()
         if not claude_path:
-            return "[Error] Claude CLI not found. Install it or use API key auth."
+            yield CLI_NOT_FOUND
+            return
+
+        pool = get_worker_pool(claude_path, self.pool_size)
+        message = self._build_message(prompt, options)
+        start = time.perf_counter()
 
         try:
-            # Prepend system prompt to user prompt (CLI doesn't have --system flag)
-            full_prompt = prompt
-            if options.system_prompt:
-                full_prompt = f"{options.system_prompt}\n\n---\n\n{prompt}"
+            # A worker that crashes before replying is replaced and the prompt resent once
+            for attempt in range(2):
+                worker = await pool.acquire()
+                produced = False
+                try:
+                    async for chunk in self._run(worker, message, start):
+                        produced = True
+                        yield chunk
+                finally:
+                    await worker.close()
+                if produced:
+                    return
+                pool.restarts += 1
+
+            stderr = await worker.stderr_text()
+            yield f"[Error] Claude CLI failed: {stderr or 'worker exited without a reply'}"
 
-            # Build command
-            cmd = [
-                claude_path,
-                "-p", full_prompt,
-                "--dangerously-skip-permissions",
-            ]
+        except Exception as e:
+            yield f"[Error] Claude CLI failed: {e}"
 
-            # Run the process
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+    async def _run(self, worker: ClaudeWorker, message: str, start: float) -> AsyncIterator[str]:
+        """Send a prompt to a worker and yield its reply text.
 
-            stdout, stderr = await process.communicate()
+        Yields nothing if the worker exits before replying, and ends with an
+        error if it exits partway through a reply, before its result event.
+        """
+        await worker.send(message)
 
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                return f"[Error] Claude CLI failed: {error_msg}"
+        streamed = False
+        stop_reason = None
+        async for event in worker.events():
+            if event.get("type") == "stream_event":
+                inner = event.get("event", {})
+                delta = inner.get("delta", {})
+                if delta.get("type") == "text_delta" and delta.get("text"):
+                    streamed = True
+                    yield delta["text"]
+                elif inner.get("type") == "message_delta":
+                    stop_reason = delta.get("stop_reason") or stop_reason
 
-            return stdout.decode()
+            elif event.get("type") == "result":
+                if event.get("is_error") or event.get("subtype") != "success":
+                    detail = event.get("result") or event.get("subtype") or "Unknown error"
+                    yield f"[Error] Claude CLI failed: {detail}"
+                    return
+                if not streamed:
+                    # Older CLIs don't emit partial messages; fall back to the final text
+                    yield event.get("result") or ""
+                usage = event.get("usage") or {}
+                report_completion(Completion(
+                    text=event.get("result") or "",
+                    provider=self.name,
+                    model=self.model,
+                    input_tokens=usage.get("input_tokens", 0),
+                    output_tokens=usage.get("output_tokens", 0),
+                    cache_read_tokens=usage.get("cache_read_input_tokens", 0),
+                    cache_write_tokens=usage.get("cache_creation_input_tokens", 0),
+                    finish_reason=stop_reason,
+                    latency_s=time.perf_counter() - start,
+                    estimated=not usage,
+                ))
+                return
 
-        except Exception as e:
-            return f"[Error] Claude CLI failed: {e}"
+        if streamed:
+            # The reply was cut off, so the text so far mustn't pass for a whole one
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(worker.process.wait(), WORKER_EXIT_TIMEOUT)
+            stderr = await worker.stderr_text() if worker.stderr_task.done() else ""
+            yield f"[Error] Claude CLI worker exited mid-reply: {stderr or 'no result received'}"
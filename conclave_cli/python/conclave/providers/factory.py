@@ -1,17 +1,24 @@
 """Provider factory for creating provider instances."""
 
 import os
-import shutil
 
 from rich.console import Console
 
+from ..core.tokens import configure as configure_tokens
+from ..core.tracing import configure as configure_tracing
 from ..core.types import AuthMethod, ConclaveConfig, ProviderConfig, ProviderType
+from ..core.usage import configure as configure_pricing
 from .anthropic import AnthropicProvider
 from .base import Provider
-from .claude_cli import ClaudeCliProvider
+from .cache import CachedProvider, ResponseCache
+from .claude_cli import ClaudeCliProvider, find_claude
 from .gemini import GeminiProvider
 from .grok import GrokProvider
+from .hedging import HedgedProvider
+from .mock import MockProvider
 from .openai import OpenAIProvider
+from .ratelimit import RateLimitedProvider, get_rate_limiter
+from .retry import Retrier, RetryBudget
 
 console = Console()
 
@@ -30,33 +37,98 @@ def _resolve_anthropic_auth_method(config: ProviderConfig) -> AuthMethod:
         return AuthMethod.API_KEY
 
     # Fall back to CLI if available
-    if shutil.which("claude"):
+    if find_claude():
         return AuthMethod.CLI
 
     # Default to API key (will fail if not configured)
     return AuthMethod.API_KEY
 
 
-def create_providers(config: ConclaveConfig) -> list[Provider]:
-    """Create provider instances based on configuration."""
+def create_providers(
+    config: ConclaveConfig, cache: ResponseCache | None = None
+) -> list[Provider]:
+    """Create provider instances based on configuration.
+
+    If a response cache is given, every provider is served through it.
+    """
     providers: list[Provider] = []
+    configure_tokens(config.tokens)
+    configure_tracing(config.tracing)
+    configure_pricing(config.pricing)
+
+    # One retry budget shared by every provider in this run
+    retry_budget = RetryBudget(config.retry.budget_seconds)
 
     for provider_name in config.active_providers:
-        provider_config = config.providers.get(provider_name)
-        if not provider_config:
-            console.print(f"[yellow]Warning: Provider '{provider_name}' not configured[/yellow]")
-            continue
-
-        try:
-            provider = _create_provider(provider_name, provider_config)
-            if provider:
-                providers.append(provider)
-        except Exception as e:
-            console.print(f"[red]Error creating provider '{provider_name}': {e}[/red]")
+        provider = _build_provider(config, provider_name, retry_budget, cache)
+        if provider:
+            providers.append(provider)
 
     return providers
 
 
+def create_provider(
+    config: ConclaveConfig, name: str, cache: ResponseCache | None = None
+) -> Provider | None:
+    """Create one configured provider by name, active or not.
+
+    Used for helper calls outside a flow's participants, such as summaries.
+    """
+    return _build_provider(config, name, RetryBudget(config.retry.budget_seconds), cache)
+
+
+def _build_provider(
+    config: ConclaveConfig,
+    provider_name: str,
+    retry_budget: RetryBudget,
+    cache: ResponseCache | None,
+) -> Provider | None:
+    """Create a provider with its retry, hedging, rate-limit and cache wrappers."""
+    provider_config = config.providers.get(provider_name)
+    if not provider_config:
+        console.print(f"[yellow]Warning: Provider '{provider_name}' not configured[/yellow]")
+        return None
+
+    try:
+        provider = _create_provider(provider_name, provider_config)
+        if provider:
+            provider.retrier = Retrier(config.retry, retry_budget)
+            # Hedging goes outside the rate limit, so every duplicate request is counted
+            provider = _apply_rate_limit(provider_name, provider, provider_config)
+            provider = _apply_hedging(provider_name, provider, provider_config)
+            if cache:
+                provider = CachedProvider(provider, cache, provider_config.type.value)
+        return provider
+    except Exception as e:
+        console.print(f"[red]Error creating provider '{provider_name}': {e}[/red]")
+        return None
+
+
+def _apply_hedging(name: str, provider: Provider, config: ProviderConfig) -> Provider:
+    """Wrap a provider for hedged requests if hedging is enabled."""
+    if not config.hedge.enabled:
+        return provider
+
+    backup = None
+    if config.hedge.backup_model:
+        backup_config = config.model_copy(update={"model": config.hedge.backup_model})
+        backup = _create_provider(name, backup_config)
+        if backup:
+            backup.retrier = provider.retrier
+            backup = _apply_rate_limit(name, backup, config)
+    return HedgedProvider(provider, config.hedge, backup)
+
+
+def _apply_rate_limit(name: str, provider: Provider, config: ProviderConfig) -> Provider:
+    """Wrap a provider with its shared rate limiter if limits are configured."""
+    if not (config.requests_per_minute or config.tokens_per_minute or config.max_concurrency):
+        return provider
+    limiter = get_rate_limiter(
+        name, config.requests_per_minute, config.tokens_per_minute, config.max_concurrency
+    )
+    return RateLimitedProvider(provider, limiter)
+
+
 def _create_provider(name: str, config: ProviderConfig) -> Provider | None:
     """Create a single provider instance."""
     match config.type:
@@ -79,6 +151,9 @@ def _create_provider(name: str, config: ProviderConfig) -> Provider | None:
         case ProviderType.OPENAI_COMPATIBLE:
             return OpenAIProvider(config, name=name.title())
 
+        case ProviderType.MOCK:
+            return MockProvider(config, name=name.title())
+
         case _:
             console.print(f"[yellow]Unknown provider type: {config.type}[/yellow]")
             return None
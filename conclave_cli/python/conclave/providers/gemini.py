@@ -1,51 +1,151 @@
 """Google Gemini provider implementation."""
 
 import os
+import time
+from collections.abc import AsyncIterator
 
 from google import genai
-from google.genai.types import GenerateContentConfig
+from google.genai.types import GenerateContentConfig, HttpOptions
 
+from ..core.tokens import count_prompt_tokens, count_tokens, record_usage
 from ..core.types import ProviderConfig
-from .base import CompletionOptions, Provider
+from .base import Completion, CompletionOptions, Prompt, Provider, render_prompt, report_completion
+from .transport import GEMINI_BASE_URL, get_http_client
 
 
 class GeminiProvider(Provider):
     """Provider for Google's Gemini API."""
 
+    token_family = "gemini"
+
     def __init__(self, config: ProviderConfig):
         super().__init__("Gemini")
         self.model_name = config.model or "gemini-2.0-flash"
 
         # Configure the API key
         api_key = config.api_key or os.environ.get("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=api_key)
+        # Older google-genai releases can't take an injected httpx client
+        http_options = None
+        if "httpx_async_client" in HttpOptions.model_fields:
+            http_options = HttpOptions(
+                httpx_async_client=get_http_client(GEMINI_BASE_URL, config)
+            )
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
+
+    def _build_request(
+        self, prompt: Prompt, options: CompletionOptions
+    ) -> tuple[str, GenerateContentConfig | None]:
+        """Build contents and generation config for a request."""
+        config_kwargs = {}
+        if options.max_tokens:
+            config_kwargs["max_output_tokens"] = options.max_tokens
+        if options.temperature is not None:
+            config_kwargs["temperature"] = options.temperature
+
+        config = GenerateContentConfig(**config_kwargs) if config_kwargs else None
+
+        # Build contents with optional system prompt
+        contents = render_prompt(prompt)
+        if options.system_prompt:
+            contents = f"{options.system_prompt}\n\n{contents}"
+
+        return contents, config
+
+    def _record_usage(self, prompt: Prompt, options: CompletionOptions, response) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            record_usage(self.token_family, prompt, options, usage.prompt_token_count)
+
+    def _completion(
+        self, prompt: Prompt, options: CompletionOptions, text: str, response, start: float
+    ) -> Completion:
+        """Completion from a response's usage metadata, estimated when there is none."""
+        completion = Completion(
+            text=text,
+            provider=self.name,
+            model=self.model_name,
+            latency_s=time.perf_counter() - start,
+        )
+        candidates = getattr(response, "candidates", None)
+        reason = candidates[0].finish_reason if candidates else None
+        if reason is not None:
+            completion.finish_reason = getattr(reason, "name", str(reason)).lower()
+
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None or usage.prompt_token_count is None:
+            completion.input_tokens = count_prompt_tokens(prompt, options, self.token_family)
+            completion.output_tokens = count_tokens(text, self.token_family)
+            completion.estimated = True
+            return completion
+        # prompt_token_count includes cached content; thinking tokens bill as output
+        cached = usage.cached_content_token_count or 0
+        completion.input_tokens = usage.prompt_token_count - cached
+        completion.cache_read_tokens = cached
+        completion.output_tokens = (usage.candidates_token_count or 0) + (
+            getattr(usage, "thoughts_token_count", None) or 0
+        )
+        return completion
 
-    async def generate(self, prompt: str, options: CompletionOptions | None = None) -> str:
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
         """Generate a completion using Gemini's API."""
         options = options or CompletionOptions()
+        start = time.perf_counter()
 
         try:
-            # Build configuration
-            config_kwargs = {}
-            if options.max_tokens:
-                config_kwargs["max_output_tokens"] = options.max_tokens
-            if options.temperature is not None:
-                config_kwargs["temperature"] = options.temperature
-
-            config = GenerateContentConfig(**config_kwargs) if config_kwargs else None
-
-            # Build contents with optional system prompt
-            contents = prompt
-            if options.system_prompt:
-                contents = f"{options.system_prompt}\n\n{prompt}"
-
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents=contents,
-                config=config,
+            contents, config = self._build_request(prompt, options)
+
+            response = await self.retrier.call(
+                lambda: self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=contents,
+                    config=config,
+                ),
+                self.name,
             )
 
-            return response.text
+            self._record_usage(prompt, options, response)
+            text = response.text
+            report_completion(self._completion(prompt, options, text or "", response, start))
+            return text
 
         except Exception as e:
             return f"[Error] Gemini failed to generate response: {e}"
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion using Gemini's API."""
+        options = options or CompletionOptions()
+        start = time.perf_counter()
+
+        try:
+            contents, config = self._build_request(prompt, options)
+
+            async def open_stream():
+                # The request is only sent on first iteration, so pull the first
+                # chunk inside the retried call
+                response = await self.client.aio.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=contents,
+                    config=config,
+                )
+                return response, await anext(response, None)
+
+            response, first = await self.retrier.call(open_stream, self.name)
+            last = first
+            parts: list[str] = []
+            if first is not None and first.text:
+                parts.append(first.text)
+                yield first.text
+            async for chunk in response:
+                last = chunk
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            # Each chunk carries running usage; the last one covers the whole call
+            if last is not None:
+                self._record_usage(prompt, options, last)
+            report_completion(self._completion(prompt, options, "".join(parts), last, start))
+
+        except Exception as e:
+            yield f"[Error] Gemini failed to generate response: {e}"
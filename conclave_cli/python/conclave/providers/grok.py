@@ -1,11 +1,15 @@
 """Grok (xAI) provider implementation using OpenAI-compatible API."""
 
 import os
+import time
+from collections.abc import AsyncIterator
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
+from ..core.tokens import count_prompt_tokens, count_tokens, record_usage
 from ..core.types import ProviderConfig
-from .base import CompletionOptions, Provider
+from .base import Completion, CompletionOptions, Prompt, Provider, render_prompt, report_completion
+from .transport import get_http_client
 
 
 # Latest Grok models as of 2025
@@ -22,6 +26,8 @@ DEFAULT_MODEL = "grok-4"
 class GrokProvider(Provider):
     """Provider for xAI's Grok API (OpenAI-compatible)."""
 
+    token_family = "grok"
+
     def __init__(self, config: ProviderConfig):
         super().__init__("Grok")
         self.model = config.model or DEFAULT_MODEL
@@ -33,31 +39,111 @@ class GrokProvider(Provider):
         self.client = AsyncOpenAI(
             api_key=api_key,
             base_url=base_url,
+            http_client=get_http_client(base_url, config, DefaultAsyncHttpxClient),
+            # Retries are handled by self.retrier
+            max_retries=0,
         )
 
-    async def generate(self, prompt: str, options: CompletionOptions | None = None) -> str:
+    def _build_kwargs(self, prompt: Prompt, options: CompletionOptions) -> dict:
+        """Build request parameters for the Chat Completions API."""
+        messages = []
+        if options.system_prompt:
+            messages.append({"role": "system", "content": options.system_prompt})
+        messages.append({"role": "user", "content": render_prompt(prompt)})
+
+        # Grok-4 is a reasoning model, similar parameters to GPT-5
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "max_completion_tokens": options.max_tokens,
+        }
+
+        # Reasoning models may not support temperature
+        if options.temperature is not None and not self.model.startswith("grok-4"):
+            kwargs["temperature"] = options.temperature
+
+        return kwargs
+
+    def _completion(
+        self,
+        prompt: Prompt,
+        options: CompletionOptions,
+        text: str,
+        usage,
+        finish_reason: str | None,
+        start: float,
+        batch: bool = False,
+    ) -> Completion:
+        """Completion from a Chat Completions usage block, estimated when there is none."""
+        completion = Completion(
+            text=text,
+            provider=self.name,
+            model=self.model,
+            finish_reason=finish_reason,
+            latency_s=time.perf_counter() - start,
+            batch=batch,
+        )
+        if usage is None:
+            completion.input_tokens = count_prompt_tokens(prompt, options, self.token_family)
+            completion.output_tokens = count_tokens(text, self.token_family)
+            completion.estimated = True
+            return completion
+        # prompt_tokens includes cached tokens, which are billed at a lower rate
+        cached = getattr(usage.prompt_tokens_details, "cached_tokens", None) or 0
+        completion.input_tokens = usage.prompt_tokens - cached
+        completion.cache_read_tokens = cached
+        completion.output_tokens = usage.completion_tokens
+        return completion
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
         """Generate a completion using Grok's API."""
         options = options or CompletionOptions()
+        start = time.perf_counter()
 
         try:
-            messages = []
-            if options.system_prompt:
-                messages.append({"role": "system", "content": options.system_prompt})
-            messages.append({"role": "user", "content": prompt})
+            kwargs = self._build_kwargs(prompt, options)
+            response = await self.retrier.call(
+                lambda: self.client.chat.completions.create(**kwargs), self.name
+            )
+            if response.usage:
+                record_usage(self.token_family, prompt, options, response.usage.prompt_tokens)
+            choice = response.choices[0]
+            text = choice.message.content or ""
+            report_completion(self._completion(
+                prompt, options, text, response.usage, choice.finish_reason, start
+            ))
+            return text
 
-            # Grok-4 is a reasoning model, similar parameters to GPT-5
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-                "max_completion_tokens": options.max_tokens,
-            }
+        except Exception as e:
+            return f"[Error] Grok failed to generate response: {e}"
 
-            # Reasoning models may not support temperature
-            if options.temperature is not None and not self.model.startswith("grok-4"):
-                kwargs["temperature"] = options.temperature
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion using Grok's API."""
+        options = options or CompletionOptions()
+        start = time.perf_counter()
 
-            response = await self.client.chat.completions.create(**kwargs)
-            return response.choices[0].message.content or ""
+        try:
+            kwargs = self._build_kwargs(prompt, options)
+            response = await self.retrier.call(
+                lambda: self.client.chat.completions.create(**kwargs, stream=True), self.name
+            )
+            usage = None
+            finish_reason = None
+            parts: list[str] = []
+            async for chunk in response:
+                if chunk.choices:
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                usage = getattr(chunk, "usage", None) or usage
+            if usage:
+                record_usage(self.token_family, prompt, options, usage.prompt_tokens)
+            report_completion(self._completion(
+                prompt, options, "".join(parts), usage, finish_reason, start
+            ))
 
         except Exception as e:
-            return f"[Error] Grok failed to generate response: {e}"
+            yield f"[Error] Grok failed to generate response: {e}"
@@ -0,0 +1,178 @@
+"""Hedged requests for tail-latency control.
+
+When a call runs longer than a configured percentile of the provider's recent
+latencies, a duplicate request goes to the same provider (or a configured
+backup model). The first good completion wins and the other is cancelled.
+For streams the race is on time-to-first-chunk.
+
+Hedged providers wrap their rate-limited providers, so a duplicate request
+waits for and counts against the same RPM, TPM and concurrency limits as the
+request it duplicates.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import asdict, dataclass
+
+from ..core.types import HedgeConfig
+from .base import CompletionOptions, Prompt, Provider, ProviderWrapper
+
+# Recent latencies kept per provider for the percentile threshold
+LATENCY_WINDOW = 100
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank percentile of the window, or None when empty."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+@dataclass
+class HedgeStats:
+    """Counters for tuning the hedge threshold."""
+
+    calls: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedges / self.calls if self.calls else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.hedge_wins / self.hedges if self.hedges else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "hedge_rate": self.hedge_rate, "win_rate": self.win_rate}
+
+
+def _is_error(result: str | None) -> bool:
+    return result is None or result.startswith("[Error]")
+
+
+async def _cancel(tasks: set[asyncio.Task]) -> None:
+    """Cancel tasks and wait for them to unwind."""
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _race(tasks: set[asyncio.Task]) -> asyncio.Task:
+    """Return the first task to finish with a usable result.
+
+    Failed tasks (exceptions or "[Error]" results) only win if every task fails.
+    """
+    pending = set(tasks)
+    last_done: asyncio.Task | None = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            last_done = task
+            if task.exception() is None and not _is_error(task.result()):
+                return task
+    return last_done
+
+
+class HedgedProvider(ProviderWrapper):
+    """Wraps a provider so slow calls are duplicated and the first completion wins."""
+
+    def __init__(self, inner: Provider, config: HedgeConfig, backup: Provider | None = None):
+        super().__init__(inner)
+        self.config = config
+        self.backup = backup or inner
+        self.latency = LatencyTracker()
+        self.ttft = LatencyTracker()
+        self.hedge_stats = HedgeStats()
+
+    def _threshold(self, tracker: LatencyTracker) -> float:
+        """Seconds to wait before hedging, from the configured latency percentile."""
+        if len(tracker.samples) < self.config.min_samples:
+            return self.config.initial_delay
+        return tracker.percentile(self.config.percentile)
+
+    async def _hedged(
+        self,
+        start_call: Callable[[Provider], Awaitable],
+        tracker: LatencyTracker,
+    ) -> tuple[asyncio.Task, asyncio.Task | None]:
+        """Run a primary call, hedging it if it passes the threshold.
+
+        Returns the winning task and the hedge task (None if no hedge was sent).
+        """
+        self.hedge_stats.calls += 1
+        start = time.monotonic()
+        primary = asyncio.ensure_future(start_call(self.inner))
+        hedge: asyncio.Task | None = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._threshold(tracker))
+            if not done:
+                self.hedge_stats.hedges += 1
+                hedge = asyncio.ensure_future(start_call(self.backup))
+            winner = await _race({primary, hedge} - {None})
+        except BaseException:
+            await _cancel({primary, hedge} - {None})
+            raise
+
+        # A cancelled primary's latency is at least the time observed so far
+        tracker.record(time.monotonic() - start)
+        if winner is hedge:
+            self.hedge_stats.hedge_wins += 1
+        await _cancel({primary, hedge} - {None, winner})
+        return winner, hedge
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
+        winner, _ = await self._hedged(
+            lambda provider: provider.generate(prompt, options), self.latency
+        )
+        return winner.result()
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        attempts: list[AsyncIterator[str]] = []
+
+        def first_chunk(provider: Provider) -> Awaitable[str | None]:
+            attempt = provider.stream(prompt, options)
+            attempts.append(attempt)
+            return anext(attempt, None)
+
+        winner, hedge = await self._hedged(first_chunk, self.ttft)
+        winner_stream = attempts[1] if winner is hedge else attempts[0]
+
+        # Close the losing stream
+        for attempt in attempts:
+            if attempt is not winner_stream:
+                await attempt.aclose()
+
+        first = winner.result()
+        if first is None:
+            return
+        yield first
+        async for chunk in winner_stream:
+            yield chunk
+
+
+def collect_hedge_stats(providers: list[Provider]) -> dict[str, dict]:
+    """Gather hedge counters from hedged providers, keyed by provider name."""
+    return {
+        p.name: p.hedge_stats.to_dict()
+        for p in providers
+        if getattr(p, "hedge_stats", None) is not None
+    }
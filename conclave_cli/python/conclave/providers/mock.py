@@ -0,0 +1,129 @@
+"""Simulated provider for offline benchmarking.
+
+Mock providers never touch the network. Each call waits for a time-to-first-
+token drawn from the configured latency distribution, then streams synthetic
+markdown at a fixed token rate, so flows, chat and the surrounding retry,
+hedging and rate-limit wrappers can be exercised and timed without API keys.
+
+Injected failures raise an error carrying an HTTP status, so they go through
+the retrier exactly like a real transient (or fatal) API error.
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections.abc import AsyncIterator
+
+from ..core.tokens import count_prompt_tokens
+from ..core.types import ProviderConfig
+from .base import Completion, CompletionOptions, Prompt, Provider, report_completion
+
+WORDS = (
+    "the plan should address latency throughput cost and reliability before "
+    "adding features each component owns its state and failures are retried "
+    "with backoff while results are cached where inputs repeat consider the "
+    "tradeoffs between consistency and availability measure first then optimize "
+    "the critical path review peer proposals and keep the strongest ideas"
+).split()
+
+# Words per paragraph and paragraphs per section of the synthetic reply
+PARAGRAPH_WORDS = 40
+SECTION_PARAGRAPHS = 3
+
+
+class MockProviderError(Exception):
+    """Injected failure, classified by the retrier through its status code."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Mock provider injected a {status_code} error")
+        self.status_code = status_code
+
+
+class MockProvider(Provider):
+    """Provider that simulates latency, streaming and errors without API calls."""
+
+    def __init__(self, config: ProviderConfig, name: str = "Mock"):
+        super().__init__(name)
+        self.model = config.model or "mock"
+        self.settings = config.mock
+        self.rng = random.Random(config.mock.seed)
+
+    def sample_latency(self) -> float:
+        """Draw a time-to-first-token (seconds) from the configured distribution."""
+        settings = self.settings
+        if settings.latency == "lognormal":
+            ms = self.rng.lognormvariate(math.log(settings.latency_ms), settings.latency_sigma)
+        elif settings.latency == "pareto":
+            # Scale so the median matches latency_ms; the tail follows pareto_alpha
+            scale = settings.latency_ms / 2 ** (1 / settings.pareto_alpha)
+            ms = scale * self.rng.paretovariate(settings.pareto_alpha)
+        else:
+            ms = settings.latency_ms
+        return min(ms, settings.max_latency_ms) / 1000
+
+    def _chunks(self, count: int) -> list[str]:
+        """Synthetic markdown in ``count`` chunks of roughly one token each."""
+        section_words = PARAGRAPH_WORDS * SECTION_PARAGRAPHS
+        chunks = []
+        for i in range(count):
+            word = self.rng.choice(WORDS)
+            if i % section_words == 0:
+                prefix = "\n\n" if i else ""
+                word = f"{prefix}## Section {i // section_words + 1}\n\n{word}"
+            elif i % PARAGRAPH_WORDS == 0:
+                word = f"\n\n{word}"
+            chunks.append(word + " ")
+        return chunks
+
+    async def _first_token(self) -> None:
+        """Wait out the time-to-first-token, failing if an error is injected."""
+        await asyncio.sleep(self.sample_latency())
+        if self.rng.random() < self.settings.error_rate:
+            raise MockProviderError(self.settings.error_status)
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
+        """Generate a synthetic completion after the simulated latency."""
+        parts: list[str] = []
+        async for chunk in self.stream(prompt, options):
+            if chunk.startswith("[Error]"):
+                return chunk
+            parts.append(chunk)
+        return "".join(parts)
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream synthetic text at the configured token rate."""
+        options = options or CompletionOptions()
+        began = time.perf_counter()
+
+        try:
+            await self.retrier.call(self._first_token, self.name)
+        except Exception as e:
+            yield f"[Error] {self.name} failed to generate response: {e}"
+            return
+
+        rate = self.settings.tokens_per_second
+        chunks = self._chunks(min(self.settings.response_tokens, options.max_tokens))
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i, chunk in enumerate(chunks):
+            # Pace against the clock rather than sleeping per token, so timer
+            # overhead doesn't slow high token rates
+            if rate > 0:
+                delay = start + i / rate - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield chunk
+
+        truncated = len(chunks) < self.settings.response_tokens
+        report_completion(Completion(
+            text="".join(chunks),
+            provider=self.name,
+            model=self.model,
+            input_tokens=count_prompt_tokens(prompt, options),
+            output_tokens=len(chunks),
+            finish_reason="max_tokens" if truncated else "end_turn",
+            latency_s=time.perf_counter() - began,
+        ))
@@ -1,54 +1,223 @@
 """OpenAI provider implementation."""
 
+import json
 import os
+import time
+from collections.abc import AsyncIterator
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from openai.types import CompletionUsage
 
+from ..core.tokens import count_prompt_tokens, count_tokens, record_usage
 from ..core.types import ProviderConfig
-from .base import CompletionOptions, Provider
+from .base import (
+    BatchItem,
+    Completion,
+    CompletionOptions,
+    Prompt,
+    Provider,
+    render_prompt,
+    report_completion,
+)
+from .transport import OPENAI_BASE_URL, get_http_client
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch statuses that mean results aren't available yet
+BATCH_ACTIVE_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
 
 
 class OpenAIProvider(Provider):
     """Provider for OpenAI's API."""
 
+    token_family = "openai"
+
     def __init__(self, config: ProviderConfig, name: str = "OpenAI"):
         super().__init__(name)
         self.model = config.model or "gpt-5.2"
+        base_url = config.base_url or OPENAI_BASE_URL
         self.client = AsyncOpenAI(
             api_key=config.api_key or os.environ.get("OPENAI_API_KEY"),
-            base_url=config.base_url,
+            base_url=base_url,
+            http_client=get_http_client(base_url, config, DefaultAsyncHttpxClient),
+            # Retries are handled by self.retrier
+            max_retries=0,
+        )
+        # OpenAI-compatible servers may reject stream_options, so only ask OpenAI itself
+        self.stream_usage = base_url == OPENAI_BASE_URL
+
+    def _build_kwargs(self, prompt: Prompt, options: CompletionOptions) -> dict:
+        """Build request parameters for the Chat Completions API."""
+        messages = []
+        if options.system_prompt:
+            messages.append({"role": "system", "content": options.system_prompt})
+        messages.append({"role": "user", "content": render_prompt(prompt)})
+
+        # GPT-5.x and o1/o3 models use different parameters
+        is_new_model = any(
+            self.model.startswith(prefix) for prefix in ("gpt-5", "o1", "o3")
+        )
+
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+        }
+
+        if is_new_model:
+            kwargs["max_completion_tokens"] = options.max_tokens
+            # New models don't support temperature
+        else:
+            kwargs["max_tokens"] = options.max_tokens
+            if options.temperature is not None:
+                kwargs["temperature"] = options.temperature
+
+        return kwargs
+
+    def _completion(
+        self,
+        prompt: Prompt,
+        options: CompletionOptions,
+        text: str,
+        usage,
+        finish_reason: str | None,
+        start: float,
+        batch: bool = False,
+    ) -> Completion:
+        """Completion from a Chat Completions usage block, estimated when there is none."""
+        completion = Completion(
+            text=text,
+            provider=self.name,
+            model=self.model,
+            finish_reason=finish_reason,
+            latency_s=time.perf_counter() - start,
+            batch=batch,
         )
+        if usage is None:
+            completion.input_tokens = count_prompt_tokens(prompt, options, self.token_family)
+            completion.output_tokens = count_tokens(text, self.token_family)
+            completion.estimated = True
+            return completion
+        # prompt_tokens includes cached tokens, which are billed at a lower rate
+        cached = getattr(usage.prompt_tokens_details, "cached_tokens", None) or 0
+        completion.input_tokens = usage.prompt_tokens - cached
+        completion.cache_read_tokens = cached
+        completion.output_tokens = usage.completion_tokens
+        return completion
 
-    async def generate(self, prompt: str, options: CompletionOptions | None = None) -> str:
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
         """Generate a completion using OpenAI's API."""
         options = options or CompletionOptions()
+        start = time.perf_counter()
 
         try:
-            messages = []
-            if options.system_prompt:
-                messages.append({"role": "system", "content": options.system_prompt})
-            messages.append({"role": "user", "content": prompt})
-
-            # GPT-5.x and o1/o3 models use different parameters
-            is_new_model = any(
-                self.model.startswith(prefix) for prefix in ("gpt-5", "o1", "o3")
+            kwargs = self._build_kwargs(prompt, options)
+            response = await self.retrier.call(
+                lambda: self.client.chat.completions.create(**kwargs), self.name
             )
+            if response.usage:
+                record_usage(self.token_family, prompt, options, response.usage.prompt_tokens)
+            choice = response.choices[0]
+            text = choice.message.content or ""
+            report_completion(self._completion(
+                prompt, options, text, response.usage, choice.finish_reason, start
+            ))
+            return text
 
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-            }
+        except Exception as e:
+            return f"[Error] {self.name} failed to generate response: {e}"
 
-            if is_new_model:
-                kwargs["max_completion_tokens"] = options.max_tokens
-                # New models don't support temperature
-            else:
-                kwargs["max_tokens"] = options.max_tokens
-                if options.temperature is not None:
-                    kwargs["temperature"] = options.temperature
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        """Stream a completion using OpenAI's API."""
+        options = options or CompletionOptions()
+        start = time.perf_counter()
 
-            response = await self.client.chat.completions.create(**kwargs)
-            return response.choices[0].message.content or ""
+        try:
+            kwargs = self._build_kwargs(prompt, options)
+            if self.stream_usage:
+                # Usage arrives in a final chunk with no choices
+                kwargs["stream_options"] = {"include_usage": True}
+            response = await self.retrier.call(
+                lambda: self.client.chat.completions.create(**kwargs, stream=True), self.name
+            )
+            usage = None
+            finish_reason = None
+            parts: list[str] = []
+            async for chunk in response:
+                if chunk.choices:
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                    record_usage(self.token_family, prompt, options, usage.prompt_tokens)
+            report_completion(self._completion(
+                prompt, options, "".join(parts), usage, finish_reason, start
+            ))
 
         except Exception as e:
-            return f"[Error] {self.name} failed to generate response: {e}"
+            yield f"[Error] {self.name} failed to generate response: {e}"
+
+    async def submit_batch(self, requests: list[BatchItem]) -> str:
+        """Upload requests as a JSONL file to the Batch API and return the batch ID."""
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": self._build_kwargs(prompt, options),
+            })
+            for custom_id, prompt, options in requests
+        ]
+        input_file = await self.retrier.call(
+            lambda: self.client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+            ),
+            self.name,
+        )
+        batch = await self.retrier.call(
+            lambda: self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+            ),
+            self.name,
+        )
+        return batch.id
+
+    async def poll_batch(self, batch_id: str) -> dict[str, str] | None:
+        """Return results by custom ID once the batch has finished, else None."""
+        polled = time.perf_counter()
+        batch = await self.retrier.call(lambda: self.client.batches.retrieve(batch_id), self.name)
+        if batch.status in BATCH_ACTIVE_STATUSES:
+            return None
+
+        results: dict[str, str] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.retrier.call(lambda: self.client.files.content(file_id), self.name)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if response.get("status_code") == 200:
+                    choice = response["body"]["choices"][0]
+                    text = choice["message"].get("content") or ""
+                    results[entry["custom_id"]] = text
+                    usage = response["body"].get("usage")
+                    # Batch requests have no meaningful latency of their own
+                    report_completion(self._completion(
+                        "", CompletionOptions(), text,
+                        CompletionUsage.model_validate(usage) if usage else None,
+                        choice.get("finish_reason"), polled, batch=True,
+                    ))
+                else:
+                    detail = entry.get("error") or response.get("body")
+                    results[entry["custom_id"]] = (
+                        f"[Error] {self.name} batch request failed: {detail}"
+                    )
+        return results
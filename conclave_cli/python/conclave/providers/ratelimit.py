@@ -0,0 +1,145 @@
+"""Per-provider request, token and concurrency limiting.
+
+Limiters are process-wide and keyed by provider name, so every engine and the
+chat room share one budget per provider. Calls queue locally until the budget
+allows them, rather than failing remotely with a 429. With max_concurrency,
+a call also holds one of the provider's slots until its reply has streamed,
+so runs over many inputs (``conclave run-batch``) keep each provider at its
+cap however many files are in flight. Retries the provider makes inside a
+call wait for request and token budget again, but keep the call's slot.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+
+from ..core.tokens import count_prompt_tokens, provider_family
+from .base import CompletionOptions, Prompt, Provider, ProviderWrapper
+from .retry import wait_before_retries
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until `amount` is available, then take it. Waiters are served in order."""
+        # A single request larger than the whole bucket can only ever wait for a full one
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute, tokens-per-minute and concurrency limits for one provider."""
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        max_concurrency: int | None = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait for one request slot and `tokens` of token budget."""
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens:
+            await self.tokens.acquire(tokens)
+
+    @contextlib.asynccontextmanager
+    async def call(self, tokens: int) -> AsyncIterator[None]:
+        """Hold a concurrency slot for the whole call, once the rate limits allow it."""
+        self.waiting += 1
+        try:
+            if self.slots:
+                await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            await self.acquire(tokens)
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.slots:
+                self.slots.release()
+
+
+_limiters: dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(
+    key: str,
+    requests_per_minute: int | None = None,
+    tokens_per_minute: int | None = None,
+    max_concurrency: int | None = None,
+) -> RateLimiter:
+    """Get the process-wide limiter for a provider, creating it on first use."""
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute, max_concurrency)
+        _limiters[key] = limiter
+    return limiter
+
+
+def rate_limiters() -> dict[str, RateLimiter]:
+    """Every limiter created so far, by provider name."""
+    return dict(_limiters)
+
+
+class RateLimitedProvider(ProviderWrapper):
+    """Wraps a provider so every call first waits on its rate limiter."""
+
+    def __init__(self, inner: Provider, limiter: RateLimiter):
+        super().__init__(inner)
+        self.limiter = limiter
+
+    def _estimate(self, prompt: Prompt, options: CompletionOptions | None) -> int:
+        """Estimate the input tokens of a request before sending it."""
+        return max(1, count_prompt_tokens(prompt, options, provider_family(self.inner)))
+
+    async def generate(self, prompt: Prompt, options: CompletionOptions | None = None) -> str:
+        tokens = self._estimate(prompt, options)
+        async with self.limiter.call(tokens):
+            with wait_before_retries(lambda: self.limiter.acquire(tokens)):
+                return await self.inner.generate(prompt, options)
+
+    async def stream(
+        self, prompt: Prompt, options: CompletionOptions | None = None
+    ) -> AsyncIterator[str]:
+        tokens = self._estimate(prompt, options)
+        async with self.limiter.call(tokens):
+            chunks = self.inner.stream(prompt, options)
+            # Providers retry before their first chunk; the hook isn't held across
+            # yields, where the consumer's own calls run in this context
+            with wait_before_retries(lambda: self.limiter.acquire(tokens)):
+                first = await anext(chunks, None)
+            if first is None:
+                return
+            yield first
+            async for chunk in chunks:
+                yield chunk
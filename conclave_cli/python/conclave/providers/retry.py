@@ -0,0 +1,152 @@
+"""Retry with jittered exponential backoff for transient provider errors.
+
+Errors are classified by HTTP status (or connection failure) into retryable
+and fatal. Retryable errors back off with full jitter, or for exactly as long
+as the server's Retry-After header asks. All providers created for a run
+share one RetryBudget, so retries can't stretch a run's wall-clock time
+without bound. A retry is a request like any other, so inside a rate-limited
+call (see ``wait_before_retries``) it waits on the provider's limiter again.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import random
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+from ..core.types import RetryConfig
+from ..utils.console import provider_console
+
+T = TypeVar("T")
+
+_before_retry: contextvars.ContextVar[Callable[[], Awaitable[None]] | None] = (
+    contextvars.ContextVar("conclave_before_retry", default=None)
+)
+
+# Statuses worth retrying: timeouts, conflicts, rate limits, server errors, overload
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Exception class names (across SDKs and HTTP clients) that mean the request never completed
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "ReadError",
+    "RemoteProtocolError",
+    "TimeoutError",
+}
+
+
+def get_status_code(exc: BaseException) -> int | None:
+    """Extract the HTTP status from an SDK error, if it carries one."""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Classify an error as transient (retry) or fatal (give up)."""
+    status = get_status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def get_retry_after(exc: BaseException) -> float | None:
+    """Read the server's requested delay (seconds) from Retry-After headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(retry_after)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def wait_before_retries(wait: Callable[[], Awaitable[None]]) -> Iterator[None]:
+    """Make every retry inside the block await ``wait()`` before it is sent."""
+    token = _before_retry.set(wait)
+    try:
+        yield
+    finally:
+        _before_retry.reset(token)
+
+
+class RetryBudget:
+    """Total backoff time that may be spent on retries during one run."""
+
+    def __init__(self, seconds: float):
+        self.remaining = seconds
+
+    def try_spend(self, seconds: float) -> bool:
+        """Reserve `seconds` of backoff, or return False if the budget can't cover it."""
+        if seconds > self.remaining:
+            return False
+        self.remaining -= seconds
+        return True
+
+
+class Retrier:
+    """Applies a retry policy and a shared budget to provider calls."""
+
+    def __init__(self, policy: RetryConfig | None = None, budget: RetryBudget | None = None):
+        self.policy = policy or RetryConfig()
+        self.budget = budget or RetryBudget(self.policy.budget_seconds)
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        """Delay before the next attempt: Retry-After if given, else full jitter."""
+        retry_after = get_retry_after(exc)
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.policy.max_delay, self.policy.base_delay * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    async def call(self, fn: Callable[[], Awaitable[T]], label: str = "Provider") -> T:
+        """Await `fn()`, retrying transient failures per the policy."""
+        attempt = 0
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.policy.max_attempts or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt - 1, e)
+                if not self.budget.try_spend(delay):
+                    raise
+                status = get_status_code(e)
+                reason = f"HTTP {status}" if status else type(e).__name__
+                provider_console().print(
+                    f"[dim]{label}: {reason}, retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.policy.max_attempts})[/dim]"
+                )
+                await asyncio.sleep(delay)
+                wait = _before_retry.get()
+                if wait is not None:
+                    await wait()
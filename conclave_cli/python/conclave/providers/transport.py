@@ -0,0 +1,145 @@
+"""Process-wide HTTP transport registry shared by API providers.
+
+Every SDK client normally owns its own connection pool, so each provider pays
+its own TLS handshakes on the first round. Providers instead draw an
+``httpx.AsyncClient`` from this registry, keyed by origin and pool limits, and
+engines warm the pooled connections while the input file is read and the
+first prompts are assembled.
+"""
+
+import asyncio
+import contextlib
+import importlib
+import importlib.util
+from types import ModuleType
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..core.types import ProviderConfig
+
+# Default API origins for providers that don't set base_url
+ANTHROPIC_BASE_URL = "https://api.anthropic.com"
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+
+# Upper bound on a single warm-up request; warming must never stall a run
+WARM_TIMEOUT = 5.0
+
+# Read and connect timeouts (seconds) for pooled clients - generations stream for minutes
+REQUEST_TIMEOUT = 600.0
+CONNECT_TIMEOUT = 10.0
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_clients: dict[tuple, httpx.AsyncClient] = {}
+_warmed: set[tuple] = set()
+
+
+def _origin(base_url: str) -> str:
+    """Reduce a base URL to its scheme://host[:port] origin."""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _http_package(client_cls: type) -> ModuleType:
+    """Find the httpx-compatible package a client class is built on.
+
+    SDKs ship their own ``DefaultAsyncHttpxClient`` subclasses, and newer
+    releases build on a successor package, so limits and timeouts must come
+    from the same package as the client.
+    """
+    for cls in client_cls.__mro__:
+        if cls.__name__ == "AsyncClient":
+            return importlib.import_module(cls.__module__.split(".")[0])
+    return httpx
+
+
+def _pool_key(base_url: str, config: ProviderConfig, client_cls: type) -> tuple:
+    """Registry key: one pool per origin, client class and limit set."""
+    return (
+        _origin(base_url),
+        client_cls,
+        config.max_connections,
+        config.max_keepalive_connections,
+        config.keepalive_expiry,
+        config.http2 and HTTP2_AVAILABLE,
+    )
+
+
+def get_http_client(
+    base_url: str,
+    config: ProviderConfig,
+    client_cls: type = httpx.AsyncClient,
+) -> httpx.AsyncClient:
+    """Get the shared async HTTP client for an API origin, creating it on first use.
+
+    Args:
+        base_url: API base URL; pools are shared per origin.
+        config: Provider config carrying the pool limits.
+        client_cls: Client class the SDK expects (e.g. its DefaultAsyncHttpxClient).
+    """
+    key = _pool_key(base_url, config, client_cls)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        http = _http_package(client_cls)
+        client = client_cls(
+            http2=config.http2 and HTTP2_AVAILABLE,
+            limits=http.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=http.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+            follow_redirects=True,
+        )
+        _clients[key] = client
+    return client
+
+
+async def _warm(key: tuple, client: httpx.AsyncClient) -> None:
+    """Open a connection to an origin so later requests reuse it."""
+    try:
+        # Any response (even a 404) leaves a live keep-alive connection in the pool
+        await client.head(key[0], timeout=WARM_TIMEOUT)
+        _warmed.add(key)
+    except Exception:
+        # Warming is best effort - the real request will connect on its own
+        pass
+
+
+async def warm_connections() -> None:
+    """Warm every registered pool that hasn't been warmed yet."""
+    pending = [
+        _warm(key, client)
+        for key, client in list(_clients.items())
+        if key not in _warmed and not client.is_closed
+    ]
+    if pending:
+        await asyncio.gather(*pending)
+
+
+def start_warming() -> asyncio.Task:
+    """Start warming pools in the background of the running event loop.
+
+    Keep the task and pass it to stop_warming() when the run ends.
+    """
+    return asyncio.create_task(warm_connections())
+
+
+async def stop_warming(task: asyncio.Task | None) -> None:
+    """Cancel a warm-up that is still running and wait for it to end."""
+    if task is None:
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+async def close_http_clients() -> None:
+    """Close all pooled clients (e.g. before the event loop shuts down)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    _warmed.clear()
+    await asyncio.gather(*(c.aclose() for c in clients if not c.is_closed))
@@ -0,0 +1,34 @@
+"""Where messages from inside provider calls are printed.
+
+Retries, batch progress and similar notes come from deep inside provider
+wrappers, which don't know which run they are serving. A run wraps its work
+in ``report_to(console)`` so those notes land in its own console (a run's log
+file under ``conclave run-batch``) rather than over the terminal's progress
+display. Tasks started inside the block inherit it.
+"""
+
+import contextlib
+import contextvars
+from collections.abc import Iterator
+
+from rich.console import Console
+
+_terminal = Console()
+_console: contextvars.ContextVar[Console | None] = contextvars.ContextVar(
+    "conclave_console", default=None
+)
+
+
+@contextlib.contextmanager
+def report_to(console: Console) -> Iterator[None]:
+    """Send provider messages from calls made inside the block to ``console``."""
+    token = _console.set(console)
+    try:
+        yield
+    finally:
+        _console.reset(token)
+
+
+def provider_console() -> Console:
+    """The open report_to() block's console, else the terminal."""
+    return _console.get() or _terminal
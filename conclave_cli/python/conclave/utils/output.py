@@ -1,9 +1,14 @@
 """Output utilities for saving flow results."""
 
+import json
+import time
 import uuid
+from collections.abc import AsyncIterable
 from dataclasses import dataclass
 from pathlib import Path
 
+from ..core.tracing import span
+
 
 @dataclass
 class RunContext:
@@ -13,13 +18,27 @@ class RunContext:
     run_dir: Path
 
 
-def create_run_context() -> RunContext:
-    """Create a new run context with unique ID and output directory."""
-    run_id = str(uuid.uuid4()).split("-")[0]
+def create_run_context(run_id: str | None = None) -> RunContext:
+    """Create a run context with a unique ID and output directory.
+
+    Pass an existing run_id to resume that run in its own directory.
+    """
+    run_id = run_id or str(uuid.uuid4()).split("-")[0]
     run_dir = Path.cwd() / ".conclave" / "runs" / run_id
     return RunContext(run_id=run_id, run_dir=run_dir)
 
 
+def get_output_path(
+    run_dir: Path,
+    provider: str,
+    round: int,
+    suffix: str | None = None,
+) -> Path:
+    """Get the path of a provider's output file for a round."""
+    suffix_part = f".{suffix}" if suffix else ""
+    return run_dir / f"{provider.lower()}{suffix_part}.v{round}.md"
+
+
 def save_output(
     run_dir: Path,
     provider: str,
@@ -28,11 +47,86 @@ def save_output(
     suffix: str | None = None,
 ) -> None:
     """Save output content to a file in the run directory."""
+    path = get_output_path(run_dir, provider, round, suffix)
+    with span("file.write", path=path.name, bytes=len(content.encode())):
+        run_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+async def stream_output(
+    run_dir: Path,
+    provider: str,
+    round: int,
+    chunks: AsyncIterable[str],
+    suffix: str | None = None,
+) -> str:
+    """
+    Write streamed chunks to a file in the run directory as they arrive.
+
+    Each chunk is flushed immediately so partial output survives a crash.
+    Returns the full content once the stream is exhausted.
+
+    A stream that ends in an ``[Error]`` chunk failed: its partial output is
+    moved to an ``error`` file next to the round file, with the error on top,
+    and the error is returned instead of the output. A stream cut off by an
+    exception (including cancellation) is moved aside the same way before the
+    exception propagates, so a round file is only ever a finished output.
+    """
     run_dir.mkdir(parents=True, exist_ok=True)
 
-    suffix_part = f".{suffix}" if suffix else ""
-    filename = f"{provider.lower()}{suffix_part}.v{round}.md"
-    (run_dir / filename).write_text(content)
+    parts: list[str] = []
+    error = None
+    path = get_output_path(run_dir, provider, round, suffix)
+    # The span covers the whole stream; write_ms is the time actually spent writing
+    with span("file.write", path=path.name, streamed=True) as write:
+        writing = 0.0
+        try:
+            with open(path, "w") as f:
+                async for chunk in chunks:
+                    if chunk.startswith("[Error]"):
+                        error = chunk
+                        break
+                    start = time.perf_counter()
+                    f.write(chunk)
+                    f.flush()
+                    writing += time.perf_counter() - start
+                    parts.append(chunk)
+        except BaseException as e:
+            reason = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            _move_aside(run_dir, provider, round, suffix, f"[Interrupted] {reason}", parts)
+            raise
+        content = "".join(parts)
+        write.set(bytes=len(content.encode()), chunks=len(parts), write_ms=writing * 1000)
+
+    if error is None:
+        return content
+
+    _move_aside(run_dir, provider, round, suffix, error, parts)
+    return error
+
+
+def _move_aside(
+    run_dir: Path,
+    provider: str,
+    round: int,
+    suffix: str | None,
+    error: str,
+    parts: list[str],
+) -> None:
+    """Replace a round file that didn't finish with an error file holding its partial output."""
+    error_suffix = f"{suffix}.error" if suffix else "error"
+    content = "".join(parts)
+    partial = f"\n\n[PARTIAL OUTPUT]\n{content}" if content else ""
+    save_output(run_dir, provider, round, error + partial, suffix=error_suffix)
+    get_output_path(run_dir, provider, round, suffix).unlink(missing_ok=True)
+
+
+def save_json(run_dir: Path, filename: str, data: dict) -> None:
+    """Save a JSON report to the run directory."""
+    text = json.dumps(data, indent=2)
+    with span("file.write", path=filename, bytes=len(text.encode())):
+        run_dir.mkdir(parents=True, exist_ok=True)
+        (run_dir / filename).write_text(text)
 
 
 def read_input_file(input_file: str | Path) -> str:
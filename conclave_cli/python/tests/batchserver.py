@@ -0,0 +1,194 @@
+"""Local stand-in for the Anthropic Message Batches and OpenAI Batch APIs.
+
+Serves just enough of both APIs for the providers' submit_batch() and
+poll_batch(): batches report as in progress on their first status check and
+as ended on the next, and every request succeeds with a reply naming its
+custom ID.
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BatchServer:
+    """A batch API server on a free local port, running in a background thread."""
+
+    def __init__(self):
+        self.anthropic: dict[str, list[dict]] = {}  # batch ID -> requests
+        self.openai: dict[str, dict] = {}  # batch ID -> input and output file IDs
+        self.files: dict[str, bytes] = {}
+        self.polls: dict[str, int] = {}
+        self.created = 0  # Batches and files created
+        self.fail_submit = False
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self) -> "BatchServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def new_id(self, prefix: str) -> str:
+        self.created += 1
+        return f"{prefix}_{self.created}"
+
+    def ended(self, batch_id: str) -> bool:
+        """Count a status check; a batch ends on its second one."""
+        self.polls[batch_id] = self.polls.get(batch_id, 0) + 1
+        return self.polls[batch_id] >= 2
+
+    def reply(self, custom_id: str) -> str:
+        return f"batch reply to {custom_id}"
+
+    def anthropic_batch(self, batch_id: str, poll: bool = True) -> dict:
+        ended = poll and self.ended(batch_id)
+        results_url = f"{self.base_url}/v1/messages/batches/{batch_id}/results"
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0,
+                "succeeded": len(self.anthropic[batch_id]),
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2025-01-01T00:00:00Z",
+            "expires_at": "2025-01-02T00:00:00Z",
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "ended_at": None,
+            "results_url": results_url if ended else None,
+        }
+
+    def anthropic_results(self, batch_id: str) -> bytes:
+        lines = []
+        for request in self.anthropic[batch_id]:
+            message = {
+                "id": "msg",
+                "type": "message",
+                "role": "assistant",
+                "model": request["params"]["model"],
+                "content": [{"type": "text", "text": self.reply(request["custom_id"])}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 10, "output_tokens": 5},
+            }
+            result = {"type": "succeeded", "message": message}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return "\n".join(lines).encode()
+
+    def openai_batch(self, batch_id: str, poll: bool = True) -> dict:
+        batch = self.openai[batch_id]
+        ended = poll and self.ended(batch_id)
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input"],
+            "completion_window": "24h",
+            "status": "completed" if ended else "in_progress",
+            "output_file_id": batch["output"] if ended else None,
+            "error_file_id": None,
+            "created_at": 0,
+        }
+
+    def create_openai_batch(self, input_file_id: str) -> str:
+        lines = []
+        for line in self.files[input_file_id].decode().splitlines():
+            request = json.loads(line)
+            message = {"role": "assistant", "content": self.reply(request["custom_id"])}
+            body = {
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": message,
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }
+            response = {"status_code": 200, "body": body}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "response": response}))
+        output_file_id = self.new_id("file")
+        self.files[output_file_id] = "\n".join(lines).encode()
+        batch_id = self.new_id("batch")
+        self.openai[batch_id] = {"input": input_file_id, "output": output_file_id}
+        return batch_id
+
+
+def _multipart_file(body: bytes) -> bytes:
+    """The content of the file part of a multipart upload."""
+    parts = body.split(b"\r\n\r\n")
+    for i, headers in enumerate(parts[:-1]):
+        if b"filename=" in headers:
+            return parts[i + 1].rsplit(b"\r\n--", 1)[0]
+    return b""
+
+
+def _handler(server: BatchServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def send(self, payload: dict | bytes, content_type: str = "application/json") -> None:
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def fail(self, status: int) -> None:
+            self.send_response(status)
+            self.send_header("content-length", "0")
+            self.end_headers()
+
+        def body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("content-length", 0)))
+
+        def do_POST(self) -> None:
+            if self.path in ("/v1/messages/batches", "/v1/batches") and server.fail_submit:
+                self.fail(500)
+            elif self.path == "/v1/messages/batches":
+                batch_id = server.new_id("msgbatch")
+                server.anthropic[batch_id] = json.loads(self.body())["requests"]
+                self.send(server.anthropic_batch(batch_id, poll=False))
+            elif self.path == "/v1/files":
+                file_id = server.new_id("file")
+                server.files[file_id] = _multipart_file(self.body())
+                self.send({
+                    "id": file_id,
+                    "object": "file",
+                    "bytes": len(server.files[file_id]),
+                    "created_at": 0,
+                    "filename": "batch.jsonl",
+                    "purpose": "batch",
+                    "status": "processed",
+                })
+            elif self.path == "/v1/batches":
+                batch_id = server.create_openai_batch(json.loads(self.body())["input_file_id"])
+                self.send(server.openai_batch(batch_id, poll=False))
+            else:
+                self.fail(404)
+
+        def do_GET(self) -> None:
+            if match := re.fullmatch(r"/v1/messages/batches/([^/]+)/results", self.path):
+                self.send(server.anthropic_results(match[1]), "application/binary")
+            elif match := re.fullmatch(r"/v1/messages/batches/([^/]+)", self.path):
+                self.send(server.anthropic_batch(match[1]))
+            elif match := re.fullmatch(r"/v1/batches/([^/]+)", self.path):
+                self.send(server.openai_batch(match[1]))
+            elif match := re.fullmatch(r"/v1/files/([^/]+)/content", self.path):
+                self.send(server.files[match[1]], "application/octet-stream")
+            else:
+                self.fail(404)
+
+    return Handler
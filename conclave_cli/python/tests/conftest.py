@@ -0,0 +1,78 @@
+"""Shared fixtures. Tests run offline, on mock providers and local stand-in servers."""
+
+import io
+
+import pytest
+from batchserver import BatchServer
+from rich.console import Console
+
+from conclave.core.types import (
+    FlowConfig,
+    FlowPrompts,
+    MockConfig,
+    ProviderConfig,
+    ProviderType,
+    RetryConfig,
+)
+from conclave.providers.mock import MockProvider
+from conclave.providers.retry import Retrier
+
+
+@pytest.fixture(autouse=True)
+def project_dir(tmp_path, monkeypatch):
+    """Run every test from an empty project directory, so .conclave/ lands in it."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def batch_server():
+    server = BatchServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def mock_provider():
+    """Factory for fast, deterministic mock providers; settings override MockConfig."""
+
+    def make(name: str = "Mock", retry: RetryConfig | None = None, **settings) -> MockProvider:
+        mock = MockConfig(
+            **{
+                "latency": "fixed",
+                "latency_ms": 1,
+                "tokens_per_second": 0,
+                "response_tokens": 20,
+                "seed": 1,
+                **settings,
+            }
+        )
+        provider = MockProvider(ProviderConfig(type=ProviderType.MOCK, mock=mock), name)
+        provider.retrier = Retrier(retry or RetryConfig(base_delay=0.001, max_delay=0.01))
+        return provider
+
+    return make
+
+
+@pytest.fixture
+def flow():
+    """Factory for basic flow configs; keyword arguments override FlowConfig fields."""
+
+    def make(**overrides) -> FlowConfig:
+        prompts = FlowPrompts(round_1="Draft a plan.", refinement="Refine the plan.")
+        return FlowConfig(**{"name": "Test", "prompts": prompts, **overrides})
+
+    return make
+
+
+@pytest.fixture
+def progress():
+    """A console that keeps engine progress off the terminal."""
+    return Console(file=io.StringIO(), width=120)
+
+
+@pytest.fixture
+def input_file(project_dir):
+    path = project_dir / "in.md"
+    path.write_text("Plan the launch of a small web service.")
+    return path
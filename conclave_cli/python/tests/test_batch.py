@@ -0,0 +1,110 @@
+"""Batch mode, against the local stand-in batch server."""
+
+import asyncio
+import json
+
+from conclave.core.types import BatchConfig, ProviderConfig, ProviderType, RetryConfig
+from conclave.flows import create_flow_engine
+from conclave.providers.anthropic import AnthropicProvider
+from conclave.providers.base import CompletionOptions, Provider
+from conclave.providers.batch import BatchCheckpoint, BatchRequest, custom_id, run_batch_round
+from conclave.providers.openai import OpenAIProvider
+from conclave.providers.retry import Retrier
+
+BATCH = BatchConfig(enabled=True, poll_interval=0.01)
+
+
+class Echo(Provider):
+    """A provider without a batch API, which replies at once."""
+
+    async def generate(self, prompt, options=None):
+        return f"{self.name} reply"
+
+    async def stream(self, prompt, options=None):
+        yield await self.generate(prompt, options)
+
+
+def api_providers(server):
+    """Anthropic and OpenAI providers pointed at the stand-in server."""
+    anthropic = AnthropicProvider(
+        ProviderConfig(type=ProviderType.ANTHROPIC, api_key="test", base_url=server.base_url)
+    )
+    openai = OpenAIProvider(
+        ProviderConfig(type=ProviderType.OPENAI, api_key="test", base_url=f"{server.base_url}/v1")
+    )
+    for provider in (anthropic, openai):
+        provider.retrier = Retrier(RetryConfig(max_attempts=1))
+    return [anthropic, openai]
+
+
+def batch_requests(providers):
+    return [BatchRequest(p, "Plan the launch.", CompletionOptions()) for p in providers]
+
+
+def run_round(round_num, providers, run_dir):
+    checkpoint = BatchCheckpoint(run_dir)
+    return asyncio.run(run_batch_round(round_num, batch_requests(providers), checkpoint, BATCH))
+
+
+def test_round_uses_batches_and_calls_other_providers_directly(batch_server, project_dir):
+    anthropic, openai = api_providers(batch_server)
+    outputs = run_round(1, [anthropic, openai, Echo("Echo")], project_dir)
+
+    assert outputs["Anthropic"] == batch_server.reply(custom_id(1, anthropic))
+    assert outputs["OpenAI"] == batch_server.reply(custom_id(1, openai))
+    assert outputs["Echo"] == "Echo reply"
+    assert len(batch_server.anthropic) == len(batch_server.openai) == 1
+
+    saved = json.loads((project_dir / "batch.json").read_text())["rounds"]["1"]
+    assert saved == {"batches": {}, "outputs": outputs}
+
+
+def test_finished_round_is_not_submitted_again(batch_server, project_dir):
+    providers = api_providers(batch_server)
+    first = run_round(1, providers, project_dir)
+    created = batch_server.created
+
+    assert run_round(1, providers, project_dir) == first
+    assert batch_server.created == created
+
+
+def test_resumed_round_polls_its_batch_in_flight(batch_server, project_dir):
+    anthropic, _ = api_providers(batch_server)
+    batch_id = asyncio.run(
+        anthropic.submit_batch([(custom_id(1, anthropic), "Plan the launch.", CompletionOptions())])
+    )
+    checkpoint = BatchCheckpoint(project_dir)
+    checkpoint.round(1)["batches"]["Anthropic"] = batch_id
+    checkpoint.save()
+    created = batch_server.created
+
+    outputs = run_round(1, [anthropic], project_dir)
+
+    assert outputs == {"Anthropic": batch_server.reply(custom_id(1, anthropic))}
+    assert batch_server.created == created
+
+
+def test_failed_submission_falls_back_to_a_direct_call(batch_server, project_dir):
+    batch_server.fail_submit = True
+    anthropic, _ = api_providers(batch_server)
+
+    outputs = run_round(1, [anthropic], project_dir)
+
+    # The stand-in has no Messages endpoint, so the direct call fails and isn't checkpointed
+    assert outputs["Anthropic"].startswith("[Error]")
+    assert BatchCheckpoint(project_dir).round(1)["outputs"] == {}
+
+
+def test_basic_flow_runs_through_batches(batch_server, flow, progress, input_file):
+    providers = [*api_providers(batch_server), Echo("Echo")]
+    engine = create_flow_engine("basic", providers, flow(), batch=BATCH, progress=progress)
+
+    asyncio.run(engine.run(str(input_file)))
+
+    assert engine.manifest.status == "complete"
+    assert engine.manifest.data["batch"] is True
+    # One batch per API per round
+    assert len(batch_server.anthropic) == len(batch_server.openai) == 2
+    assert len(engine.manifest.final_outputs()) == len(providers)
+    for name in engine.manifest.final_outputs():
+        assert (engine.run_dir / name).read_text()
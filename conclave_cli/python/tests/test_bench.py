@@ -0,0 +1,52 @@
+"""End-to-end flow benchmark (commands.bench)."""
+
+import asyncio
+
+import pytest
+
+from conclave.commands.bench import compare_to_baseline, critical_path, run_bench
+from conclave.core.types import DEFAULT_CONFIG, MockConfig
+
+
+def case(**metrics):
+    return {"flow": "basic", "input_kb": 1, "providers": 2, **metrics}
+
+
+def test_critical_path_takes_the_slowest_call_of_each_round():
+    calls = [(0.0, 1.0), (0.1, 2.0), (2.5, 3.0), (2.6, 4.1), (5.0, 5.5)]
+
+    assert critical_path(calls) == pytest.approx([1.9, 1.5, 0.5])
+    assert critical_path([]) == []
+
+
+def test_regressions_must_beat_both_tolerance_and_noise():
+    baseline = {"cases": [case(wall_s=1.0, overhead_s=0.01, bytes_written=10_000)]}
+    results = {"cases": [
+        case(wall_s=1.2, overhead_s=0.04, bytes_written=10_500),
+        case(input_kb=64, wall_s=9.0),
+    ]}
+
+    [regression] = compare_to_baseline(results, baseline, tolerance=0.1)
+
+    # Overhead quadrupled but by less than the noise floor; the new case has no baseline
+    assert regression["metric"] == "wall_s"
+    assert regression["change_pct"] == pytest.approx(20.0)
+    assert compare_to_baseline(results, baseline, tolerance=0.5) == []
+
+
+def test_bench_measures_every_case(flow):
+    settings = MockConfig(
+        latency="fixed", latency_ms=1, tokens_per_second=0, response_tokens=20, seed=1
+    )
+    config = DEFAULT_CONFIG.model_copy(update={"flows": {"basic": flow(max_rounds=2)}})
+    finished = []
+
+    results = asyncio.run(
+        run_bench(config, "basic", [1], [2, 3], settings, repeats=2, on_case=finished.append)
+    )
+
+    assert [case.providers for case in finished] == [2, 3]
+    first = results["cases"][0]
+    assert first["repeats"] == 2 and len(first["critical_path_s"]) == 2
+    assert first["wall_s"] >= first["provider_wait_s"]
+    assert first["bytes_written"] > 0 and first["peak_memory_mb"] > 0
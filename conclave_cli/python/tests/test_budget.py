@@ -0,0 +1,105 @@
+"""Run-level token and cost budgets (core.budget)."""
+
+import asyncio
+import json
+
+from conclave.core.budget import BUDGET_FILE, BudgetGuard
+from conclave.core.manifest import MANIFEST_FILE
+from conclave.core.types import BudgetConfig
+from conclave.core.usage import UsageLedger
+from conclave.flows import create_flow_engine
+from conclave.providers.base import Completion, CompletionOptions
+
+PROMPT = "x" * 4000  # 1,000 estimated tokens
+
+
+class Model:
+    def __init__(self, name, model="claude-sonnet-4-5"):
+        self.name = name
+        self.model = model
+
+
+def calls(*providers, max_tokens=1000):
+    return [(p, PROMPT, CompletionOptions(max_tokens=max_tokens)) for p in providers]
+
+
+def guard(usage=None, **config):
+    return BudgetGuard(BudgetConfig(**config), usage or UsageLedger())
+
+
+def test_a_round_within_budget_runs_unchanged():
+    budget = guard(max_tokens=10_000)
+    decision = budget.check(1, calls(Model("A"), Model("B")))
+
+    assert decision.proceed and decision.max_tokens is None
+    assert budget.events == []
+    assert guard().check(1, calls(Model("A"))).proceed
+
+
+def test_a_round_over_the_token_budget_stops_the_run():
+    budget = guard(max_tokens=3000)
+    decision = budget.check(2, calls(Model("A"), Model("B")))
+
+    assert not decision.proceed
+    assert decision.reason.startswith("round 2 needs ~4,000 tokens")
+    assert budget.to_dict()["events"][0]["action"] == "stop"
+
+
+def test_replies_are_expected_as_long_as_the_longest_so_far():
+    usage = UsageLedger()
+    usage.record(1, [Completion(text="", provider="A", model="m", output_tokens=200)])
+    budget = guard(usage, max_tokens=10_000)
+
+    estimate = budget.estimate(calls(Model("A"), Model("B")))
+
+    assert estimate.output_tokens == 200 + 1000
+    assert budget.spent() == (200, 0.0)
+
+
+def test_cost_budget_counts_what_was_spent():
+    usage = UsageLedger()
+    usage.record(1, [
+        Completion(text="", provider="A", model="claude-sonnet-4-5", output_tokens=1_000_000)
+    ])
+    budget = guard(usage, max_cost=20.0)
+
+    # $15 spent; another round costs ~$0.018 per call
+    assert budget.check(2, calls(Model("A"))).proceed
+    budget.config.max_cost = 15.01
+    assert not budget.check(3, calls(Model("A"))).proceed
+
+
+def test_shrinking_caps_this_and_later_rounds():
+    budget = guard(max_tokens=3000, on_exceed="shrink", min_response_tokens=100)
+    round_calls = calls(Model("A"), Model("B"))
+
+    decision = budget.check(2, round_calls)
+
+    # 3,000 tokens less 2,000 of input leaves 500 per reply
+    assert decision.proceed and decision.max_tokens == 500
+    limited = budget.limit(round_calls, decision)
+    assert [options.max_tokens for _, _, options in limited] == [500, 500]
+    assert budget.check(3, calls(Model("A"), max_tokens=2000)).max_tokens == 500
+
+
+def test_shrinking_below_the_minimum_reply_stops_instead():
+    budget = guard(max_tokens=2100, on_exceed="shrink", min_response_tokens=100)
+    decision = budget.check(2, calls(Model("A"), Model("B")))
+
+    assert not decision.proceed
+    assert [event["action"] for event in budget.events] == ["stop"]
+
+
+def test_flow_stops_before_a_round_it_cannot_afford(mock_provider, flow, input_file):
+    providers = [mock_provider("A"), mock_provider("B")]
+    # With no replies yet, each is expected to take the whole max_tokens
+    config = flow(max_rounds=3, budget=BudgetConfig(max_tokens=8192))
+    engine = create_flow_engine("basic", providers, config)
+
+    asyncio.run(engine.run(str(input_file)))
+
+    manifest = json.loads((engine.run_dir / MANIFEST_FILE).read_text())
+    assert manifest["status"] == "stopped"
+    assert not manifest["rounds"].get("1", {}).get("calls")
+    [event] = json.loads((engine.run_dir / BUDGET_FILE).read_text())["events"]
+    assert event["round"] == 1 and event["action"] == "stop"
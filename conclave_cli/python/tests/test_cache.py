@@ -0,0 +1,91 @@
+"""On-disk response cache (providers.cache)."""
+
+import asyncio
+import os
+
+from conclave.providers.base import CompletionOptions, Provider
+from conclave.providers.cache import CachedProvider, ResponseCache
+
+
+class Counting(Provider):
+    """Replies in a few chunks, and counts the calls that reach it."""
+
+    def __init__(self, reply="A plan in three parts."):
+        super().__init__("Counting")
+        self.reply = reply
+        self.calls = 0
+
+    async def generate(self, prompt, options=None):
+        self.calls += 1
+        return f"{self.reply} ({prompt})"
+
+    async def stream(self, prompt, options=None):
+        self.calls += 1
+        for word in f"{self.reply} ({prompt})".split(" "):
+            yield word + " "
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_repeated_requests_are_served_from_cache(project_dir):
+    inner = Counting()
+    cache = ResponseCache()
+    provider = CachedProvider(inner, cache, "mock")
+
+    first = asyncio.run(provider.generate("Hello"))
+    assert asyncio.run(provider.generate("Hello")) == first
+    assert inner.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert cache.cache_dir == project_dir / ".conclave" / "cache"
+
+    # Anything that changes the response changes the key
+    asyncio.run(provider.generate("Hello", CompletionOptions(temperature=0.2)))
+    asyncio.run(provider.generate("Hello again"))
+    assert inner.calls == 3
+
+
+def test_streamed_responses_are_cached_whole():
+    inner = Counting()
+    provider = CachedProvider(inner, ResponseCache(), "mock")
+
+    chunks = asyncio.run(collect(provider.stream("Hello")))
+    assert len(chunks) > 1
+    assert asyncio.run(collect(provider.stream("Hello"))) == ["".join(chunks)]
+    assert inner.calls == 1
+
+
+def test_errors_are_not_cached():
+    inner = Counting("[Error] 400: bad request")
+    cache = ResponseCache()
+    provider = CachedProvider(inner, cache, "mock")
+
+    assert asyncio.run(provider.generate("Hello")).startswith("[Error]")
+    assert asyncio.run(collect(provider.stream("Hello")))[0].startswith("[Error]")
+    asyncio.run(provider.generate("Hello"))
+    assert inner.calls == 3
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "cache")
+    cache.max_bytes = 25
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    os.utime(cache._path("a"), (100, 100))
+    os.utime(cache._path("b"), (200, 200))
+
+    assert cache.get("a") == "x" * 10  # Now the most recently used
+    cache.put("c", "z" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10 and cache.get("c") == "z" * 10
+    assert cache.stats()["size_bytes"] == 20
+
+
+def test_entries_outlive_the_process(tmp_path):
+    ResponseCache(tmp_path / "cache").put("key", "cached reply")
+    reopened = ResponseCache(tmp_path / "cache")
+    assert reopened.stats()["entries"] == 1
+    assert reopened.get("key") == "cached reply"
@@ -0,0 +1,69 @@
+"""The Claude CLI provider, driven through a stand-in claude binary."""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from conclave.core.types import ProviderConfig, ProviderType
+from conclave.providers import claude_cli
+from conclave.providers.claude_cli import ClaudeCliProvider, close_worker_pools, find_claude
+
+REPLY = [
+    {"type": "stream_event", "event": {"delta": {"type": "text_delta", "text": "Hello, "}}},
+    {"type": "stream_event", "event": {"delta": {"type": "text_delta", "text": "world."}}},
+    {"type": "result", "subtype": "success", "result": "Hello, world.", "usage": {}},
+]
+
+
+@pytest.fixture
+def fake_claude(tmp_path, monkeypatch):
+    """Put a claude script that runs the given shell body on PATH."""
+
+    def install(body: str) -> None:
+        script = tmp_path / "bin" / "claude"
+        script.parent.mkdir(exist_ok=True)
+        script.write_text(f"#!/bin/sh\nread line\n{body}\n")
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{script.parent}{os.pathsep}{os.environ['PATH']}")
+        find_claude.cache_clear()
+
+    yield install
+    find_claude.cache_clear()
+
+
+async def collect(provider, linger: float = 0):
+    try:
+        return [chunk async for chunk in provider.stream("Say hello.")]
+    finally:
+        await close_worker_pools()
+        # Outlive anything the workers left holding their pipes
+        await asyncio.sleep(linger)
+
+
+def test_reply_is_streamed_from_a_worker(fake_claude):
+    fake_claude("\n".join(f"echo '{json.dumps(event)}'" for event in REPLY))
+    provider = ClaudeCliProvider(ProviderConfig(type=ProviderType.ANTHROPIC, cli_workers=1))
+
+    assert asyncio.run(collect(provider)) == ["Hello, ", "world."]
+
+
+def test_worker_that_exits_without_a_reply_reports_its_stderr(fake_claude):
+    fake_claude("echo 'not logged in' >&2\nexit 1")
+    provider = ClaudeCliProvider(ProviderConfig(type=ProviderType.ANTHROPIC, cli_workers=1))
+
+    [chunk] = asyncio.run(collect(provider))
+
+    assert chunk == "[Error] Claude CLI failed: not logged in"
+
+
+def test_stderr_held_open_past_close_still_gives_an_error(fake_claude, monkeypatch):
+    # A child keeps stderr open after the worker ends, so closing it cuts the read short
+    monkeypatch.setattr(claude_cli, "WORKER_EXIT_TIMEOUT", 0.05)
+    fake_claude("exec 1>&-\nsleep 0.2 &")
+    provider = ClaudeCliProvider(ProviderConfig(type=ProviderType.ANTHROPIC, cli_workers=1))
+
+    [chunk] = asyncio.run(collect(provider, linger=0.5))
+
+    assert chunk == "[Error] Claude CLI failed: worker exited without a reply"
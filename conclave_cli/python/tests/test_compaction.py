@@ -0,0 +1,101 @@
+"""Peer-output compaction."""
+
+import asyncio
+
+from conclave.core.compaction import PeerCompactor, split_blocks
+from conclave.core.tokens import count_tokens
+from conclave.core.types import CompactionConfig
+from conclave.flows import create_flow_engine
+
+SECTION = (
+    "## Caching\n\nPut a read-through cache in front of the catalogue service, keyed by "
+    "product and locale, with a five minute expiry and explicit invalidation on every "
+    "write so that prices never go stale for longer than a single request takes.\n\n"
+)
+
+
+def long_output(topic: str, paragraphs: int = 40) -> str:
+    return "".join(
+        f"## {topic} {n}\n\nParagraph {n} about {topic}, with enough words to count.\n\n"
+        for n in range(paragraphs)
+    )
+
+
+def test_split_blocks_round_trips():
+    text = "# Plan\n\nIntro.\n\n- one\n- two\n\n```\ncode\n\nmore\n```\n\nEnd.\n"
+    assert "".join(split_blocks(text)) == text
+
+
+def test_dedupe_drops_a_section_an_earlier_peer_made():
+    compactor = PeerCompactor(CompactionConfig(enabled=True, stages=["dedupe"]))
+    outputs = {"A": SECTION + "## Other\n\nA's own idea.\n", "B": SECTION}
+
+    compacted = asyncio.run(compactor.compact(2, outputs))
+
+    assert compacted["A"] == outputs["A"]
+    assert "read-through cache" not in compacted["B"]
+    assert compactor.rounds[0]["saved_tokens"] > 0
+
+
+def test_truncate_keeps_each_peer_within_budget():
+    config = CompactionConfig(enabled=True, stages=["truncate"], max_tokens_per_peer=100)
+    compactor = PeerCompactor(config)
+
+    compacted = asyncio.run(compactor.compact(2, {"A": long_output("latency")}))
+
+    assert count_tokens(compacted["A"]) <= 120
+    assert compacted["A"].startswith("## latency 0")
+
+
+def test_repeated_outputs_are_compacted_once_and_recorded_every_round():
+    config = CompactionConfig(enabled=True, stages=["truncate"], max_tokens_per_peer=100)
+    compactor = PeerCompactor(config)
+    outputs = {"A": long_output("latency"), "B": long_output("cost")}
+
+    first = asyncio.run(compactor.compact(2, outputs))
+    second = asyncio.run(compactor.compact(3, dict(outputs)))
+
+    assert second is first
+    assert [entry["round"] for entry in compactor.rounds] == [2, 3]
+    assert compactor.rounds[1]["saved_tokens"] == compactor.rounds[0]["saved_tokens"]
+    assert compactor.rounds[1]["reused_from"] == 2
+
+
+def test_each_provider_gets_its_own_previous_output_in_full(mock_provider, flow):
+    providers = [mock_provider("A"), mock_provider("B")]
+    engine = create_flow_engine("basic", providers, flow())
+    own = {"A": long_output("latency"), "B": long_output("cost")}
+    compacted = {"A": "A, compacted.", "B": "B, compacted."}
+
+    calls, _ = engine._refinement_calls(providers, compacted, own, 2)
+
+    for provider, (shared, tail), _ in calls:
+        assert own[provider.name] not in shared.text
+        assert own[provider.name] in tail.text
+
+
+def test_an_uncompacted_own_output_is_sent_once(mock_provider, flow):
+    providers = [mock_provider("A"), mock_provider("B")]
+    engine = create_flow_engine("basic", providers, flow())
+    own = {"A": long_output("latency"), "B": long_output("cost")}
+
+    calls, _ = engine._refinement_calls(providers, dict(own), own, 2)
+
+    for provider, prompt, _ in calls:
+        text = "".join(segment.text for segment in prompt)
+        assert text.count(own[provider.name]) == 1
+        assert f"the one from {provider.name} above" in text
+
+
+def test_models_without_a_shared_cache_get_only_their_peers(mock_provider, flow):
+    providers = [mock_provider("A"), mock_provider("B")]
+    providers[1].model = "mock-large"
+    engine = create_flow_engine("basic", providers, flow())
+    own = {"A": long_output("latency"), "B": long_output("cost")}
+
+    calls, _ = engine._refinement_calls(providers, dict(own), own, 2)
+
+    for (provider, (block, tail), _), peer in zip(calls, ["B", "A"]):
+        assert not block.cacheable
+        assert own[peer] in block.text and own[provider.name] not in block.text
+        assert own[provider.name] in tail.text
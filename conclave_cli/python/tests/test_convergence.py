@@ -0,0 +1,89 @@
+"""Ending a flow once its outputs stop changing (core.convergence)."""
+
+import asyncio
+import json
+
+from conclave.core.convergence import (
+    CONVERGENCE_FILE,
+    ConvergenceDetector,
+    diff_similarity,
+    minhash_similarity,
+    sketch,
+)
+from conclave.core.types import ConvergenceConfig
+from conclave.flows import create_flow_engine
+from conclave.providers.base import ProviderWrapper
+
+PLAN = " ".join(f"step {n} covers part {n} of the rollout plan." for n in range(60))
+OTHER = " ".join(f"item {n} is about budget line {n * 7} only." for n in range(60))
+
+
+class Steady(ProviderWrapper):
+    """Replies with the same plan every round."""
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.calls = 0
+
+    async def stream(self, prompt, options=None):
+        self.calls += 1
+        yield f"{self.name}: {PLAN}"
+
+
+def test_similarity_measures():
+    edited = PLAN.replace("step 30 covers", "step 30 now covers")
+    assert minhash_similarity(sketch(PLAN), sketch(PLAN)) == 1.0
+    assert minhash_similarity(sketch(PLAN), sketch(edited)) > 0.9
+    assert minhash_similarity(sketch(PLAN), sketch(OTHER)) < 0.1
+    assert diff_similarity(PLAN, edited) > 0.95
+    assert diff_similarity(PLAN, OTHER) < 0.5
+
+
+def test_stable_outputs_converge():
+    detector = ConvergenceDetector(ConvergenceConfig(enabled=True, threshold=0.9))
+    previous = {"A": PLAN, "B": OTHER}
+
+    assert detector.check(2, previous, {"A": PLAN, "B": OTHER})
+    assert not detector.check(3, previous, {"A": PLAN, "B": PLAN})
+    assert detector.rounds[1]["stability"]["B"] < 0.1
+    assert detector.rounds[1]["agreement"] == {"A~B": 1.0}
+
+
+def test_errors_and_missing_replies_are_left_out():
+    detector = ConvergenceDetector(ConvergenceConfig(method="diff"))
+    previous = {"A": PLAN, "B": OTHER}
+
+    assert detector.check(2, previous, {"A": PLAN, "B": "[Error] B timed out", "C": OTHER})
+    assert detector.rounds[0]["stability"] == {"A": 1.0}
+    assert not detector.check(3, {}, {"A": PLAN})
+
+
+def test_peer_agreement_can_converge_a_round():
+    config = ConvergenceConfig(enabled=True, threshold=0.99, peer_threshold=0.9)
+    detector = ConvergenceDetector(config)
+
+    assert detector.check(2, {"A": OTHER, "B": PLAN}, {"A": PLAN, "B": PLAN})
+    assert detector.rounds[0]["min_stability"] < 0.99
+
+
+def test_converged_flow_skips_the_remaining_rounds(mock_provider, flow, input_file):
+    providers = [Steady(mock_provider("A")), Steady(mock_provider("B"))]
+    config = flow(max_rounds=4, convergence=ConvergenceConfig(enabled=True))
+    engine = create_flow_engine("basic", providers, config)
+
+    asyncio.run(engine.run(str(input_file)))
+
+    assert [p.calls for p in providers] == [2, 2]
+    scores = json.loads((engine.run_dir / CONVERGENCE_FILE).read_text())
+    assert scores["rounds"][-1]["round"] == 2 and scores["rounds"][-1]["converged"]
+
+
+def test_scores_are_recorded_with_early_stopping_off(mock_provider, flow, input_file):
+    providers = [Steady(mock_provider("A")), Steady(mock_provider("B"))]
+    engine = create_flow_engine("basic", providers, flow(max_rounds=3))
+
+    asyncio.run(engine.run(str(input_file)))
+
+    assert [p.calls for p in providers] == [3, 3]
+    scores = json.loads((engine.run_dir / CONVERGENCE_FILE).read_text())
+    assert [entry["converged"] for entry in scores["rounds"] if entry["round"] > 1] == [True, True]
@@ -0,0 +1,150 @@
+"""Refinement prompts that send peers' changes as diffs (core.deltas)."""
+
+import asyncio
+import json
+import re
+
+from conclave.core.deltas import DELTAS_FILE, DeltaSavings, render_delta, text_delta
+from conclave.flows import create_flow_engine
+from conclave.providers.base import ProviderWrapper, render_prompt
+
+PLAN = "".join(f"Step {n}: do the next part of the plan, carefully.\n" for n in range(40))
+
+
+class Revising(ProviderWrapper):
+    """Replies with the same plan every round, plus one line per revision."""
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.prompts = []
+        self.outputs = []
+
+    async def stream(self, prompt, options=None):
+        self.prompts.append(render_prompt(prompt))
+        revisions = "".join(f"Revision {n}.\n" for n in range(1, len(self.prompts)))
+        self.outputs.append(f"{self.name}'s plan.\n{PLAN}{revisions}")
+        yield self.outputs[-1]
+
+
+def test_small_changes_go_as_a_diff():
+    new = PLAN.replace("Step 7:", "Step seven:")
+    delta = text_delta(PLAN, new)
+
+    assert delta.startswith("@@")
+    assert "-Step 7:" in delta and "+Step seven:" in delta
+    assert len(delta) < len(new)
+    assert render_delta(delta) == f"```diff\n{delta}```"
+
+
+def test_rewrites_and_unchanged_texts():
+    assert text_delta(PLAN, "Something else entirely.\n") is None
+    assert text_delta(PLAN, PLAN) == ""
+    assert render_delta("") == "(unchanged)"
+    # A last line without a newline still diffs cleanly
+    delta = text_delta(PLAN + "End", PLAN + "The end")
+    assert delta.endswith("-End\n+The end\n")
+
+
+def test_savings_are_recorded_per_round():
+    savings = DeltaSavings()
+    savings.record(3, ["a long prompt " * 20], ["a diff"], diffed=2)
+    savings.record(4, ["short"], ["short"], diffed=0, step="respond")
+
+    total = savings.total()
+    assert savings.rounds[0]["diffed_outputs"] == 2
+    assert savings.rounds[1]["step"] == "respond"
+    assert total["saved_bytes"] == len("a long prompt " * 20) - len("a diff")
+    assert total["saved_tokens"] == savings.rounds[0]["saved_tokens"] > 0
+
+
+def apply_delta(base, delta):
+    """Apply a diff, as text_delta makes them, to ``base``."""
+    old = base.splitlines(keepends=True)
+    new, at = [], 0
+    for line in delta.splitlines(keepends=True):
+        if line.startswith("@@"):
+            start, _, count = re.match(r"@@ -(\d+)(,(\d+))?", line).groups()
+            # An empty old range names the line the hunk goes after
+            start = int(start) if count == "0" else int(start) - 1
+            new += old[at:start]
+            at = start
+        elif line.startswith("-"):
+            at += 1
+        elif line.startswith("+"):
+            new.append(line[1:])
+        else:
+            new.append(old[at])
+            at += 1
+    return "".join(new + old[at:])
+
+
+def recovered(prompt, peer, bases):
+    """A peer's version as the prompt carries it, in full or applied to its base."""
+    match = re.search(
+        rf"FROM {peer.upper()}, AS CHANGES AGAINST (.+?)\]\n```diff\n(.*?)```", prompt, re.S
+    )
+    if match is None:
+        return None
+    base = bases[match.group(1)]
+    # The base of the diff is in the same prompt, in full
+    assert base in prompt
+    return apply_delta(base, match.group(2))
+
+
+def test_diffs_apply_back_to_their_base():
+    new = PLAN.replace("Step 7:", "Step seven:").replace("Step 30:", "Added.\nStep 30:")
+
+    assert apply_delta(PLAN, text_delta(PLAN, new)) == new
+    assert apply_delta(PLAN, text_delta(PLAN, PLAN + "End.\n")) == PLAN + "End.\n"
+
+
+def test_peers_can_be_recovered_from_every_prompt(mock_provider, flow, input_file):
+    providers = [Revising(mock_provider("A")), Revising(mock_provider("B"))]
+    config = flow(max_rounds=3, refinement_deltas=True)
+    engine = create_flow_engine("basic", providers, config)
+
+    asyncio.run(engine.run(str(input_file)))
+
+    [a, b] = providers
+    for n in (1, 2):
+        shared_base = {"A'S VERSION ABOVE": a.outputs[n - 1]}
+        assert recovered(b.prompts[n], "B", shared_base) == b.outputs[n - 1]
+        assert recovered(a.prompts[n], "B", shared_base) == b.outputs[n - 1]
+        # A's version leads the block in full; B's goes after it once more in full
+        assert a.prompts[n].count(a.outputs[n - 1]) == 1
+        assert b.prompts[n].count(b.outputs[n - 1]) == 1
+    rounds = json.loads((engine.run_dir / DELTAS_FILE).read_text())["rounds"]
+    assert [entry["diffed_outputs"] for entry in rounds] == [1, 1]
+    assert all(entry["saved_tokens"] > 0 for entry in rounds)
+
+
+def test_unshared_prompts_diff_peers_against_the_recipients_own(
+    mock_provider, flow, input_file
+):
+    providers = [Revising(mock_provider("A")), Revising(mock_provider("B"))]
+    providers[1].inner.model = "mock-large"
+    config = flow(max_rounds=3, refinement_deltas=True)
+    engine = create_flow_engine("basic", providers, config)
+
+    asyncio.run(engine.run(str(input_file)))
+
+    [a, b] = providers
+    for n in (1, 2):
+        own = {"YOUR PREVIOUS VERSION": a.outputs[n - 1]}
+        assert recovered(a.prompts[n], "B", own) == b.outputs[n - 1]
+        own = {"YOUR PREVIOUS VERSION": b.outputs[n - 1]}
+        assert recovered(b.prompts[n], "A", own) == a.outputs[n - 1]
+
+
+def test_contributions_go_to_the_leader_against_its_own(mock_provider, flow, input_file):
+    providers = [Revising(mock_provider("A")), Revising(mock_provider("B"))]
+    config = flow(max_rounds=4, refinement_deltas=True)
+    engine = create_flow_engine("leading", providers, config, leader="A")
+
+    asyncio.run(engine.run(str(input_file)))
+
+    [leader, contributor] = providers
+    # The leader's second synthesis weighs B's response against its first synthesis
+    synthesis = leader.prompts[2]
+    own = {"A'S ABOVE": leader.outputs[1]}
+    assert recovered(synthesis, "B", own) == contributor.outputs[1]
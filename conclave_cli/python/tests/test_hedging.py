@@ -0,0 +1,94 @@
+"""Hedged requests: slow calls are duplicated and the first good reply wins."""
+
+import asyncio
+
+from conclave.core.types import HedgeConfig
+from conclave.providers.base import Provider
+from conclave.providers.hedging import HedgedProvider, LatencyTracker, collect_hedge_stats
+
+
+class Scripted(Provider):
+    """Replies after a set delay per call, and records calls that were cut short."""
+
+    def __init__(self, name, delays, reply="ok"):
+        super().__init__(name)
+        self.delays = list(delays)
+        self.reply = reply
+        self.cancelled = 0
+
+    async def generate(self, prompt, options=None):
+        try:
+            await asyncio.sleep(self.delays.pop(0))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.reply
+
+    async def stream(self, prompt, options=None):
+        yield await self.generate(prompt, options)
+        yield " (rest)"
+
+
+def hedged(primary, backup=None, **config):
+    settings = {"enabled": True, "initial_delay": 0.02, **config}
+    return HedgedProvider(primary, HedgeConfig(**settings), backup)
+
+
+def test_fast_calls_are_not_hedged():
+    primary = Scripted("P", [0.001])
+    provider = hedged(primary)
+
+    assert asyncio.run(provider.generate("Hi")) == "ok"
+    assert provider.hedge_stats.to_dict()["hedges"] == 0
+
+
+def test_slow_call_loses_to_its_hedge_and_is_cancelled():
+    primary = Scripted("P", [1.0], reply="slow")
+    backup = Scripted("B", [0.001], reply="fast")
+    provider = hedged(primary, backup)
+
+    assert asyncio.run(provider.generate("Hi")) == "fast"
+    assert primary.cancelled == 1
+    stats = collect_hedge_stats([provider])["P"]
+    assert stats["hedges"] == stats["hedge_wins"] == 1
+    assert stats["hedge_rate"] == stats["win_rate"] == 1.0
+
+
+def test_a_failed_hedge_does_not_beat_a_slower_good_reply():
+    primary = Scripted("P", [0.06], reply="good")
+    backup = Scripted("B", [0.001], reply="[Error] 503")
+    provider = hedged(primary, backup)
+
+    assert asyncio.run(provider.generate("Hi")) == "good"
+    assert provider.hedge_stats.hedge_wins == 0
+
+
+def test_errors_win_only_when_every_attempt_fails():
+    primary = Scripted("P", [0.04], reply="[Error] 500")
+    backup = Scripted("B", [0.001], reply="[Error] 503")
+
+    assert asyncio.run(hedged(primary, backup).generate("Hi")).startswith("[Error]")
+
+
+def test_streams_race_on_the_first_chunk():
+    primary = Scripted("P", [1.0], reply="slow")
+    backup = Scripted("B", [0.001], reply="fast")
+    provider = hedged(primary, backup)
+
+    async def collect():
+        return [chunk async for chunk in provider.stream("Hi")]
+
+    assert asyncio.run(collect()) == ["fast", " (rest)"]
+    assert primary.cancelled == 1
+
+
+def test_threshold_follows_the_latency_percentile():
+    provider = hedged(Scripted("P", []), percentile=50, min_samples=3)
+    tracker = LatencyTracker()
+    for seconds in (0.1, 0.2):
+        tracker.record(seconds)
+    # Too few samples yet: the configured initial delay applies
+    assert provider._threshold(tracker) == 0.02
+
+    tracker.record(0.3)
+    assert provider._threshold(tracker) == 0.2
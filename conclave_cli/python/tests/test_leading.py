@@ -0,0 +1,47 @@
+"""The leading flow's alternating synthesize/respond steps."""
+
+import asyncio
+import json
+
+from conclave.core.manifest import MANIFEST_FILE
+from conclave.flows import create_flow_engine
+from conclave.providers.base import Provider
+
+
+class Recording(Provider):
+    """Keeps every prompt it is sent; replies fail from call ``fail_from`` on."""
+
+    def __init__(self, name, fail_from=None):
+        super().__init__(name)
+        self.prompts = []
+        self.fail_from = fail_from
+
+    async def generate(self, prompt, options=None):
+        return "".join([chunk async for chunk in self.stream(prompt, options)])
+
+    async def stream(self, prompt, options=None):
+        self.prompts.append(prompt)
+        if self.fail_from is not None and len(self.prompts) >= self.fail_from:
+            yield "[Error] 500: synthesis failed"
+            return
+        yield f"{self.name}'s plan, take {len(self.prompts)}."
+
+
+def test_failed_synthesis_stops_the_run(flow, progress, input_file):
+    leader = Recording("Lead", fail_from=3)
+    contributor = Recording("Peer")
+    config = flow(max_rounds=5)
+    engine = create_flow_engine(
+        "leading", [leader, contributor], config, leader="Lead", progress=progress
+    )
+
+    asyncio.run(engine.run(str(input_file)))
+
+    # Step 2's synthesis went out; the failed one in step 4 reached no contributor
+    assert len(leader.prompts) == 3
+    assert len(contributor.prompts) == 2
+    assert all("[Error]" not in prompt for prompt in contributor.prompts)
+    manifest = json.loads((engine.run_dir / MANIFEST_FILE).read_text())
+    assert manifest["status"] == "stopped"
+    assert "Lead" not in manifest["rounds"]["4"]["calls"]
+    assert "synthesis in step 4 failed" in progress.file.getvalue()
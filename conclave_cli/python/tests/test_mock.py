@@ -0,0 +1,57 @@
+"""Simulated-latency mock provider (providers.mock)."""
+
+import asyncio
+
+from conclave.core.types import MockConfig, ProviderConfig, ProviderType
+from conclave.providers.base import CompletionOptions, capture_completions
+from conclave.providers.mock import PARAGRAPH_WORDS, MockProvider
+
+
+def sampler(**settings):
+    mock = MockConfig(**{"seed": 7, **settings})
+    return MockProvider(ProviderConfig(type=ProviderType.MOCK, mock=mock))
+
+
+def test_seeded_providers_repeat_their_replies(mock_provider):
+    first = asyncio.run(mock_provider("A").generate("Hi"))
+    second = asyncio.run(mock_provider("B").generate("Hi"))
+
+    assert first == second
+    assert first.startswith("## Section 1\n\n")
+    assert len(first.split()) == 20 + 3  # Words plus the section heading
+
+
+def test_latencies_follow_the_distribution():
+    assert sampler(latency="fixed", latency_ms=250).sample_latency() == 0.25
+
+    draws = sorted(sampler(latency="pareto", latency_ms=100).sample_latency() for _ in range(999))
+    # The median matches latency_ms; pareto draws never fall below its scale
+    assert 0.08 < draws[499] < 0.12
+    assert draws[0] >= 0.1 / 2 ** (1 / 1.5)
+
+    capped = sampler(latency="lognormal", latency_ms=100, latency_sigma=3, max_latency_ms=200)
+    assert max(capped.sample_latency() for _ in range(200)) == 0.2
+
+
+def test_replies_are_capped_by_max_tokens_and_reported(mock_provider):
+    provider = mock_provider("A", response_tokens=2 * PARAGRAPH_WORDS)
+
+    async def run():
+        with capture_completions() as completions:
+            text = await provider.generate("Hi", CompletionOptions(max_tokens=PARAGRAPH_WORDS + 5))
+        return text, completions
+
+    text, [completion] = asyncio.run(run())
+
+    assert text.count("\n\n") == 2  # The heading, then a second paragraph
+    assert completion.output_tokens == PARAGRAPH_WORDS + 5
+    assert completion.finish_reason == "max_tokens"
+    assert completion.provider == "A" and completion.model == "mock"
+
+
+def test_injected_errors_come_back_as_error_replies(mock_provider):
+    provider = mock_provider("A", error_rate=1.0, error_status=400)
+
+    reply = asyncio.run(provider.generate("Hi"))
+
+    assert reply == "[Error] A failed to generate response: Mock provider injected a 400 error"
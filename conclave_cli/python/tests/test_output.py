@@ -0,0 +1,52 @@
+"""Streaming round output to disk (utils.output)."""
+
+import asyncio
+
+import pytest
+
+from conclave.utils.output import get_output_path, stream_output
+
+
+async def chunks(*parts, fail=None):
+    for part in parts:
+        yield part
+    if fail:
+        raise fail
+
+
+def test_chunks_are_written_as_they_arrive(tmp_path):
+    path = get_output_path(tmp_path, "A", 1)
+
+    async def watch():
+        async def slow():
+            yield "first "
+            # The first chunk is on disk before the stream ends
+            assert path.read_text() == "first "
+            yield "second"
+
+        return await stream_output(tmp_path, "A", 1, slow())
+
+    assert asyncio.run(watch()) == "first second"
+    assert path.read_text() == "first second"
+
+
+def test_error_chunk_moves_partial_output_aside(tmp_path):
+    stream = chunks("partial ", "[Error] A failed: overloaded")
+    output = asyncio.run(stream_output(tmp_path, "A", 2, stream))
+
+    assert output == "[Error] A failed: overloaded"
+    assert not get_output_path(tmp_path, "A", 2).exists()
+    error = get_output_path(tmp_path, "A", 2, "error").read_text()
+    assert error == "[Error] A failed: overloaded\n\n[PARTIAL OUTPUT]\npartial "
+
+
+@pytest.mark.parametrize("exc", [asyncio.CancelledError(), ConnectionResetError("reset")])
+def test_interrupted_stream_leaves_no_round_file(tmp_path, exc):
+    stream = chunks("partial ", fail=exc)
+    with pytest.raises(type(exc)):
+        asyncio.run(stream_output(tmp_path, "A", 2, stream, "synthesis"))
+
+    assert not get_output_path(tmp_path, "A", 2, "synthesis").exists()
+    error = get_output_path(tmp_path, "A", 2, "synthesis.error").read_text()
+    assert error.startswith(f"[Interrupted] {type(exc).__name__}")
+    assert error.endswith("[PARTIAL OUTPUT]\npartial ")
@@ -0,0 +1,57 @@
+"""Prompt-cache breakpoints on shared prompt prefixes."""
+
+from conclave.core.types import ProviderConfig, ProviderType
+from conclave.providers.anthropic import MAX_CACHE_BREAKPOINTS, AnthropicProvider
+from conclave.providers.base import PromptSegment, render_prompt, shares_prompt_cache
+
+
+class Model:
+    def __init__(self, model, token_family="anthropic"):
+        self.model = model
+        self.token_family = token_family
+
+
+def anthropic():
+    return AnthropicProvider(ProviderConfig(type=ProviderType.ANTHROPIC, api_key="test"))
+
+
+def breakpoints(content):
+    return [block["text"] for block in content if "cache_control" in block]
+
+
+def test_cacheable_segments_become_breakpoints():
+    prompt = [
+        PromptSegment("Input file", cacheable=True),
+        PromptSegment("Peer versions", cacheable=True),
+        PromptSegment("Your task"),
+    ]
+
+    content = anthropic()._build_content(prompt)
+
+    assert [block["text"] for block in content] == ["Input file", "Peer versions", "Your task"]
+    assert breakpoints(content) == ["Input file", "Peer versions"]
+    assert content[0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_only_the_last_breakpoints_that_fit_are_kept():
+    count = MAX_CACHE_BREAKPOINTS + 2
+    prompt = [PromptSegment(f"Part {n}", cacheable=True) for n in range(count)]
+    prompt.insert(1, PromptSegment(""))
+
+    content = anthropic()._build_content(prompt)
+
+    # Empty segments are dropped; a later breakpoint caches everything before it
+    assert len(content) == count
+    assert breakpoints(content) == [f"Part {n}" for n in range(2, count)]
+
+
+def test_plain_prompts_are_sent_as_text():
+    assert anthropic()._build_content("Hello") == "Hello"
+    assert render_prompt([PromptSegment("A", cacheable=True), PromptSegment("B")]) == "A\n\nB"
+
+
+def test_prefixes_are_cached_only_where_a_model_reuses_them():
+    assert shares_prompt_cache([Model("claude-opus-4-5"), Model("claude-opus-4-5")])
+    assert not shares_prompt_cache([Model("claude-opus-4-5"), Model("claude-sonnet-4-5")])
+    assert not shares_prompt_cache([Model("gpt-4o", "openai"), Model("gpt-4o", "grok")])
+    assert not shares_prompt_cache([Model("claude-opus-4-5")])
@@ -0,0 +1,35 @@
+"""Rounds that close on a quorum."""
+
+import asyncio
+
+from conclave.core.types import QuorumConfig
+from conclave.flows import create_flow_engine
+
+
+def quorum_engine(providers, flow, min_outputs):
+    config = flow(quorum=QuorumConfig(min_outputs=min_outputs))
+    return create_flow_engine("basic", providers, config)
+
+
+def test_round_closes_once_the_quorum_is_in(mock_provider, flow):
+    fast, slow = mock_provider("Fast"), mock_provider("Slow", latency_ms=2000)
+    engine = quorum_engine([fast, slow], flow, min_outputs=1)
+    calls = [(fast, "Draft a plan.", None), (slow, "Draft a plan.", None)]
+
+    outputs = asyncio.run(engine._call_quorum_round(1, calls))
+
+    assert outputs[0] and outputs[1] is None
+    assert engine.quorum_log[0]["closed"] == "quorum"
+    [straggler] = engine.quorum_log[0]["stragglers"]
+    assert (straggler["provider"], straggler["status"]) == ("Slow", "cancelled")
+
+
+def test_resumed_round_waits_for_its_missing_calls(mock_provider, flow):
+    slow = mock_provider("Slow", latency_ms=200)
+    engine = quorum_engine([slow], flow, min_outputs=1)
+
+    # One reply restored from before the interruption already meets the quorum
+    outputs = asyncio.run(engine._call_quorum_round(1, [(slow, "Draft a plan.", None)], restored=1))
+
+    assert outputs[0] and not outputs[0].startswith("[Error]")
+    assert engine.quorum_log == []
@@ -0,0 +1,180 @@
+"""Local rate and concurrency limits (providers.ratelimit)."""
+
+import asyncio
+import time
+
+import pytest
+
+from conclave.core.types import (
+    ConclaveConfig,
+    MockConfig,
+    ProviderConfig,
+    ProviderType,
+    RetryConfig,
+)
+from conclave.providers import ratelimit
+from conclave.providers.base import Provider, ProviderWrapper
+from conclave.providers.factory import create_provider
+from conclave.providers.ratelimit import (
+    RateLimitedProvider,
+    RateLimiter,
+    TokenBucket,
+    get_rate_limiter,
+)
+from conclave.providers.retry import Retrier
+
+
+class Echo(Provider):
+    async def generate(self, prompt, options=None):
+        return prompt
+
+
+class Counting(ProviderWrapper):
+    """Records the most calls the wrapped provider had in flight at once."""
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, options=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await self.inner.generate(prompt, options)
+        finally:
+            self.active -= 1
+
+
+def test_token_bucket_waits_for_refill():
+    async def drain_then_wait():
+        bucket = TokenBucket(60_000)  # 1,000 a second
+        await bucket.acquire(60_000)
+        start = time.perf_counter()
+        await bucket.acquire(100)
+        return time.perf_counter() - start
+
+    assert asyncio.run(drain_then_wait()) >= 0.08
+
+
+def test_oversized_request_waits_for_a_full_bucket():
+    async def oversized():
+        bucket = TokenBucket(60_000)
+        await asyncio.wait_for(bucket.acquire(200_000), timeout=1)
+        return bucket.available
+
+    assert asyncio.run(oversized()) < 1
+
+
+def test_max_concurrency_caps_calls_in_flight(mock_provider):
+    inner = Counting(mock_provider("Capped", latency_ms=20))
+    limiter = RateLimiter(max_concurrency=2)
+    provider = RateLimitedProvider(inner, limiter)
+
+    async def burst():
+        return await asyncio.gather(*(provider.generate("Hello") for _ in range(6)))
+
+    outputs = asyncio.run(burst())
+    assert all(not output.startswith("[Error]") for output in outputs)
+    assert inner.peak == 2
+    assert limiter.in_flight == limiter.waiting == 0
+
+
+def test_requests_per_minute_spaces_calls():
+    provider = RateLimitedProvider(Echo("Paced"), RateLimiter(requests_per_minute=600))
+
+    async def burst():
+        start = time.perf_counter()
+        # One request left in the bucket, so the other two wait for it to refill
+        provider.limiter.requests.available = 1
+        await asyncio.gather(*(provider.generate("Hello") for _ in range(3)))
+        return time.perf_counter() - start
+
+    # 600 a minute is one every 0.1s
+    assert asyncio.run(burst()) >= 0.18
+
+
+def test_streams_take_their_estimated_tokens():
+    limiter = RateLimiter(tokens_per_minute=6000)
+    provider = RateLimitedProvider(Echo("Streamed"), limiter)
+
+    async def collect():
+        return [chunk async for chunk in provider.stream("x" * 400)]
+
+    assert asyncio.run(collect()) == ["x" * 400]
+    # 400 characters are estimated at 100 tokens
+    assert limiter.tokens.available == pytest.approx(5900, abs=5)
+
+
+def test_providers_share_one_limiter_per_name(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_limiters", {})
+    first = get_rate_limiter("openai", requests_per_minute=60)
+    assert get_rate_limiter("openai", requests_per_minute=600) is first
+    assert get_rate_limiter("anthropic") is not first
+
+
+def test_created_providers_share_their_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_limiters", {})
+    settings = MockConfig(latency="fixed", latency_ms=1, tokens_per_second=0)
+    config = ConclaveConfig(
+        active_providers=["mock"],
+        providers={
+            "mock": ProviderConfig(type=ProviderType.MOCK, max_concurrency=3, mock=settings)
+        },
+        flows={},
+    )
+    first, second = create_provider(config, "mock"), create_provider(config, "mock")
+    assert first.limiter is second.limiter
+    assert first.limiter.max_concurrency == 3
+    assert ratelimit.rate_limiters() == {"mock": first.limiter}
+
+
+class Flaky(Provider):
+    """Fails every attempt with a retryable error, retrying through its retrier."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.retrier = Retrier(RetryConfig(max_attempts=3, base_delay=0.001, max_delay=0.01))
+
+    async def generate(self, prompt, options=None):
+        async def fail():
+            raise TimeoutError("overloaded")
+
+        try:
+            return await self.retrier.call(fail, self.name)
+        except TimeoutError as e:
+            return f"[Error] {e}"
+
+    async def stream(self, prompt, options=None):
+        yield await self.generate(prompt, options)
+
+
+class RecordingLimiter(RateLimiter):
+    """Records the token budget of every request it lets through."""
+
+    def __init__(self, **limits):
+        super().__init__(**limits)
+        self.acquired = []
+
+    async def acquire(self, tokens):
+        self.acquired.append(tokens)
+        await super().acquire(tokens)
+
+
+async def collect(provider, method):
+    if method == "generate":
+        return await provider.generate("Hello")
+    return "".join([chunk async for chunk in provider.stream("Hello")])
+
+
+@pytest.mark.parametrize("method", ["generate", "stream"])
+def test_retries_wait_on_the_limiter_again(method):
+    limiter = RecordingLimiter(requests_per_minute=600, max_concurrency=1)
+    provider = RateLimitedProvider(Flaky("Flaky"), limiter)
+
+    output = asyncio.run(collect(provider, method))
+
+    assert output.startswith("[Error]")
+    # The first attempt and both retries each took a request's budget
+    assert len(limiter.acquired) == 3 and len(set(limiter.acquired)) == 1
+    assert limiter.in_flight == 0
@@ -0,0 +1,87 @@
+"""Resuming interrupted runs from their manifests."""
+
+import asyncio
+import json
+
+import yaml
+from click.testing import CliRunner
+
+from conclave.cli import main
+from conclave.core.manifest import RunManifest
+from conclave.flows import create_flow_engine
+from conclave.providers.batch import CHECKPOINT_FILE
+from conclave.utils.output import create_run_context
+
+
+def interrupt_round(run_dir, round_num, unfinished):
+    """Make a finished run look as if it was interrupted in ``round_num``."""
+    manifest = RunManifest(run_dir)
+    entry = manifest.data["rounds"][str(round_num)]
+    entry["closed"] = False
+    for provider in unfinished:
+        del entry["calls"][provider]
+    manifest.finish("interrupted")
+
+
+def test_resumed_run_makes_only_the_missing_calls(mock_provider, flow, input_file):
+    providers = [mock_provider("A"), mock_provider("B")]
+    engine = create_flow_engine("basic", providers, flow())
+    asyncio.run(engine.run(str(input_file)))
+    interrupt_round(engine.run_dir, 2, ["B"])
+
+    resumed = create_flow_engine("basic", providers, flow(), run_id=engine.run_id)
+    asyncio.run(resumed.run(str(input_file)))
+
+    assert resumed.manifest.status == "complete"
+    new_calls = resumed.usage.completions[len(engine.usage.completions):]
+    assert [completion.provider for completion in new_calls] == ["B"]
+
+
+def test_run_with_a_changed_input_is_not_resumed(mock_provider, flow, input_file):
+    providers = [mock_provider("A")]
+    engine = create_flow_engine("basic", providers, flow())
+    asyncio.run(engine.run(str(input_file)))
+    interrupt_round(engine.run_dir, 2, ["A"])
+    input_file.write_text("A different plan.")
+
+    resumed = create_flow_engine("basic", providers, flow(), run_id=engine.run_id)
+    asyncio.run(resumed.run(str(input_file)))
+
+    assert resumed.manifest.status == "interrupted"
+    assert len(resumed.usage.completions) == len(engine.usage.completions)
+
+
+def test_resume_command_picks_up_a_batch_in_flight(batch_server, project_dir, input_file):
+    config = {
+        "active_providers": ["anthropic"],
+        "providers": {
+            "anthropic": {"type": "anthropic", "api_key": "test", "base_url": batch_server.base_url}
+        },
+        "flows": {
+            "audit": {
+                "name": "Audit",
+                "prompts": {"round_1": "Draft a plan.", "refinement": "Refine the plan."},
+            }
+        },
+        "batch": {"poll_interval": 0.01},
+    }
+    (project_dir / "conclave.config.yaml").write_text(yaml.safe_dump(config))
+    runner = CliRunner()
+    result = runner.invoke(main, ["run", "audit", str(input_file), "--batch"])
+    assert result.exit_code == 0, result.output
+    [run_id] = [path.name for path in (project_dir / ".conclave" / "runs").iterdir()]
+
+    # Interrupted while round 2's batch was still being processed
+    run_dir = create_run_context(run_id).run_dir
+    interrupt_round(run_dir, 2, ["Anthropic"])
+    checkpoint = json.loads((run_dir / CHECKPOINT_FILE).read_text())
+    in_flight = list(batch_server.anthropic)[-1]
+    checkpoint["rounds"]["2"] = {"batches": {"Anthropic": in_flight}, "outputs": {}}
+    (run_dir / CHECKPOINT_FILE).write_text(json.dumps(checkpoint))
+    created = batch_server.created
+
+    result = runner.invoke(main, ["resume", run_id])
+
+    assert result.exit_code == 0, result.output
+    assert RunManifest(run_dir).status == "complete"
+    assert batch_server.created == created
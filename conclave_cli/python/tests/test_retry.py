@@ -0,0 +1,98 @@
+"""Retries of transient provider errors (providers.retry)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from conclave.core.types import RetryConfig
+from conclave.providers.retry import Retrier, RetryBudget, get_retry_after, is_retryable
+
+FAST = RetryConfig(max_attempts=4, base_delay=0.001, max_delay=0.01)
+
+
+class StatusError(Exception):
+    """An SDK-style error carrying its HTTP status."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def failing(statuses):
+    """A call that raises StatusError for each status in turn, then succeeds."""
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts) + 1)
+        if len(attempts) <= len(statuses):
+            raise StatusError(statuses[len(attempts) - 1])
+        return "ok"
+
+    return call, attempts
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class ConnectError(Exception):
+    pass
+
+
+def test_classifies_errors():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(HTTPError(529))
+    assert is_retryable(ConnectError())
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_retries_transient_errors_until_success():
+    call, attempts = failing([429, 503])
+    assert asyncio.run(Retrier(FAST).call(call)) == "ok"
+    assert attempts == [1, 2, 3]
+
+
+def test_fatal_errors_are_not_retried():
+    call, attempts = failing([400])
+    with pytest.raises(StatusError):
+        asyncio.run(Retrier(FAST).call(call))
+    assert attempts == [1]
+
+
+def test_gives_up_after_max_attempts():
+    call, attempts = failing([503] * 10)
+    with pytest.raises(StatusError):
+        asyncio.run(Retrier(FAST).call(call))
+    assert len(attempts) == FAST.max_attempts
+
+
+def test_honours_retry_after():
+    assert get_retry_after(HTTPError(429, {"retry-after-ms": "250"})) == 0.25
+    assert get_retry_after(HTTPError(429, {"retry-after": "3"})) == 3.0
+    assert get_retry_after(HTTPError(429, {"retry-after": "Thu, 01 Jan 1970 00:00:00 GMT"})) == 0
+    assert get_retry_after(HTTPError(429)) is None
+    assert Retrier(FAST).backoff(0, HTTPError(429, {"retry-after": "7"})) == 7.0
+
+
+def test_backoff_stays_under_the_cap():
+    retrier = Retrier(RetryConfig(base_delay=1.0, max_delay=4.0))
+    delays = [retrier.backoff(attempt, StatusError(503)) for attempt in range(10)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+
+
+def test_shared_budget_stops_retries():
+    budget = RetryBudget(0.05)
+    retriers = [Retrier(FAST, budget), Retrier(FAST, budget)]
+    retriers[0].backoff = retriers[1].backoff = lambda attempt, exc: 0.03
+
+    call, attempts = failing([503])
+    assert asyncio.run(retriers[0].call(call)) == "ok"
+    # The first retry used most of the budget, so the second retrier can't afford one
+    call, attempts = failing([503])
+    with pytest.raises(StatusError):
+        asyncio.run(retriers[1].call(call))
+    assert attempts == [1]
@@ -0,0 +1,50 @@
+"""Many input files through one BatchRun (commands.run_batch)."""
+
+import asyncio
+
+from conclave.commands import run_batch
+from conclave.commands.run_batch import LOG_FILE, BatchRun
+from conclave.utils.output import create_run_context
+
+
+def write_inputs(project_dir, count):
+    paths = []
+    for i in range(count):
+        path = project_dir / f"in{i}.md"
+        path.write_text(f"Plan number {i}.")
+        paths.append(str(path))
+    return paths
+
+
+def test_engine_failure_stays_with_its_file(project_dir, mock_provider, flow, monkeypatch):
+    inputs = write_inputs(project_dir, 3)
+    create = run_batch.create_flow_engine
+
+    def create_flow_engine(*args, run_id=None, **kwargs):
+        if run_id == broken:
+            raise ValueError("bad manifest")
+        return create(*args, run_id=run_id, **kwargs)
+
+    batch = BatchRun(None, flow(max_rounds=1), "basic", inputs)
+    broken = batch.items[1].run_id = "broken"
+    monkeypatch.setattr(run_batch, "create_flow_engine", create_flow_engine)
+
+    asyncio.run(batch.run([mock_provider("A"), mock_provider("B")], jobs=2))
+
+    statuses = [item.status for item in batch.items]
+    assert statuses == ["complete", "failed", "complete"]
+    assert batch.items[1].error == "ValueError: bad manifest"
+    assert BatchRun.load(batch.batch_id).items[1].status == "failed"
+
+
+def test_provider_messages_go_to_each_files_log(project_dir, mock_provider, flow, capsys):
+    inputs = write_inputs(project_dir, 2)
+    flaky = mock_provider("Flaky", error_rate=1.0, error_status=503)
+    batch = BatchRun(None, flow(max_rounds=1), "basic", inputs)
+
+    asyncio.run(batch.run([mock_provider("A"), flaky], jobs=2))
+
+    assert "retrying" not in capsys.readouterr().out
+    for item in batch.items:
+        log = (create_run_context(item.run_id).run_dir / LOG_FILE).read_text()
+        assert "Flaky: HTTP 503, retrying" in log
@@ -0,0 +1,100 @@
+"""Local token estimation, calibration and prompt fitting (core.tokens)."""
+
+import pytest
+
+from conclave.core import tokens
+from conclave.core.tokens import (
+    context_window,
+    count_prompt_tokens,
+    count_tokens,
+    fit_prompt,
+    record_usage,
+)
+from conclave.core.types import TokenConfig
+from conclave.providers.base import CompletionOptions, PromptSegment
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Start every test uncalibrated, with default settings and an empty memo."""
+    monkeypatch.setattr(tokens, "_settings", TokenConfig())
+    monkeypatch.setattr(tokens, "_calibration", {})
+    monkeypatch.setattr(tokens, "_samples", {})
+    monkeypatch.setattr(tokens, "_exact_counts", tokens.OrderedDict())
+
+
+class CountingEncoder:
+    """Stands in for a tiktoken encoding: one token per word."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode_ordinary(self, text):
+        self.calls += 1
+        return text.split()
+
+
+def test_estimates_follow_the_family_ratio():
+    text = "x" * 700
+    assert count_tokens(text, "anthropic") == 200
+    assert count_tokens(text, "openai") == 175
+    # Non-ASCII characters count a token each
+    assert count_tokens("é" * 10, "openai") == 10
+    assert count_tokens("") == 0
+
+
+def test_system_prompt_counts_toward_a_request():
+    options = CompletionOptions(system_prompt="y" * 400)
+    assert count_prompt_tokens("x" * 400, options, "openai") == 200
+
+
+def test_calibration_learns_from_reported_usage():
+    prompt = "x" * 4000  # 1,000 estimated tokens
+
+    record_usage("openai", prompt, None, 1500)
+    assert count_tokens(prompt, "openai") == 1500
+
+    record_usage("openai", prompt, None, 1000)
+    assert tokens.calibration_factors()["openai"] == {"factor": 1.4, "samples": 2}
+    # Tiny requests are mostly overhead and don't move the factor
+    record_usage("openai", "short", None, 500)
+    assert tokens.calibration_factors()["openai"]["samples"] == 2
+
+
+def test_context_windows_prefer_configured_sizes():
+    assert context_window("claude-opus-4-5", "anthropic") == 200_000
+    assert context_window("gpt-4o-mini", "openai") == 128_000
+    assert context_window("local-model", "openai") is None
+
+    tokens.configure(TokenConfig(context_windows={"gpt-4o-mini": 64_000, "openai": 32_000}))
+    assert context_window("gpt-4o-mini", "openai") == 64_000
+    assert context_window("local-model", "openai") == 32_000
+
+
+def test_fit_prompt_trims_the_largest_segment():
+    line = "Some detail about the plan.\n"
+    prompt = [PromptSegment(line * 400, cacheable=True), PromptSegment("Refine the plan.")]
+
+    fitted = fit_prompt(prompt, 1000, family="openai")
+
+    assert count_prompt_tokens(fitted, family="openai") <= 1000
+    assert fitted[0].text.endswith(tokens.TRUNCATION_MARKER) and fitted[0].cacheable
+    assert fitted[1] == prompt[1]
+    assert fit_prompt(prompt, 10_000, family="openai") is prompt
+
+
+def test_exact_counts_are_memoized_by_digest(monkeypatch):
+    encoder = CountingEncoder()
+    monkeypatch.setattr(tokens, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(tokens, "_encoder", lambda: encoder)
+    tokens.configure(TokenConfig(exact=True))
+    text = "one two three " * 100
+
+    assert count_tokens(text, "openai") == count_tokens(text, "openai") == 300
+    assert encoder.calls == 1
+    # The memo keeps fixed-size digests, not the texts it has seen
+    [key] = tokens._exact_counts
+    assert len(key) == 16
+    # Character estimates need no tokenizer
+    count_tokens(text, "anthropic")
+    assert encoder.calls == 1
@@ -0,0 +1,167 @@
+"""Span tracing of runs, rounds and provider calls (core.tracing)."""
+
+import asyncio
+import json
+
+import pytest
+
+from conclave.core import tracing
+from conclave.core.tracing import (
+    NOOP_SPAN,
+    TRACE_FILE,
+    OtlpExporter,
+    annotate,
+    record_output,
+    span,
+    trace,
+    traced_call,
+)
+from conclave.core.types import TracingConfig
+from conclave.flows import create_flow_engine
+from conclave.providers.base import Provider
+
+
+@pytest.fixture(autouse=True)
+def tracing_on(monkeypatch):
+    monkeypatch.setattr(tracing, "_settings", TracingConfig())
+    monkeypatch.setattr(tracing, "_exporter", None)
+
+
+class Echo(Provider):
+    async def generate(self, prompt, options=None):
+        return prompt
+
+    async def stream(self, prompt, options=None):
+        yield prompt
+
+
+class Collector:
+    """Stands in for the OTLP exporter, keeping the spans handed to it."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def by_name(records):
+    return {record["name"]: record for record in records}
+
+
+def test_nested_spans_share_the_trace_and_point_at_their_parent(tmp_path):
+    path = tmp_path / TRACE_FILE
+    with trace("run", path, flow="basic"):
+        with span("round", round=1):
+            annotate(peers=2)
+            with span("call"):
+                pass
+
+    records = by_name(spans(path))
+
+    # Spans are written as they finish: innermost first
+    assert [record["name"] for record in spans(path)] == ["call", "round", "run"]
+    assert len({record["trace_id"] for record in records.values()}) == 1
+    assert records["run"]["parent_id"] is None
+    assert records["round"]["parent_id"] == records["run"]["span_id"]
+    assert records["call"]["parent_id"] == records["round"]["span_id"]
+    assert records["round"]["attributes"] == {"round": 1, "peers": 2}
+    assert records["run"]["end_ns"] >= records["round"]["end_ns"]
+
+
+def test_concurrent_tasks_inherit_the_open_span(tmp_path):
+    path = tmp_path / TRACE_FILE
+
+    async def call(n):
+        with span("call", n=n):
+            await asyncio.sleep(0)
+
+    async def run():
+        with trace("run", path):
+            with span("round"):
+                await asyncio.gather(call(1), call(2))
+
+    asyncio.run(run())
+
+    records = spans(path)
+    round_id = by_name(records)["round"]["span_id"]
+    calls = [record for record in records if record["name"] == "call"]
+    assert [record["parent_id"] for record in calls] == [round_id, round_id]
+
+
+def test_an_exception_fails_its_spans(tmp_path):
+    path = tmp_path / TRACE_FILE
+    with pytest.raises(ValueError):
+        with trace("run", path):
+            with span("round"):
+                raise ValueError("boom")
+
+    records = by_name(spans(path))
+    assert records["round"]["status"] == records["run"]["status"] == "error"
+    assert "boom" in records["round"]["error"]
+
+
+def test_spans_are_no_ops_outside_a_trace(tmp_path, monkeypatch):
+    with span("round") as current:
+        annotate(peers=2)
+        assert current is NOOP_SPAN
+
+    monkeypatch.setattr(tracing, "_settings", TracingConfig(enabled=False))
+    with trace("run", tmp_path / TRACE_FILE) as root:
+        with traced_call(Echo("A"), "Hi") as call:
+            assert root is call is NOOP_SPAN
+    assert not (tmp_path / TRACE_FILE).exists()
+
+
+def test_provider_calls_record_sizes_and_fail_on_error_replies(tmp_path):
+    path = tmp_path / TRACE_FILE
+    provider = Echo("A")
+    with trace("run", path):
+        with traced_call(provider, "x" * 400, round=1) as call:
+            record_output(call, provider, "y" * 40)
+        with traced_call(provider, "x") as call:
+            record_output(call, provider, "[Error] 500")
+
+    ok, failed = spans(path)[:2]
+    assert ok["attributes"]["prompt_bytes"] == 400
+    assert ok["attributes"]["output_bytes"] == 40
+    assert ok["attributes"]["provider"] == "A" and ok["attributes"]["round"] == 1
+    assert failed["status"] == "error" and failed["error"] == "[Error] 500"
+
+
+def test_otlp_payload_encodes_spans(monkeypatch):
+    collected = Collector()
+    monkeypatch.setattr(tracing, "_exporter", collected)
+    with trace("run", None, rounds=2, flow="basic"):
+        with span("round") as current:
+            current.fail("timeout")
+
+    exporter = OtlpExporter.__new__(OtlpExporter)
+    exporter.service_name = "conclave"
+    [resource] = exporter._payload(collected.spans)["resourceSpans"]
+
+    round_span, run_span = resource["scopeSpans"][0]["spans"]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "conclave"}
+    assert round_span["parentSpanId"] == run_span["spanId"]
+    assert round_span["status"] == {"code": 2, "message": "timeout"}
+    assert "parentSpanId" not in run_span
+    assert {"key": "rounds", "value": {"intValue": "2"}} in run_span["attributes"]
+
+
+def test_runs_write_a_trace(mock_provider, flow, input_file):
+    providers = [mock_provider("A"), mock_provider("B")]
+    engine = create_flow_engine("basic", providers, flow(max_rounds=2))
+
+    asyncio.run(engine.run(str(input_file)))
+
+    records = spans(engine.run_dir / TRACE_FILE)
+    names = [record["name"] for record in records]
+    assert names[-1] == "flow.run"
+    assert names.count("round") == 2 and names.count("provider.call") == 4
+    rounds = {record["span_id"] for record in records if record["name"] == "round"}
+    calls = [record for record in records if record["name"] == "provider.call"]
+    assert all(record["parent_id"] in rounds for record in calls)
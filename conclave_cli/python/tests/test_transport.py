@@ -0,0 +1,82 @@
+"""Shared, pre-warmed HTTP connection pools (providers.transport)."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from conclave.core.types import ProviderConfig, ProviderType
+from conclave.providers import transport
+from conclave.providers.transport import (
+    close_http_clients,
+    get_http_client,
+    start_warming,
+    stop_warming,
+)
+
+CONFIG = ProviderConfig(type=ProviderType.OPENAI)
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch):
+    monkeypatch.setattr(transport, "_clients", {})
+    monkeypatch.setattr(transport, "_warmed", set())
+
+
+class LocalClient(httpx.AsyncClient):
+    """Answers every request in-process and records what was asked."""
+
+    requests: list[httpx.Request] = []
+
+    def __init__(self, **kwargs):
+        def answer(request):
+            self.requests.append(request)
+            return httpx.Response(404)
+
+        super().__init__(transport=httpx.MockTransport(answer), **kwargs)
+
+
+def test_providers_on_one_origin_share_a_pool():
+    async def run():
+        first = get_http_client("https://api.openai.com/v1", CONFIG)
+        second = get_http_client("https://api.openai.com/v2/", CONFIG)
+        other_origin = get_http_client("https://api.x.ai/v1", CONFIG)
+        smaller = get_http_client(
+            "https://api.openai.com/v1", CONFIG.model_copy(update={"max_connections": 2})
+        )
+        assert first is second
+        assert other_origin is not first and smaller is not first
+
+        await close_http_clients()
+        assert first.is_closed
+        assert get_http_client("https://api.openai.com/v1", CONFIG) is not first
+        await close_http_clients()
+
+    asyncio.run(run())
+
+
+def test_each_pool_is_warmed_once():
+    LocalClient.requests = []
+
+    async def run():
+        get_http_client("https://api.anthropic.com/v1", CONFIG, LocalClient)
+        get_http_client("https://api.openai.com/v1", CONFIG, LocalClient)
+        await start_warming()
+        await start_warming()
+        await close_http_clients()
+
+    asyncio.run(run())
+
+    warmed = sorted(str(request.url) for request in LocalClient.requests)
+    assert warmed == ["https://api.anthropic.com", "https://api.openai.com"]
+    assert {request.method for request in LocalClient.requests} == {"HEAD"}
+
+
+def test_stopping_cancels_an_unfinished_warm_up():
+    async def run():
+        warming = asyncio.create_task(asyncio.sleep(10))
+        await stop_warming(warming)
+        await stop_warming(None)
+        return warming
+
+    assert asyncio.run(run()).cancelled()
@@ -0,0 +1,87 @@
+"""Token usage and cost accounting (core.usage)."""
+
+import asyncio
+import json
+
+import pytest
+
+from conclave.core import usage
+from conclave.core.types import ModelPricing
+from conclave.core.usage import USAGE_FILE, UsageLedger, completion_cost, price_for
+from conclave.flows import create_flow_engine
+from conclave.providers.base import Completion
+
+
+@pytest.fixture(autouse=True)
+def list_prices(monkeypatch):
+    monkeypatch.setattr(usage, "_prices", dict(usage.PRICES))
+
+
+def completion(model="claude-sonnet-4-5", **tokens):
+    return Completion(text="", provider="Anthropic", model=model, **tokens)
+
+
+def test_prices_match_the_longest_model_prefix():
+    assert price_for("claude-opus-4-5-20251101").input == 5.0
+    assert price_for("claude-opus-4-1").input == 15.0
+    assert price_for("gpt-4o-mini-2024-07-18").output == 0.60
+    assert price_for("local-model") is None
+
+
+def test_cost_prices_each_kind_of_token():
+    call = completion(
+        input_tokens=1_000_000,
+        output_tokens=100_000,
+        cache_read_tokens=2_000_000,
+        cache_write_tokens=1_000_000,
+    )
+    # 3.00 input + 1.50 output + 0.60 cache reads + 3.75 cache writes
+    assert completion_cost(call) == pytest.approx(8.85)
+
+
+def test_cache_tokens_default_to_the_input_price_and_batches_are_discounted():
+    usage.configure({"house-model": ModelPricing(input=2.0, output=4.0)})
+    call = completion("house-model", input_tokens=500_000, cache_read_tokens=500_000)
+
+    assert completion_cost(call) == pytest.approx(2.0)
+    call.batch = True
+    assert completion_cost(call) == pytest.approx(1.0)
+    assert completion_cost(completion("local-model", input_tokens=10)) is None
+
+
+def test_ledger_totals_flag_unpriced_models():
+    ledger = UsageLedger()
+    ledger.record(1, [completion(input_tokens=1000, output_tokens=100)])
+    ledger.record(2, [completion("local-model", input_tokens=10, estimated=True)])
+
+    total = ledger.total()
+    assert total["calls"] == 2 and total["input_tokens"] == 1010
+    assert total["estimated_calls"] == 1
+    assert total["unpriced_models"] == ["local-model"]
+    assert total["cost_usd"] == pytest.approx(0.0045)
+
+
+def test_saved_ledger_is_loaded_back_for_a_resumed_run(tmp_path):
+    ledger = UsageLedger()
+    ledger.record(1, [completion(input_tokens=1000, output_tokens=100, finish_reason="end_turn")])
+    path = tmp_path / USAGE_FILE
+    path.write_text(json.dumps(ledger.to_dict("run")))
+
+    loaded = UsageLedger.load(path)
+
+    assert loaded.total() == ledger.total()
+    assert loaded.completions[0].finish_reason == "end_turn"
+    assert UsageLedger.load(tmp_path / "missing.json").rounds == {}
+
+
+def test_runs_record_every_call(mock_provider, flow, input_file):
+    providers = [mock_provider("A"), mock_provider("B")]
+    engine = create_flow_engine("basic", providers, flow(max_rounds=2))
+
+    asyncio.run(engine.run(str(input_file)))
+
+    saved = json.loads((engine.run_dir / USAGE_FILE).read_text())
+    assert [entry["round"] for entry in saved["rounds"]] == [1, 2]
+    assert saved["total"]["calls"] == 4
+    assert saved["total"]["output_tokens"] == 4 * 20
+    assert {entry["provider"] for entry in saved["by_provider"]} == {"A", "B"}
@@ -0,0 +1,262 @@
+"""
+Compaction of peer responses before they go into refinement prompts.
+
+Each refinement prompt of a basic flow embeds every peer's previous response,
+so a round's input grows with the square of the model count. compact_responses()
+shrinks the responses once per round, before the shared block is built, by
+running the flow's "compaction" stages in order:
+
+- "dedupe": replaces sections that are near-duplicates of a section an earlier
+  peer already wrote (MinHash similarity of word shingles) with a short note.
+- "truncate": cuts each response to max_tokens_per_peer on Markdown
+  structure, keeping whole headings, list items, paragraphs and code blocks.
+- "summarize": has a cheap model (summary_model, an instance ID among the
+  flow's models) condense responses still longer than summary_tokens.
+
+Results are memoized by content, so identical responses are compacted once.
+
+Flow config example:
+    "compaction": {"stages": ["dedupe", "truncate"], "max_tokens_per_peer": 2000}
+"""
+
+import asyncio
+import hashlib
+import heapq
+import json
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+COMPACTION_FILE = "compaction.json"
+
+# Rough size estimate; the UI has no tokenizer
+CHARS_PER_TOKEN = 4
+
+DEFAULT_STAGES = ["dedupe", "truncate"]
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+DEFAULT_MAX_TOKENS_PER_PEER = 2000
+DEFAULT_SUMMARY_TOKENS = 600
+
+SHINGLE_WORDS = 5
+SKETCH_SIZE = 256
+# Sections shorter than this are always kept; MinHash is unreliable on them
+MIN_DEDUPE_WORDS = 30
+
+MEMO_SIZE = 64
+
+_HEADING = re.compile(r"#{1,6}\s")
+_LIST_ITEM = re.compile(r"\s*(?:[-*+]|\d+[.)])\s")
+_FENCE = re.compile(r"\s*(?:```|~~~)")
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You condense proposals for expert reviewers. Keep concrete recommendations, "
+    "decisions, numbers, risks and open questions. Drop preamble, restatements of "
+    "the task and examples. Keep the Markdown headings."
+)
+
+# Summarize(prompt, max_tokens, system_prompt) -> text
+Summarizer = Callable[[str, int, str], Awaitable[str]]
+
+_memo: OrderedDict[str, dict[str, str]] = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+def split_blocks(text: str) -> list[str]:
+    """Split Markdown into headings, list items, paragraphs and fenced code blocks.
+
+    Each block keeps its trailing blank lines, so joining the blocks gives back the text.
+    """
+    blocks: list[str] = []
+    current: list[str] = []
+    fenced = False
+    after_blank = False
+    for line in text.splitlines(keepends=True):
+        if fenced:
+            current.append(line)
+            fenced = not _FENCE.match(line)
+            continue
+        if not line.strip():
+            current.append(line)
+            after_blank = True
+            continue
+        starts_block = (
+            after_blank or _HEADING.match(line) or _LIST_ITEM.match(line) or _FENCE.match(line)
+        )
+        if starts_block and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+        fenced = bool(_FENCE.match(line))
+        after_blank = False
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def split_sections(text: str) -> list[str]:
+    """Split Markdown at its headings, or at blank lines if it has none."""
+    blocks = split_blocks(text)
+    if not any(_HEADING.match(block) for block in blocks):
+        return blocks
+    sections: list[str] = []
+    for block in blocks:
+        if _HEADING.match(block) or not sections:
+            sections.append(block)
+        else:
+            sections[-1] += block
+    return sections
+
+
+def _sketch(text: str) -> set[int]:
+    """Bottom-k MinHash sketch of the text's word shingles."""
+    words = re.findall(r"\w+", text.lower())
+    shingles = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    hashes = (
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles
+    )
+    return set(heapq.nsmallest(SKETCH_SIZE, hashes))
+
+
+def _similarity(a: set[int], b: set[int]) -> float:
+    """Estimated Jaccard similarity from two sketches."""
+    union = heapq.nsmallest(SKETCH_SIZE, a | b)
+    if not union:
+        return 1.0
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+def dedupe(responses: dict[str, str], names: dict[str, str], threshold: float) -> dict[str, str]:
+    """Replace sections an earlier peer already wrote with a short note."""
+    seen: list[tuple[str, set[int]]] = []  # (instance_id, sketch) of every section kept
+    compacted = {}
+    for instance_id, text in responses.items():
+        parts = []
+        for section in split_sections(text):
+            if len(section.split()) >= MIN_DEDUPE_WORDS:
+                signature = _sketch(section)
+                duplicate_of = next(
+                    (
+                        peer for peer, other in seen
+                        if peer != instance_id and _similarity(signature, other) >= threshold
+                    ),
+                    None,
+                )
+                if duplicate_of:
+                    title = "A section"
+                    if _HEADING.match(section):
+                        title = section.splitlines()[0].lstrip("# ").strip()
+                    peer = names.get(duplicate_of, duplicate_of)
+                    parts.append(f"[{title}: omitted, near-duplicate of {peer}'s]\n\n")
+                    continue
+                seen.append((instance_id, signature))
+            parts.append(section)
+        compacted[instance_id] = "".join(parts)
+    return compacted
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens at a block boundary, noting how much was left out."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    blocks = split_blocks(text)
+    kept: list[str] = []
+    used = 0
+    for block in blocks:
+        size = estimate_tokens(block)
+        if used + size > max_tokens:
+            break
+        kept.append(block)
+        used += size
+    if not kept:
+        # A single block larger than the budget; cut it on a line break
+        cut = text.rfind("\n", 0, max_tokens * CHARS_PER_TOKEN)
+        kept = [text[:cut if cut > 0 else max_tokens * CHARS_PER_TOKEN]]
+    omitted = len(blocks) - len(kept)
+    note = f"[... {max(omitted, 1)} more block(s) omitted for length ...]"
+    return "".join(kept).rstrip() + "\n\n" + note
+
+
+async def _summarize(
+    summarize: Summarizer, name: str, text: str, summary_tokens: int
+) -> str:
+    if estimate_tokens(text) <= summary_tokens:
+        return text
+    prompt = (
+        f"Condense this proposal from {name} to at most {summary_tokens} tokens.\n\n"
+        f"[PROPOSAL]\n{text}"
+    )
+    try:
+        # Headroom so a summary that runs a little long isn't cut mid-sentence
+        summary = await summarize(prompt, summary_tokens * 2, SUMMARY_SYSTEM_PROMPT)
+    except Exception:
+        # A failed summary is no reason to fail the round; keep the text as it was
+        return text
+    return summary or text
+
+
+async def compact_responses(
+    responses: dict[str, str],
+    config: dict,
+    names: dict[str, str] | None = None,
+    summarize: Summarizer | None = None,
+) -> tuple[dict[str, str], dict]:
+    """
+    Compact a round's responses for the next round's peer block.
+
+    Args:
+        responses: instance_id -> response text, in peer-block order
+        config: The flow's "compaction" dict
+        names: instance_id -> display name, for notes about dropped sections
+        summarize: Async callable for the "summarize" stage
+
+    Returns:
+        (compacted responses, stats with estimated tokens after each stage)
+    """
+    names = names or {}
+    stages = config.get("stages", DEFAULT_STAGES)
+    key = hashlib.sha256(json.dumps([responses, config], sort_keys=True).encode()).hexdigest()
+
+    before = {instance_id: estimate_tokens(text) for instance_id, text in responses.items()}
+    stats = {"input_tokens": before, "stages": []}
+    if key in _memo:
+        compacted = _memo[key]
+        _memo.move_to_end(key)
+        stats["cached"] = True
+    else:
+        compacted = responses
+        for stage in stages:
+            if stage == "dedupe":
+                threshold = config.get("duplicate_threshold", DEFAULT_DUPLICATE_THRESHOLD)
+                compacted = dedupe(compacted, names, threshold)
+            elif stage == "truncate":
+                max_tokens = config.get("max_tokens_per_peer", DEFAULT_MAX_TOKENS_PER_PEER)
+                compacted = {i: truncate(text, max_tokens) for i, text in compacted.items()}
+            elif stage == "summarize":
+                if summarize is None:
+                    continue
+                summary_tokens = config.get("summary_tokens", DEFAULT_SUMMARY_TOKENS)
+                summaries = await asyncio.gather(*(
+                    _summarize(summarize, names.get(i, i), text, summary_tokens)
+                    for i, text in compacted.items()
+                ))
+                compacted = dict(zip(compacted, summaries))
+            else:
+                raise ValueError(f"Unknown compaction stage: {stage}")
+            stats["stages"].append({
+                "stage": stage,
+                "total": sum(estimate_tokens(text) for text in compacted.values()),
+            })
+        _memo[key] = compacted
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+    after = sum(estimate_tokens(text) for text in compacted.values())
+    stats["saved_tokens"] = sum(before.values()) - after
+    return compacted, stats
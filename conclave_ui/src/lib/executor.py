@@ -3,21 +3,36 @@ Flow execution engine with provider classes.
 
 Implements the base provider interface and concrete providers for each LLM service.
 Includes flow execution logic for basic (round-robin) and leading (hub-and-spoke) patterns.
+
+Flows run on asyncio (arun_basic_flow, arun_leading_flow, arun_leading_flow_step) using
+the providers' async SDK clients, so many flows can share one event loop. The
+run_* functions are synchronous wrappers for callers without an event loop.
 """
 
+import asyncio
+import hashlib
+import json
+import math
 import os
+import random
 import threading
+import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
 
 import anthropic
+import google.ai.generativelanguage as glm
 import google.generativeai as genai
 import openai
 
+from .compaction import COMPACTION_FILE, compact_responses
+from .scheduler import get_scheduler
+from .tracing import TRACE_FILE, span, trace
+
 
 class FlowCancelledError(Exception):
     """Raised when a flow execution is cancelled by the user."""
@@ -68,6 +83,7 @@ PROVIDER_MODELS = {
     "openai": "gpt-5.2",
     "google": "gemini-3-pro-preview",
     "xai": "grok-3",
+    "mock": "mock",
 }
 
 # Human-readable model names for display
@@ -76,6 +92,7 @@ MODEL_NAMES = {
     "openai": "GPT-5.2",
     "google": "Gemini 3 Pro",
     "xai": "Grok 3",
+    "mock": "Mock",
 }
 
 
@@ -115,6 +132,9 @@ class ModelResponse:
     error: str | None = None
     instance_id: str | None = None  # Unique identifier for this instance
     display_name: str | None = None  # Human-readable name for display
+    cache_read_tokens: int = 0  # Prompt tokens served from the provider's prompt cache
+    cache_write_tokens: int = 0  # Prompt tokens written to the provider's prompt cache
+    queue_seconds: float = 0.0  # Time spent waiting for a scheduler slot
 
 
 @dataclass
@@ -159,6 +179,7 @@ class LeadingFlowState:
     prev_responses: dict = field(default_factory=dict)  # Keyed by instance_id
     leader_synthesis: str = ""
     current_round: int = 0  # 0 = not started, increments after each round
+    tenant: str | None = None  # Owner of the run, for fair scheduling
 
     # Control flags
     is_complete: bool = False
@@ -172,6 +193,39 @@ class LeadingFlowState:
         return self.leader_instance_id
 
 
+@dataclass
+class PromptSegment:
+    """A piece of a prompt; cacheable segments are stable prefixes shared across calls."""
+
+    text: str
+    cacheable: bool = False
+
+
+# A prompt is plain text or an ordered list of segments, shared content first
+Prompt = str | list[PromptSegment]
+
+# Anthropic allows at most four cache breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+
+
+def render_prompt(prompt: Prompt) -> str:
+    """Flatten a prompt to plain text for providers without prompt caching."""
+    if isinstance(prompt, str):
+        return prompt
+    return "\n\n".join(segment.text for segment in prompt if segment.text)
+
+
+def _shares_prompt_cache(providers) -> bool:
+    """Whether two providers call the same model on the same key, and so share a prompt cache.
+
+    A prefix sent once to each provider is only read back from the cache when
+    some model gets it more than once; otherwise a breakpoint just pays the
+    cache write premium.
+    """
+    models = [(p.name, p.model, p.api_key) for p in providers]
+    return len(set(models)) < len(models)
+
+
 class BaseProvider(ABC):
     """Base class for LLM providers."""
 
@@ -188,6 +242,9 @@ class BaseProvider(ABC):
         self.timeout = timeout
         self._instance_id = instance_id
         self.default_system_prompt = default_system_prompt
+        # Async SDK clients are bound to the event loop they were created on
+        self._async_client = None
+        self._async_client_loop = None
 
     @property
     @abstractmethod
@@ -207,7 +264,7 @@ class BaseProvider(ABC):
     @abstractmethod
     def generate(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
         max_tokens: int = 2048,
         system_prompt: str | None = None,
@@ -215,13 +272,42 @@ class BaseProvider(ABC):
         """Generate a response from the model.
 
         Args:
-            prompt: The user prompt/task
+            prompt: The user prompt/task, as text or segments (shared prefix first)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
             system_prompt: Optional system instructions (for format, behavior)
         """
         pass
 
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        """Async version of generate().
+
+        Providers with an async SDK client override this; the default runs the
+        blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(
+            self.generate, prompt, temperature, max_tokens, system_prompt
+        )
+
+    @abstractmethod
+    def _create_async_client(self):
+        """Create this provider's async SDK client, for the running event loop."""
+        pass
+
+    def get_async_client(self):
+        """Get the async SDK client for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = self._create_async_client()
+            self._async_client_loop = loop
+        return self._async_client
+
 
 class AnthropicProvider(BaseProvider):
     """Anthropic Claude provider."""
@@ -246,27 +332,107 @@ class AnthropicProvider(BaseProvider):
             default_system_prompt,
         )
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.last_usage = None
 
-    def generate(
-        self,
-        prompt: str,
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-        system_prompt: str | None = None,
-    ) -> str:
+    @staticmethod
+    def _build_content(prompt: Prompt) -> str | list[dict]:
+        """Build message content, marking the last cacheable segments as breakpoints."""
+        if isinstance(prompt, str):
+            return prompt
+        segments = [segment for segment in prompt if segment.text]
+        cacheable = [i for i, segment in enumerate(segments) if segment.cacheable]
+        breakpoints = set(cacheable[-MAX_CACHE_BREAKPOINTS:])
+        blocks = []
+        for i, segment in enumerate(segments):
+            block = {"type": "text", "text": segment.text}
+            if i in breakpoints:
+                block["cache_control"] = {"type": "ephemeral"}
+            blocks.append(block)
+        return blocks
+
+    def _build_kwargs(
+        self, prompt: Prompt, max_tokens: int, system_prompt: str | None
+    ) -> dict:
         effective_system_prompt = self.get_effective_system_prompt(system_prompt)
         kwargs = {
             "model": self.model,
             "max_tokens": max_tokens,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": [{"role": "user", "content": self._build_content(prompt)}],
             "timeout": self.timeout,
         }
         if effective_system_prompt:
             kwargs["system"] = effective_system_prompt
+        return kwargs
+
+    def _create_async_client(self):
+        return anthropic.AsyncAnthropic(api_key=self.api_key)
 
+    def generate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        kwargs = self._build_kwargs(prompt, max_tokens, system_prompt)
         response = self.client.messages.create(**kwargs)
+        self.last_usage = response.usage
         return response.content[0].text
 
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        kwargs = self._build_kwargs(prompt, max_tokens, system_prompt)
+        response = await self.get_async_client().messages.create(**kwargs)
+        self.last_usage = response.usage
+        return response.content[0].text
+
+    def batch_params(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> dict:
+        """Request parameters for one entry of a Message Batch."""
+        kwargs = self._build_kwargs(prompt, max_tokens, system_prompt)
+        del kwargs["timeout"]
+        return kwargs
+
+    async def asubmit_batch(self, requests: list[tuple[str, dict]]) -> str:
+        """Submit (custom_id, params) pairs as a Message Batch and return its ID."""
+        batch = await self.get_async_client().messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests]
+        )
+        return batch.id
+
+    async def apoll_batch(self, batch_id: str) -> dict[str, tuple[str, str | None]] | None:
+        """(content, error) by custom_id once the batch has ended, else None."""
+        client = self.get_async_client()
+        batch = await client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results = {}
+        async for entry in await client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = (entry.result.message.content[0].text, None)
+            else:
+                detail = getattr(entry.result, "error", None) or entry.result.type
+                error = f"Anthropic batch request {entry.result.type}: {detail}"
+                results[entry.custom_id] = ("", error)
+        return results
+
+
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+
+# OpenAI batch statuses that mean results aren't available yet
+OPENAI_BATCH_ACTIVE_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
+
 
 def _uses_max_completion_tokens(model: str) -> bool:
     """Check if an OpenAI-compatible model uses max_completion_tokens instead of max_tokens.
@@ -302,18 +468,14 @@ class OpenAIProvider(BaseProvider):
         )
         self.client = openai.OpenAI(api_key=api_key, timeout=timeout)
 
-    def generate(
-        self,
-        prompt: str,
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-        system_prompt: str | None = None,
-    ) -> str:
+    def _build_kwargs(
+        self, prompt: Prompt, temperature: float, max_tokens: int, system_prompt: str | None
+    ) -> dict:
         effective_system_prompt = self.get_effective_system_prompt(system_prompt)
         messages = []
         if effective_system_prompt:
             messages.append({"role": "system", "content": effective_system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "user", "content": render_prompt(prompt)})
 
         kwargs = {
             "model": self.model,
@@ -324,10 +486,141 @@ class OpenAIProvider(BaseProvider):
             kwargs["max_completion_tokens"] = max_tokens
         else:
             kwargs["max_tokens"] = max_tokens
+        return kwargs
+
+    def _create_async_client(self):
+        return openai.AsyncOpenAI(api_key=self.api_key, timeout=self.timeout)
 
+    def generate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        kwargs = self._build_kwargs(prompt, temperature, max_tokens, system_prompt)
         response = self.client.chat.completions.create(**kwargs)
         return response.choices[0].message.content
 
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        kwargs = self._build_kwargs(prompt, temperature, max_tokens, system_prompt)
+        response = await self.get_async_client().chat.completions.create(**kwargs)
+        return response.choices[0].message.content
+
+    def batch_params(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> dict:
+        """Request body for one line of a Batch API input file."""
+        return self._build_kwargs(prompt, temperature, max_tokens, system_prompt)
+
+    async def asubmit_batch(self, requests: list[tuple[str, dict]]) -> str:
+        """Upload (custom_id, body) pairs as a Batch API input file and return the batch ID."""
+        client = self.get_async_client()
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": OPENAI_BATCH_ENDPOINT,
+                "body": body,
+            })
+            for custom_id, body in requests
+        ]
+        input_file = await client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=OPENAI_BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def apoll_batch(self, batch_id: str) -> dict[str, tuple[str, str | None]] | None:
+        """(content, error) by custom_id once the batch has finished, else None."""
+        client = self.get_async_client()
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in OPENAI_BATCH_ACTIVE_STATUSES:
+            return None
+
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if response.get("status_code") == 200:
+                    message = response["body"]["choices"][0]["message"]
+                    results[entry["custom_id"]] = (message.get("content") or "", None)
+                else:
+                    detail = entry.get("error") or response.get("body")
+                    results[entry["custom_id"]] = ("", f"OpenAI batch request failed: {detail}")
+        return results
+
+
+# Gemini clients, one per API key. genai.configure() is process-global, so
+# runs on different keys (BYOK) each get their own client instead of sharing it.
+_gemini_clients: dict[str, "glm.GenerativeServiceClient"] = {}
+# Bounded LRU of Gemini model handles shared by all GeminiProvider instances,
+# keyed by (API key hash, model name, system instruction)
+GEMINI_MODEL_CACHE_SIZE = 32
+_gemini_models: OrderedDict[tuple[str, str, str | None], "genai.GenerativeModel"] = OrderedDict()
+_gemini_lock = threading.Lock()
+
+
+def _gemini_key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def _get_gemini_client(api_key: str) -> "glm.GenerativeServiceClient":
+    """Get the client for an API key, creating it on first use."""
+    key_hash = _gemini_key_hash(api_key)
+    with _gemini_lock:
+        gemini_client = _gemini_clients.get(key_hash)
+        if gemini_client is None:
+            gemini_client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            _gemini_clients[key_hash] = gemini_client
+    return gemini_client
+
+
+def _get_gemini_model(
+    api_key: str, model_name: str, system_instruction: str | None
+) -> "genai.GenerativeModel":
+    """Get a cached model handle bound to the key's client, building it on first use."""
+    key = (_gemini_key_hash(api_key), model_name, system_instruction)
+    with _gemini_lock:
+        model = _gemini_models.get(key)
+        if model is not None:
+            _gemini_models.move_to_end(key)
+            return model
+
+    model_kwargs = {}
+    if system_instruction:
+        model_kwargs["system_instruction"] = system_instruction
+    model = genai.GenerativeModel(model_name, **model_kwargs)
+    # A handle otherwise takes the globally configured client on its first call
+    model._client = _get_gemini_client(api_key)
+
+    with _gemini_lock:
+        _gemini_models[key] = model
+        _gemini_models.move_to_end(key)
+        while len(_gemini_models) > GEMINI_MODEL_CACHE_SIZE:
+            _gemini_models.popitem(last=False)
+    return model
+
 
 class GeminiProvider(BaseProvider):
     """Google Gemini provider."""
@@ -351,35 +644,70 @@ class GeminiProvider(BaseProvider):
             instance_id,
             default_system_prompt,
         )
-        genai.configure(api_key=api_key)
         self._model_name = self.model
+        # Generation configs reused across calls, keyed by (temperature, max_tokens)
+        self._generation_configs: dict[tuple[float, int], "genai.types.GenerationConfig"] = {}
+
+    def _get_generation_config(
+        self, temperature: float, max_tokens: int
+    ) -> "genai.types.GenerationConfig":
+        key = (temperature, max_tokens)
+        config = self._generation_configs.get(key)
+        if config is None:
+            config = genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+            )
+            self._generation_configs[key] = config
+        return config
+
+    def _create_async_client(self):
+        # Not the SDK's default async client: that one is process-global and stays
+        # bound to the event loop of its first call
+        return glm.GenerativeServiceAsyncClient(client_options={"api_key": self.api_key})
 
     def generate(
         self,
-        prompt: str,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        effective_system_prompt = self.get_effective_system_prompt(system_prompt)
+        # Model handles are cached per (key, model, system instruction) across calls and runs
+        model_instance = _get_gemini_model(self.api_key, self._model_name, effective_system_prompt)
+
+        response = model_instance.generate_content(
+            render_prompt(prompt),
+            generation_config=self._get_generation_config(temperature, max_tokens),
+        )
+        return response.text
+
+    async def agenerate(
+        self,
+        prompt: Prompt,
         temperature: float = 0.7,
         max_tokens: int = 2048,
         system_prompt: str | None = None,
     ) -> str:
         effective_system_prompt = self.get_effective_system_prompt(system_prompt)
-        # Create model instance with optional system instruction
         model_kwargs = {}
         if effective_system_prompt:
             model_kwargs["system_instruction"] = effective_system_prompt
-
+        # Handles are cheap to build; the cached ones keep the blocking client
         model_instance = genai.GenerativeModel(self._model_name, **model_kwargs)
+        model_instance._async_client = self.get_async_client()
 
-        generation_config = genai.types.GenerationConfig(
-            temperature=temperature,
-            max_output_tokens=max_tokens,
-        )
-        response = model_instance.generate_content(
-            prompt,
-            generation_config=generation_config,
+        response = await model_instance.generate_content_async(
+            render_prompt(prompt),
+            generation_config=self._get_generation_config(temperature, max_tokens),
         )
         return response.text
 
 
+XAI_BASE_URL = "https://api.x.ai/v1"
+
+
 class GrokProvider(BaseProvider):
     """xAI Grok provider (uses OpenAI-compatible API)."""
 
@@ -404,32 +732,163 @@ class GrokProvider(BaseProvider):
         )
         self.client = openai.OpenAI(
             api_key=api_key,
-            base_url="https://api.x.ai/v1",
+            base_url=XAI_BASE_URL,
             timeout=timeout,
         )
 
+    def _build_kwargs(
+        self, prompt: Prompt, temperature: float, max_tokens: int, system_prompt: str | None
+    ) -> dict:
+        effective_system_prompt = self.get_effective_system_prompt(system_prompt)
+        messages = []
+        if effective_system_prompt:
+            messages.append({"role": "system", "content": effective_system_prompt})
+        messages.append({"role": "user", "content": render_prompt(prompt)})
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": messages,
+        }
+
+    def _create_async_client(self):
+        return openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=XAI_BASE_URL,
+            timeout=self.timeout,
+        )
+
     def generate(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
         max_tokens: int = 2048,
         system_prompt: str | None = None,
     ) -> str:
-        effective_system_prompt = self.get_effective_system_prompt(system_prompt)
-        messages = []
-        if effective_system_prompt:
-            messages.append({"role": "system", "content": effective_system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        kwargs = self._build_kwargs(prompt, temperature, max_tokens, system_prompt)
+        response = self.client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            messages=messages,
-        )
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        kwargs = self._build_kwargs(prompt, temperature, max_tokens, system_prompt)
+        response = await self.get_async_client().chat.completions.create(**kwargs)
         return response.choices[0].message.content
 
 
+# Vocabulary of the mock provider's synthetic replies
+MOCK_WORDS = (
+    "the plan should address latency throughput cost and reliability before "
+    "adding features each component owns its state and failures are retried "
+    "with backoff while results are cached where inputs repeat consider the "
+    "tradeoffs between consistency and availability measure first then optimize "
+    "the critical path review peer proposals and keep the strongest ideas"
+).split()
+
+
+@dataclass
+class MockSettings:
+    """Simulated behaviour of a mock provider (the "mock" section of the config)."""
+
+    response_tokens: int = 400  # Length of the synthetic reply (capped by max_tokens)
+    latency: str = "lognormal"  # Time-to-first-token distribution: fixed, lognormal or pareto
+    latency_ms: float = 800.0  # Fixed value, or median for lognormal/pareto
+    latency_sigma: float = 0.5  # Spread of the lognormal distribution
+    pareto_alpha: float = 1.5  # Tail index of the pareto distribution (lower = heavier tail)
+    max_latency_ms: float = 60_000.0  # Cap on any single draw
+    tokens_per_second: float = 80.0  # Generation rate after the first token (0 = instant)
+    error_rate: float = 0.0  # Probability a call fails
+    seed: int | None = None  # Fix for reproducible latencies, errors and text
+
+
+class MockProviderError(Exception):
+    """Failure injected by a mock provider."""
+    pass
+
+
+class MockProvider(BaseProvider):
+    """Provider that simulates latency and errors without API calls, for benchmarking."""
+
+    @property
+    def name(self) -> str:
+        return "mock"
+
+    def __init__(
+        self,
+        api_key: str = "",
+        model: str | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        instance_id: str | None = None,
+        default_system_prompt: str | None = None,
+        settings: MockSettings | None = None,
+    ):
+        super().__init__(
+            api_key,
+            model or PROVIDER_MODELS["mock"],
+            timeout,
+            instance_id,
+            default_system_prompt,
+        )
+        self.settings = settings or MockSettings()
+        self.rng = random.Random(self.settings.seed)
+
+    def _sample_latency(self) -> float:
+        """Time-to-first-token (seconds) from the configured distribution."""
+        settings = self.settings
+        if settings.latency == "lognormal":
+            ms = self.rng.lognormvariate(math.log(settings.latency_ms), settings.latency_sigma)
+        elif settings.latency == "pareto":
+            # Scale so the median matches latency_ms; the tail follows pareto_alpha
+            scale = settings.latency_ms / 2 ** (1 / settings.pareto_alpha)
+            ms = scale * self.rng.paretovariate(settings.pareto_alpha)
+        else:
+            ms = settings.latency_ms
+        return min(ms, settings.max_latency_ms) / 1000
+
+    def _create_async_client(self):
+        # Calls are simulated, so there is no SDK client to bind to a loop
+        return None
+
+    def _plan(self, max_tokens: int) -> tuple[float, str]:
+        """Draw the total response time and the reply text for one call."""
+        tokens = min(self.settings.response_tokens, max_tokens)
+        delay = self._sample_latency()
+        if self.settings.tokens_per_second > 0:
+            delay += tokens / self.settings.tokens_per_second
+        if self.rng.random() < self.settings.error_rate:
+            raise MockProviderError("Mock provider injected a failure")
+        words = [self.rng.choice(MOCK_WORDS) for _ in range(tokens)]
+        paragraphs = [" ".join(words[i:i + 40]) for i in range(0, tokens, 40)]
+        return delay, "## Response\n\n" + "\n\n".join(paragraphs)
+
+    def generate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        delay, text = self._plan(max_tokens)
+        time.sleep(delay)
+        return text
+
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        delay, text = self._plan(max_tokens)
+        await asyncio.sleep(delay)
+        return text
+
+
 def convert_legacy_models(models: list[str]) -> list[ModelInstance]:
     """Convert old-style model list to ModelInstance list.
 
@@ -451,7 +910,9 @@ def convert_legacy_models(models: list[str]) -> list[ModelInstance]:
 
 
 def create_providers(
-    api_keys: dict, models: list[str] | list[ModelInstance]
+    api_keys: dict,
+    models: list[str] | list[ModelInstance],
+    mock_settings: MockSettings | dict | None = None,
 ) -> dict[str, BaseProvider]:
     """
     Create provider instances for requested models.
@@ -462,6 +923,8 @@ def create_providers(
     Args:
         api_keys: Dict of provider -> api_key
         models: List of model names (legacy) or ModelInstance objects (new)
+        mock_settings: Behaviour of "mock" instances (a MockSettings, or the
+            "mock" section of the config as a dict)
 
     Returns:
         Dict of instance_id -> provider_instance
@@ -497,8 +960,20 @@ def create_providers(
         "xai": GrokProvider,
     }
 
+    if isinstance(mock_settings, dict):
+        mock_settings = MockSettings(**mock_settings)
+
     providers = {}
     for instance in model_instances:
+        # Mock instances need no API key
+        if instance.provider == "mock":
+            providers[instance.instance_id] = MockProvider(
+                instance_id=instance.instance_id,
+                default_system_prompt=instance.system_prompt,
+                settings=mock_settings,
+            )
+            continue
+
         if instance.provider not in provider_classes:
             raise ValueError(f"Unknown provider: {instance.provider}")
 
@@ -517,16 +992,18 @@ def create_providers(
     return providers
 
 
-def _call_provider(
+async def _call_provider(
     provider: BaseProvider,
-    prompt: str,
+    prompt: Prompt,
     temperature: float = 0.7,
     max_tokens: int = 2048,
     system_prompt: str | None = None,
     instance_id: str | None = None,
     display_name: str | None = None,
+    run_id: str | None = None,
+    tenant: str | None = None,
 ) -> ModelResponse:
-    """Call a provider and return response with error handling.
+    """Call a provider asynchronously and return response with error handling.
 
     Args:
         provider: The provider to call
@@ -536,6 +1013,8 @@ def _call_provider(
         system_prompt: Optional system prompt
         instance_id: Unique identifier for this instance (for tracking)
         display_name: Human-readable name for display
+        run_id: Flow run the call belongs to (for fair scheduling)
+        tenant: User or account the run belongs to (for fair scheduling)
 
     Returns:
         ModelResponse with instance metadata
@@ -544,13 +1023,67 @@ def _call_provider(
     effective_instance_id = instance_id or provider.instance_id
     effective_display_name = display_name or MODEL_NAMES.get(provider.name, provider.name.title())
 
+    with span(
+        "provider.call",
+        provider=provider.name,
+        model=provider.model,
+        instance_id=effective_instance_id,
+        prompt_bytes=len(render_prompt(prompt).encode()),
+    ) as call:
+        response = await _send_to_provider(
+            provider,
+            prompt,
+            temperature,
+            max_tokens,
+            system_prompt,
+            effective_instance_id,
+            effective_display_name,
+            run_id,
+            tenant,
+        )
+        call.set(
+            output_bytes=len(response.content.encode()),
+            queue_seconds=response.queue_seconds,
+            cache_read_tokens=response.cache_read_tokens,
+            cache_write_tokens=response.cache_write_tokens,
+        )
+        usage = getattr(provider, "last_usage", None)
+        if usage is not None and not response.error:
+            call.set(
+                input_tokens=getattr(usage, "input_tokens", None),
+                output_tokens=getattr(usage, "output_tokens", None),
+            )
+        if response.error:
+            call.fail(response.error)
+        return response
+
+
+async def _send_to_provider(
+    provider: BaseProvider,
+    prompt: Prompt,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str | None,
+    effective_instance_id: str,
+    effective_display_name: str,
+    run_id: str | None,
+    tenant: str | None,
+) -> ModelResponse:
+    """Send one call through the scheduler, mapping SDK errors to error responses."""
     try:
-        content = provider.generate(prompt, temperature, max_tokens, system_prompt)
+        # Every call waits for a slot in the process-wide scheduler
+        scheduler = get_scheduler()
+        async with scheduler.slot(provider.name, run_id or effective_instance_id, tenant) as queued:
+            content = await provider.agenerate(prompt, temperature, max_tokens, system_prompt)
+        usage = getattr(provider, "last_usage", None)
         return ModelResponse(
             provider=provider.name,
             content=content,
             instance_id=effective_instance_id,
             display_name=effective_display_name,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+            queue_seconds=queued,
         )
     except anthropic.APIConnectionError:
         return ModelResponse(
@@ -666,16 +1199,190 @@ timestamp: {timestamp}
 """
 
     # Write file
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(header)
-        f.write(content)
+    with span("file.write", path=str(filepath), bytes=len((header + content).encode())):
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(header)
+            f.write(content)
 
 
-def run_basic_flow(
+# Batch mode: progress of a batch run, so it can be resumed from its run directory
+BATCH_CHECKPOINT_FILE = "batch_checkpoint.json"
+
+# Seconds between batch status checks, and how long to wait for a round's batches
+BATCH_POLL_INTERVAL = 30.0
+BATCH_MAX_WAIT = 24 * 3600.0
+
+
+def _load_batch_checkpoint(run_dir: Path) -> dict:
+    path = run_dir / BATCH_CHECKPOINT_FILE
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"rounds": {}}
+
+
+def _save_batch_checkpoint(run_dir: Path, checkpoint: dict) -> None:
+    """Write the checkpoint atomically so an interrupted run never leaves it half-written."""
+    path = run_dir / BATCH_CHECKPOINT_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _batch_group(provider: BaseProvider) -> tuple[str, str, str | None] | None:
+    """Instances that can share one batch (same API, key and model), or None without a batch API."""
+    if not hasattr(provider, "asubmit_batch"):
+        return None
+    return (provider.name, provider.api_key, provider.model)
+
+
+async def _run_batch_round(
+    round_num: int,
+    providers: dict[str, BaseProvider],
+    model_prompts: dict[str, Prompt],
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str | None,
+    display_names: dict[str, str],
+    run_dir: Path,
+    checkpoint: dict,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    tenant: str | None = None,
+) -> list[ModelResponse]:
+    """Run one round through provider batch APIs.
+
+    Instances of the same provider, key and model share a batch. Providers
+    without a batch API are called directly while the batches are processed.
+    Batch IDs and finished outputs are checkpointed as they happen, so a
+    resumed run picks up in-flight batches instead of resubmitting them.
+    """
+    state = checkpoint["rounds"].setdefault(str(round_num), {"batches": [], "outputs": {}})
+    responses: list[ModelResponse] = []
+
+    def finish(instance_id: str, content: str, error: str | None = None) -> None:
+        provider = providers[instance_id]
+        responses.append(ModelResponse(
+            provider=provider.name,
+            content=content,
+            error=error,
+            instance_id=instance_id,
+            display_name=display_names.get(instance_id),
+        ))
+        # Failures aren't checkpointed, so a resumed run retries them
+        if not error:
+            state["outputs"][instance_id] = content
+            _save_batch_checkpoint(run_dir, checkpoint)
+
+    for instance_id, content in state["outputs"].items():
+        if instance_id in providers:
+            finish(instance_id, content)
+
+    in_flight = {
+        i
+        for batch in state["batches"]
+        if not batch.get("ended")
+        for i in batch["requests"].values()
+    }
+    groups: dict[tuple, list[str]] = {}
+    direct: list[str] = []
+    for instance_id, provider in providers.items():
+        if instance_id in state["outputs"] or instance_id in in_flight:
+            continue
+        group = _batch_group(provider)
+        if group is None:
+            direct.append(instance_id)
+        else:
+            groups.setdefault(group, []).append(instance_id)
+
+    # Submit one batch per group; custom IDs are positional because batch APIs
+    # only accept [a-zA-Z0-9_-] and instance IDs are free-form
+    for instance_ids in groups.values():
+        provider = providers[instance_ids[0]]
+        index = len(state["batches"])
+        requests = {f"round-{round_num}-{index}-{n}": i for n, i in enumerate(instance_ids)}
+        try:
+            batch_id = await provider.asubmit_batch([
+                (
+                    custom_id,
+                    providers[i].batch_params(
+                        model_prompts[i], temperature, max_tokens, system_prompt
+                    ),
+                )
+                for custom_id, i in requests.items()
+            ])
+        except Exception:
+            # The batch API is an optimization; fall back to regular calls
+            direct.extend(instance_ids)
+            continue
+        state["batches"].append({"id": batch_id, "instance": instance_ids[0], "requests": requests})
+        _save_batch_checkpoint(run_dir, checkpoint)
+
+    async def call_direct(instance_id: str) -> None:
+        response = await _call_provider(
+            providers[instance_id],
+            model_prompts[instance_id],
+            temperature,
+            max_tokens,
+            system_prompt,
+            instance_id,
+            display_names.get(instance_id),
+            run_id=run_dir.name,
+            tenant=tenant,
+        )
+        finish(instance_id, response.content, response.error)
+
+    def poller(batch: dict) -> BaseProvider | None:
+        """An instance of this run that can poll the batch (all of its group share a key)."""
+        return next((providers[i] for i in batch["requests"].values() if i in providers), None)
+
+    async def poll_batches() -> None:
+        # Instances dropped from the run since a batch was submitted are skipped on resume
+        waiting = [
+            batch
+            for batch in state["batches"]
+            if not batch.get("ended") and poller(batch) is not None
+        ]
+        deadline = asyncio.get_running_loop().time() + BATCH_MAX_WAIT
+        while waiting:
+            if is_cancelled():
+                # Batch IDs are checkpointed; resuming the run picks them up again
+                raise FlowCancelledError("Flow cancelled by user")
+            for batch in list(waiting):
+                try:
+                    results = await poller(batch).apoll_batch(batch["id"])
+                except Exception:
+                    # Transient polling failures are retried on the next pass
+                    continue
+                if results is None:
+                    continue
+                batch["ended"] = True
+                for custom_id, instance_id in batch["requests"].items():
+                    if instance_id not in providers:
+                        continue
+                    content, error = results.get(custom_id, ("", "Batch ended without a result"))
+                    finish(instance_id, content, error)
+                _save_batch_checkpoint(run_dir, checkpoint)
+                waiting.remove(batch)
+            if waiting and asyncio.get_running_loop().time() > deadline:
+                for batch in waiting:
+                    for instance_id in batch["requests"].values():
+                        if instance_id in providers:
+                            finish(instance_id, "", "Batch did not finish in time")
+                return
+            if waiting:
+                await asyncio.sleep(poll_interval)
+
+    await asyncio.gather(poll_batches(), *(call_direct(i) for i in direct))
+    return responses
+
+
+async def arun_basic_flow(
     flow: dict,
     task_prompt: str,
     providers: dict[str, BaseProvider],
     progress_callback: Callable[[int, str], None] | None = None,
+    tenant: str | None = None,
+    batch: bool | None = None,
+    resume_dir: str | Path | None = None,
 ) -> FlowResults:
     """
     Execute a basic (round-robin) flow.
@@ -688,9 +1395,17 @@ def run_basic_flow(
         task_prompt: User's task/question to send to models
         providers: Dict of instance_id -> provider_instance
         progress_callback: Optional callback(round_number, status_message)
+        tenant: Optional owner of the run, so concurrent users share capacity fairly
+        batch: Send rounds through provider batch APIs (cheaper, slower);
+            defaults to the flow's "batch" setting
+        resume_dir: Output directory of an interrupted batch run to resume
 
     Returns:
         FlowResults with all rounds
+
+    With a "compaction" dict in the flow config, peer responses are
+    deduplicated, truncated or summarized once per round before they go into
+    the refinement prompts (see compaction.py); stats go to compaction.json.
     """
     flow_name = flow.get("name", "Unnamed")
     results = FlowResults(
@@ -698,10 +1413,19 @@ def run_basic_flow(
         flow_type="basic",
     )
 
-    # Create output directory for this run
-    run_dir = _create_run_directory(flow_name)
+    # Create output directory for this run, or reuse the one being resumed
+    if resume_dir:
+        run_dir = Path(resume_dir)
+    else:
+        run_dir = _create_run_directory(flow_name)
     results.output_dir = str(run_dir)
 
+    if batch is None:
+        batch = flow.get("batch", False)
+    batch = batch or resume_dir is not None
+    checkpoint = _load_batch_checkpoint(run_dir) if batch else None
+    poll_interval = flow.get("batch_poll_interval", BATCH_POLL_INTERVAL)
+
     max_rounds = flow.get("max_rounds", 2)
     temperature = flow.get("temperature", 0.7)
     max_tokens = flow.get("max_tokens", 2048)
@@ -717,72 +1441,122 @@ def run_basic_flow(
     for instance_id, provider in providers.items():
         display_names[instance_id] = MODEL_NAMES.get(provider.name, provider.name.title())
 
-    for round_num in range(1, max_rounds + 1):
-        # Check for cancellation before each round
-        if is_cancelled():
-            raise FlowCancelledError("Flow cancelled by user")
+    compaction = flow.get("compaction")
+    compaction_log: list[dict] = []
+    summarize = None
+    if compaction and compaction.get("summary_model") in providers:
+        summary_provider = providers[compaction["summary_model"]]
 
-        if progress_callback:
-            progress_callback(round_num, f"Round {round_num}: Processing...")
+        async def summarize(prompt: str, max_tokens: int, system_prompt: str) -> str:
+            return await summary_provider.agenerate(prompt, 0.3, max_tokens, system_prompt)
 
-        round_result = RoundResult(round_number=round_num)
+    with trace(
+        "flow.run",
+        run_dir / TRACE_FILE,
+        flow=flow_name,
+        flow_type="basic",
+        run_id=run_dir.name,
+        models=list(providers),
+        batch=batch,
+    ):
+        for round_num in range(1, max_rounds + 1):
+            # Check for cancellation before each round
+            if is_cancelled():
+                raise FlowCancelledError("Flow cancelled by user")
 
-        # Build prompts for this round (keyed by instance_id)
-        if round_num == 1:
-            # First round: initial prompt + task
-            base_prompt = prompts.get("round_1", "Please respond to the following task:")
-            model_prompts = {
-                instance_id: f"{base_prompt}\n\n{task_prompt}"
-                for instance_id in providers.keys()
-            }
-        else:
-            # Refinement rounds: include peer responses
-            refinement_prompt = prompts.get(
-                "refinement",
-                "Review peer responses and refine your answer:",
-            )
+            if progress_callback:
+                progress_callback(round_num, f"Round {round_num}: Processing...")
+
+            round_result = RoundResult(round_number=round_num)
 
-            model_prompts = {}
-            for instance_id in providers.keys():
-                # Gather peer responses using display names
-                peer_outputs = []
-                for peer_id, peer_response in prev_responses.items():
-                    if peer_id != instance_id:
-                        peer_display = display_names.get(peer_id, peer_id)
-                        peer_outputs.append(f"**{peer_display}:**\n{peer_response}")
+            # Peer responses as they go into this round's prompts, in a fixed order
+            peer_responses = {
+                peer_id: prev_responses[peer_id]
+                for peer_id in providers
+                if peer_id in prev_responses
+            }
+            if compaction and peer_responses:
+                with span("compaction", round=round_num, peers=len(peer_responses)) as compacting:
+                    peer_responses, stats = await compact_responses(
+                        peer_responses, compaction, display_names, summarize
+                    )
+                    compacting.set(saved_tokens=stats["saved_tokens"])
+                compaction_log.append({"round": round_num, **stats})
+                (run_dir / COMPACTION_FILE).write_text(
+                    json.dumps({"rounds": compaction_log}, indent=2), encoding="utf-8"
+                )
 
-                model_prompts[instance_id] = f"""{refinement_prompt}
+            with span("prompt.build", round=round_num):
+                # Build prompts for this round (keyed by instance_id)
+                if round_num == 1:
+                    # First round: initial prompt + task
+                    base_prompt = prompts.get("round_1", "Please respond to the following task:")
+                    shared = [
+                        PromptSegment(
+                            f"{base_prompt}\n\n{task_prompt}",
+                            cacheable=_shares_prompt_cache(providers.values()),
+                        )
+                    ]
+                    model_prompts = {instance_id: shared for instance_id in providers.keys()}
+                else:
+                    # Refinement rounds: include peer responses
+                    refinement_prompt = prompts.get(
+                        "refinement",
+                        "Review peer responses and refine your answer:",
+                    )
 
-**Your previous response:**
-{prev_responses.get(instance_id, "(none)")}
+                    cacheable = _shares_prompt_cache(providers.values())
 
-**Peer responses:**
-{chr(10).join(peer_outputs)}
+                    def responses_block(exclude: str | None = None) -> PromptSegment:
+                        outputs = [
+                            f"**{display_names.get(peer_id, peer_id)} [{peer_id}]:**\n{response}"
+                            for peer_id, response in peer_responses.items()
+                            if peer_id != exclude
+                        ]
+                        heading = "All responses" if exclude is None else "Peer responses"
+                        return PromptSegment(
+                            f"""{refinement_prompt}
 
 **Task reminder:**
 {task_prompt}
 
-Please provide your refined response:"""
-
-        # Execute all providers in parallel
-        with ThreadPoolExecutor(max_workers=len(providers)) as executor:
-            futures = {
-                executor.submit(
-                    _call_provider,
-                    provider,
-                    model_prompts[instance_id],
-                    temperature,
-                    max_tokens,
-                    system_prompt,
-                    instance_id,  # Pass instance_id
-                    display_names.get(instance_id),  # Pass display_name
-                ): instance_id
-                for instance_id, provider in providers.items()
-            }
+**{heading}:**
+{chr(10).join(outputs)}""",
+                            cacheable=exclude is None,
+                        )
 
-            for future in as_completed(futures):
-                instance_id = futures[future]  # Get instance_id from our mapping
-                response = future.result()
+                    # Where a model is called more than once, every response in a fixed
+                    # order leads as one cached prefix and only the short tail differs per
+                    # model; otherwise each model is sent only its peers' responses
+                    shared = responses_block() if cacheable else None
+
+                    model_prompts = {}
+                    for instance_id in providers.keys():
+                        own_response = prev_responses.get(instance_id)
+                        if own_response is None:
+                            own = "Your previous response: (none)"
+                        elif shared is None:
+                            own = f"Your previous response:\n{own_response}"
+                        elif peer_responses.get(instance_id) == own_response:
+                            own = (
+                                "Your previous response is the one from "
+                                f"{display_names.get(instance_id, instance_id)} [{instance_id}] "
+                                "above; the others are your peers'."
+                            )
+                        else:
+                            # In full: the copy above was compacted
+                            own = (
+                                "Your previous response, in full "
+                                "(the others above are your peers'):"
+                                f"\n{own_response}"
+                            )
+                        model_prompts[instance_id] = [
+                            shared or responses_block(exclude=instance_id),
+                            PromptSegment(f"{own}\n\nPlease provide your refined response:"),
+                        ]
+
+            def record(response: ModelResponse) -> None:
+                instance_id = response.instance_id
                 round_result.responses.append(response)
                 # Store for next round and save to file (keyed by instance_id)
                 if not response.error:
@@ -797,16 +1571,68 @@ Please provide your refined response:"""
                         display_name=display_names.get(instance_id),
                     )
 
-        results.rounds.append(round_result)
+            with span("round", round=round_num, calls=len(providers), batch=batch):
+                # Execute all providers in parallel
+                if batch:
+                    batch_responses = await _run_batch_round(
+                        round_num,
+                        providers,
+                        model_prompts,
+                        temperature,
+                        max_tokens,
+                        system_prompt,
+                        display_names,
+                        run_dir,
+                        checkpoint,
+                        poll_interval,
+                        tenant,
+                    )
+                    for response in batch_responses:
+                        record(response)
+                else:
+                    calls = [
+                        _call_provider(
+                            provider,
+                            model_prompts[instance_id],
+                            temperature,
+                            max_tokens,
+                            system_prompt,
+                            instance_id,  # Pass instance_id
+                            display_names.get(instance_id),  # Pass display_name
+                            run_id=run_dir.name,
+                            tenant=tenant,
+                        )
+                        for instance_id, provider in providers.items()
+                    ]
+                    for call in asyncio.as_completed(calls):
+                        record(await call)
+
+            results.rounds.append(round_result)
 
     return results
 
 
-def run_leading_flow(
+def run_basic_flow(
     flow: dict,
     task_prompt: str,
     providers: dict[str, BaseProvider],
     progress_callback: Callable[[int, str], None] | None = None,
+    tenant: str | None = None,
+    batch: bool | None = None,
+    resume_dir: str | Path | None = None,
+) -> FlowResults:
+    """Synchronous wrapper around arun_basic_flow() for callers without an event loop."""
+    return asyncio.run(arun_basic_flow(
+        flow, task_prompt, providers, progress_callback, tenant, batch, resume_dir
+    ))
+
+
+async def arun_leading_flow(
+    flow: dict,
+    task_prompt: str,
+    providers: dict[str, BaseProvider],
+    progress_callback: Callable[[int, str], None] | None = None,
+    tenant: str | None = None,
 ) -> FlowResults:
     """
     Execute a leading (hub-and-spoke) flow.
@@ -818,6 +1644,7 @@ def run_leading_flow(
         task_prompt: User's task/question to send to models
         providers: Dict of instance_id -> provider_instance
         progress_callback: Optional callback(round_number, status_message)
+        tenant: Optional owner of the run, so concurrent users share capacity fairly
 
     Returns:
         FlowResults with all rounds and final synthesis
@@ -857,65 +1684,80 @@ def run_leading_flow(
     prev_responses: dict[str, str] = {}
     leader_synthesis = ""
 
-    for round_num in range(1, max_rounds + 1):
-        # Check for cancellation before each round
-        if is_cancelled():
-            raise FlowCancelledError("Flow cancelled by user")
-
-        if progress_callback:
-            progress_callback(round_num, f"Round {round_num}: Processing...")
-
-        round_result = RoundResult(round_number=round_num)
-
-        if round_num == 1:
-            # Round 1: All ideate independently (including leader)
-            base_prompt = prompts.get("round_1", "Please respond to the following task:")
-            full_prompt = f"{base_prompt}\n\n{task_prompt}"
-
-            with ThreadPoolExecutor(max_workers=len(providers)) as executor:
-                futures = {
-                    executor.submit(
-                        _call_provider,
-                        provider,
-                        full_prompt,
-                        temperature,
-                        max_tokens,
-                        system_prompt,
-                        instance_id,  # Pass instance_id
-                        display_names.get(instance_id),  # Pass display_name
-                    ): instance_id
-                    for instance_id, provider in providers.items()
-                }
-
-                for future in as_completed(futures):
-                    instance_id = futures[future]  # Get instance_id from our mapping
-                    response = future.result()
-                    round_result.responses.append(response)
-                    if not response.error:
-                        prev_responses[instance_id] = response.content
-                        _save_response_to_file(
-                            run_dir,
-                            round_num,
-                            instance_id,
-                            response.content,
-                            task_prompt,
-                            display_name=display_names.get(instance_id),
+    with trace(
+        "flow.run",
+        run_dir / TRACE_FILE,
+        flow=flow_name,
+        flow_type="leading",
+        run_id=run_dir.name,
+        leader=leader_instance_id,
+        models=list(providers),
+    ):
+        for round_num in range(1, max_rounds + 1):
+            # Check for cancellation before each round
+            if is_cancelled():
+                raise FlowCancelledError("Flow cancelled by user")
+
+            if progress_callback:
+                progress_callback(round_num, f"Round {round_num}: Processing...")
+
+            round_result = RoundResult(round_number=round_num)
+
+            with span("round", round=round_num, step=_leading_step(round_num)):
+                if round_num == 1:
+                    # Round 1: All ideate independently (including leader)
+                    base_prompt = prompts.get("round_1", "Please respond to the following task:")
+                    full_prompt = [
+                        PromptSegment(
+                            f"{base_prompt}\n\n{task_prompt}",
+                            cacheable=_shares_prompt_cache(providers.values()),
+                        )
+                    ]
+
+                    calls = [
+                        _call_provider(
+                            provider,
+                            full_prompt,
+                            temperature,
+                            max_tokens,
+                            system_prompt,
+                            instance_id,  # Pass instance_id
+                            display_names.get(instance_id),  # Pass display_name
+                            run_id=run_dir.name,
+                            tenant=tenant,
+                        )
+                        for instance_id, provider in providers.items()
+                    ]
+                    for call in asyncio.as_completed(calls):
+                        response = await call
+                        instance_id = response.instance_id
+                        round_result.responses.append(response)
+                        if not response.error:
+                            prev_responses[instance_id] = response.content
+                            _save_response_to_file(
+                                run_dir,
+                                round_num,
+                                instance_id,
+                                response.content,
+                                task_prompt,
+                                display_name=display_names.get(instance_id),
+                            )
+
+                elif round_num % 2 == 0:
+                    # Even rounds: Leader synthesizes
+                    with span("prompt.build", round=round_num):
+                        synthesis_prompt = prompts.get(
+                            "leader_synthesis",
+                            "Synthesize all contributions into a unified response:",
                         )
 
-        elif round_num % 2 == 0:
-            # Even rounds: Leader synthesizes
-            synthesis_prompt = prompts.get(
-                "leader_synthesis",
-                "Synthesize all contributions into a unified response:",
-            )
-
-            # Use display names for contribution output
-            all_contributions = []
-            for inst_id, content in prev_responses.items():
-                contrib_display = display_names.get(inst_id, inst_id)
-                all_contributions.append(f"**{contrib_display}:**\n{content}")
+                        # Use display names for contribution output
+                        all_contributions = []
+                        for inst_id, content in prev_responses.items():
+                            contrib_display = display_names.get(inst_id, inst_id)
+                            all_contributions.append(f"**{contrib_display}:**\n{content}")
 
-            leader_prompt = f"""{synthesis_prompt}
+                        leader_prompt = f"""{synthesis_prompt}
 
 **Contributions:**
 {chr(10).join(all_contributions)}
@@ -925,100 +1767,111 @@ def run_leading_flow(
 
 Please provide your synthesis:"""
 
-            response = _call_provider(
-                leader_provider,
-                leader_prompt,
-                temperature,
-                max_tokens,
-                system_prompt,
-                leader_instance_id,  # Pass instance_id
-                leader_display_name,  # Pass display_name
-            )
-            round_result.responses.append(response)
-            if not response.error:
-                leader_synthesis = response.content
-                prev_responses[leader_instance_id] = response.content
-                _save_response_to_file(
-                    run_dir,
-                    round_num,
-                    leader_instance_id,
-                    response.content,
-                    task_prompt,
-                    display_name=leader_display_name,
-                )
-
-        else:
-            # Odd rounds (after 1): Contributors respond to leader's synthesis
-            refinement_prompt = prompts.get(
-                "refinement",
-                "Review the leader's synthesis and provide your refined perspective:",
-            )
-
-            contributor_prompt = f"""{refinement_prompt}
-
-**Leader's synthesis:**
-{leader_synthesis}
-
-**Your previous response:**
-{{prev_response}}
-
-**Task:**
-{task_prompt}
-
-Please provide your refined perspective:"""
-
-            with ThreadPoolExecutor(max_workers=len(contributor_providers)) as executor:
-                futures = {
-                    executor.submit(
-                        _call_provider,
-                        provider,
-                        contributor_prompt.format(prev_response=prev_responses.get(instance_id, "(none)")),
+                    response = await _call_provider(
+                        leader_provider,
+                        leader_prompt,
                         temperature,
                         max_tokens,
                         system_prompt,
-                        instance_id,  # Pass instance_id
-                        display_names.get(instance_id),  # Pass display_name
-                    ): instance_id
-                    for instance_id, provider in contributor_providers.items()
-                }
-
-                for future in as_completed(futures):
-                    instance_id = futures[future]  # Get instance_id from our mapping
-                    response = future.result()
+                        leader_instance_id,  # Pass instance_id
+                        leader_display_name,  # Pass display_name
+                        run_id=run_dir.name,
+                        tenant=tenant,
+                    )
                     round_result.responses.append(response)
                     if not response.error:
-                        prev_responses[instance_id] = response.content
+                        leader_synthesis = response.content
+                        prev_responses[leader_instance_id] = response.content
                         _save_response_to_file(
                             run_dir,
                             round_num,
-                            instance_id,
+                            leader_instance_id,
                             response.content,
                             task_prompt,
-                            display_name=display_names.get(instance_id),
+                            display_name=leader_display_name,
                         )
 
-        results.rounds.append(round_result)
+                else:
+                    # Odd rounds (after 1): Contributors respond to leader's synthesis
+                    refinement_prompt = prompts.get(
+                        "refinement",
+                        "Review the leader's synthesis and provide your refined perspective:",
+                    )
 
-    # Check for cancellation before final synthesis
-    if is_cancelled():
-        raise FlowCancelledError("Flow cancelled by user")
+                    # The synthesis and task lead as a prefix shared by every contributor
+                    shared = PromptSegment(
+                        f"""{refinement_prompt}
 
-    # Final synthesis by leader
-    if progress_callback:
-        progress_callback(max_rounds + 1, "Final synthesis...")
+**Leader's synthesis:**
+{leader_synthesis}
 
-    final_prompt = prompts.get(
-        "leader_synthesis",
-        "Provide the final, comprehensive synthesis:",
-    )
+**Task:**
+{task_prompt}""",
+                        cacheable=_shares_prompt_cache(contributor_providers.values()),
+                    )
+
+                    def contributor_prompt(prev_response: str) -> list[PromptSegment]:
+                        return [
+                            shared,
+                            PromptSegment(
+                                f"**Your previous response:**\n{prev_response}\n\n"
+                                "Please provide your refined perspective:"
+                            ),
+                        ]
+
+                    calls = [
+                        _call_provider(
+                            provider,
+                            contributor_prompt(prev_responses.get(instance_id, "(none)")),
+                            temperature,
+                            max_tokens,
+                            system_prompt,
+                            instance_id,  # Pass instance_id
+                            display_names.get(instance_id),  # Pass display_name
+                            run_id=run_dir.name,
+                            tenant=tenant,
+                        )
+                        for instance_id, provider in contributor_providers.items()
+                    ]
+                    for call in asyncio.as_completed(calls):
+                        response = await call
+                        instance_id = response.instance_id
+                        round_result.responses.append(response)
+                        if not response.error:
+                            prev_responses[instance_id] = response.content
+                            _save_response_to_file(
+                                run_dir,
+                                round_num,
+                                instance_id,
+                                response.content,
+                                task_prompt,
+                                display_name=display_names.get(instance_id),
+                            )
+
+            results.rounds.append(round_result)
+
+        # Check for cancellation before final synthesis
+        if is_cancelled():
+            raise FlowCancelledError("Flow cancelled by user")
 
-    # Use display names for contribution output
-    all_contributions = []
-    for inst_id, content in prev_responses.items():
-        contrib_display = display_names.get(inst_id, inst_id)
-        all_contributions.append(f"**{contrib_display}:**\n{content}")
+        # Final synthesis by leader
+        if progress_callback:
+            progress_callback(max_rounds + 1, "Final synthesis...")
+
+        with span("round", round=max_rounds + 1, step="final"):
+            with span("prompt.build", round=max_rounds + 1):
+                final_prompt = prompts.get(
+                    "leader_synthesis",
+                    "Provide the final, comprehensive synthesis:",
+                )
+
+                # Use display names for contribution output
+                all_contributions = []
+                for inst_id, content in prev_responses.items():
+                    contrib_display = display_names.get(inst_id, inst_id)
+                    all_contributions.append(f"**{contrib_display}:**\n{content}")
 
-    final_leader_prompt = f"""{final_prompt}
+                final_leader_prompt = f"""{final_prompt}
 
 This is the final round. Please provide a comprehensive synthesis that:
 1. Integrates the best insights from all contributors
@@ -1033,38 +1886,61 @@ This is the final round. Please provide a comprehensive synthesis that:
 
 **Your final synthesis:**"""
 
-    final_response = _call_provider(
-        leader_provider,
-        final_leader_prompt,
-        temperature,
-        max_tokens,
-        system_prompt,
-        leader_instance_id,  # Pass instance_id
-        leader_display_name,  # Pass display_name
-    )
+            final_response = await _call_provider(
+                leader_provider,
+                final_leader_prompt,
+                temperature,
+                max_tokens,
+                system_prompt,
+                leader_instance_id,  # Pass instance_id
+                leader_display_name,  # Pass display_name
+                run_id=run_dir.name,
+                tenant=tenant,
+            )
 
-    if not final_response.error:
-        results.final_synthesis = final_response.content
-        # Save final synthesis to file
-        _save_response_to_file(
-            run_dir,
-            max_rounds + 1,
-            leader_instance_id,
-            final_response.content,
-            task_prompt,
-            is_synthesis=True,
-            display_name=leader_display_name,
-        )
-    else:
-        results.final_synthesis = f"Error generating final synthesis: {final_response.error}"
+            if not final_response.error:
+                results.final_synthesis = final_response.content
+                # Save final synthesis to file
+                _save_response_to_file(
+                    run_dir,
+                    max_rounds + 1,
+                    leader_instance_id,
+                    final_response.content,
+                    task_prompt,
+                    is_synthesis=True,
+                    display_name=leader_display_name,
+                )
+            else:
+                results.final_synthesis = (
+                    f"Error generating final synthesis: {final_response.error}"
+                )
 
     return results
 
 
+def _leading_step(round_num: int) -> str:
+    """What a leading-flow round does: ideate, leader synthesis, or contributors respond."""
+    if round_num == 1:
+        return "ideate"
+    return "synthesize" if round_num % 2 == 0 else "respond"
+
+
+def run_leading_flow(
+    flow: dict,
+    task_prompt: str,
+    providers: dict[str, BaseProvider],
+    progress_callback: Callable[[int, str], None] | None = None,
+    tenant: str | None = None,
+) -> FlowResults:
+    """Synchronous wrapper around arun_leading_flow() for callers without an event loop."""
+    return asyncio.run(arun_leading_flow(flow, task_prompt, providers, progress_callback, tenant))
+
+
 def init_leading_flow_state(
     flow: dict,
     task_prompt: str,
     providers: dict[str, BaseProvider],
+    tenant: str | None = None,
 ) -> LeadingFlowState:
     """
     Initialize state for step-by-step leading flow execution.
@@ -1073,6 +1949,7 @@ def init_leading_flow_state(
         flow: Flow configuration dict
         task_prompt: User's task/question
         providers: Dict of instance_id -> provider_instance
+        tenant: Optional owner of the run, so concurrent users share capacity fairly
 
     Returns:
         LeadingFlowState ready for step-by-step execution
@@ -1111,10 +1988,11 @@ def init_leading_flow_state(
         display_names=display_names,
         run_dir=run_dir,
         results=results,
+        tenant=tenant,
     )
 
 
-def run_leading_flow_step(
+async def arun_leading_flow_step(
     state: LeadingFlowState,
     providers: dict[str, BaseProvider],
     edited_synthesis: str | None = None,
@@ -1156,7 +2034,7 @@ def run_leading_flow_step(
     # Check if we've exceeded max rounds
     if round_num > state.max_rounds:
         # Do final synthesis
-        return _do_final_synthesis(state, providers)
+        return await _do_final_synthesis(state, providers)
 
     leader_provider = providers[state.leader_instance_id]
     contributor_providers = {k: v for k, v in providers.items() if k != state.leader_instance_id}
@@ -1164,15 +2042,26 @@ def run_leading_flow_step(
     round_result = RoundResult(round_number=round_num)
 
     try:
-        if round_num == 1:
-            # Round 1: All ideate independently (including leader)
-            base_prompt = state.prompts.get("round_1", "Please respond to the following task:")
-            full_prompt = f"{base_prompt}\n\n{state.task_prompt}"
-
-            with ThreadPoolExecutor(max_workers=len(providers)) as executor:
-                futures = {
-                    executor.submit(
-                        _call_provider,
+        with trace(
+            "flow.step",
+            state.run_dir / TRACE_FILE,
+            flow=state.results.flow_name,
+            run_id=state.run_dir.name,
+            round=round_num,
+            step=_leading_step(round_num),
+        ):
+            if round_num == 1:
+                # Round 1: All ideate independently (including leader)
+                base_prompt = state.prompts.get("round_1", "Please respond to the following task:")
+                full_prompt = [
+                    PromptSegment(
+                        f"{base_prompt}\n\n{state.task_prompt}",
+                        cacheable=_shares_prompt_cache(providers.values()),
+                    )
+                ]
+
+                calls = [
+                    _call_provider(
                         provider,
                         full_prompt,
                         state.temperature,
@@ -1180,13 +2069,14 @@ def run_leading_flow_step(
                         state.system_prompt,
                         instance_id,  # Pass instance_id
                         state.display_names.get(instance_id),  # Pass display_name
-                    ): instance_id
+                        run_id=state.run_dir.name,
+                        tenant=state.tenant,
+                    )
                     for instance_id, provider in providers.items()
-                }
-
-                for future in as_completed(futures):
-                    instance_id = futures[future]  # Get instance_id from our mapping
-                    response = future.result()
+                ]
+                for call in asyncio.as_completed(calls):
+                    response = await call
+                    instance_id = response.instance_id
                     round_result.responses.append(response)
                     if not response.error:
                         state.prev_responses[instance_id] = response.content
@@ -1199,20 +2089,21 @@ def run_leading_flow_step(
                             display_name=state.display_names.get(instance_id),
                         )
 
-        elif round_num % 2 == 0:
-            # Even rounds: Leader synthesizes
-            synthesis_prompt = state.prompts.get(
-                "leader_synthesis",
-                "Synthesize all contributions into a unified response:",
-            )
+            elif round_num % 2 == 0:
+                # Even rounds: Leader synthesizes
+                with span("prompt.build", round=round_num):
+                    synthesis_prompt = state.prompts.get(
+                        "leader_synthesis",
+                        "Synthesize all contributions into a unified response:",
+                    )
 
-            # Use display names for contribution output
-            all_contributions = []
-            for inst_id, content in state.prev_responses.items():
-                contrib_display = state.display_names.get(inst_id, inst_id)
-                all_contributions.append(f"**{contrib_display}:**\n{content}")
+                    # Use display names for contribution output
+                    all_contributions = []
+                    for inst_id, content in state.prev_responses.items():
+                        contrib_display = state.display_names.get(inst_id, inst_id)
+                        all_contributions.append(f"**{contrib_display}:**\n{content}")
 
-            leader_prompt = f"""{synthesis_prompt}
+                    leader_prompt = f"""{synthesis_prompt}
 
 **Contributions:**
 {chr(10).join(all_contributions)}
@@ -1222,70 +2113,79 @@ def run_leading_flow_step(
 
 Please provide your synthesis:"""
 
-            response = _call_provider(
-                leader_provider,
-                leader_prompt,
-                state.temperature,
-                state.max_tokens,
-                state.system_prompt,
-                state.leader_instance_id,  # Pass instance_id
-                state.leader_display_name,  # Pass display_name
-            )
-            round_result.responses.append(response)
-            if not response.error:
-                state.leader_synthesis = response.content
-                state.prev_responses[state.leader_instance_id] = response.content
-                _save_response_to_file(
-                    state.run_dir,
-                    round_num,
-                    state.leader_instance_id,
-                    response.content,
-                    state.task_prompt,
-                    display_name=state.leader_display_name,
+                response = await _call_provider(
+                    leader_provider,
+                    leader_prompt,
+                    state.temperature,
+                    state.max_tokens,
+                    state.system_prompt,
+                    state.leader_instance_id,  # Pass instance_id
+                    state.leader_display_name,  # Pass display_name
+                    run_id=state.run_dir.name,
+                    tenant=state.tenant,
                 )
-                # Pause for user review after leader synthesis
-                state.pending_review = True
-            else:
-                state.error = f"Leader synthesis error: {response.error}"
+                round_result.responses.append(response)
+                if not response.error:
+                    state.leader_synthesis = response.content
+                    state.prev_responses[state.leader_instance_id] = response.content
+                    _save_response_to_file(
+                        state.run_dir,
+                        round_num,
+                        state.leader_instance_id,
+                        response.content,
+                        state.task_prompt,
+                        display_name=state.leader_display_name,
+                    )
+                    # Pause for user review after leader synthesis
+                    state.pending_review = True
+                else:
+                    state.error = f"Leader synthesis error: {response.error}"
 
-        else:
-            # Odd rounds (after 1): Contributors respond to leader's synthesis
-            refinement_prompt = state.prompts.get(
-                "refinement",
-                "Review the leader's synthesis and provide your refined perspective:",
-            )
+            else:
+                # Odd rounds (after 1): Contributors respond to leader's synthesis
+                refinement_prompt = state.prompts.get(
+                    "refinement",
+                    "Review the leader's synthesis and provide your refined perspective:",
+                )
 
-            contributor_prompt = f"""{refinement_prompt}
+                # The synthesis and task lead as a prefix shared by every contributor
+                shared = PromptSegment(
+                    f"""{refinement_prompt}
 
 **Leader's synthesis:**
 {state.leader_synthesis}
 
-**Your previous response:**
-{{prev_response}}
-
 **Task:**
-{state.task_prompt}
-
-Please provide your refined perspective:"""
+{state.task_prompt}""",
+                    cacheable=_shares_prompt_cache(contributor_providers.values()),
+                )
 
-            with ThreadPoolExecutor(max_workers=len(contributor_providers)) as executor:
-                futures = {
-                    executor.submit(
-                        _call_provider,
+                def contributor_prompt(prev_response: str) -> list[PromptSegment]:
+                    return [
+                        shared,
+                        PromptSegment(
+                            f"**Your previous response:**\n{prev_response}\n\n"
+                            "Please provide your refined perspective:"
+                        ),
+                    ]
+
+                calls = [
+                    _call_provider(
                         provider,
-                        contributor_prompt.format(prev_response=state.prev_responses.get(instance_id, "(none)")),
+                        contributor_prompt(state.prev_responses.get(instance_id, "(none)")),
                         state.temperature,
                         state.max_tokens,
                         state.system_prompt,
                         instance_id,  # Pass instance_id
                         state.display_names.get(instance_id),  # Pass display_name
-                    ): instance_id
+                        run_id=state.run_dir.name,
+                        tenant=state.tenant,
+                    )
                     for instance_id, provider in contributor_providers.items()
-                }
-
-                for future in as_completed(futures):
-                    instance_id = futures[future]  # Get instance_id from our mapping
-                    response = future.result()
+                ]
+                for call in asyncio.as_completed(calls):
+                    response = await call
+                    instance_id = response.instance_id
                     round_result.responses.append(response)
                     if not response.error:
                         state.prev_responses[instance_id] = response.content
@@ -1306,25 +2206,43 @@ Please provide your refined perspective:"""
     return state
 
 
-def _do_final_synthesis(
+def run_leading_flow_step(
+    state: LeadingFlowState,
+    providers: dict[str, BaseProvider],
+    edited_synthesis: str | None = None,
+) -> LeadingFlowState:
+    """Synchronous wrapper around arun_leading_flow_step() for callers without an event loop."""
+    return asyncio.run(arun_leading_flow_step(state, providers, edited_synthesis))
+
+
+async def _do_final_synthesis(
     state: LeadingFlowState,
     providers: dict[str, BaseProvider],
 ) -> LeadingFlowState:
     """Generate final synthesis and mark flow complete."""
     leader_provider = providers[state.leader_instance_id]
 
-    final_prompt = state.prompts.get(
-        "leader_synthesis",
-        "Provide the final, comprehensive synthesis:",
-    )
+    with trace(
+        "flow.step",
+        state.run_dir / TRACE_FILE,
+        flow=state.results.flow_name,
+        run_id=state.run_dir.name,
+        round=state.max_rounds + 1,
+        step="final",
+    ):
+        with span("prompt.build", round=state.max_rounds + 1):
+            final_prompt = state.prompts.get(
+                "leader_synthesis",
+                "Provide the final, comprehensive synthesis:",
+            )
 
-    # Use display names for contribution output
-    all_contributions = []
-    for inst_id, content in state.prev_responses.items():
-        contrib_display = state.display_names.get(inst_id, inst_id)
-        all_contributions.append(f"**{contrib_display}:**\n{content}")
+            # Use display names for contribution output
+            all_contributions = []
+            for inst_id, content in state.prev_responses.items():
+                contrib_display = state.display_names.get(inst_id, inst_id)
+                all_contributions.append(f"**{contrib_display}:**\n{content}")
 
-    final_leader_prompt = f"""{final_prompt}
+            final_leader_prompt = f"""{final_prompt}
 
 This is the final round. Please provide a comprehensive synthesis that:
 1. Integrates the best insights from all contributors
@@ -1339,30 +2257,34 @@ This is the final round. Please provide a comprehensive synthesis that:
 
 **Your final synthesis:**"""
 
-    final_response = _call_provider(
-        leader_provider,
-        final_leader_prompt,
-        state.temperature,
-        state.max_tokens,
-        state.system_prompt,
-        state.leader_instance_id,  # Pass instance_id
-        state.leader_display_name,  # Pass display_name
-    )
-
-    if not final_response.error:
-        state.results.final_synthesis = final_response.content
-        _save_response_to_file(
-            state.run_dir,
-            state.max_rounds + 1,
-            state.leader_instance_id,
-            final_response.content,
-            state.task_prompt,
-            is_synthesis=True,
-            display_name=state.leader_display_name,
+        final_response = await _call_provider(
+            leader_provider,
+            final_leader_prompt,
+            state.temperature,
+            state.max_tokens,
+            state.system_prompt,
+            state.leader_instance_id,  # Pass instance_id
+            state.leader_display_name,  # Pass display_name
+            run_id=state.run_dir.name,
+            tenant=state.tenant,
         )
-    else:
-        state.results.final_synthesis = f"Error generating final synthesis: {final_response.error}"
-        state.error = final_response.error
+
+        if not final_response.error:
+            state.results.final_synthesis = final_response.content
+            _save_response_to_file(
+                state.run_dir,
+                state.max_rounds + 1,
+                state.leader_instance_id,
+                final_response.content,
+                state.task_prompt,
+                is_synthesis=True,
+                display_name=state.leader_display_name,
+            )
+        else:
+            state.results.final_synthesis = (
+                f"Error generating final synthesis: {final_response.error}"
+            )
+            state.error = final_response.error
 
     state.is_complete = True
     return state
@@ -11,12 +11,13 @@ API Documentation: https://openrouter.ai/docs
 
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import TYPE_CHECKING
 
 import openai
 
-from lib.executor import BaseProvider, DEFAULT_TIMEOUT, MODEL_NAMES
+from lib.executor import BaseProvider, DEFAULT_TIMEOUT, MODEL_NAMES, Prompt, render_prompt
 
 if TYPE_CHECKING:
     from lib.executor import ModelInstance
@@ -137,6 +138,12 @@ OPENROUTER_PROVIDER_NAMES = {
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+OPENROUTER_HEADERS = {
+    "HTTP-Referer": "https://conclave.ai",
+    "X-Title": "Conclave",
+}
+
 
 # =============================================================================
 # Helper Functions
@@ -232,14 +239,27 @@ class OpenRouterProvider(BaseProvider):
         # Create OpenAI client with OpenRouter base URL
         self.client = openai.OpenAI(
             api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
+            base_url=OPENROUTER_BASE_URL,
             timeout=timeout,
-            default_headers={
-                "HTTP-Referer": "https://conclave.ai",
-                "X-Title": "Conclave",
-            },
+            default_headers=OPENROUTER_HEADERS,
         )
 
+    def _create_async_client(self):
+        return openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=OPENROUTER_BASE_URL,
+            timeout=self.timeout,
+            default_headers=OPENROUTER_HEADERS,
+        )
+
+    def _build_messages(self, prompt: Prompt, system_prompt: str | None) -> list[dict]:
+        effective_system_prompt = self.get_effective_system_prompt(system_prompt)
+        messages = []
+        if effective_system_prompt:
+            messages.append({"role": "system", "content": effective_system_prompt})
+        messages.append({"role": "user", "content": render_prompt(prompt)})
+        return messages
+
     @property
     def name(self) -> str:
         """Provider name (e.g., 'deepseek', 'meta')."""
@@ -247,7 +267,7 @@ class OpenRouterProvider(BaseProvider):
 
     def generate(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
         max_tokens: int = 2048,
         system_prompt: str | None = None,
@@ -271,11 +291,7 @@ class OpenRouterProvider(BaseProvider):
             openai.AuthenticationError: Invalid API key
             openai.RateLimitError: Rate limit exceeded after retries
         """
-        effective_system_prompt = self.get_effective_system_prompt(system_prompt)
-        messages = []
-        if effective_system_prompt:
-            messages.append({"role": "system", "content": effective_system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, system_prompt)
 
         # Retry logic for rate limits
         last_error = None
@@ -303,6 +319,39 @@ class OpenRouterProvider(BaseProvider):
 
         raise RuntimeError("Failed to generate response after retries")
 
+    async def agenerate(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        system_prompt: str | None = None,
+    ) -> str:
+        """Async version of generate(), with the same rate-limit retries."""
+        messages = self._build_messages(prompt, system_prompt)
+        client = self.get_async_client()
+
+        last_error = None
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    messages=messages,
+                )
+                return response.choices[0].message.content
+
+            except openai.RateLimitError as e:
+                last_error = e
+                if attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(RETRY_DELAY_SECONDS * (2 ** attempt))
+                continue
+
+        if last_error:
+            raise last_error
+
+        raise RuntimeError("Failed to generate response after retries")
+
 
 # =============================================================================
 # Factory Functions
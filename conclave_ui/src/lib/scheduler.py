@@ -0,0 +1,212 @@
+"""
+Process-wide fair scheduler for provider calls.
+
+Every provider call from every executor run takes a slot from one shared
+scheduler before it is sent. Total concurrency and per-provider concurrency are
+bounded, and waiting calls are granted round-robin across tenants, then across
+the runs of each tenant, so one large flow cannot starve everyone else.
+
+Runs may live on different event loops (the synchronous wrappers start one
+loop per run, often in different threads), so scheduler state is guarded by a
+thread lock and waiters are woken on their own loop.
+"""
+
+import asyncio
+import contextlib
+import math
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+
+# Calls in flight across the whole process
+MAX_CONCURRENT_CALLS = 64
+
+# Calls in flight per provider (anthropic, openai, ...) unless overridden
+DEFAULT_PROVIDER_CONCURRENCY = 16
+
+DEFAULT_TENANT = "default"
+
+# Recent queue waits kept for the wait-time metrics
+WAIT_WINDOW = 1000
+
+
+@dataclass
+class _Waiter:
+    """A queued call waiting for a slot."""
+
+    provider: str
+    run_id: str
+    tenant: str
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+    granted: bool = False
+    wait: float = 0.0
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class CallScheduler:
+    """Bounded, fair queue of provider calls shared by all runs in the process."""
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_CALLS,
+        provider_limit: int = DEFAULT_PROVIDER_CONCURRENCY,
+        provider_limits: dict[str, int] | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.provider_limit = provider_limit
+        self.provider_limits = provider_limits or {}
+
+        self._lock = threading.Lock()
+        # tenant -> run_id -> queued calls, in arrival order
+        self._queues: dict[str, OrderedDict[str, deque[_Waiter]]] = {}
+        self._tenants: deque[str] = deque()
+        self._running = 0
+        self._running_by_provider: Counter[str] = Counter()
+        self._waits: deque[float] = deque(maxlen=WAIT_WINDOW)
+        self._granted = 0
+
+    def _limit(self, provider: str) -> int:
+        return self.provider_limits.get(provider, self.provider_limit)
+
+    def _has_capacity(self, provider: str) -> bool:
+        return self._running_by_provider[provider] < self._limit(provider)
+
+    def _next_waiter(self) -> _Waiter | None:
+        """Pop the next grantable call: tenants round-robin, then runs round-robin.
+
+        Within a run, the oldest call whose provider has spare capacity goes
+        first, so a saturated provider doesn't block calls to other providers.
+        """
+        for _ in range(len(self._tenants)):
+            tenant = self._tenants[0]
+            self._tenants.rotate(-1)
+            runs = self._queues[tenant]
+            for run_id, queue in list(runs.items()):
+                for waiter in queue:
+                    if not self._has_capacity(waiter.provider):
+                        continue
+                    queue.remove(waiter)
+                    # This tenant's next grant goes to one of its other runs
+                    runs.move_to_end(run_id)
+                    if not queue:
+                        del runs[run_id]
+                    if not runs:
+                        del self._queues[tenant]
+                        self._tenants.remove(tenant)
+                    return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        """Grant slots while capacity allows. Caller holds the lock."""
+        while self._running < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            waiter.granted = True
+            waiter.wait = time.monotonic() - waiter.enqueued
+            self._running += 1
+            self._running_by_provider[waiter.provider] += 1
+            self._waits.append(waiter.wait)
+            self._granted += 1
+            waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        if waiter.tenant not in self._queues:
+            self._queues[waiter.tenant] = OrderedDict()
+            self._tenants.append(waiter.tenant)
+        self._queues[waiter.tenant].setdefault(waiter.run_id, deque()).append(waiter)
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        runs = self._queues.get(waiter.tenant, {})
+        queue = runs.get(waiter.run_id)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del runs[waiter.run_id]
+            if not runs:
+                self._queues.pop(waiter.tenant, None)
+                self._tenants.remove(waiter.tenant)
+
+    def _release(self, provider: str) -> None:
+        with self._lock:
+            self._running -= 1
+            self._running_by_provider[provider] -= 1
+            self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, provider: str, run_id: str, tenant: str | None = None):
+        """Wait for a slot to call ``provider``; yields the seconds spent queued."""
+        waiter = _Waiter(
+            provider=provider,
+            run_id=run_id,
+            tenant=tenant or DEFAULT_TENANT,
+            loop=asyncio.get_running_loop(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        with self._lock:
+            self._enqueue(waiter)
+            self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._dequeue(waiter)
+            # Granted just as we were cancelled - hand the slot back
+            if granted:
+                self._release(provider)
+            raise
+
+        try:
+            yield waiter.wait
+        finally:
+            self._release(provider)
+
+    def metrics(self) -> dict:
+        """Queue depth, in-flight calls and recent queue wait times."""
+        with self._lock:
+            queued_by_tenant = {
+                tenant: sum(len(q) for q in runs.values())
+                for tenant, runs in self._queues.items()
+            }
+            waits = sorted(self._waits)
+            return {
+                "queued": sum(queued_by_tenant.values()),
+                "queued_by_tenant": queued_by_tenant,
+                "running": self._running,
+                "running_by_provider": {p: n for p, n in self._running_by_provider.items() if n},
+                "granted": self._granted,
+                "wait_seconds": {
+                    "avg": sum(waits) / len(waits) if waits else 0.0,
+                    "p95": waits[math.ceil(0.95 * len(waits)) - 1] if waits else 0.0,
+                    "max": waits[-1] if waits else 0.0,
+                },
+            }
+
+
+_scheduler = CallScheduler()
+
+
+def get_scheduler() -> CallScheduler:
+    """The process-wide scheduler used by the executor."""
+    return _scheduler
+
+
+def configure_scheduler(
+    max_concurrency: int = MAX_CONCURRENT_CALLS,
+    provider_limit: int = DEFAULT_PROVIDER_CONCURRENCY,
+    provider_limits: dict[str, int] | None = None,
+) -> CallScheduler:
+    """Replace the process-wide scheduler (call before any flow starts)."""
+    global _scheduler
+    _scheduler = CallScheduler(max_concurrency, provider_limit, provider_limits)
+    return _scheduler
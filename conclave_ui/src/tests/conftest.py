@@ -0,0 +1,6 @@
+"""Import the UI's modules as ``lib.*``, as the app does, from ``src``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,122 @@
+"""Fair scheduling of provider calls across runs and tenants (lib.scheduler)."""
+
+import asyncio
+import threading
+
+import pytest
+
+from lib.scheduler import CallScheduler
+
+
+async def queued(scheduler: CallScheduler, count: int) -> None:
+    """Wait until ``count`` calls are queued."""
+    while scheduler.metrics()["queued"] < count:
+        await asyncio.sleep(0)
+
+
+async def hold(scheduler: CallScheduler, provider: str, run_id: str) -> None:
+    """Take a slot and keep it until cancelled."""
+    async with scheduler.slot(provider, run_id):
+        await asyncio.Event().wait()
+
+
+async def grant_order(scheduler: CallScheduler, calls: list[tuple[str, str, str]]) -> list[str]:
+    """Queue (provider, run_id, tenant) calls behind a held slot; the runs in grant order."""
+    order = []
+
+    async def call(provider, run_id, tenant):
+        async with scheduler.slot(provider, run_id, tenant):
+            order.append(run_id)
+            await asyncio.sleep(0)
+
+    async with scheduler.slot("p", "blocker"):
+        tasks = [asyncio.create_task(call(*args)) for args in calls]
+        await queued(scheduler, len(calls))
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_runs_take_turns():
+    scheduler = CallScheduler(max_concurrency=1)
+    calls = [("p", "big", "t")] * 4 + [("p", "small", "t")] * 2
+
+    order = asyncio.run(grant_order(scheduler, calls))
+
+    assert order == ["big", "small", "big", "small", "big", "big"]
+
+
+def test_tenants_take_turns_before_runs():
+    scheduler = CallScheduler(max_concurrency=1)
+    calls = [("p", "x1", "x")] * 3 + [("p", "x2", "x")] * 3 + [("p", "y1", "y")] * 3
+
+    order = asyncio.run(grant_order(scheduler, calls))
+
+    # Tenant y's one run gets every other slot, though tenant x queued twice as much
+    assert order[:6] == ["x1", "y1", "x2", "y1", "x1", "y1"]
+    assert order[6:] == ["x2", "x1", "x2"]
+
+
+def test_saturated_provider_does_not_block_others():
+    async def scenario():
+        scheduler = CallScheduler(max_concurrency=4, provider_limits={"slow": 1})
+        async with scheduler.slot("slow", "run"):
+            waiting = asyncio.create_task(hold(scheduler, "slow", "run"))
+            await queued(scheduler, 1)
+            async with scheduler.slot("fast", "run"):
+                metrics = scheduler.metrics()
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+        return metrics, scheduler.metrics()
+
+    during, after = asyncio.run(scenario())
+
+    assert during["queued"] == 1
+    assert during["running_by_provider"] == {"slow": 1, "fast": 1}
+    assert (after["queued"], after["running"]) == (0, 0)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = CallScheduler(max_concurrency=1)
+        async with scheduler.slot("p", "a"):
+            task = asyncio.create_task(hold(scheduler, "p", "b"))
+            await queued(scheduler, 1)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            assert scheduler.metrics()["queued"] == 0
+        # The freed slot isn't handed to the cancelled call
+        async with scheduler.slot("p", "c") as wait:
+            return wait, scheduler.metrics()
+
+    wait, metrics = asyncio.run(scenario())
+    assert wait < 0.1
+    assert metrics["running"] == 1 and metrics["granted"] == 2
+
+
+def test_limits_hold_across_event_loops():
+    scheduler = CallScheduler(max_concurrency=3)
+    peak, lock = [0, 0], threading.Lock()
+
+    async def run(run_id):
+        async def call():
+            async with scheduler.slot("p", run_id):
+                with lock:
+                    peak[0] += 1
+                    peak[1] = max(peak[1], peak[0])
+                await asyncio.sleep(0.01)
+                with lock:
+                    peak[0] -= 1
+
+        await asyncio.gather(*(call() for _ in range(5)))
+
+    threads = [threading.Thread(target=asyncio.run, args=(run(f"run-{i}"),)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    metrics = scheduler.metrics()
+    assert peak[1] <= 3
+    assert metrics["granted"] == 20 and metrics["running"] == 0
+    assert metrics["wait_seconds"]["max"] > 0